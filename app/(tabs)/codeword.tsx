@@ -89,6 +89,12 @@ export default function CodewordScreen() {
     initializeSession();
   }, []);
 
+  // Drop the session's cached event pages when the session ends
+  useEffect(() => {
+    if (!sessionId) return;
+    return () => chatApi.clearSessionEvents(sessionId);
+  }, [sessionId]);
+
   const handleSendMessage = async () => {
     if (!inputText.trim() || !sessionId || isLoading) return;
 
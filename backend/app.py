@@ -6,16 +6,32 @@ Connects to OpenAI GPT-4o for real AI responses
 """
 import os
 import time
-import json
 import asyncio
 from datetime import datetime
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, Response
 from flask_cors import CORS
-from openai import OpenAI
 import logging
 
 # Import XCAi-AIIA Multi-Agent System
 from xcai_agents import initialize_xcai_system
+from xcai_agents.core.rate_limit import build_rate_limiter_from_env
+from xcai_agents.core.llm_client import build_openai_client_from_env, LazyOpenAIClient
+from xcai_agents.core.ids import new_id
+from xcai_agents.core.sessions import create_session as register_session, create_sessions
+from xcai_agents.core.message_store import build_message_store_from_env
+from xcai_agents.core.serialization import dumps, dumps_with_fragments, crisis_support_fragment
+from xcai_agents.core.health import HealthSnapshotCache
+from xcai_agents.core.scheduler import llm_gate
+from xcai_agents.core.pattern_store import build_pattern_store_from_env
+from xcai_agents.core.crisis_model_store import build_crisis_model_store_from_env
+from xcai_agents.core.semantic_router import build_semantic_router_from_env
+from xcai_agents.core.phrase_matcher import TokenMatcher
+from xcai_agents.core.fuzzy_lexicon import FuzzyLexicon
+from xcai_agents.core.text_index import index_text
+from xcai_agents.core.affinity import build_affinity_from_env, FORWARDED_HEADER, INTERNAL_TOKEN_HEADER
+from xcai_agents.core.admission import (
+    AdmissionController, AdaptiveConcurrencyLimiter, PRIORITY_CRISIS, PRIORITY_STANDARD
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,29 +40,115 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-# OpenAI Configuration
-api_key = os.getenv('OPENAI_API_KEY')
-if api_key:
-    try:
-        openai_client = OpenAI(api_key=api_key)
-        logger.info("OpenAI client initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize OpenAI client: {e}")
-        openai_client = None
-else:
-    logger.error("OPENAI_API_KEY environment variable not set")
-    openai_client = None
+# OpenAI Configuration (client built on first LLM call)
+openai_client = build_openai_client_from_env()
+
+# Build agents on first use; XCAI_PREWARM_AGENTS=true builds them at startup instead
+# (gunicorn.conf.py sets it so the preloading master builds them once before fork)
+prewarm_agents = os.getenv('XCAI_PREWARM_AGENTS', 'false').lower() == 'true'
+if prewarm_agents and openai_client is not None:
+    LazyOpenAIClient.preload_module()
+
+# Admission control in front of the orchestrator (crisis requests always admitted)
+admission_controller = AdmissionController(
+    limiter=AdaptiveConcurrencyLimiter(
+        initial_limit=int(os.getenv('CHAT_CONCURRENCY_LIMIT', 20)),
+        max_limit=int(os.getenv('CHAT_CONCURRENCY_MAX', 200)),
+        latency_target=float(os.getenv('CHAT_LATENCY_TARGET', 2.0))
+    ),
+    max_queue=int(os.getenv('CHAT_QUEUE_SIZE', 50)),
+    queue_timeout=float(os.getenv('CHAT_QUEUE_TIMEOUT', 1.0))
+)
+
+# Token-bucket rate limits per device, per session and globally
+rate_limiter = build_rate_limiter_from_env()
+
+# Consistent-hash session ownership across nodes (disabled unless SESSION_NODES is set)
+session_affinity = build_affinity_from_env()
+
+# Keyword tables from a precompiled artifact or a directory of versioned JSON configs (XCAI_PATTERNS),
+# reloaded by a background watcher when they change; agents keep their built-in tables when unset
+pattern_store = build_pattern_store_from_env()
+
+# Second-stage crisis classifier from a model file or registry (XCAI_CRISIS_MODEL); keyword-only when unset
+crisis_model_store = build_crisis_model_store_from_env()
+
+# Similarity-based routing stage after the keyword indicators (XCAI_SEMANTIC_ROUTING=true)
+semantic_router = build_semantic_router_from_env()
 
 # Initialize XCAi-AIIA Multi-Agent System
 try:
-    xcai_orchestrator = initialize_xcai_system(openai_client=openai_client)
+    xcai_orchestrator = initialize_xcai_system(
+        openai_client=openai_client, prewarm=prewarm_agents, pattern_store=pattern_store,
+        crisis_model=crisis_model_store, semantic_router=semantic_router
+    )
     logger.info("XCAi-AIIA Multi-Agent System initialized successfully")
+    
+    # Skip the LLM tier once the limiter is saturated
+    xcai_orchestrator.degradation.set_load_provider(admission_controller.load)
+    
+    # Optional per-route quality ladder, e.g. XCAI_CHAT_DEGRADATION_TIERS=neo_fallback,template
+    chat_tiers = os.getenv('XCAI_CHAT_DEGRADATION_TIERS')
+    if chat_tiers:
+        xcai_orchestrator.degradation.configure_route(
+            'chat', tiers=[tier.strip() for tier in chat_tiers.split(',') if tier.strip()]
+        )
 except Exception as e:
     logger.error(f"Failed to initialize XCAi-AIIA system: {e}")
     xcai_orchestrator = None
 
 # Store sessions in memory (use Redis/DB in production)
 sessions = {}
+MAX_BULK_SESSIONS = int(os.getenv('MAX_BULK_SESSIONS', 10))
+MAX_EVENTS_PAGE = int(os.getenv('MAX_EVENTS_PAGE', 500))
+
+# Quick crisis checks on the raw message, matched on word boundaries
+CRISIS_MODE_PHRASES = ['suicide', 'kill myself', 'end my life', 'overdose', 'emergency']
+CRISIS_MODE_INDICATORS = TokenMatcher.of(CRISIS_MODE_PHRASES)
+# Inflected forms whole-word phrases miss ("overdosed", "suicidal", "emergencies")
+CRISIS_MODE_STEMS = ('suicid', 'overdos', 'emergenc')
+# Misspellings and shorthand ("kil myself", "wanna kms"), corrected as in MIKA's second pass
+CRISIS_MODE_LEXICON = FuzzyLexicon(CRISIS_MODE_PHRASES)
+FALLBACK_CRISIS_KEYWORDS = TokenMatcher.of(['crisis', 'suicide', 'kill myself', 'hurt myself', 'hopeless'])
+
+def _crisis_indicators_in(index) -> bool:
+    return CRISIS_MODE_INDICATORS.any(index) or any(token.startswith(CRISIS_MODE_STEMS) for token in index.tokens)
+
+def crisis_mode_indicated(message: str) -> bool:
+    """Crisis-mode gate: indicator phrases or their stems, in the message or its misspelling-corrected form"""
+    index = index_text(message)
+    if _crisis_indicators_in(index):
+        return True
+    corrected = CRISIS_MODE_LEXICON.correct(index)
+    return corrected is not None and _crisis_indicators_in(corrected[0])
+
+# Write-behind SQLite history (MESSAGE_STORE_PATH); memory-only when unset
+message_store = build_message_store_from_env()
+
+def get_session(session_id):
+    """In-memory session, lazily rehydrated from the message store after a restart"""
+    session = sessions.get(session_id)
+    if session is None and message_store is not None:
+        try:
+            stored = message_store.load_session(session_id)
+        except Exception as e:
+            # Chat carries on with what this process holds rather than failing the request
+            logger.error(f"Could not rehydrate session {session_id}: {e}")
+            return sessions.get(session_id)
+        if stored is not None:
+            session = sessions.setdefault(session_id, stored)
+    return session
+
+def store_session(session):
+    session = sessions.setdefault(session['session_id'], session)
+    if message_store is not None:
+        message_store.create_session(session)
+    return session
+
+def append_message(session_id, message):
+    sessions[session_id]['messages'].append(message)
+    if message_store is not None:
+        message_store.append(session_id, message)
 
 class CodewordBackend:
     def __init__(self):
@@ -58,9 +160,14 @@ class CodewordBackend:
 
 backend = CodewordBackend()
 
+def json_response(payload, status=200, fragments=None):
+    """JSON response through the fast serializer; `fragments` are pre-encoded members"""
+    body = dumps_with_fragments(payload, fragments) if fragments else dumps(payload)
+    return Response(body, status=status, mimetype='application/json')
+
 @app.route('/', methods=['GET'])
 def root():
-    return jsonify({
+    return json_response({
         "message": "Crisis support and life coaching API",
         "service": "Codeword Backend", 
         "status": "online"
@@ -68,7 +175,7 @@ def root():
 
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({
+    return json_response({
         "service": "codeword-backend",
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
@@ -76,24 +183,46 @@ def health():
         "version": backend.version
     })
 
+def route_to_owner(session_id):
+    """Proxy the current request to the node owning the session; None means serve locally"""
+    if request.headers.get(FORWARDED_HEADER) or session_affinity.is_local(session_id):
+        return None
+    result = session_affinity.forward(
+        session_id, request.method, request.full_path.rstrip('?'), request.get_data() or None,
+        headers={'If-None-Match': request.headers.get('If-None-Match')}
+    )
+    if result is None:
+        return None
+    status, body, headers = result
+    return Response(body, status=status, headers=headers)
+
+def rate_limited_response(scope, retry_after):
+    """429 response with a Retry-After hint"""
+    response = json_response({
+        'error': 'Rate limit exceeded. Please wait before sending another message.',
+        'limit_scope': scope,
+        'retry_after': round(retry_after, 2)
+    }, status=429)
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
 @app.route('/api/session', methods=['POST'])
 def create_session():
     try:
         data = request.get_json()
-        device_id = data.get('device_id', f'device-{int(time.time())}')
+        device_id = data.get('device_id') or new_id('device-')
         
-        session_id = f'session-{int(time.time())}-{device_id}'
+        allowed, limited_scope, retry_after = rate_limiter.check(device_id=device_id)
+        if not allowed:
+            return rate_limited_response(limited_scope, retry_after)
         
-        sessions[session_id] = {
-            'session_id': session_id,
-            'device_id': device_id,
-            'created_at': time.time(),
-            'messages': []
-        }
+        session = register_session(sessions, device_id, accept=session_affinity.is_local)
+        store_session(session)
+        session_id = session['session_id']
         
         logger.info(f"Created session: {session_id}")
         
-        return jsonify({
+        return json_response({
             'session_id': session_id,
             'device_id': device_id,
             'status': 'created'
@@ -101,7 +230,81 @@ def create_session():
         
     except Exception as e:
         logger.error(f"Session creation error: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, status=500)
+
+@app.route('/api/session/bulk', methods=['POST'])
+def create_sessions_bulk():
+    """Pre-warm several sessions for one device in a single call"""
+    try:
+        data = request.get_json() or {}
+        device_id = data.get('device_id') or new_id('device-')
+        count = data.get('count', 1)
+        if not isinstance(count, int) or not 1 <= count <= MAX_BULK_SESSIONS:
+            return json_response({'error': f'count must be between 1 and {MAX_BULK_SESSIONS}'}, status=400)
+        
+        allowed, limited_scope, retry_after = rate_limiter.check(device_id=device_id, cost=count)
+        if not allowed:
+            return rate_limited_response(limited_scope, retry_after)
+        
+        created = create_sessions(sessions, device_id, count, accept=session_affinity.is_local)
+        for session in created:
+            store_session(session)
+        logger.info(f"Created {count} sessions for device {device_id}")
+        
+        return json_response({
+            'session_ids': [session['session_id'] for session in created],
+            'device_id': device_id,
+            'status': 'created'
+        })
+    
+    except Exception as e:
+        logger.error(f"Bulk session creation error: {e}")
+        return json_response({'error': str(e)}, status=500)
+
+# Degraded answers that mean the agents were tried and failed; the other reasons
+# (open breaker, unavailable tier) short-circuited the work and say nothing about load
+LIMITER_FAILURE_REASONS = ('timeout', 'no_agent_response')
+
+def limiter_outcome(orchestration_result):
+    """True/False for the AIMD limiter, None when the request should not be sampled"""
+    reason = orchestration_result.get('degraded_reason')
+    if reason is None:
+        return True
+    return False if reason in LIMITER_FAILURE_REASONS else None
+
+def run_orchestration(request_data, crisis_mode):
+    """Run the orchestrator behind admission control"""
+    priority = PRIORITY_CRISIS if crisis_mode else PRIORITY_STANDARD
+    ticket = admission_controller.acquire(priority=priority)
+    if ticket is None:
+        return xcai_orchestrator.degraded_response(
+            request_data, crisis_mode=crisis_mode, route='chat', reason='shed'
+        )
+    
+    success = False
+    try:
+        # Use async orchestration with event loop
+        if hasattr(asyncio, 'run'):
+            # Python 3.7+
+            orchestration_result = asyncio.run(
+                xcai_orchestrator.orchestrate_request(request_data, crisis_mode=crisis_mode, route='chat')
+            )
+        else:
+            # Fallback for older Python versions
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                orchestration_result = loop.run_until_complete(
+                    xcai_orchestrator.orchestrate_request(request_data, crisis_mode=crisis_mode, route='chat')
+                )
+            finally:
+                loop.close()
+        
+        # Errors (raised) and timeouts shrink the limit; short-circuited requests are not sampled
+        success = limiter_outcome(orchestration_result)
+        return orchestration_result
+    finally:
+        admission_controller.release(ticket, success=success)
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
@@ -112,28 +315,51 @@ def chat():
         stream = data.get('stream', False)
         
         if not message.strip():
-            return jsonify({'error': 'Message cannot be empty'}), 400
+            return json_response({'error': 'Message cannot be empty'}, status=400)
+        
+        # Follow-up messages must reach the node holding the session's history
+        proxied = route_to_owner(session_id)
+        if proxied is not None:
+            return proxied
+        
+        # Quick crisis detection for immediate crisis mode activation; the model's
+        # calibrated risk also catches crises phrased without any of the keywords
+        crisis_mode = crisis_mode_indicated(message) or (
+            crisis_model_store is not None and crisis_model_store.is_crisis(message)
+        )
+        
+        # Per-session, per-device and global limits; crisis messages are never throttled
+        device_id = (get_session(session_id) or {}).get('device_id')
+        if device_id == 'unknown':
+            device_id = None
+        allowed, limited_scope, retry_after = rate_limiter.check(
+            device_id=device_id, session_id=session_id, crisis=crisis_mode
+        )
+        if not allowed:
+            return rate_limited_response(limited_scope, retry_after)
             
         logger.info(f"XCAi-AIIA Chat request - Session: {session_id}, Message: {message[:50]}...")
         
         # Ensure session exists
-        if session_id not in sessions:
-            sessions[session_id] = {
+        if get_session(session_id) is None:
+            store_session({
                 'session_id': session_id,
                 'device_id': 'unknown',
                 'created_at': time.time(),
                 'messages': []
-            }
+            })
         
         # Add user message to history
-        sessions[session_id]['messages'].append({
+        append_message(session_id, {
             'role': 'user',
             'content': message,
             'timestamp': time.time()
         })
         
         # Prepare request data for XCAi-AIIA orchestrator
+        request_id = new_id('req-')
         request_data = {
+            'request_id': request_id,
             'message': message,
             'session_id': session_id,
             'conversation_history': sessions[session_id]['messages'],
@@ -144,8 +370,7 @@ def chat():
         # Check if XCAi-AIIA system is available
         if not xcai_orchestrator:
             # Fallback to simple crisis detection
-            crisis_keywords = ['crisis', 'suicide', 'kill myself', 'hurt myself', 'hopeless']
-            is_crisis = any(keyword in message.lower() for keyword in crisis_keywords)
+            is_crisis = FALLBACK_CRISIS_KEYWORDS.any(message)
             
             fallback_response = (
                 "I'm here to help. The multi-agent system is currently unavailable, "
@@ -153,46 +378,29 @@ def chat():
                 "If you're in crisis, please call 988 or text HOME to 741741."
             ) if is_crisis else f"Echo: {message}"
             
-            sessions[session_id]['messages'].append({
+            append_message(session_id, {
                 'role': 'assistant',
                 'content': fallback_response,
                 'timestamp': time.time()
             })
             
-            return jsonify({
+            return json_response({
                 'response': fallback_response,
                 'timestamp': datetime.utcnow().isoformat(),
                 'session_id': session_id,
+                'request_id': request_id,
                 'system': 'fallback',
                 'error': 'XCAi-AIIA system unavailable'
             })
         
         try:
-            # Quick crisis detection for immediate crisis mode activation
-            crisis_indicators = ['suicide', 'kill myself', 'end my life', 'overdose', 'emergency']
-            crisis_mode = any(indicator in message.lower() for indicator in crisis_indicators)
-            
-            # Use async orchestration with event loop
-            if hasattr(asyncio, 'run'):
-                # Python 3.7+
-                orchestration_result = asyncio.run(
-                    xcai_orchestrator.orchestrate_request(request_data, crisis_mode=crisis_mode)
-                )
-            else:
-                # Fallback for older Python versions
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    orchestration_result = loop.run_until_complete(
-                        xcai_orchestrator.orchestrate_request(request_data, crisis_mode=crisis_mode)
-                    )
-                finally:
-                    loop.close()
+            # Admission-controlled orchestration; shed requests get the fast degraded tier
+            orchestration_result = run_orchestration(request_data, crisis_mode)
             
             ai_response = orchestration_result['response']
             
             # Add assistant message to history
-            sessions[session_id]['messages'].append({
+            append_message(session_id, {
                 'role': 'assistant',
                 'content': ai_response,
                 'timestamp': time.time()
@@ -200,53 +408,50 @@ def chat():
             
             logger.info(f"XCAi-AIIA response ({orchestration_result['response_time_ms']:.1f}ms): {ai_response[:100]}...")
             
-            return jsonify({
+            return json_response({
                 'response': ai_response,
                 'timestamp': datetime.utcnow().isoformat(),
                 'session_id': session_id,
+                'request_id': request_id,
                 'message_count': len(sessions[session_id]['messages']),
                 'system': 'xcai-aiia',
                 'agents_used': orchestration_result.get('agents_used', []),
                 'response_time_ms': orchestration_result.get('response_time_ms', 0),
                 'crisis_mode': orchestration_result.get('crisis_mode', False),
-                'crisis_support': {
-                    '988_lifeline': 'Call or text 988 for immediate crisis support',
-                    'crisis_text': 'Text HOME to 741741 for Crisis Text Line',
-                    'emergency': 'Call 911 for immediate physical danger'
-                } if crisis_mode else None
-            })
+                'quality_tier': orchestration_result.get('quality_tier', 'llm')
+            }, fragments={'crisis_support': crisis_support_fragment(crisis_mode)})
                 
         except Exception as xcai_error:
             logger.error(f"XCAi-AIIA orchestration error: {xcai_error}")
             
-            # Fallback response with crisis awareness
-            fallback_response = (
-                "I'm experiencing a technical issue with the AI system, but your safety is my priority. "
-                "If you're in crisis, please call 988 (Suicide & Crisis Lifeline) or text HOME to 741741 immediately. "
-                f"In the meantime, I hear you saying: {message}"
+            # Degrade to NEO fallback / MIKA templates rather than a canned apology
+            fallback = xcai_orchestrator.degraded_response(
+                request_data, crisis_mode=crisis_mode, route='chat', reason='error'
             )
+            fallback_response = fallback['response']
             
-            sessions[session_id]['messages'].append({
+            append_message(session_id, {
                 'role': 'assistant',
                 'content': fallback_response,
                 'timestamp': time.time()
             })
             
-            return jsonify({
+            return json_response({
                 'response': fallback_response,
                 'timestamp': datetime.utcnow().isoformat(),
                 'session_id': session_id,
+                'request_id': request_id,
                 'system': 'fallback',
+                'quality_tier': fallback['quality_tier'],
                 'error': f'XCAi-AIIA error: {str(xcai_error)}'
             })
             
     except Exception as e:
         logger.error(f"Chat error: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, status=500)
 
-@app.route('/healthz', methods=['GET'])
-def healthz():
-    """Health check endpoint that includes OpenAI and XCAi-AIIA status"""
+def build_health_report():
+    """Full health tree; built by the snapshot cache at most every HEALTH_SNAPSHOT_INTERVAL seconds"""
     openai_status = "configured" if openai_client else "missing_api_key"
     xcai_status = "active" if xcai_orchestrator else "unavailable"
     
@@ -269,25 +474,198 @@ def healthz():
             system_health = xcai_orchestrator.get_system_health()
             health_data["xcai_aiia_system"]["agents"] = system_health.get("agents", {})
             health_data["xcai_aiia_system"]["performance"] = system_health.get("performance", {})
+            health_data["xcai_aiia_system"]["circuit_breakers"] = system_health.get("circuit_breakers", {})
+            health_data["xcai_aiia_system"]["metrics"] = system_health.get("metrics", {})
+            health_data["xcai_aiia_system"]["admission"] = admission_controller.get_status()
+            health_data["xcai_aiia_system"]["rate_limits"] = rate_limiter.get_status()
+            health_data["xcai_aiia_system"]["session_affinity"] = session_affinity.get_status()
+            if message_store is not None:
+                health_data["xcai_aiia_system"]["message_store"] = message_store.get_status()
+            if pattern_store is not None:
+                health_data["xcai_aiia_system"]["patterns"] = pattern_store.get_status()
+            if crisis_model_store is not None:
+                health_data["xcai_aiia_system"]["crisis_model"] = crisis_model_store.get_status()
+            if semantic_router is not None:
+                health_data["xcai_aiia_system"]["semantic_routing"] = semantic_router.get_status()
         except Exception as e:
             logger.warning(f"Could not get XCAi-AIIA system health: {e}")
     
-    return jsonify(health_data)
+    return health_data
+
+health_cache = HealthSnapshotCache(
+    build_health_report,
+    interval=float(os.getenv('HEALTH_SNAPSHOT_INTERVAL', 5.0))
+)
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Health check endpoint that includes OpenAI and XCAi-AIIA status (cached snapshot)"""
+    snapshot = health_cache.get()
+    response = Response(snapshot.body, mimetype='application/json')
+    response.headers['X-Health-Snapshot-Version'] = str(snapshot.version)
+    response.headers['Age'] = str(int(snapshot.age))
+    return response
+
+LIVEZ_BODY = dumps({'status': 'alive'})
+
+@app.route('/livez', methods=['GET'])
+def livez():
+    """Liveness: the process is serving requests; no dependency checks"""
+    return Response(LIVEZ_BODY, mimetype='application/json')
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: dependencies needed to serve chat are usable"""
+    checks = {'orchestrator': xcai_orchestrator is not None}
+    
+    if xcai_orchestrator is not None and 'NEO' in xcai_orchestrator.circuit_breakers:
+        llm_gate_status = llm_gate.get_status()
+        checks['openai'] = (
+            bool(openai_client) and
+            not xcai_orchestrator.circuit_breakers['NEO'].is_open() and
+            llm_gate_status['in_use'] < llm_gate_status['total']
+        )
+    else:
+        checks['openai'] = bool(openai_client)
+    
+    if message_store is not None:
+        checks['session_store'] = message_store.ping()
+    
+    # Degraded tiers still answer without OpenAI, so only the orchestrator and store gate readiness
+    ready = checks['orchestrator'] and checks.get('session_store', True)
+    return json_response({
+        'status': 'ready' if ready else 'not_ready',
+        'degraded': not checks['openai'],
+        'checks': checks,
+        'health_snapshot_version': health_cache.get().version
+    }, status=200 if ready else 503)
 
 @app.route('/events/<session_id>', methods=['GET'])
 def get_events(session_id):
-    """Get session events for debugging"""
-    if session_id not in sessions:
-        return jsonify({'error': 'Session not found'}), 404
-        
-    return jsonify({
-        'events': sessions[session_id]['messages'],
+    """
+    Session events, paginated by message index
+    ?since=<cursor>&limit=<n> pages through history (next_cursor in the response)
+    ?format=ndjson streams one event per line for exports
+    ETag / If-None-Match: history is append-only, so the message count identifies the content
+    """
+    proxied = route_to_owner(session_id)
+    if proxied is not None:
+        return proxied
+    
+    session = get_session(session_id)
+    if session is None:
+        return json_response({'error': 'Session not found'}, status=404)
+    
+    try:
+        since = max(0, int(request.args.get('since', 0)))
+        limit = request.args.get('limit')
+        limit = min(MAX_EVENTS_PAGE, max(1, int(limit))) if limit is not None else None
+    except ValueError:
+        return json_response({'error': 'since and limit must be integers'}, status=400)
+    
+    stream = request.args.get('format') == 'ndjson'
+    messages = session['messages']
+    total = len(messages)
+    # Unpaged JSON keeps returning the full history for existing clients
+    end = total if limit is None else min(total, since + limit)
+    
+    etag = f'{session_id}-{session["created_at"]}-{total}-{since}-{limit}-{"ndjson" if stream else "json"}'
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    if stream:
+        def generate(snapshot):
+            for message in snapshot:
+                yield dumps(message) + b'\n'
+        # Slice now so the stream is a consistent snapshot of the history
+        response = Response(generate(messages[since:end]), mimetype='application/x-ndjson')
+        response.set_etag(etag)
+        return response
+    
+    response = json_response({
+        'events': messages[since:end],
+        'next_cursor': end,
+        'has_more': end < total,
         'session_info': {
             'session_id': session_id,
-            'created_at': sessions[session_id]['created_at'],
-            'message_count': len(sessions[session_id]['messages'])
+            'created_at': session['created_at'],
+            'message_count': total
         }
     })
+    response.set_etag(etag)
+    return response
+
+def echo_agent():
+    return xcai_orchestrator.agents.get('ECHO') if xcai_orchestrator else None
+
+def export_sessions(session_ids):
+    """Remove sessions (and their ECHO memory) from this node for handoff"""
+    echo = echo_agent()
+    payload = {'sessions': [], 'echo_memory': {}}
+    for session_id in session_ids:
+        session = sessions.pop(session_id, None)
+        if session is not None:
+            payload['sessions'].append(session)
+        if echo is not None:
+            state = echo.export_session(session_id)
+            if state['memory'] is not None or 'emotional_series' in state:
+                payload['echo_memory'][session_id] = state
+    return payload
+
+@app.route('/internal/sessions/import', methods=['POST'])
+def import_sessions():
+    """Receive sessions handed off by another node"""
+    if not session_affinity.configured:
+        return json_response({'error': 'Not found'}, status=404)
+    if not session_affinity.authorized(request.headers.get(INTERNAL_TOKEN_HEADER)):
+        return json_response({'error': 'Forbidden'}, status=403)
+    
+    data = request.get_json() or {}
+    for session in data.get('sessions', []):
+        existing = sessions.setdefault(session['session_id'], session)
+        if existing is not session:
+            # A local stub was created while the owner was unreachable: keep both histories
+            existing['messages'] = sorted(
+                session['messages'] + existing['messages'], key=lambda m: m.get('timestamp', 0)
+            )
+    
+    echo = echo_agent()
+    if echo is not None:
+        for session_id, state in data.get('echo_memory', {}).items():
+            echo.import_session(session_id, state)
+    
+    return json_response({'imported': len(data.get('sessions', []))})
+
+@app.route('/internal/ring', methods=['POST'])
+def update_ring():
+    """Apply a new node set and hand off sessions whose owner changed"""
+    if not session_affinity.configured:
+        return json_response({'error': 'Not found'}, status=404)
+    if not session_affinity.authorized(request.headers.get(INTERNAL_TOKEN_HEADER)):
+        return json_response({'error': 'Forbidden'}, status=403)
+    
+    nodes = (request.get_json() or {}).get('nodes')
+    if not isinstance(nodes, dict) or not nodes:
+        return json_response({'error': 'nodes must map node ids to base URLs'}, status=400)
+    
+    session_affinity.update_nodes(nodes)
+    handed_off = {}
+    for owner, session_ids in session_affinity.moved_sessions(list(sessions)).items():
+        payload = export_sessions(session_ids)
+        if session_affinity.push(owner, payload):
+            handed_off[owner] = len(payload['sessions'])
+        else:
+            # Put them back so a retried ring update can hand them off again
+            for session in payload['sessions']:
+                sessions.setdefault(session['session_id'], session)
+            echo = echo_agent()
+            if echo is not None:
+                for session_id, state in payload['echo_memory'].items():
+                    echo.import_session(session_id, state)
+    
+    return json_response({'ring': session_affinity.get_status(), 'handed_off': handed_off})
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 9989))
@@ -4,14 +4,19 @@ Codeword Backend - Crisis support and life coaching API
 Connects to OpenAI GPT-4o for real AI responses
 """
 import os
-import time
 import json
+import time
 from datetime import datetime
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, Response
 from flask_cors import CORS
 from openai import OpenAI
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -37,9 +42,25 @@ class CodewordBackend:
 
 backend = CodewordBackend()
 
+def dumps(payload):
+    # orjson when the deployment installs it, the standard library otherwise
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+# Pre-encoded SSE frames: only the streamed token is JSON-encoded per chunk
+SSE_DONE_FRAME = b'data: ' + dumps({'content': '', 'done': True}) + b'\n\n'
+
+def sse_content_frame(content):
+    # Same bytes as dumps({'content': content, 'done': False})
+    return b'data: {"content":' + dumps(content) + b',"done":false}\n\n'
+
 @app.route('/', methods=['GET'])
 def root():
-    return jsonify({
+    return json_response({
         "message": "Crisis support and life coaching API",
         "service": "Codeword Backend", 
         "status": "online"
@@ -47,7 +68,7 @@ def root():
 
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({
+    return json_response({
         "service": "codeword-backend",
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
@@ -72,7 +93,7 @@ def create_session():
         
         logger.info(f"Created session: {session_id}")
         
-        return jsonify({
+        return json_response({
             'session_id': session_id,
             'device_id': device_id,
             'status': 'created'
@@ -80,7 +101,7 @@ def create_session():
         
     except Exception as e:
         logger.error(f"Session creation error: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, status=500)
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
@@ -91,7 +112,7 @@ def chat():
         stream = data.get('stream', False)
         
         if not message.strip():
-            return jsonify({'error': 'Message cannot be empty'}), 400
+            return json_response({'error': 'Message cannot be empty'}, status=400)
             
         logger.info(f"Chat request - Session: {session_id}, Message: {message[:50]}...")
         
@@ -113,7 +134,7 @@ def chat():
         
         # Check if OpenAI is configured
         if not openai_client.api_key:
-            return jsonify({
+            return json_response({
                 'response': 'Echo: ' + message,
                 'timestamp': datetime.utcnow().isoformat(),
                 'error': 'OpenAI API key not configured'
@@ -163,7 +184,7 @@ Respond naturally and supportively to help the user through their situation.'''
                         if chunk.choices[0].delta.content:
                             content = chunk.choices[0].delta.content
                             full_response += content
-                            yield f"data: {json.dumps({'content': content, 'done': False})}\n\n"
+                            yield sse_content_frame(content)
                     
                     # Add assistant message to history
                     sessions[session_id]['messages'].append({
@@ -172,7 +193,7 @@ Respond naturally and supportively to help the user through their situation.'''
                         'timestamp': time.time()
                     })
                     
-                    yield f"data: {json.dumps({'content': '', 'done': True})}\n\n"
+                    yield SSE_DONE_FRAME
                 
                 return Response(generate(), mimetype='text/plain')
             else:
@@ -187,7 +208,7 @@ Respond naturally and supportively to help the user through their situation.'''
                 
                 logger.info(f"OpenAI response: {ai_response[:100]}...")
                 
-                return jsonify({
+                return json_response({
                     'response': ai_response,
                     'timestamp': datetime.utcnow().isoformat(),
                     'session_id': session_id,
@@ -206,7 +227,7 @@ Respond naturally and supportively to help the user through their situation.'''
                 'timestamp': time.time()
             })
             
-            return jsonify({
+            return json_response({
                 'response': fallback_response,
                 'timestamp': datetime.utcnow().isoformat(),
                 'error': f'OpenAI error: {str(openai_error)}'
@@ -214,14 +235,14 @@ Respond naturally and supportively to help the user through their situation.'''
             
     except Exception as e:
         logger.error(f"Chat error: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, status=500)
 
 @app.route('/healthz', methods=['GET'])
 def healthz():
     """Health check endpoint that includes OpenAI status"""
     openai_status = "configured" if openai_client.api_key else "missing_api_key"
     
-    return jsonify({
+    return json_response({
         "status": "healthy",
         "models_available": {
             "gpt-4o": openai_status,
@@ -235,9 +256,9 @@ def healthz():
 def get_events(session_id):
     """Get session events for debugging"""
     if session_id not in sessions:
-        return jsonify({'error': 'Session not found'}), 404
+        return json_response({'error': 'Session not found'}, status=404)
         
-    return jsonify({
+    return json_response({
         'events': sessions[session_id]['messages'],
         'session_info': {
             'session_id': session_id,
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+MAC audit entry memory and serialization throughput
+Compares the previous nested-dict audit entries with compact AuditRecords:
+retained bytes per entry (tracemalloc) and entries/second for to_dict + JSON
+and for compact rows.
+
+Usage: python benchmarks/bench_audit_records.py [--entries 1000]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xcai_agents.agents.mac_agent import MACAgent
+
+MESSAGES = [
+    "I have been feeling anxious lately and can't sleep",
+    "My doctor changed my medication and I want to stop taking it",
+    "Can you share health tips? My email address is on file with the clinic",
+    "There was violence at home and I feel unsafe",
+    "Thanks, that helped a lot today",
+]
+
+def assess(mac, message):
+    context = {'message': message, 'session_id': 'bench-session'}
+    compliance = mac._assess_compliance(message, context)
+    safety = mac._validate_content_safety(message, context)
+    recommendations = mac._generate_compliance_recommendations(compliance, safety, context)
+    return compliance, safety, recommendations
+
+def legacy_entry(mac, compliance, safety, recommendations):
+    return {
+        'entry_id': 'deadbeef',
+        'session_id': 'bench-session',
+        'timestamp': datetime.utcnow().isoformat(),
+        'compliance_assessment': compliance,
+        'safety_assessment': safety,
+        'recommendations': recommendations,
+        'agent_version': mac.agent_version,
+        'processing_time_ms': 0
+    }
+
+def retained_bytes(build, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entries = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return entries, (after - before) / count
+
+def throughput(fn, entries):
+    start = time.perf_counter()
+    for entry in entries:
+        fn(entry)
+    return len(entries) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=1000, help='audit entries to build')
+    args = parser.parse_args()
+    
+    mac = MACAgent()
+    
+    def build_legacy(i):
+        return legacy_entry(mac, *assess(mac, MESSAGES[i % len(MESSAGES)]))
+    
+    def build_compact(i):
+        compliance, safety, recommendations = assess(mac, MESSAGES[i % len(MESSAGES)])
+        return mac._create_audit_entry('bench-session', compliance, safety, recommendations)
+    
+    legacy, legacy_bytes = retained_bytes(build_legacy, args.entries)
+    compact, compact_bytes = retained_bytes(build_compact, args.entries)
+    
+    dumps = lambda obj: json.dumps(obj, separators=(',', ':'), default=str)
+    legacy_rate = throughput(dumps, legacy)
+    compact_json_rate = throughput(lambda record: dumps(record.to_dict()), compact)
+    compact_row_rate = throughput(lambda record: dumps(record.to_row()), compact)
+    
+    print(f"entries: {args.entries}")
+    print(f"memory per entry: dict={legacy_bytes:.0f}B record={compact_bytes:.0f}B "
+          f"({legacy_bytes / max(compact_bytes, 1):.1f}x smaller)")
+    print(f"serialize dict -> JSON:          {legacy_rate:,.0f} entries/s")
+    print(f"serialize record.to_dict -> JSON: {compact_json_rate:,.0f} entries/s")
+    print(f"serialize record.to_row -> JSON:  {compact_row_rate:,.0f} entries/s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
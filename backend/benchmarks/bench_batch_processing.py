@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Batch agent throughput in messages/second on one core
+Compares each agent's per-message analysis (the same table checks process()
+runs, minus response text) with process_batch, which lowercases and scans the
+whole batch with one compiled matcher. Every batch row is checked against the
+per-message result before timings are reported.
+
+Usage: python benchmarks/bench_batch_processing.py [--messages 20000] [--chunk 4096]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xcai_agents.agents.neo_agent import NEOAgent
+from xcai_agents.agents.mika_agent import MIKAAgent
+from xcai_agents.agents.nemo_agent import NEMOAgent
+from xcai_agents.agents.mac_agent import MACAgent
+from xcai_agents.core.parallel_agent_orchestrator import ParallelAgentOrchestrator
+
+FILLER = (
+    "i have been thinking about work and my family a lot this week and it is "
+    "hard to sleep but my friends check in and i try to go for walks when i can"
+).split()
+
+SIGNALS = [
+    'i feel hopeless', 'really anxious', 'i want to die', 'my doctor changed my medication',
+    'my email address', 'where are you really from', 'spanish speaking family',
+    'thank you that helps', 'self harm to others', 'so overwhelmed and stressed', 'İstanbul'
+]
+
+def corpus(size, seed=11):
+    random.seed(seed)
+    messages = []
+    for _ in range(size):
+        words = [random.choice(FILLER) for _ in range(random.randint(6, 40))]
+        for _ in range(random.choice((0, 0, 1, 2))):
+            words.insert(random.randrange(len(words) + 1), random.choice(SIGNALS))
+        messages.append(' '.join(words).capitalize())
+    return messages
+
+def mika_single(agent, message):
+    context = {'message': message, 'conversation_history': []}
+    crisis = agent._detect_crisis_immediate(message)
+    risk = agent._assess_risk_factors(message, context)
+    return crisis['level'], crisis['category'], crisis['detected_pattern'], risk['total_risk_score']
+
+def mika_row(columns, i):
+    return (columns['crisis_level'][i], columns['category'][i], columns['detected_pattern'][i],
+            columns['total_risk_score'][i])
+
+def mac_single(agent, message):
+    context = {'message': message}
+    compliance = agent._assess_compliance(message, context)
+    safety = agent._validate_content_safety(message, context)
+    return (round(compliance['overall_score'], 9), compliance['hipaa']['risk_level'],
+            compliance['high_risk_areas'], safety['overall_risk'])
+
+def mac_row(columns, i):
+    return (round(columns['overall_score'][i], 9), columns['hipaa_risk'][i],
+            columns['high_risk_areas'][i], columns['safety_risk'][i])
+
+def nemo_single(agent, message):
+    profile = agent._analyze_cultural_dimensions(message, {})
+    equity = agent._assess_equity_needs(profile, {})
+    bias = agent._detect_bias_patterns(message)
+    return profile['primary_dimensions'], equity['priority_level'], round(bias['severity_score'], 9)
+
+def nemo_row(columns, i):
+    return columns['primary_dimensions'][i], columns['equity_priority'][i], round(columns['bias_severity'][i], 9)
+
+def neo_single(agent, message):
+    emotions = agent._analyze_emotions(message)
+    crisis = agent._detect_crisis(message)
+    return emotions['primary_emotion'], round(emotions['intensity'], 9), crisis['level'], crisis['detected_pattern']
+
+def neo_row(columns, i):
+    return (columns['primary_emotion'][i], round(columns['intensity'][i], 9),
+            columns['crisis_level'][i], columns['detected_pattern'][i])
+
+AGENTS = [
+    ('MIKA', MIKAAgent, mika_single, mika_row),
+    ('MAC', MACAgent, mac_single, mac_row),
+    ('NEMO', NEMOAgent, nemo_single, nemo_row),
+    ('NEO', NEOAgent, neo_single, neo_row),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--chunk', type=int, default=4096)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    messages = corpus(args.messages)
+    orchestrator = ParallelAgentOrchestrator()
+    
+    print(f"{args.messages:,d} messages, chunk size {args.chunk:,d}")
+    print(f"{'agent':6s} {'per-message':>14s} {'process_batch':>15s} {'speedup':>8s}")
+    single_total = 0.0
+    for name, cls, single, row in AGENTS:
+        agent = cls()
+        orchestrator.register_agent(name, agent)
+        
+        start = time.perf_counter()
+        expected = [single(agent, message) for message in messages]
+        single_seconds = time.perf_counter() - start
+        single_total += single_seconds
+        
+        agent.process_batch(messages[:10])  # compile the matcher outside the timing
+        start = time.perf_counter()
+        columns = {}
+        for offset in range(0, len(messages), args.chunk):
+            for column, values in agent.process_batch(messages[offset:offset + args.chunk]).items():
+                columns.setdefault(column, []).extend(values)
+        batch_seconds = time.perf_counter() - start
+        
+        mismatches = [i for i in range(len(messages)) if row(columns, i) != expected[i]]
+        if mismatches:
+            i = mismatches[0]
+            print(f"{name}: {len(mismatches)} mismatches, first: {messages[i]!r}\n"
+                  f"  per-message {expected[i]}\n  batch       {row(columns, i)}")
+            return 1
+        
+        single_rate = len(messages) / single_seconds
+        batch_rate = len(messages) / batch_seconds
+        print(f"{name:6s} {single_rate:>10,.0f}/s {batch_rate:>12,.0f}/s {batch_rate / single_rate:>7.1f}x")
+    
+    result = orchestrator.orchestrate_batch(messages, chunk_size=args.chunk)
+    batch_rate = len(messages) / (result['elapsed_ms'] / 1000)
+    single_rate = len(messages) / single_total
+    print(f"{'all 4':6s} {single_rate:>10,.0f}/s {batch_rate:>12,.0f}/s {batch_rate / single_rate:>7.1f}x"
+          f"  (orchestrate_batch)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Second-stage crisis model: training, calibration and scoring latency
+
+Trains the hashed n-gram logistic regression
+(offline/train_crisis_model.py) on a synthetic labelled set, writes the model
+file, and loads it the way servers do (CrisisModelStore). Crisis examples
+embed either table phrases or crisis statements with no keyword in them
+("i have my pills saved up"). Other examples are everyday filler with the
+benign signals. The split is random, so the held-out metrics only show that
+training and calibration work, not real-world accuracy.
+
+Latency, per message on one core:
+- model.score() on a fresh message, and again on an already indexed message
+  (the chat() path, where the keyword check has just tokenized it);
+- MIKA's _detect_crisis_immediate with and without the model attached;
+- score_batch() throughput for offline re-scoring.
+
+It also reports chat() crisis-mode recall on the held-out crises, with the
+keyword check alone and with the model.
+
+Usage: python benchmarks/bench_crisis_model.py [--examples 10000] [--buckets 65536]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xcai_agents.agents.mika_agent import MIKAAgent, CRISIS_PATTERNS
+from xcai_agents.core.crisis_model import write_model
+from xcai_agents.core.crisis_model_store import CrisisModelStore
+from xcai_agents.core.phrase_matcher import TokenMatcher
+from xcai_agents.core.text_index import TextIndex, tokenize
+from xcai_agents.offline.train_crisis_model import train
+
+from bench_batch_processing import FILLER, SIGNALS
+
+# Crisis statements none of the keyword tables contain
+UNKEYED = [
+    'i have my pills saved up', 'i wrote letters to my family to say sorry', 'they would be happier without me',
+    'i dont want to wake up tomorrow', 'i gave away my things this week', 'i keep thinking about the bridge',
+    'there is no way out for me', 'i cant do this anymore', 'this is the last time i talk to anyone',
+    'i bought a rope', 'nobody would notice if i was gone', 'i am a burden to everyone'
+]
+
+BENIGN = [s for s in SIGNALS if s not in ('i want to die', 'i feel hopeless', 'self harm to others')]
+
+# The indicator phrases of the chat() crisis-mode gate (app.py also matches their stems and misspellings)
+CRISIS_MODE_INDICATORS = TokenMatcher.of(['suicide', 'kill myself', 'end my life', 'overdose', 'emergency'])
+
+def dataset(size, seed=7):
+    random.seed(seed)
+    keyed = [phrase for level in ('critical', 'high') for phrases in CRISIS_PATTERNS[level].values()
+             if isinstance(phrases, list) for phrase in phrases]
+    examples = []
+    for _ in range(size):
+        words = [random.choice(FILLER) for _ in range(random.randint(6, 30))]
+        crisis = random.random() < 0.3
+        if crisis:
+            words.insert(random.randrange(len(words) + 1), random.choice(keyed if random.random() < 0.5 else UNKEYED))
+        elif random.random() < 0.5:
+            words.insert(random.randrange(len(words) + 1), random.choice(BENIGN))
+        examples.append((' '.join(words), int(crisis)))
+    return examples
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def timed(fn, messages):
+    latencies = []
+    for message in messages:
+        start = time.perf_counter()
+        fn(message)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--examples', type=int, default=10000)
+    parser.add_argument('--buckets', type=int, default=1 << 16)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    examples = dataset(args.examples)
+    start = time.perf_counter()
+    model = train(examples, buckets=args.buckets)
+    elapsed = time.perf_counter() - start
+    metrics = model['metrics']
+    print(f"trained on {metrics['training']:,d} examples in {elapsed:.1f}s ({args.buckets:,d} buckets)")
+    print(f"  held-out {metrics['held_out']:,d}: AUC {metrics['auc']:.4f}, precision {metrics['precision']:.3f}, "
+          f"recall {metrics['recall']:.3f} at threshold {model['threshold']:.4f}, log loss {metrics['log_loss']:.4f}")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'crisis.xcmodel')
+        write_model(path, **model)
+        print(f"  model file {os.path.getsize(path):,d} bytes")
+        store = CrisisModelStore(path)
+        store.load()
+        crisis_model = store.model
+        
+        held_out = dataset(2000, seed=8)
+        crises = [text for text, label in held_out if label]
+        keyword_hits = sum(CRISIS_MODE_INDICATORS.any(text) for text in crises)
+        combined_hits = sum(CRISIS_MODE_INDICATORS.any(text) or store.is_crisis(text) for text in crises)
+        false_alarms = sum(store.is_crisis(text) for text, label in held_out if not label)
+        print(f"\ncrisis_mode recall on {len(crises)} new crisis messages: keywords {keyword_hits / len(crises):.1%}, "
+              f"keywords + model {combined_hits / len(crises):.1%} "
+              f"(model false alarms {false_alarms}/{len(held_out) - len(crises)})")
+        
+        messages = [text for text, _ in dataset(args.examples, seed=9)]
+        plain, with_model = MIKAAgent(), MIKAAgent(crisis_model=store)
+        
+        indexes = [TextIndex(tokenize(message)) for message in messages]
+        
+        print(f"\n{'per message':34s} {'mean':>9s} {'p50':>9s} {'p99':>9s}")
+        rows = (
+            ('model.score, fresh message', crisis_model.score, messages),
+            ('model.score, indexed message', crisis_model.score, indexes),
+            ('MIKA keyword pass', plain._detect_crisis_immediate, messages),
+            ('MIKA keyword pass + model', with_model._detect_crisis_immediate, messages),
+        )
+        for name, fn, inputs in rows:
+            latencies = timed(fn, inputs)
+            mean = sum(latencies) / len(latencies)
+            print(f"{name:34s} {mean * 1e6:>7.1f}us {percentile(latencies, 0.5) * 1e6:>7.1f}us "
+                  f"{percentile(latencies, 0.99) * 1e6:>7.1f}us")
+        
+        start = time.perf_counter()
+        crisis_model.score_batch(messages)
+        elapsed = time.perf_counter() - start
+        print(f"\nscore_batch: {len(messages) / elapsed:,.0f} messages/s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
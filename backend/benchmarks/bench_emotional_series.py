@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+ECHO emotional-trajectory cost at 10, 100 and 10k turns per session
+Compares the incremental EmotionalSeries (typed arrays + prefix sums) with
+recomputing the same statistics from a list of per-turn states on every turn,
+and times a full ECHOAgent.process call once the session has N turns.
+
+Usage: python benchmarks/bench_emotional_series.py [--sizes 10,100,10000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xcai_agents.core.emotional_series import EmotionalSeries
+from xcai_agents.agents.echo_agent import ECHOAgent, TREND_WINDOW
+
+MESSAGES = [
+    "I feel sad and bad today", "a bit better, my friends helped", "work is the same as always",
+    "feeling good and grateful", "worse again, I am depressed", "happy and excited about the weekend"
+]
+
+def naive_turn(states, valence, intensity):
+    # What a list-based implementation recomputes on every turn
+    states.append((valence, intensity))
+    window = [v for v, _ in states[-TREND_WINDOW:]]
+    session = [v for v, _ in states]
+    mean = statistics.fmean(window)
+    xs = range(len(window))
+    x_mean = statistics.fmean(xs)
+    denominator = sum((x - x_mean) ** 2 for x in xs)
+    slope = sum((x - x_mean) * (v - mean) for x, v in zip(xs, window)) / denominator if denominator else 0.0
+    std = statistics.pstdev(window)
+    change = statistics.fmean(abs(a - b) for a, b in zip(window[1:], window)) if len(window) > 1 else 0.0
+    counts = (sum(1 for v in session if v > 0), sum(1 for v in session if v < 0))
+    return slope, std, change, statistics.fmean(session), counts
+
+def incremental_turn(series, valence, intensity):
+    series.append(valence, intensity)
+    return (series.slope_valence(TREND_WINDOW), series.std_valence(TREND_WINDOW),
+            series.mean_abs_change(TREND_WINDOW), series.session_mean_valence, series.emotion_counts)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10,100,10000')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    random.seed(7)
+    
+    print(f"{'turns':>6s} {'naive/turn':>12s} {'series/turn':>12s} {'speedup':>8s} "
+          f"{'ECHO.process':>13s} {'series bytes':>13s} {'list bytes':>11s}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        points = [(random.choice((-1.0, 0.0, 1.0)), random.random()) for _ in range(size)]
+        
+        states = []
+        start = time.perf_counter()
+        for valence, intensity in points:
+            naive_turn(states, valence, intensity)
+        naive_us = (time.perf_counter() - start) / size * 1e6
+        
+        series = EmotionalSeries()
+        start = time.perf_counter()
+        for valence, intensity in points:
+            incremental_turn(series, valence, intensity)
+        series_us = (time.perf_counter() - start) / size * 1e6
+        series_bytes = series.nbytes
+        
+        # Full agent call with the session already at `size` turns (history window kept short
+        # so the number reflects the time series, not theme scanning of the transcript)
+        agent = ECHOAgent()
+        agent.emotional_series['bench'] = series
+        history = [{'role': 'user', 'content': random.choice(MESSAGES)} for _ in range(20)]
+        calls = 200
+        start = time.perf_counter()
+        for _ in range(calls):
+            agent.process({'message': history[-1]['content'], 'session_id': 'bench', 'conversation_history': history})
+        process_us = (time.perf_counter() - start) / calls * 1e6
+        
+        list_bytes = sys.getsizeof(states) + sum(sys.getsizeof(state) for state in states)
+        print(f"{size:>6d} {naive_us:>9.1f} us {series_us:>9.1f} us {naive_us / series_us:>7.1f}x "
+              f"{process_us:>10.1f} us {series_bytes:>13,d} {list_bytes:>11,d}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
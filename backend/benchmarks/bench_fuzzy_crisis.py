@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Misspelling-tolerant crisis detection: recall, false positives and latency
+
+Recall: crisis messages with typos, run-together words and shorthand, scored
+with exact phrases only and with the fuzzy second pass (MIKA and NEO).
+Negatives: ordinary messages full of words one edit from a crisis word
+("will myself", "homeless", "my wife"), which must stay at level 'none'.
+
+Latency: MIKA's _detect_crisis_immediate per message against the critical
+level's declared response_time. It is measured on a realistic corpus (next to
+the exact pass alone), on the misspelled messages, and on a
+cold worst case where every message is made of never-seen tokens, so each
+token takes a full deletion-index lookup (up to the per-message limit).
+
+Usage: python benchmarks/bench_fuzzy_crisis.py [--messages 20000]
+"""
+import os
+import sys
+import time
+import random
+import string
+import argparse
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xcai_agents.agents.mika_agent import MIKAAgent
+from xcai_agents.agents.neo_agent import NEOAgent
+
+from xcai_agents.offline.crisis_eval import RECALL, NEGATIVES
+
+from bench_batch_processing import corpus
+
+def exact_level(agent, message):
+    assessment = agent._first_crisis(agent._match_patterns(message), message)
+    return assessment['level'] if assessment else 'none'
+
+def cold_messages(count, seed=3):
+    random.seed(seed)
+    return [' '.join(''.join(random.choices(string.ascii_lowercase, k=random.randint(5, 12)))
+                     for _ in range(40))
+            for _ in range(count)]
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def timed(fn, messages):
+    latencies = []
+    for message in messages:
+        start = time.perf_counter()
+        fn(message)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=20000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    mika, neo = MIKAAgent(), NEOAgent()
+    failures = 0
+    
+    expected_hits = sum(level != 'none' for _, level in RECALL)
+    exact_hits = fuzzy_hits = neo_hits = 0
+    for message, level in RECALL:
+        exact_hits += level != 'none' and exact_level(mika, message) == level
+        found = mika._detect_crisis_immediate(message)['level']
+        fuzzy_hits += level != 'none' and found == level
+        neo_hits += level != 'none' and neo._detect_crisis(message)['level'] != 'none'
+        if found != level:
+            failures += 1
+            print(f"  recall miss: {message!r} -> {found} (expected {level})")
+    print(f"recall on {expected_hits} misspelled crisis messages")
+    print(f"  exact only  {exact_hits}/{expected_hits}")
+    print(f"  with fuzzy  {fuzzy_hits}/{expected_hits} (MIKA level), {neo_hits}/{expected_hits} (NEO any level)")
+    
+    false_positives = 0
+    for message in NEGATIVES:
+        for name, assessment in (('MIKA', mika._detect_crisis_immediate(message)),
+                                 ('NEO', neo._detect_crisis(message))):
+            if assessment['level'] != 'none':
+                false_positives += 1
+                print(f"  false positive ({name}): {message!r} -> {assessment['level']} "
+                      f"{assessment['detected_pattern']!r} {assessment.get('corrections')}")
+    failures += false_positives
+    print(f"false positives on {len(NEGATIVES)} near-miss messages: {false_positives}")
+    
+    messages = corpus(args.messages)
+    fuzzy_only = sum(mika._detect_crisis_immediate(message)['match_type'] == 'fuzzy' for message in messages)
+    print(f"corpus rows flagged only by the fuzzy pass: {fuzzy_only}/{len(messages)}")
+    
+    budget = mika.crisis_patterns['critical']['response_time']
+    print(f"\n_detect_crisis_immediate latency, budget {budget * 1e3:.1f}ms")
+    print(f"{'messages':22s} {'mean':>9s} {'p50':>9s} {'p99':>9s} {'max':>9s}")
+    detect = mika._detect_crisis_immediate
+    for name, fn, batch in (('corpus, exact only', lambda message: exact_level(mika, message), messages),
+                            ('corpus (warm)', detect, messages),
+                            ('misspelled (warm)', detect, [message for message, _ in RECALL] * 50),
+                            ('unseen tokens (cold)', detect, cold_messages(max(100, args.messages // 20)))):
+        latencies = timed(fn, batch)
+        mean = sum(latencies) / len(latencies)
+        p99 = percentile(latencies, 0.99)
+        print(f"{name:22s} {mean * 1e6:>7.1f}us {percentile(latencies, 0.5) * 1e6:>7.1f}us "
+              f"{p99 * 1e6:>7.1f}us {latencies[-1] * 1e6:>7.1f}us  {'ok' if p99 <= budget else 'OVER BUDGET'}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Offline runner scaling with worker count
+Writes a synthetic JSONL corpus, then runs the process-pool runner over it
+with 1, 2, 4, ... workers up to the core count. For each run it reports
+messages/second, speedup over one worker and parallel efficiency (speedup
+divided by workers).
+
+Usage: python benchmarks/bench_offline_runner.py [--messages 200000] [--workers 1,2,4,8]
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_batch_processing import corpus
+from xcai_agents.offline.runner import run
+
+def worker_counts(cores):
+    counts, n = [], 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    return counts + [cores]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--workers', default=None, help='comma-separated; default 1, 2, 4, ... up to all cores')
+    parser.add_argument('--unit-bytes', type=int, default=1 << 20)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    counts = [int(n) for n in args.workers.split(',')] if args.workers else worker_counts(os.cpu_count() or 1)
+    workdir = tempfile.mkdtemp(prefix='xcai-offline-')
+    try:
+        path = os.path.join(workdir, 'messages.jsonl')
+        with open(path, 'w') as f:
+            for i, message in enumerate(corpus(args.messages)):
+                f.write(json.dumps({'session_id': f"s{i % 997}", 'message': message}) + '\n')
+        print(f"{args.messages:,d} messages ({os.path.getsize(path) / 1e6:.1f} MB), "
+              f"{os.cpu_count()} cores, agents NEO, MIKA, NEMO, MAC")
+        print(f"{'workers':>7s} {'msg/s':>10s} {'speedup':>8s} {'efficiency':>11s}")
+        
+        baseline = None
+        for workers in counts:
+            output = os.path.join(workdir, f"out-{workers}")
+            summary = run(path, output, workers=workers, unit_bytes=args.unit_bytes, progress_interval=3600)
+            rate = summary['messages_per_second']
+            baseline = baseline or rate / workers
+            speedup = rate / baseline
+            print(f"{workers:>7d} {rate:>10,.0f} {speedup:>7.2f}x {speedup / workers:>10.0%}")
+            shutil.rmtree(output)
+    finally:
+        shutil.rmtree(workdir)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
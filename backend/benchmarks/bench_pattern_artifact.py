@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Pattern artifact load, cold start and hot swap
+Each measurement runs in a fresh interpreter, so no regex cache carries over.
+  builtin   construct the five agents and compile their batch matchers from the module tables
+  artifact  construct them, then map the artifact and apply its tables and precompiled matchers
+  swap      reload a replaced artifact (one phrase added) into five live agents
+Also reports the artifact size.
+
+Usage: python benchmarks/bench_pattern_artifact.py [--runs 5]
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND)
+
+CHILD = r'''
+import sys, time, json, logging
+logging.disable(logging.CRITICAL)
+from xcai_agents.offline.build_patterns import PATTERN_AGENTS
+from xcai_agents.core.pattern_artifact import PatternArtifact, build_artifact
+from xcai_agents.core.pattern_store import PatternStore
+mode, path = sys.argv[1], sys.argv[2]
+start = time.perf_counter()
+if mode == 'builtin':
+    for name, cls in PATTERN_AGENTS.items():
+        cls().process_batch([''])
+elif mode == 'artifact':
+    artifact = PatternArtifact(path)
+    for name, cls in PATTERN_AGENTS.items():
+        agent = cls()
+        artifact.apply(name, agent)
+        agent.process_batch([''])
+else:
+    store = PatternStore(path)
+    store.load()
+    for name, cls in PATTERN_AGENTS.items():
+        store.attach(name, cls())
+    # One new crisis phrase, so the reload really recompiles a matcher
+    mika = PATTERN_AGENTS['MIKA']()
+    crisis = json.loads(json.dumps(mika.crisis_patterns))
+    crisis['critical']['suicide'].append('on the ledge')
+    mika.apply_patterns({'crisis_patterns': crisis})
+    build_artifact(dict(store._agents, MIKA=mika), path, version='next')
+    start = time.perf_counter()
+    store.reload()
+    assert store.version == 'next'
+print(json.dumps({'ms': (time.perf_counter() - start) * 1000}))
+'''
+
+def child(mode, path):
+    output = subprocess.run([sys.executable, '-c', CHILD, mode, path], cwd=BACKEND,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])['ms']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    
+    from xcai_agents.offline.build_patterns import build
+    workdir = tempfile.mkdtemp(prefix='xcai-patterns-')
+    try:
+        path = os.path.join(workdir, 'patterns.xcpat')
+        build(path)
+        print(f"artifact {os.path.getsize(path):,d} bytes, median of {args.runs} fresh interpreters")
+        for mode in ('builtin', 'artifact', 'swap'):
+            times = [child(mode, path) for _ in range(args.runs)]
+            print(f"  {mode:9s} {statistics.median(times):7.2f} ms")
+    finally:
+        shutil.rmtree(workdir)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
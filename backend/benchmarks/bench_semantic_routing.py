@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Semantic routing stage: routing precision, recall and latency
+
+Scores _select_agents on labelled messages, keyword indicators only against
+keywords plus the semantic router. Specialist choices are compared with the
+expected set (NEO, ECHO and VISION are left out). The labelled messages are
+not the router's examples. They are paraphrases the keywords miss, messages
+the keywords already catch, and everyday messages that need no specialist.
+
+Latency is for the routing stage alone, per message:
+- _select_agents with keywords only, as the baseline;
+- with the router on messages it has not seen (embedding computed);
+- with the router on repeated messages (embedding and route cached).
+
+Usage: python benchmarks/bench_semantic_routing.py [--messages 20000] [--threshold 0.2]
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xcai_agents.core.parallel_agent_orchestrator import ParallelAgentOrchestrator
+from xcai_agents.core.semantic_router import SemanticRouter, DEFAULT_THRESHOLD
+
+from bench_batch_processing import corpus
+
+SPECIALISTS = {'NEMO', 'MAC', 'MIKA', 'ISHA'}
+
+# (message, specialists it should reach)
+LABELLED = [
+    # Paraphrases without the keyword indicators
+    ("my mom wants me to marry within our religion", {'NEMO'}),
+    ("kids at school make fun of my accent and my skin color", {'NEMO'}),
+    ("i am the only black person in my office and it is isolating", {'NEMO'}),
+    ("my parents don't accept my girlfriend because she is from another ethnic group", {'NEMO'}),
+    ("i am queer and my family would disown me", {'NEMO'}),
+    ("as an immigrant i feel i don't belong anywhere", {'NEMO'}),
+    ("my community expects women to stay home", {'NEMO'}),
+    ("will you share what i tell you with anyone", {'MAC'}),
+    ("can my school see these chats", {'MAC'}),
+    ("someone keeps harassing me on social media, how do i report them", {'MAC'}),
+    ("my boss is threatening to fire me if i take sick leave, is that even allowed", {'MAC', 'ISHA'}),
+    ("is it against the law to record my landlord", {'MAC'}),
+    ("please delete everything i have told you", {'MAC'}),
+    ("i need a lawyer for my custody case", {'MAC'}),
+    ("i can't cope and i am scared i will do something tonight", {'MIKA'}),
+    ("everything is falling apart and i'm panicking", {'MIKA'}),
+    ("i'm at breaking point and completely alone", {'MIKA'}),
+    ("i don't feel safe in my house right now", {'MIKA'}),
+    ("my thoughts keep getting darker every night", {'MIKA'}),
+    ("my antidepressant makes me nauseous", {'ISHA'}),
+    ("i've had a headache and fever all week", {'ISHA'}),
+    ("my psychiatrist changed my prescription", {'ISHA'}),
+    ("chest pain when i climb stairs", {'ISHA'}),
+    ("i keep forgetting to take my pills", {'ISHA'}),
+    ("i have insomnia and my heart is racing", {'ISHA'}),
+    ("just got home from the hospital after surgery", {'ISHA'}),
+    ("the nurse said my blood sugar is too high", {'ISHA'}),
+    # Keyword cases
+    ("is it safe to talk about my culture here", {'MAC', 'NEMO'}),
+    ("i need help, this is urgent", {'MIKA'}),
+    ("my doctor wants me on new medication", {'ISHA'}),
+    ("discrimination at my job because of my background", {'NEMO'}),
+    ("what is your privacy policy", {'MAC'}),
+    # Everyday messages
+    ("i had pizza with my friends tonight", set()),
+    ("my cat knocked over a plant", set()),
+    ("thanks, that was a nice chat", set()),
+    ("we are going to the beach on saturday", set()),
+    ("i finished my homework early", set()),
+    ("my brother got a new job", set()),
+    ("i am learning to play guitar", set()),
+    ("what a lovely sunny morning", set()),
+    ("i watched the game with my dad", set()),
+    ("my friend and i baked cookies", set()),
+    ("i am planning a trip to see my cousins", set()),
+    ("work was okay, a bit long", set()),
+]
+
+def score(select):
+    true_positives = false_positives = false_negatives = 0
+    errors = []
+    for message, expected in LABELLED:
+        found = set(select({'message': message})) & SPECIALISTS
+        true_positives += len(found & expected)
+        false_positives += len(found - expected)
+        false_negatives += len(expected - found)
+        if found != expected:
+            errors.append((message, sorted(found), sorted(expected)))
+    precision = true_positives / max(1, true_positives + false_positives)
+    recall = true_positives / max(1, true_positives + false_negatives)
+    return precision, recall, errors
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def timed(fn, messages):
+    latencies = []
+    for message in messages:
+        request = {'message': message}
+        start = time.perf_counter()
+        fn(request)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--verbose', action='store_true', help='list the misrouted messages')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    keywords = ParallelAgentOrchestrator()
+    semantic = ParallelAgentOrchestrator()
+    start = time.perf_counter()
+    semantic.semantic_router = SemanticRouter(threshold=args.threshold)
+    print(f"router built in {(time.perf_counter() - start) * 1e3:.1f}ms: {semantic.semantic_router.get_status()}")
+    
+    print(f"\nrouting on {len(LABELLED)} labelled messages")
+    print(f"{'stage':22s} {'precision':>9s} {'recall':>7s} {'misrouted':>9s}")
+    for name, orchestrator in (('keywords', keywords), ('keywords + semantic', semantic)):
+        precision, recall, errors = score(orchestrator._select_agents)
+        print(f"{name:22s} {precision:>9.3f} {recall:>7.3f} {len(errors):>9d}")
+        if args.verbose:
+            for message, found, expected in errors:
+                print(f"    {message!r}: {found}, expected {expected}")
+    
+    messages = corpus(args.messages)
+    print(f"\n_select_agents per message ({len(messages):,d} messages)")
+    print(f"{'stage':30s} {'mean':>9s} {'p50':>9s} {'p99':>9s}")
+    repeated = messages[:200] * (len(messages) // 200)
+    rows = (
+        ('keywords only', keywords._select_agents, messages),
+        ('+ semantic, unseen messages', semantic._select_agents, messages),
+        ('+ semantic, repeated messages', semantic._select_agents, repeated),
+    )
+    for name, fn, inputs in rows:
+        latencies = timed(fn, inputs)
+        mean = sum(latencies) / len(latencies)
+        print(f"{name:30s} {mean * 1e6:>7.1f}us {percentile(latencies, 0.5) * 1e6:>7.1f}us "
+              f"{percentile(latencies, 0.99) * 1e6:>7.1f}us")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
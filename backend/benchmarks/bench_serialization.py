@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+API response and SSE encode throughput
+Compares today's path (Flask-style sorted, compact stdlib json.dumps per
+response and per SSE token) with core/serialization.py: the fastest available
+encoder plus pre-encoded crisis_support and SSE done fragments.
+
+Usage: python benchmarks/bench_serialization.py [--iterations 20000]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xcai_agents import initialize_xcai_system
+from xcai_agents.core import serialization
+from xcai_agents.core.serialization import CRISIS_SUPPORT
+
+def jsonify_dumps(obj):
+    # Flask's default provider: sorted keys, compact separators
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str).encode()
+
+def chat_payload():
+    return {
+        'response': "I hear you, and I'm glad you reached out. " * 6,
+        'timestamp': datetime.utcnow().isoformat(),
+        'session_id': 'session-K7-01M5AP9J45ZMV65RG00002MDC1',
+        'request_id': 'req-01M5AP9J45ZMV65RG00002MDC2',
+        'message_count': 12,
+        'system': 'xcai-aiia',
+        'agents_used': ['NEO', 'ECHO', 'MIKA', 'MAC'],
+        'response_time_ms': 41.7,
+        'crisis_mode': True,
+        'quality_tier': 'llm'
+    }
+
+def rate(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    n = args.iterations
+    
+    payload = chat_payload()
+    health = initialize_xcai_system().get_system_health()
+    tokens = ['I', "'m", ' here', ' with', ' you', '.', ' "', 'Breathe', '"', ' ✓'] * 10
+    
+    def chat_before():
+        return jsonify_dumps({**payload, 'crisis_support': CRISIS_SUPPORT})
+    
+    def chat_after():
+        return serialization.dumps_with_fragments(
+            payload, {'crisis_support': serialization.crisis_support_fragment(True)}
+        )
+    
+    def sse_before():
+        for token in tokens:
+            f"data: {json.dumps({'content': token, 'done': False})}\n\n".encode()
+        f"data: {json.dumps({'content': '', 'done': True})}\n\n".encode()
+    
+    def sse_after():
+        for token in tokens:
+            serialization.sse_content_frame(token)
+        serialization.SSE_DONE_FRAME
+    
+    assert json.loads(chat_before()) == json.loads(chat_after())
+    
+    print(f"encoder backend: {serialization.BACKEND}")
+    rows = [
+        ('/api/chat crisis response', chat_before, chat_after, n),
+        ('/healthz system health', lambda: jsonify_dumps(health), lambda: serialization.dumps(health), n // 4),
+        (f"SSE stream ({len(tokens)} tokens + done)", sse_before, sse_after, n // 20),
+    ]
+    for name, before, after, iterations in rows:
+        before_rate = rate(before, iterations)
+        after_rate = rate(after, iterations)
+        print(f"{name:36s} before {before_rate:>10,.0f}/s  after {after_rate:>10,.0f}/s  "
+              f"({after_rate / before_rate:.2f}x)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
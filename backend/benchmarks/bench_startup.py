@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Worker startup time: `import app` through the first /api/chat response
+Each sample runs in a fresh interpreter, as a new gunicorn worker or an
+autoscaled instance would. Modes:
+  eager - openai imported and all agents built during import (previous behaviour)
+  lazy  - openai imported on the first LLM call, agents built on first use
+
+Import is timed with an OPENAI_API_KEY configured (import only, no requests);
+the first request is timed without one, so it is answered from templates and
+never leaves the process.
+
+Usage: python benchmarks/bench_startup.py [--runs 5]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+CHILD = r'''
+import os, sys, json, time, resource, logging
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, os.getcwd())
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+result = {'import_ms': (imported - start) * 1000, 'openai_imported': 'openai' in sys.modules}
+if 'OPENAI_API_KEY' not in os.environ:
+    client = app.app.test_client()
+    session_id = client.post('/api/session', json={'device_id': 'bench'}).get_json()['session_id']
+    response = client.post('/api/chat', json={'message': 'I feel anxious about work', 'session_id': session_id})
+    assert response.status_code == 200, response.status_code
+    result['first_request_ms'] = (time.perf_counter() - imported) * 1000
+result['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps(result))
+'''
+
+MODES = {
+    'eager': {'XCAI_PREWARM_AGENTS': 'true'},
+    'lazy': {'XCAI_PREWARM_AGENTS': 'false'},
+}
+
+def sample(mode_env, api_key):
+    env = {key: value for key, value in os.environ.items() if key != 'OPENAI_API_KEY'}
+    env.update(mode_env)
+    if api_key:
+        env['OPENAI_API_KEY'] = 'sk-benchmark-not-used'
+    result = subprocess.run([sys.executable, '-c', CHILD], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    
+    print(f"{'mode':6s} {'import (key set)':>18s} {'first request':>15s} {'total':>9s} {'max RSS':>10s}  openai loaded")
+    for mode, mode_env in MODES.items():
+        imports, firsts, rss, loaded = [], [], [], set()
+        for _ in range(args.runs):
+            with_key = sample(mode_env, api_key=True)
+            without_key = sample(mode_env, api_key=False)
+            imports.append(with_key['import_ms'])
+            firsts.append(without_key['first_request_ms'])
+            rss.append(with_key['max_rss_kb'])
+            loaded.add(with_key['openai_imported'])
+        import_ms = statistics.median(imports)
+        first_ms = statistics.median(firsts)
+        print(f"{mode:6s} {import_ms:>15.1f} ms {first_ms:>12.1f} ms {import_ms + first_ms:>6.1f} ms "
+              f"{statistics.median(rss) / 1024:>7.1f} MB  {sorted(loaded)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Peak memory of export analysis versus input size
+Writes /events/<session_id>-shaped JSON exports of increasing size and
+analyzes each two ways:
+  load     json.load the whole export, then orchestrate_batch over every user message
+  stream   StreamingPipeline (memory-mapped read, one element at a time, bounded queues)
+Peak Python heap is measured with tracemalloc (the mapped file itself is page
+cache, not heap). Throughput is timed separately without tracing.
+
+Usage: python benchmarks/bench_streaming_pipeline.py [--sizes 10000,100000,300000] [--batch-size 1024]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_batch_processing import corpus
+from xcai_agents.offline.pipeline import StreamingPipeline
+from xcai_agents.offline.runner import build_batch_orchestrator, resolve_agents
+
+def write_export(path, messages):
+    with open(path, 'w') as f:
+        f.write('{"events":[')
+        for i, message in enumerate(messages):
+            user = {'role': 'user', 'content': message, 'timestamp': 1700000000.0 + i}
+            reply = {'role': 'assistant', 'content': "I'm here with you.", 'timestamp': 1700000000.5 + i}
+            f.write(('' if i == 0 else ',') + json.dumps(user) + ',' + json.dumps(reply))
+        f.write(f'],"has_more":false,"next_cursor":{2 * len(messages)}}}')
+
+def load_all(path, orchestrator, agents):
+    with open(path) as f:
+        events = json.load(f)['events']
+    batch = [{'message': event['content'], 'session_id': 'bench'} for event in events if event['role'] == 'user']
+    result = orchestrator.orchestrate_batch(batch, agents=agents, chunk_size=len(batch))
+    with open(os.devnull, 'w') as out:
+        for agent_columns in result['agents'].values():
+            json.dump(agent_columns, out)
+    return len(batch)
+
+def stream(path, pipeline):
+    return pipeline.run(path, os.devnull)['written']
+
+def measure(fn, *args):
+    start = time.perf_counter()
+    count = fn(*args)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, count / seconds, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,300000', help='user messages per export')
+    parser.add_argument('--batch-size', type=int, default=1024)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    agents = resolve_agents()
+    orchestrator = build_batch_orchestrator(agents)
+    pipeline = StreamingPipeline(agents, batch_size=args.batch_size)
+    workdir = tempfile.mkdtemp(prefix='xcai-stream-')
+    try:
+        print(f"{'messages':>9s} {'export':>9s} {'load peak':>10s} {'load msg/s':>11s} "
+              f"{'stream peak':>12s} {'stream msg/s':>13s}")
+        for size in (int(value) for value in args.sizes.split(',')):
+            path = os.path.join(workdir, 'bench.json')
+            write_export(path, corpus(size))
+            _, load_rate, load_peak = measure(load_all, path, orchestrator, agents)
+            count, stream_rate, stream_peak = measure(stream, path, pipeline)
+            assert count == size, (count, size)
+            print(f"{size:>9,d} {os.path.getsize(path) / 1e6:>7.1f}MB {load_peak / 1e6:>8.1f}MB {load_rate:>11,.0f} "
+                  f"{stream_peak / 1e6:>10.1f}MB {stream_rate:>13,.0f}")
+    finally:
+        shutil.rmtree(workdir)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Keyword matching accuracy and latency: word-boundary token matching against the
+substring checks it replaced
+
+Accuracy: labelled messages for phrases from the agents' keyword lists and
+the routing lists, scored both ways. Substring traps ('mad' in "made")
+should not match. Spelling variants ("cant", "CAN’T", "self harm") should.
+
+Corpus: per-message latency of one request's keyword work, routing plus the
+table checks of ECHO, NEO, MIKA, NEMO and MAC. The old path lowercases the
+message and runs `phrase in message` for every phrase. The new path tokenizes
+once, and every agent matches against that one index. The count of group hits
+shows how many substring matches were inside other words.
+
+Usage: python benchmarks/bench_text_matching.py [--messages 20000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xcai_agents.agents.echo_agent import ECHOAgent
+from xcai_agents.agents.neo_agent import NEOAgent
+from xcai_agents.agents.mika_agent import MIKAAgent
+from xcai_agents.agents.nemo_agent import NEMOAgent
+from xcai_agents.agents.mac_agent import MACAgent
+from xcai_agents.core.parallel_agent_orchestrator import ROUTING_INDICATORS
+from xcai_agents.core.text_index import TextIndex, tokenize
+
+from bench_batch_processing import FILLER, SIGNALS
+
+# (message, phrase, should match)
+CASES = [
+    ("I made dinner for the kids", 'mad', False),
+    ("Sadie came over today", 'sad', False),
+    ("I also need some rest", 'so', False),
+    ("The mythology class was fun", 'my', False),
+    ("My Tesla broke down again", 'esl', False),
+    ("We moved to Manchester last year", 'man', False),
+    ("The velocity of it all", 'city', False),
+    ("Choir harmony practice went well", 'harm', False),
+    ("The females in my class", 'male', False),
+    ("The cherry blossoms are out", 'loss', False),
+    ("I lost my glove on the bus", 'love', False),
+    ("My coworker was so helpful", 'help', False),
+    ("I can't breathe", "can't breathe", True),
+    ("i cant breathe", "can't breathe", True),
+    ("I CAN’T BREATHE", "can't breathe", True),
+    ("honestly i cant go on like this", "can't go on", True),
+    ("looking up self harm techniques", 'self-harm techniques', True),
+    ("I'm so MAD right now!", 'mad', True),
+    ("Sad.", 'sad', True),
+    ("(suicide) was the word she used", 'suicide', True),
+    ("My SSN is on the form", 'ssn', True),
+    ("I use he him pronouns", 'he/him', True),
+    ("my friend is non binary", 'non-binary', True),
+    ("so much ﬁnancial stress", 'financial stress', True),
+    ("Ｉ ｗａｎｔ ｔｏ ｄｉｅ", 'want to die', True),
+    ("I feel so HOPELESS", 'hopeless', True),
+    ("Is this safe?", 'safe', True),
+]
+
+# Words that contain short table phrases
+TRAPS = ['made', 'also', 'some', 'myth', 'manage', 'helpful', 'harmony', 'females', 'glove', 'season', 'reasonable']
+
+AGENT_CLASSES = [ECHOAgent, NEOAgent, MIKAAgent, NEMOAgent, MACAgent]
+
+def corpus(size, seed=5):
+    random.seed(seed)
+    words = FILLER + TRAPS
+    messages = []
+    for _ in range(size):
+        message = [random.choice(words) for _ in range(random.randint(6, 40))]
+        for _ in range(random.choice((0, 0, 1, 2))):
+            message.insert(random.randrange(len(message) + 1), random.choice(SIGNALS))
+        messages.append(' '.join(message).capitalize())
+    return messages
+
+def substring_matches(checks, message):
+    message_lower = message.lower()
+    hits = 0
+    for groups in checks:
+        for _, phrases in groups:
+            matched = [phrase for phrase in phrases if phrase in message_lower]
+            if matched:
+                hits += 1
+    return hits
+
+def token_matches(agents, message):
+    index = TextIndex(tokenize(message))
+    hits = len(ROUTING_INDICATORS.match(index))
+    for agent in agents:
+        hits += len(agent._match_patterns(index))
+    return hits
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def timed(fn, messages):
+    latencies, hits = [], 0
+    for message in messages:
+        start = time.perf_counter()
+        hits += fn(message)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies, hits
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=20000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    
+    print(f"accuracy on {len(CASES)} labelled cases")
+    scores = {'substring': 0, 'token': 0}
+    for message, phrase, expected in CASES:
+        substring = phrase in message.lower()
+        token = phrase in TextIndex(tokenize(message))
+        scores['substring'] += substring == expected
+        scores['token'] += token == expected
+        if token != expected:
+            print(f"  token miss: {phrase!r} in {message!r} -> {token}")
+    for name, correct in scores.items():
+        print(f"  {name:10s} {correct}/{len(CASES)} correct")
+    
+    agents = [cls() for cls in AGENT_CLASSES]
+    checks = [ROUTING_INDICATORS.groups] + [agent._batch_pattern_groups() for agent in agents]
+    messages = corpus(args.messages)
+    token_matches(agents, messages[0])  # compile the matchers outside the timing
+    
+    print(f"\n{args.messages:,d} messages, routing + {len(agents)} agents' tables "
+          f"({sum(len(phrases) for groups in checks for _, phrases in groups)} phrases)")
+    print(f"{'path':10s} {'mean':>9s} {'p50':>9s} {'p99':>9s} {'group hits':>11s}")
+    for name, fn in (('substring', lambda message: substring_matches(checks, message)),
+                     ('token', lambda message: token_matches(agents, message))):
+        latencies, hits = timed(fn, messages)
+        mean = sum(latencies) / len(latencies)
+        print(f"{name:10s} {mean * 1e6:>7.1f}us {percentile(latencies, 0.5) * 1e6:>7.1f}us "
+              f"{percentile(latencies, 0.99) * 1e6:>7.1f}us {hits:>11,d}")
+    return 0 if scores['token'] == len(CASES) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
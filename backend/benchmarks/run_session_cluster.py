@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Local session-affinity cluster check
+Starts several backend processes on consecutive ports with SESSION_NODES set,
+sends each session's messages through random nodes, and checks history stays
+whole. Then adds a node through /internal/ring and checks handoff kept it.
+
+Usage: python benchmarks/run_session_cluster.py [--nodes 3] [--sessions 20] [--messages 4]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def call(url, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, method='POST' if data else 'GET',
+                                 headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=30) as response:
+        return json.loads(response.read())
+
+def start_node(node_id, nodes, base_port):
+    env = dict(os.environ, PORT=str(base_port + list(nodes).index(node_id)), SESSION_NODE_ID=node_id,
+               SESSION_NODES=','.join(f"{name}={url}" for name, url in nodes.items()),
+               RATE_LIMIT_DEVICE_PER_MIN='100000', RATE_LIMIT_SESSION_PER_MIN='100000')
+    return subprocess.Popen([sys.executable, 'app.py'], cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            call(url + '/health')
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not start")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nodes', type=int, default=3)
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=4)
+    parser.add_argument('--base-port', type=int, default=9301)
+    args = parser.parse_args()
+    
+    names = [f"node{index}" for index in range(args.nodes + 1)]
+    urls = {name: f"http://127.0.0.1:{args.base_port + index}" for index, name in enumerate(names)}
+    initial = {name: urls[name] for name in names[:-1]}
+    processes = [start_node(name, initial, args.base_port) for name in initial]
+    failures = 0
+    
+    try:
+        for url in initial.values():
+            wait_ready(url)
+        
+        session_ids = []
+        for _ in range(args.sessions):
+            entry = random.choice(list(initial.values()))
+            session_ids.append(call(entry + '/api/session', {'device_id': 'cluster-check'})['session_id'])
+        
+        start = time.time()
+        for turn in range(args.messages):
+            for session_id in session_ids:
+                entry = random.choice(list(initial.values()))
+                result = call(entry + '/api/chat', {'session_id': session_id, 'message': f"turn {turn}"})
+                if result.get('message_count') not in (None, 2 * (turn + 1)):
+                    failures += 1
+        elapsed = time.time() - start
+        print(f"{args.nodes} nodes, {args.sessions} sessions x {args.messages} messages via random nodes: "
+              f"{failures} history mismatches, {elapsed / (args.sessions * args.messages) * 1000:.1f}ms/message")
+        
+        # Scale up: start one more node and announce the new ring to everyone
+        processes.append(start_node(names[-1], urls, args.base_port))
+        wait_ready(urls[names[-1]])
+        moved = 0
+        for url in urls.values():
+            moved += sum(call(url + '/internal/ring', {'nodes': urls})['handed_off'].values())
+        
+        lost = 0
+        for session_id in session_ids:
+            events = call(random.choice(list(urls.values())) + f"/events/{session_id}")
+            if events['session_info']['message_count'] != 2 * args.messages:
+                lost += 1
+        print(f"scale-up to {len(urls)} nodes: {moved} sessions handed off, {lost} sessions with missing history")
+        failures += lost
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+    
+    return 0 if failures == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration for the Codeword backend (picked up automatically from
+the working directory by `gunicorn app:app`).
+
+The app is imported once in the master (preload_app) with agents prewarmed, then
+the heap is frozen out of the garbage collector before forking, so workers share
+the pattern tables and agent objects copy-on-write instead of each rebuilding
+them and dirtying the pages on their first collection.
+
+Sessions live in each worker's memory, so one worker is the default. More
+workers (WEB_CONCURRENCY) need MESSAGE_STORE_PATH so a worker can rehydrate a
+session another one created; gunicorn refuses to start without it.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '9989')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+if workers > 1 and not os.getenv('MESSAGE_STORE_PATH'):
+    raise RuntimeError(f"WEB_CONCURRENCY={workers} needs MESSAGE_STORE_PATH: "
+                       "sessions in one worker's memory are invisible to the others")
+
+if preload_app:
+    os.environ.setdefault('XCAI_PREWARM_AGENTS', 'true')
+    # Only when gunicorn itself loads this file (as __config__) and is about to
+    # import the app: no collections until when_ready freezes the heap and
+    # re-enables them. Tools that merely import the config keep their GC.
+    if __name__ == '__config__':
+        gc.disable()
+
+def when_ready(server):
+    # Called in the master after the preloaded app is imported and before workers are forked
+    if preload_app:
+        gc.freeze()
+        gc.enable()
+        server.log.info(f"Froze {gc.get_freeze_count()} objects before forking workers")
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Admission control: only attempted requests move the AIMD limit, and a waiter
+past its deadline does not hold back the fast path
+"""
+import time
+
+from xcai_agents.core.admission import AdmissionController, AdmissionTicket, AdaptiveConcurrencyLimiter
+
+def controller(**kwargs):
+    return AdmissionController(AdaptiveConcurrencyLimiter(initial_limit=10, min_limit=2, **kwargs))
+
+def test_short_circuited_requests_leave_the_limit_alone():
+    admission = controller()
+    for _ in range(50):
+        admission.release(admission.acquire(), success=None)
+    assert admission.limiter.current == 10
+
+def test_failures_shrink_the_limit():
+    admission = controller()
+    for _ in range(5):
+        admission.release(admission.acquire(), success=False)
+    assert admission.limiter.current < 10
+
+def test_expired_waiter_does_not_block_the_fast_path():
+    admission = controller()
+    admission._queue.append(AdmissionTicket('standard', deadline=time.time() - 1))
+    ticket = admission.acquire(timeout=0)
+    assert ticket is not None and ticket.granted
+    assert admission.get_status()['queued'] == 0
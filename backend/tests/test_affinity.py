@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Session affinity handoff: sessions whose owner changes on a ring update are
+grouped by new owner, including every session of a node leaving the ring
+"""
+from xcai_agents.core.affinity import SessionAffinity
+
+NODES = {'a': 'http://127.0.0.1:9001', 'b': 'http://127.0.0.1:9002', 'c': 'http://127.0.0.1:9003'}
+SESSION_IDS = [f'legacy-session-{i}' for i in range(200)]
+
+def local_sessions(affinity):
+    return [session_id for session_id in SESSION_IDS if affinity.owner(session_id) == affinity.node_id]
+
+def test_removed_node_hands_off_every_session():
+    affinity = SessionAffinity('a', NODES, internal_token='secret')
+    held = local_sessions(affinity)
+    assert held
+    
+    affinity.update_nodes({'b': NODES['b'], 'c': NODES['c']})
+    assert not affinity.enabled
+    assert affinity.configured
+    moved = affinity.moved_sessions(held)
+    assert set(moved) <= {'b', 'c'}
+    assert sorted(sum(moved.values(), [])) == sorted(held)
+    for owner, session_ids in moved.items():
+        assert all(affinity.owner(session_id) == owner for session_id in session_ids)
+
+def test_ring_shrunk_to_one_node_hands_off_to_it():
+    affinity = SessionAffinity('a', NODES, internal_token='secret')
+    held = local_sessions(affinity)
+    affinity.update_nodes({'b': NODES['b']})
+    assert affinity.moved_sessions(held) == {'b': held}
+
+def test_remaining_node_keeps_its_own_sessions():
+    affinity = SessionAffinity('b', NODES, internal_token='secret')
+    held = local_sessions(affinity)
+    affinity.update_nodes({'b': NODES['b'], 'c': NODES['c']})
+    assert affinity.moved_sessions(held) == {}
+
+def test_internal_endpoints_need_a_configured_node_and_token():
+    assert not SessionAffinity().configured
+    affinity = SessionAffinity('a', {'a': NODES['a']})
+    assert affinity.configured and not affinity.enabled
+    assert not affinity.authorized('anything')
+    assert SessionAffinity('a', NODES, internal_token='secret').authorized('secret')
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Agent registry: lazy construction happens once, and a factory that fails is
+kept so the next lookup can retry it
+"""
+import pytest
+
+from xcai_agents.core.agent_registry import AgentRegistry
+
+def test_agent_is_constructed_once_on_first_use():
+    calls = []
+    registry = AgentRegistry()
+    registry.register_factory('NEO', lambda: calls.append(1) or object())
+    assert 'NEO' in registry and not registry.is_constructed('NEO')
+    assert registry['NEO'] is registry['NEO']
+    assert len(calls) == 1
+
+def test_failed_construction_can_be_retried():
+    attempts = []
+    
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("OPENAI_API_KEY environment variable not set")
+        return 'agent'
+    
+    registry = AgentRegistry()
+    registry.register_factory('NEO', factory)
+    with pytest.raises(RuntimeError):
+        registry['NEO']
+    assert 'NEO' in registry
+    assert registry.get_status() == {'NEO': 'lazy'}
+    assert registry['NEO'] == 'agent'
+    assert registry.get_status() == {'NEO': 'ready'}
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Audit log persistence: the shared manifest is rewritten per segment rather than
+per batch, open segments stay searchable from other processes, and closed
+segments past the retention period are deleted
+"""
+import os
+import json
+import time
+
+from xcai_agents.core.audit_log import AuditLog, MANIFEST_FILE
+
+def manifest(log_dir):
+    with open(os.path.join(log_dir, MANIFEST_FILE)) as f:
+        return json.load(f)['segments']
+
+def test_manifest_is_written_per_segment_not_per_batch(tmp_path, monkeypatch):
+    log = AuditLog(log_dir=str(tmp_path), flush_interval=0.01, batch_size=10, segment_max_entries=100)
+    writes = []
+    original = log._write_manifest
+    monkeypatch.setattr(log, '_write_manifest', lambda: writes.append(1) or original())
+    for index in range(250):
+        log.append({'session_id': f's{index % 5}'})
+    log.close()
+    # Three segments, each written to the manifest when opened and when closed
+    assert len(writes) == 6
+    segments = manifest(str(tmp_path))
+    assert [segment['count'] for segment in segments] == [100, 100, 50]
+    assert not any(segment.get('open') for segment in segments)
+
+def test_open_segment_is_searchable_from_another_log(tmp_path):
+    writer = AuditLog(log_dir=str(tmp_path), flush_interval=0.01)
+    for _ in range(20):
+        writer.append({'session_id': 'shared'})
+    writer.flush()
+    assert manifest(str(tmp_path))[0]['open']
+    
+    reader = AuditLog(log_dir=str(tmp_path))
+    assert len(list(reader.search(session_id='shared'))) == 20
+    writer.close()
+    assert len(list(reader.search(session_id='shared'))) == 20
+    assert list(reader.search(session_id='other')) == []
+    reader.close()
+
+def test_segments_past_retention_are_deleted(tmp_path):
+    old = AuditLog(log_dir=str(tmp_path), flush_interval=0.01)
+    old.append({'session_id': 'old'}, timestamp=time.time() - 3600)
+    old.close()
+    
+    log = AuditLog(log_dir=str(tmp_path), flush_interval=0.01, retention_seconds=600)
+    log.append({'session_id': 'new'})
+    log.close()
+    segments = manifest(str(tmp_path))
+    assert [segment['sessions'] for segment in segments] == [['new']]
+    assert sorted(os.listdir(tmp_path)) == sorted([segments[0]['file'], MANIFEST_FILE, 'manifest.lock'])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker: the slow-call threshold sits below the agent timeout, and a
+half-open probe slot comes back when its request is cancelled before the call runs
+"""
+import asyncio
+import logging
+import time
+
+import pytest
+
+from xcai_agents import initialize_xcai_system
+from xcai_agents.core.circuit_breaker import CircuitBreaker
+from xcai_agents.core.parallel_agent_orchestrator import STANDARD_TIMEOUT
+
+@pytest.fixture(scope='module')
+def orchestrator():
+    logging.disable(logging.CRITICAL)
+    yield initialize_xcai_system()
+    logging.disable(logging.NOTSET)
+
+def half_open(breaker: CircuitBreaker):
+    breaker.state = 'OPEN'
+    breaker.opened_at = time.time() - breaker.current_recovery_timeout - 1
+
+def test_slow_calls_trip_before_they_time_out():
+    breaker = CircuitBreaker(name='test')
+    assert breaker.slow_call_threshold < STANDARD_TIMEOUT
+    for _ in range(breaker.minimum_calls):
+        breaker.record_success(STANDARD_TIMEOUT * 0.8)
+    assert breaker.state == 'OPEN'
+
+def test_release_probe_frees_a_reserved_slot():
+    breaker = CircuitBreaker(name='test', half_open_max_calls=1)
+    half_open(breaker)
+    assert breaker.can_execute()
+    assert not breaker.can_execute()
+    breaker.release_probe()
+    assert breaker.can_execute()
+
+def test_cancelled_request_releases_its_probe_slots(orchestrator, monkeypatch):
+    breakers = list(orchestrator.circuit_breakers.values())
+    reservations = []
+    for breaker in breakers:
+        half_open(breaker)
+        
+        def can_execute(reserve=breaker.can_execute):
+            # Cancellation arrives after the first slot is reserved, before any call starts
+            if reservations:
+                raise asyncio.CancelledError()
+            reservations.append(1)
+            return reserve()
+        
+        monkeypatch.setattr(breaker, 'can_execute', can_execute)
+    
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(orchestrator.orchestrate_request({'message': 'hello', 'session_id': 'probe'}))
+    assert reservations
+    assert all(breaker._half_open_in_flight == 0 and breaker.trip_count == 0 for breaker in breakers)
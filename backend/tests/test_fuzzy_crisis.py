@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Misspelling-tolerant crisis detection: recall on misspelled crisis messages
+and no false positives on near-miss everyday messages (the shared evaluation set)
+"""
+import logging
+
+import pytest
+
+from xcai_agents.agents.mika_agent import MIKAAgent
+from xcai_agents.agents.neo_agent import NEOAgent
+from xcai_agents.offline.crisis_eval import RECALL, NEGATIVES
+
+MIKA_RECALL = 0.95
+NEO_RECALL = 0.7
+
+@pytest.fixture(scope='module')
+def agents():
+    logging.disable(logging.CRITICAL)
+    yield MIKAAgent(), NEOAgent()
+    logging.disable(logging.NOTSET)
+
+def test_mika_recall_on_misspelled_crisis_messages(agents):
+    mika, _ = agents
+    crisis = [(message, level) for message, level in RECALL if level != 'none']
+    misses = [(message, level) for message, level in crisis
+              if mika._detect_crisis_immediate(message)['level'] != level]
+    assert 1 - len(misses) / len(crisis) >= MIKA_RECALL, misses
+
+def test_mika_never_misses_critical_messages(agents):
+    mika, _ = agents
+    misses = [message for message, level in RECALL
+              if level == 'critical' and mika._detect_crisis_immediate(message)['level'] != 'critical']
+    assert not misses
+
+def test_neo_recall_on_misspelled_crisis_messages(agents):
+    _, neo = agents
+    crisis = [message for message, level in RECALL if level != 'none']
+    found = sum(neo._detect_crisis(message)['level'] != 'none' for message in crisis)
+    assert found / len(crisis) >= NEO_RECALL
+
+@pytest.mark.parametrize('message', NEGATIVES)
+def test_no_false_positives_on_near_misses(agents, message):
+    mika, neo = agents
+    assert mika._detect_crisis_immediate(message)['level'] == 'none'
+    assert neo._detect_crisis(message)['level'] == 'none'
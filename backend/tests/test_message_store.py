@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Message store write-behind buffer: a failed flush keeps its batch for the
+next one, and the retry writes each row exactly once
+"""
+import sqlite3
+
+import pytest
+
+from xcai_agents.core.message_store import MessageStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = MessageStore(str(tmp_path / 'messages.db'), flush_interval=60)
+    # Inserts abort while `fail_writes` has a row, inside the store's own transaction
+    with sqlite3.connect(store.db_path) as conn:
+        conn.executescript(
+            "CREATE TABLE fail_writes (x);"
+            "CREATE TRIGGER abort_writes BEFORE INSERT ON messages WHEN EXISTS (SELECT 1 FROM fail_writes)"
+            " BEGIN SELECT RAISE(ABORT, 'disk I/O error'); END;"
+        )
+    yield store
+    store.close()
+
+def fail_writes(store, failing):
+    with sqlite3.connect(store.db_path) as conn:
+        conn.execute("DELETE FROM fail_writes")
+        if failing:
+            conn.execute("INSERT INTO fail_writes VALUES (1)")
+
+def stored_rows(store):
+    with sqlite3.connect(store.db_path) as conn:
+        return conn.execute("SELECT session_id, content FROM messages").fetchall()
+
+def test_failed_flush_is_retried_once(store):
+    store.create_session({'session_id': 's1', 'device_id': 'd1', 'created_at': 1.0})
+    store.append('s1', {'role': 'user', 'content': 'hello', 'timestamp': 2.0})
+    fail_writes(store, True)
+    with pytest.raises(sqlite3.Error):
+        store.flush()
+    assert store.pending() == 2
+    assert stored_rows(store) == []
+    
+    fail_writes(store, False)
+    store.flush()
+    assert store.pending() == 0
+    assert stored_rows(store) == [('s1', 'hello')]
+
+def test_load_session_serves_buffered_rows_when_flush_fails(store):
+    store.create_session({'session_id': 's1', 'device_id': 'd1', 'created_at': 1.0})
+    store.append('s1', {'role': 'user', 'content': 'hello', 'timestamp': 2.0, 'agent': 'NEO'})
+    fail_writes(store, True)
+    session = store.load_session('s1')
+    assert session['device_id'] == 'd1'
+    assert session['messages'] == [{'role': 'user', 'content': 'hello', 'timestamp': 2.0, 'agent': 'NEO'}]
+    
+    fail_writes(store, False)
+    store.flush()
+    assert store.load_session('s1')['messages'] == session['messages']
+    assert len(stored_rows(store)) == 1
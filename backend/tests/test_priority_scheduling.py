@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Priority scheduler: crisis work runs ahead of queued standard work, on
+reserved capacity when the shared pool is busy, without starving standard work
+"""
+import threading
+import time
+
+import pytest
+
+from xcai_agents.core.scheduler import PriorityExecutor, PrioritySemaphore, PRIORITY_CRISIS, PRIORITY_STANDARD
+
+@pytest.fixture
+def executor():
+    pools = []
+    
+    def make(**kwargs):
+        pool = PriorityExecutor(name='test', **kwargs)
+        pools.append(pool)
+        return pool
+    
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+def occupy_worker(executor):
+    """Standard task holding a shared worker until the returned event is set"""
+    started, release = threading.Event(), threading.Event()
+    
+    def block():
+        started.set()
+        release.wait()
+    
+    future = executor.submit(block, priority=PRIORITY_STANDARD)
+    assert started.wait(timeout=5)
+    return future, release
+
+def run_order(executor, tasks):
+    """Order in which one shared worker runs `tasks` queued behind a blocking task"""
+    _, release = occupy_worker(executor)
+    order = []
+    futures = [executor.submit(order.append, label, priority=priority) for label, priority in tasks]
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    return order
+
+def test_crisis_preempts_queued_standard_work(executor):
+    pool = executor(shared_workers=1, reserved_workers=0)
+    tasks = [(f's{i}', PRIORITY_STANDARD) for i in range(5)] + [(f'c{i}', PRIORITY_CRISIS) for i in range(3)]
+    order = run_order(pool, tasks)
+    assert order[:3] == ['c0', 'c1', 'c2']
+    assert order[3:] == ['s0', 's1', 's2', 's3', 's4']
+
+def test_standard_work_is_not_starved(executor):
+    pool = executor(shared_workers=1, reserved_workers=0, crisis_weight=2)
+    tasks = [(f'c{i}', PRIORITY_CRISIS) for i in range(6)] + [(f's{i}', PRIORITY_STANDARD) for i in range(2)]
+    order = run_order(pool, tasks)
+    assert order == ['c0', 'c1', 's0', 'c2', 'c3', 's1', 'c4', 'c5']
+
+def test_reserved_workers_run_crisis_while_shared_workers_are_busy(executor):
+    pool = executor(shared_workers=1, reserved_workers=1)
+    blocked, release = occupy_worker(pool)
+    try:
+        assert pool.submit(lambda: 'done', priority=PRIORITY_CRISIS).result(timeout=2) == 'done'
+        standard = pool.submit(lambda: 'done', priority=PRIORITY_STANDARD)
+        time.sleep(0.05)
+        assert not standard.done()
+    finally:
+        release.set()
+    blocked.result(timeout=2)
+    assert standard.result(timeout=2) == 'done'
+
+def test_gate_reserves_slots_for_crisis_callers():
+    gate = PrioritySemaphore(total=2, reserved=1, name='test')
+    assert gate.acquire(PRIORITY_STANDARD, timeout=0)
+    assert not gate.acquire(PRIORITY_STANDARD, timeout=0)
+    assert gate.acquire(PRIORITY_CRISIS, timeout=0)
+    assert not gate.acquire(PRIORITY_CRISIS, timeout=0)
+    gate.release()
+    gate.release()
+    assert gate.get_status()['in_use'] == 0
+
+def test_crisis_p99_holds_under_standard_flood(executor):
+    pool = executor(shared_workers=4, reserved_workers=2)
+    gate = PrioritySemaphore(total=4, reserved=2, name='test-llm')
+    work = 0.005
+    waits = []
+    
+    def call(priority, submitted_at=None):
+        with gate.slot(priority, timeout=30):
+            time.sleep(work)
+        if submitted_at is not None:
+            waits.append(time.perf_counter() - submitted_at - work)
+    
+    flood = [pool.submit(call, PRIORITY_STANDARD, priority=PRIORITY_STANDARD) for _ in range(400)]
+    crisis = []
+    for _ in range(20):
+        crisis.append(pool.submit(call, PRIORITY_CRISIS, time.perf_counter(), priority=PRIORITY_CRISIS))
+        time.sleep(work / 2)
+    for future in crisis:
+        future.result(timeout=10)
+    # The flood takes about a second on its two unreserved slots; crisis calls never wait for it
+    assert sum(future.done() for future in flood) < len(flood)
+    waits.sort()
+    assert waits[int(0.99 * (len(waits) - 1))] < 0.05
+    for future in flood:
+        future.result(timeout=30)
@@ -11,22 +11,39 @@ from .agents.echo_agent import ECHOAgent
 from .agents.mac_agent import MACAgent
 
 # Initialize and register all agents
-def initialize_xcai_system(openai_client=None):
-    """Initialize the complete XCAi-AIIA multi-agent system"""
-    
-    # Initialize agents
-    neo_agent = NEOAgent(openai_client=openai_client)
-    mika_agent = MIKAAgent()
-    nemo_agent = NEMOAgent()
-    echo_agent = ECHOAgent()
-    mac_agent = MACAgent()
+def initialize_xcai_system(openai_client=None, lazy=True, prewarm=False, pattern_store=None, crisis_model=None,
+                           semantic_router=None):
+    """
+    Initialize the complete XCAi-AIIA multi-agent system
+    With lazy=True agents are registered as factories and built on first use;
+    prewarm=True builds them immediately (e.g. in a preloading master before fork).
+    With a PatternStore, every agent takes its keyword tables from the store's
+    artifact when built and again whenever the artifact is reloaded.
+    A CrisisModelStore gives MIKA its second-stage scorer for borderline messages.
+    A SemanticRouter adds similarity-based agent selection after the routing keywords.
+    """
+    factories = {
+        'NEO': lambda: NEOAgent(openai_client=openai_client),
+        'MIKA': lambda: MIKAAgent(crisis_model=crisis_model),
+        'NEMO': NEMOAgent,
+        'ECHO': ECHOAgent,
+        'MAC': MACAgent
+    }
     
     # Register agents with orchestrator
-    orchestrator.register_agent('NEO', neo_agent)
-    orchestrator.register_agent('MIKA', mika_agent)
-    orchestrator.register_agent('NEMO', nemo_agent)
-    orchestrator.register_agent('ECHO', echo_agent)
-    orchestrator.register_agent('MAC', mac_agent)
+    for agent_name, factory in factories.items():
+        if pattern_store is not None:
+            factory = pattern_store.wrap_factory(agent_name, factory)
+        if lazy:
+            orchestrator.register_agent_factory(agent_name, factory)
+        else:
+            orchestrator.register_agent(agent_name, factory())
+    
+    orchestrator.pattern_store = pattern_store
+    orchestrator.semantic_router = semantic_router
+    
+    if prewarm:
+        orchestrator.prewarm_agents()
     
     return orchestrator
 
@@ -13,15 +13,81 @@ from datetime import datetime, timedelta
 import logging
 
 from ..core.base_agent import SpecializedAgent
+from ..core.emotional_series import EmotionalSeries, POSITIVE, NEGATIVE
+from ..core.phrase_matcher import TokenMatcher
 
 logger = logging.getLogger(__name__)
 
+# Context analysis patterns
+CONTEXT_PATTERNS = {
+    'emotional_progression': {
+        'improving': ['better', 'improving', 'feeling good', 'progress', 'positive'],
+        'declining': ['worse', 'deteriorating', 'getting bad', 'declining', 'downward'],
+        'stable': ['same', 'consistent', 'unchanged', 'steady', 'stable'],
+        'fluctuating': ['up and down', 'back and forth', 'sometimes', 'varies', 'mixed']
+    },
+    'support_seeking': {
+        'direct': ['help me', 'need support', 'what should i do', 'advice', 'guidance'],
+        'indirect': ['struggling with', 'difficult time', 'not sure', 'confused', 'lost'],
+        'resistant': ['fine', 'okay', 'nothing wrong', 'don\'t need help', 'handle it myself'],
+        'ready': ['open to', 'willing to try', 'ready for help', 'want to change']
+    },
+    'relationship_dynamics': {
+        'family': ['family', 'parents', 'siblings', 'relatives', 'home'],
+        'romantic': ['partner', 'boyfriend', 'girlfriend', 'spouse', 'relationship'],
+        'friends': ['friends', 'social', 'peers', 'group', 'friendship'],
+        'professional': ['work', 'boss', 'colleague', 'job', 'career'],
+        'isolation': ['alone', 'lonely', 'isolated', 'no one', 'by myself']
+    },
+    'life_domains': {
+        'health': ['health', 'medical', 'physical', 'body', 'illness', 'doctor'],
+        'work': ['job', 'work', 'career', 'employment', 'workplace', 'professional'],
+        'education': ['school', 'college', 'study', 'academic', 'learning', 'grades'],
+        'finances': ['money', 'financial', 'budget', 'debt', 'income', 'expenses'],
+        'housing': ['home', 'housing', 'apartment', 'living', 'rent', 'mortgage']
+    }
+}
+
+# Conversation flow indicators
+FLOW_INDICATORS = {
+    'opening': ['first time', 'new here', 'never talked', 'beginning'],
+    'continuing': ['last time', 'mentioned before', 'as i said', 'previously'],
+    'deepening': ['more about', 'deeper', 'really', 'honestly', 'truth is'],
+    'closing': ['thank you', 'that helps', 'feel better', 'good to talk'],
+    'crisis_escalation': ['getting worse', 'can\'t handle', 'emergency', 'immediate help']
+}
+
+# Per-message signals for depth and emotional state
+EMOTIONAL_LANGUAGE = TokenMatcher.of(['feel', 'emotion', 'sad', 'happy', 'angry', 'scared', 'worried', 'excited', 'frustrated'])
+PERSONAL_DISCLOSURE = TokenMatcher.of(['my', 'i am', 'i have', 'i feel', 'personal', 'private', 'secret'])
+EMOTIONAL_STATE_WORDS = TokenMatcher([
+    (POSITIVE, ['happy', 'good', 'better', 'positive', 'excited', 'grateful']),
+    (NEGATIVE, ['sad', 'bad', 'worse', 'negative', 'depressed', 'angry'])
+])
+
+# Conversation depth indicators
+DEPTH_INDICATORS = {
+    'surface': ['Short or factual messages', 'Little emotional language so far'],
+    'developing': ['Some emotional language', 'Beginning to share personal context'],
+    'moderate': ['Regular emotional expression', 'Personal disclosures in several messages'],
+    'deep': ['Sustained emotional expression', 'Detailed personal disclosure']
+}
+
+# Emotional trajectory thresholds (valence is -1..1 per turn)
+TREND_WINDOW = 10             # turns used for trend, volatility and consistency
+TREND_SLOPE_THRESHOLD = 0.05  # valence change per turn that counts as a trend
+VOLATILITY_HIGH = 0.8         # mean absolute valence change per turn over the window
+VOLATILITY_MODERATE = 0.4
+TIMELINE_LENGTH = 10
+
 class ECHOAgent(SpecializedAgent):
     """
     ECHO Agent - Context Building and Conversation Memory
     Fibonacci Level: 1 (Primary Support Agent)
     """
     
+    PATTERN_TABLES = ('context_patterns', 'flow_indicators')
+    
     def __init__(self):
         super().__init__(
             agent_name="ECHO",
@@ -42,47 +108,15 @@ class ECHOAgent(SpecializedAgent):
         ]
         
         # Context analysis patterns
-        self.context_patterns = {
-            'emotional_progression': {
-                'improving': ['better', 'improving', 'feeling good', 'progress', 'positive'],
-                'declining': ['worse', 'deteriorating', 'getting bad', 'declining', 'downward'],
-                'stable': ['same', 'consistent', 'unchanged', 'steady', 'stable'],
-                'fluctuating': ['up and down', 'back and forth', 'sometimes', 'varies', 'mixed']
-            },
-            'support_seeking': {
-                'direct': ['help me', 'need support', 'what should i do', 'advice', 'guidance'],
-                'indirect': ['struggling with', 'difficult time', 'not sure', 'confused', 'lost'],
-                'resistant': ['fine', 'okay', 'nothing wrong', 'don\'t need help', 'handle it myself'],
-                'ready': ['open to', 'willing to try', 'ready for help', 'want to change']
-            },
-            'relationship_dynamics': {
-                'family': ['family', 'parents', 'siblings', 'relatives', 'home'],
-                'romantic': ['partner', 'boyfriend', 'girlfriend', 'spouse', 'relationship'],
-                'friends': ['friends', 'social', 'peers', 'group', 'friendship'],
-                'professional': ['work', 'boss', 'colleague', 'job', 'career'],
-                'isolation': ['alone', 'lonely', 'isolated', 'no one', 'by myself']
-            },
-            'life_domains': {
-                'health': ['health', 'medical', 'physical', 'body', 'illness', 'doctor'],
-                'work': ['job', 'work', 'career', 'employment', 'workplace', 'professional'],
-                'education': ['school', 'college', 'study', 'academic', 'learning', 'grades'],
-                'finances': ['money', 'financial', 'budget', 'debt', 'income', 'expenses'],
-                'housing': ['home', 'housing', 'apartment', 'living', 'rent', 'mortgage']
-            }
-        }
+        self.context_patterns = CONTEXT_PATTERNS
         
         # Conversation flow indicators
-        self.flow_indicators = {
-            'opening': ['first time', 'new here', 'never talked', 'beginning'],
-            'continuing': ['last time', 'mentioned before', 'as i said', 'previously'],
-            'deepening': ['more about', 'deeper', 'really', 'honestly', 'truth is'],
-            'closing': ['thank you', 'that helps', 'feel better', 'good to talk'],
-            'crisis_escalation': ['getting worse', 'can\'t handle', 'emergency', 'immediate help']
-        }
+        self.flow_indicators = FLOW_INDICATORS
         
         # Memory storage for session continuity
         self.session_memory = {}
         self.pattern_memory = {}
+        self.emotional_series = {}
         
         logger.info("ECHO Agent initialized with context building and memory capabilities")
     
@@ -154,7 +188,7 @@ class ECHOAgent(SpecializedAgent):
         
         # Track emotional continuity
         emotional_continuity = self._track_emotional_continuity(
-            current_message, conversation_history, session_data
+            session_id, current_message, conversation_history, session_data
         )
         
         return {
@@ -169,15 +203,21 @@ class ECHOAgent(SpecializedAgent):
             'conversation_quality': self._assess_conversation_quality(conversation_history)
         }
     
+    def _batch_pattern_groups(self):
+        groups = [(('flow', flow_type), indicators) for flow_type, indicators in self.flow_indicators.items()]
+        for category, patterns in self.context_patterns.items():
+            groups.extend((('theme', category, theme), keywords) for theme, keywords in patterns.items())
+        return groups
+    
     def _analyze_conversation_flow(self, current_message: str, history: List[Dict]) -> Dict[str, Any]:
         """Analyze the flow and stage of conversation"""
-        message_lower = current_message.lower()
+        hits = self._match_patterns(current_message)
         message_count = len(history) + 1
         
         # Detect flow indicators
         detected_flows = {}
         for flow_type, indicators in self.flow_indicators.items():
-            matches = [indicator for indicator in indicators if indicator in message_lower]
+            matches = hits.get(('flow', flow_type))
             if matches:
                 detected_flows[flow_type] = {
                     'matches': matches,
@@ -208,7 +248,8 @@ class ECHOAgent(SpecializedAgent):
     def _extract_conversation_themes(self, current_message: str, history: List[Dict]) -> Dict[str, Any]:
         """Extract and track conversation themes"""
         all_messages = [msg.get('content', '') for msg in history] + [current_message]
-        combined_text = ' '.join(all_messages).lower()
+        combined_hits = self._match_patterns(' '.join(all_messages))
+        recent_hits = self._match_patterns(current_message)
         
         detected_themes = {}
         
@@ -216,12 +257,12 @@ class ECHOAgent(SpecializedAgent):
         for category, patterns in self.context_patterns.items():
             category_themes = {}
             for theme, keywords in patterns.items():
-                matches = sum(1 for keyword in keywords if keyword in combined_text)
+                matches = len(combined_hits.get(('theme', category, theme), ()))
                 if matches > 0:
                     category_themes[theme] = {
                         'frequency': matches,
                         'relevance': matches / len(keywords),
-                        'recent': any(keyword in current_message.lower() for keyword in keywords)
+                        'recent': ('theme', category, theme) in recent_hits
                     }
             
             if category_themes:
@@ -273,29 +314,27 @@ class ECHOAgent(SpecializedAgent):
             'indicators': self._get_depth_indicators(depth_level)
         }
     
-    def _track_emotional_continuity(self, current_message: str, history: List[Dict], 
+    def _track_emotional_continuity(self, session_id: str, current_message: str, history: List[Dict],
                                    session_data: Dict[str, Any]) -> Dict[str, Any]:
         """Track emotional continuity and changes throughout conversation"""
         current_emotional_state = self._analyze_emotional_state(current_message)
         
         # Get previous emotional states
         previous_states = []
-        for msg in history[-3:]:  # Last 3 messages
+        for msg in history[-4:-1] if history and history[-1].get('content') == current_message else history[-3:]:
             emotional_state = self._analyze_emotional_state(msg.get('content', ''))
             previous_states.append(emotional_state)
         
-        # Calculate emotional consistency
-        emotional_consistency = self._calculate_emotional_consistency(current_emotional_state, previous_states)
-        
-        # Detect emotional shifts
-        emotional_shifts = self._detect_emotional_shifts(current_emotional_state, previous_states)
+        # Session time series, updated incrementally with this turn
+        series = self._get_emotional_series(session_id, current_message, history)
+        series.append(current_emotional_state['valence'], current_emotional_state['intensity'])
         
         return {
             'current_state': current_emotional_state,
             'previous_states': previous_states,
-            'consistency': emotional_consistency,
-            'shifts': emotional_shifts,
-            'emotional_trajectory': self._determine_emotional_trajectory(previous_states + [current_emotional_state])
+            'consistency': self._calculate_emotional_consistency(series),
+            'shifts': self._detect_emotional_shifts(series),
+            'emotional_trajectory': self._determine_emotional_trajectory(series)
         }
     
     def _analyze_conversation_patterns(self, current_message: str, 
@@ -313,28 +352,28 @@ class ECHOAgent(SpecializedAgent):
     
     def _map_emotional_journey(self, conversation_context: Dict[str, Any]) -> Dict[str, Any]:
         """Map the emotional journey throughout the conversation"""
-        emotional_data = conversation_context.get('emotional_continuity', {})
+        series = self.emotional_series.get(conversation_context.get('session_id'))
+        if series is None:
+            series = EmotionalSeries()
         
-        # Create emotional timeline
+        # Create emotional timeline from the most recent turns
         emotional_timeline = []
-        current_state = emotional_data.get('current_state', {})
-        previous_states = emotional_data.get('previous_states', [])
-        
-        for i, state in enumerate(previous_states + [current_state]):
+        for turn, valence, intensity in series.recent(TIMELINE_LENGTH):
             emotional_timeline.append({
-                'position': i,
-                'primary_emotion': state.get('primary_emotion', 'neutral'),
-                'intensity': state.get('intensity', 0.0),
-                'valence': state.get('valence', 0.0)  # positive/negative
+                'position': turn,
+                'primary_emotion': POSITIVE if valence > 0 else NEGATIVE if valence < 0 else 'neutral',
+                'intensity': intensity,
+                'valence': valence  # positive/negative
             })
         
         # Analyze journey characteristics
         journey_analysis = {
             'timeline': emotional_timeline,
-            'overall_trend': self._calculate_emotional_trend(emotional_timeline),
-            'volatility': self._calculate_emotional_volatility(emotional_timeline),
-            'dominant_emotions': self._identify_dominant_emotions(emotional_timeline),
-            'improvement_indicators': self._detect_improvement_indicators(emotional_timeline)
+            'overall_trend': self._calculate_emotional_trend(series),
+            'volatility': self._calculate_emotional_volatility(series),
+            'dominant_emotions': self._identify_dominant_emotions(series),
+            'improvement_indicators': self._detect_improvement_indicators(series),
+            'turns_tracked': series.turns
         }
         
         return journey_analysis
@@ -391,22 +430,18 @@ class ECHOAgent(SpecializedAgent):
     # Helper methods for context analysis
     def _contains_emotional_language(self, message: str) -> bool:
         """Check if message contains emotional language"""
-        emotional_words = ['feel', 'emotion', 'sad', 'happy', 'angry', 'scared', 'worried', 'excited', 'frustrated']
-        return any(word in message.lower() for word in emotional_words)
+        return EMOTIONAL_LANGUAGE.any(message)
     
     def _contains_personal_disclosure(self, message: str) -> bool:
         """Check if message contains personal disclosure"""
-        disclosure_indicators = ['my', 'i am', 'i have', 'i feel', 'personal', 'private', 'secret']
-        return any(indicator in message.lower() for indicator in disclosure_indicators)
+        return PERSONAL_DISCLOSURE.any(message)
     
     def _analyze_emotional_state(self, message: str) -> Dict[str, Any]:
         """Analyze emotional state in a message"""
         # Simplified emotional analysis (would be enhanced with NEO integration)
-        positive_words = ['happy', 'good', 'better', 'positive', 'excited', 'grateful']
-        negative_words = ['sad', 'bad', 'worse', 'negative', 'depressed', 'angry']
-        
-        positive_count = sum(1 for word in positive_words if word in message.lower())
-        negative_count = sum(1 for word in negative_words if word in message.lower())
+        hits = EMOTIONAL_STATE_WORDS.match(message)
+        positive_count = len(hits.get(POSITIVE, ()))
+        negative_count = len(hits.get(NEGATIVE, ()))
         
         if positive_count > negative_count:
             primary_emotion = 'positive'
@@ -443,6 +478,293 @@ class ECHOAgent(SpecializedAgent):
         if len(self.session_memory[session_id]['history']) > 10:
             self.session_memory[session_id]['history'] = self.session_memory[session_id]['history'][-10:]
     
+    # Emotional time series
+    def _get_emotional_series(self, session_id: str, current_message: str, history: List[Dict]) -> EmotionalSeries:
+        """Session series, backfilled from earlier user turns the first time a session is seen"""
+        series = self.emotional_series.get(session_id)
+        if series is not None:
+            return series
+        
+        series = EmotionalSeries()
+        earlier = history[:-1] if history and history[-1].get('content') == current_message else history
+        for msg in earlier:
+            if msg.get('role', 'user') == 'user':
+                state = self._analyze_emotional_state(msg.get('content', ''))
+                series.append(state['valence'], state['intensity'])
+        return self.emotional_series.setdefault(session_id, series)
+    
+    def _calculate_emotional_trend(self, series: EmotionalSeries) -> Dict[str, Any]:
+        """Least-squares valence trend over the recent window"""
+        slope = series.slope_valence(TREND_WINDOW)
+        if len(series) < 2 or abs(slope) < TREND_SLOPE_THRESHOLD:
+            direction = 'stable'
+        else:
+            direction = 'improving' if slope > 0 else 'declining'
+        
+        return {
+            'direction': direction,
+            'slope': slope,
+            'recent_valence': series.mean_valence(TREND_WINDOW),
+            'session_valence': series.session_mean_valence
+        }
+    
+    def _calculate_emotional_volatility(self, series: EmotionalSeries) -> Dict[str, Any]:
+        """Turn-to-turn movement and spread of valence over the recent window"""
+        mean_change = series.mean_abs_change(TREND_WINDOW)
+        if mean_change >= VOLATILITY_HIGH:
+            level = 'high'
+        elif mean_change >= VOLATILITY_MODERATE:
+            level = 'moderate'
+        else:
+            level = 'low'
+        
+        return {
+            'level': level,
+            'mean_change': mean_change,
+            'std': series.std_valence(TREND_WINDOW)
+        }
+    
+    def _calculate_emotional_consistency(self, series: EmotionalSeries) -> float:
+        """1.0 when valence is steady over the recent window, 0.0 at maximum spread"""
+        return max(0.0, 1.0 - series.std_valence(TREND_WINDOW))
+    
+    def _detect_emotional_shifts(self, series: EmotionalSeries) -> List[Dict[str, Any]]:
+        """Most recent sustained valence shifts"""
+        return [
+            {
+                'turn': turn,
+                'from': before,
+                'to': after,
+                'direction': 'positive' if after > before else 'negative'
+            }
+            for turn, before, after in list(series.shifts)[-3:]
+        ]
+    
+    def _determine_emotional_trajectory(self, series: EmotionalSeries) -> str:
+        """improving / declining / volatile / stable, or insufficient_data before three turns"""
+        if series.turns < 3:
+            return 'insufficient_data'
+        if series.mean_abs_change(TREND_WINDOW) >= VOLATILITY_HIGH:
+            return 'volatile'
+        return self._calculate_emotional_trend(series)['direction']
+    
+    def _identify_dominant_emotions(self, series: EmotionalSeries) -> List[Dict[str, Any]]:
+        """Share of session turns by emotional polarity, most frequent first"""
+        if not series.turns:
+            return []
+        return [
+            {'emotion': emotion, 'share': count / series.turns}
+            for emotion, count in sorted(series.emotion_counts.items(), key=lambda item: -item[1])
+            if count
+        ]
+    
+    def _detect_improvement_indicators(self, series: EmotionalSeries) -> List[str]:
+        """Signals that the user is doing better than earlier in the session"""
+        indicators = []
+        if series.turns < 2:
+            return indicators
+        
+        if series.slope_valence(TREND_WINDOW) >= TREND_SLOPE_THRESHOLD:
+            indicators.append('Valence trending upward')
+        if series.turns > TREND_WINDOW and series.mean_valence(TREND_WINDOW) > series.session_mean_valence:
+            indicators.append('Recent turns more positive than session average')
+        if series.shifts and series.shifts[-1][2] > series.shifts[-1][1]:
+            indicators.append('Latest emotional shift was positive')
+        if series.mean_intensity(3) < series.mean_intensity(TREND_WINDOW) and series.mean_valence(3) <= 0:
+            indicators.append('Negative intensity easing')
+        return indicators
+    
+    # Conversation structure
+    def _calculate_session_duration(self, session_data: Dict[str, Any]) -> float:
+        """Seconds since ECHO first saw the session"""
+        created_at = session_data.get('created_at')
+        if not created_at:
+            return 0.0
+        try:
+            return (datetime.utcnow() - datetime.fromisoformat(created_at)).total_seconds()
+        except (TypeError, ValueError):
+            return 0.0
+    
+    def _assess_conversation_quality(self, history: List[Dict]) -> Dict[str, Any]:
+        """Engagement from turn count and message substance"""
+        user_messages = [msg.get('content', '') for msg in history if msg.get('role', 'user') == 'user']
+        if not user_messages:
+            return {'level': 'new', 'score': 0.0, 'user_turns': 0}
+        
+        avg_length = sum(len(content) for content in user_messages) / len(user_messages)
+        score = min(1.0, len(user_messages) / 10) * 0.5 + min(1.0, avg_length / 100) * 0.5
+        level = 'high' if score > 0.6 else 'moderate' if score > 0.3 else 'low'
+        return {'level': level, 'score': score, 'user_turns': len(user_messages)}
+    
+    def _get_depth_indicators(self, depth_level: str) -> List[str]:
+        return list(DEPTH_INDICATORS.get(depth_level, []))
+    
+    def _identify_dominant_themes(self, detected_themes: Dict[str, Any]) -> List[str]:
+        """Top three category:theme pairs by frequency"""
+        ranked = sorted(
+            ((details['frequency'], f"{category}:{theme}")
+             for category, themes in detected_themes.items()
+             for theme, details in themes.items()),
+            reverse=True
+        )
+        return [name for _, name in ranked[:3]]
+    
+    def _calculate_theme_consistency(self, detected_themes: Dict[str, Any]) -> float:
+        """Fraction of session themes that are still present in the current message"""
+        themes = [details for category in detected_themes.values() for details in category.values()]
+        if not themes:
+            return 0.0
+        return sum(1 for details in themes if details['recent']) / len(themes)
+    
+    def _track_theme_evolution(self, detected_themes: Dict[str, Any], history: List[Dict]) -> Dict[str, Any]:
+        """Themes raised in this message versus themes only seen earlier"""
+        current, earlier = [], []
+        for category, themes in detected_themes.items():
+            for theme, details in themes.items():
+                (current if details['recent'] else earlier).append(f"{category}:{theme}")
+        return {'current': current, 'earlier': earlier, 'messages_analyzed': len(history) + 1}
+    
+    # Pattern analysis
+    def _detect_repetitive_themes(self, conversation_context: Dict[str, Any]) -> List[str]:
+        detected = conversation_context['themes']['detected_themes']
+        return [
+            f"{category}:{theme}"
+            for category, themes in detected.items()
+            for theme, details in themes.items()
+            if details['frequency'] >= 2
+        ]
+    
+    def _track_support_seeking(self, conversation_context: Dict[str, Any]) -> Dict[str, Any]:
+        support = conversation_context['themes']['detected_themes'].get('support_seeking', {})
+        recent = [theme for theme, details in support.items() if details['recent']]
+        return {
+            'current': max(recent, key=lambda theme: support[theme]['relevance']) if recent else None,
+            'observed': sorted(support)
+        }
+    
+    def _analyze_engagement_patterns(self, conversation_context: Dict[str, Any]) -> Dict[str, Any]:
+        depth = conversation_context['depth_analysis']
+        return {
+            'stage': conversation_context['flow_stage']['primary_stage'],
+            'depth_level': depth['level'],
+            'message_count': conversation_context['message_count'],
+            'engaged': depth['level'] in ('moderate', 'deep')
+        }
+    
+    def _detect_crisis_patterns(self, conversation_context: Dict[str, Any]) -> List[str]:
+        themes = conversation_context['themes']['detected_themes']
+        continuity = conversation_context['emotional_continuity']
+        indicators = []
+        if conversation_context['flow_stage']['primary_stage'] == 'crisis_escalation':
+            indicators.append('Escalating crisis language in this message')
+        if continuity['emotional_trajectory'] == 'declining':
+            indicators.append('Emotional trajectory declining across recent turns')
+        if any(shift['direction'] == 'negative' for shift in continuity['shifts'][-1:]):
+            indicators.append('Recent sustained negative shift')
+        if 'isolation' in themes.get('relationship_dynamics', {}):
+            indicators.append('Isolation mentioned')
+        if 'declining' in themes.get('emotional_progression', {}):
+            indicators.append('User describes things getting worse')
+        return indicators
+    
+    def _detect_progress_patterns(self, conversation_context: Dict[str, Any]) -> List[str]:
+        themes = conversation_context['themes']['detected_themes']
+        continuity = conversation_context['emotional_continuity']
+        indicators = []
+        if continuity['emotional_trajectory'] == 'improving':
+            indicators.append('Emotional trajectory improving')
+        if 'improving' in themes.get('emotional_progression', {}):
+            indicators.append('User describes improvement')
+        if 'ready' in themes.get('support_seeking', {}):
+            indicators.append('Open to support')
+        if conversation_context['flow_stage']['primary_stage'] == 'closing':
+            indicators.append('Conversation reaching a positive close')
+        return indicators
+    
+    # Insights
+    def _generate_conversation_summary(self, conversation_context: Dict[str, Any]) -> str:
+        summary = (
+            f"{conversation_context['message_count']} messages, "
+            f"{conversation_context['flow_stage']['primary_stage']} stage, "
+            f"{conversation_context['depth_analysis']['level']} depth"
+        )
+        dominant = conversation_context['themes']['dominant_themes']
+        if dominant:
+            summary += f"; themes: {', '.join(theme.split(':')[1] for theme in dominant)}"
+        return summary
+    
+    def _identify_key_patterns(self, pattern_analysis: Dict[str, Any]) -> List[str]:
+        patterns = []
+        repetitive = pattern_analysis['repetitive_themes']
+        if repetitive:
+            patterns.append(f"Recurring themes: {', '.join(theme.split(':')[1] for theme in repetitive[:3])}")
+        support = pattern_analysis['support_seeking_evolution']['current']
+        if support:
+            patterns.append(f"Support seeking: {support}")
+        patterns.extend(pattern_analysis['crisis_indicators'])
+        patterns.extend(pattern_analysis['progress_indicators'])
+        return patterns
+    
+    def _generate_emotional_insights(self, emotional_journey: Dict[str, Any]) -> List[str]:
+        if emotional_journey['turns_tracked'] < 2:
+            return []
+        trend = emotional_journey['overall_trend']
+        insights = [
+            f"Emotional trend {trend['direction']} over the last "
+            f"{min(TREND_WINDOW, emotional_journey['turns_tracked'])} turns",
+            f"Volatility {emotional_journey['volatility']['level']}"
+        ]
+        insights.extend(emotional_journey['improvement_indicators'])
+        return insights
+    
+    def _generate_context_recommendations(self, conversation_context: Dict[str, Any],
+                                          pattern_analysis: Dict[str, Any],
+                                          emotional_journey: Dict[str, Any]) -> List[str]:
+        recommendations = []
+        if pattern_analysis['crisis_indicators']:
+            recommendations.append('Check in on safety and surface crisis resources')
+        if emotional_journey['volatility']['level'] == 'high':
+            recommendations.append('Keep responses steady and grounding; mood is changing quickly')
+        if emotional_journey['overall_trend']['direction'] == 'improving':
+            recommendations.append('Reinforce what has been helping')
+        if conversation_context['depth_analysis']['level'] in ('surface', 'developing'):
+            recommendations.append('Invite the user to share more at their own pace')
+        if pattern_analysis['support_seeking_evolution']['current'] == 'resistant':
+            recommendations.append('Respect autonomy; avoid pushing advice')
+        return recommendations
+    
+    def _identify_contextual_risk_factors(self, pattern_analysis: Dict[str, Any]) -> List[str]:
+        return list(pattern_analysis['crisis_indicators'])
+    
+    def _identify_contextual_strengths(self, conversation_context: Dict[str, Any],
+                                       emotional_journey: Dict[str, Any]) -> List[str]:
+        strengths = []
+        if conversation_context['depth_analysis']['level'] in ('moderate', 'deep'):
+            strengths.append('Willing to open up')
+        if 'ready' in conversation_context['themes']['detected_themes'].get('support_seeking', {}):
+            strengths.append('Open to support')
+        if emotional_journey['improvement_indicators']:
+            strengths.append('Signs of improvement during the session')
+        return strengths
+    
+    # Session handoff
+    def export_session(self, session_id: str) -> Dict[str, Any]:
+        """Remove and return the session's memory and emotional series (JSON-safe)"""
+        state = {'memory': self.session_memory.pop(session_id, None)}
+        series = self.emotional_series.pop(session_id, None)
+        if series is not None:
+            state['emotional_series'] = series.to_dict()
+        return state
+    
+    def import_session(self, session_id: str, state: Dict[str, Any]):
+        """Adopt state produced by export_session on another node (never overwrites local state)"""
+        if 'memory' not in state and 'emotional_series' not in state:
+            state = {'memory': state}  # bare session_memory entry from an older node
+        if state.get('memory') is not None:
+            self.session_memory.setdefault(session_id, state['memory'])
+        if state.get('emotional_series'):
+            self.emotional_series.setdefault(session_id, EmotionalSeries.from_dict(state['emotional_series']))
+    
     def calculate_confidence(self, request_data: Dict[str, Any]) -> float:
         """Calculate confidence for context building requests"""
         # ECHO has high confidence for all requests as it provides context for other agents
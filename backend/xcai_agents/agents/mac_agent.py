@@ -6,24 +6,147 @@ Compliance Areas: HIPAA, GDPR, platform ToS, ethical guidelines, content safety
 Crisis Prevention: Blocks unsafe recommendations, adds medical disclaimers
 Audit Trail: Complete compliance history with flag tracking
 """
+import os
 import time
 import re
-import hashlib
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Sequence, Union, Hashable
 from datetime import datetime
 import logging
 
 from ..core.base_agent import SpecializedAgent
+from ..core.audit_log import AuditLog
+from ..core.ids import new_id
+from ..core.phrase_matcher import TokenMatcher
+from ..core.audit_record import (
+    AuditCodebook, AuditRecord, RISK_CODES,
+    FLAG_BLOCK_RESPONSE, FLAG_ESCALATION_NEEDED, FLAG_REQUIRES_ACTION
+)
 
 logger = logging.getLogger(__name__)
 
+# HIPAA Compliance Framework
+HIPAA_COMPLIANCE = {
+    'protected_health_info': {
+        'identifiers': [
+            'social security', 'ssn', 'medical record', 'patient id', 'diagnosis',
+            'prescription', 'medication', 'doctor name', 'hospital', 'clinic',
+            'insurance', 'medicaid', 'medicare', 'health plan'
+        ],
+        'risk_level': 'high',
+        'action': 'redact_and_warn'
+    },
+    'medical_advice': {
+        'indicators': [
+            'you should take', 'i recommend medication', 'stop taking',
+            'increase dosage', 'medical diagnosis', 'prescribe', 'treatment plan'
+        ],
+        'risk_level': 'high',
+        'action': 'add_disclaimer'
+    },
+    'health_guidance': {
+        'indicators': [
+            'health tips', 'wellness advice', 'medical information',
+            'symptoms suggest', 'might have', 'could be'
+        ],
+        'risk_level': 'medium',
+        'action': 'add_disclaimer'
+    }
+}
+
+# GDPR Compliance Framework
+GDPR_COMPLIANCE = {
+    'personal_data': {
+        'identifiers': [
+            'full name', 'email address', 'phone number', 'address',
+            'credit card', 'bank account', 'ip address', 'location data'
+        ],
+        'risk_level': 'high',
+        'action': 'data_protection_notice'
+    },
+    'consent_tracking': {
+        'required_for': ['data_processing', 'communication', 'analytics'],
+        'retention_policy': '2_years',
+        'deletion_rights': True
+    }
+}
+
+# Content Safety Framework
+CONTENT_SAFETY = {
+    'harmful_content': {
+        'violence': ['violence', 'harm', 'attack', 'assault', 'abuse'],
+        'self_harm': ['suicide methods', 'self-harm techniques', 'cutting methods'],
+        'illegal_activities': ['illegal drugs', 'fraud', 'theft', 'hacking'],
+        'harassment': ['bullying', 'stalking', 'doxxing', 'threatening'],
+        'risk_level': 'critical',
+        'action': 'block_and_escalate'
+    },
+    'inappropriate_content': {
+        'adult_content': ['sexual', 'explicit', 'nsfw', 'pornographic'],
+        'substance_abuse': ['drug use guide', 'alcohol abuse', 'substance methods'],
+        'risk_level': 'high',
+        'action': 'moderate_and_warn'
+    },
+    'misinformation': {
+        'medical_misinformation': ['cure cancer', 'miracle treatment', 'doctors hate'],
+        'conspiracy_theories': ['government conspiracy', 'fake pandemic'],
+        'risk_level': 'medium',
+        'action': 'fact_check_disclaimer'
+    }
+}
+
+# Ethical Guidelines Framework
+ETHICAL_GUIDELINES = {
+    'professional_boundaries': {
+        'therapeutic_relationship': [
+            'therapist-client', 'professional boundaries', 'dual relationships'
+        ],
+        'scope_of_practice': [
+            'ai limitations', 'not a replacement', 'professional help'
+        ],
+        'risk_level': 'medium',
+        'action': 'boundary_reminder'
+    },
+    'cultural_sensitivity': {
+        'discriminatory_language': [
+            'racial slurs', 'hate speech', 'discriminatory terms'
+        ],
+        'cultural_appropriation': [
+            'cultural stereotypes', 'inappropriate generalizations'
+        ],
+        'risk_level': 'high',
+        'action': 'cultural_correction'
+    }
+}
+
+# Medical disclaimers
+MEDICAL_DISCLAIMERS = {
+    'general': (
+        "\n\n⚠️ MEDICAL DISCLAIMER: This information is for educational purposes only "
+        "and is not intended as medical advice. Always consult with a qualified "
+        "healthcare professional for medical concerns."
+    ),
+    'crisis': (
+        "\n\n🚨 CRISIS DISCLAIMER: If you're experiencing a medical emergency, "
+        "call 911 immediately. For mental health crises, call 988 or text HOME to 741741."
+    ),
+    'medication': (
+        "\n\n💊 MEDICATION DISCLAIMER: Never start, stop, or change medications "
+        "without consulting your healthcare provider. This is not medical advice."
+    )
+}
+
+# Messages that always get the crisis disclaimer
+CRISIS_INDICATORS = TokenMatcher.of(['crisis', 'emergency', 'suicide', 'harm'])
+
 class MACAgent(SpecializedAgent):
     """
     MAC Agent - Moderation and Compliance Adjudication
     Fibonacci Level: 3 (Compliance Specialist)
     """
     
-    def __init__(self):
+    PATTERN_TABLES = ('hipaa_compliance', 'gdpr_compliance', 'content_safety', 'ethical_guidelines')
+    
+    def __init__(self, audit_log_dir: str = None):
         super().__init__(
             agent_name="MAC",
             specialization="Moderation & Compliance Adjudication",
@@ -43,119 +166,30 @@ class MACAgent(SpecializedAgent):
         ]
         
         # HIPAA Compliance Framework
-        self.hipaa_compliance = {
-            'protected_health_info': {
-                'identifiers': [
-                    'social security', 'ssn', 'medical record', 'patient id', 'diagnosis',
-                    'prescription', 'medication', 'doctor name', 'hospital', 'clinic',
-                    'insurance', 'medicaid', 'medicare', 'health plan'
-                ],
-                'risk_level': 'high',
-                'action': 'redact_and_warn'
-            },
-            'medical_advice': {
-                'indicators': [
-                    'you should take', 'i recommend medication', 'stop taking',
-                    'increase dosage', 'medical diagnosis', 'prescribe', 'treatment plan'
-                ],
-                'risk_level': 'high',
-                'action': 'add_disclaimer'
-            },
-            'health_guidance': {
-                'indicators': [
-                    'health tips', 'wellness advice', 'medical information',
-                    'symptoms suggest', 'might have', 'could be'
-                ],
-                'risk_level': 'medium',
-                'action': 'add_disclaimer'
-            }
-        }
+        self.hipaa_compliance = HIPAA_COMPLIANCE
         
         # GDPR Compliance Framework
-        self.gdpr_compliance = {
-            'personal_data': {
-                'identifiers': [
-                    'full name', 'email address', 'phone number', 'address',
-                    'credit card', 'bank account', 'ip address', 'location data'
-                ],
-                'risk_level': 'high',
-                'action': 'data_protection_notice'
-            },
-            'consent_tracking': {
-                'required_for': ['data_processing', 'communication', 'analytics'],
-                'retention_policy': '2_years',
-                'deletion_rights': True
-            }
-        }
+        self.gdpr_compliance = GDPR_COMPLIANCE
         
         # Content Safety Framework
-        self.content_safety = {
-            'harmful_content': {
-                'violence': ['violence', 'harm', 'attack', 'assault', 'abuse'],
-                'self_harm': ['suicide methods', 'self-harm techniques', 'cutting methods'],
-                'illegal_activities': ['illegal drugs', 'fraud', 'theft', 'hacking'],
-                'harassment': ['bullying', 'stalking', 'doxxing', 'threatening'],
-                'risk_level': 'critical',
-                'action': 'block_and_escalate'
-            },
-            'inappropriate_content': {
-                'adult_content': ['sexual', 'explicit', 'nsfw', 'pornographic'],
-                'substance_abuse': ['drug use guide', 'alcohol abuse', 'substance methods'],
-                'risk_level': 'high',
-                'action': 'moderate_and_warn'
-            },
-            'misinformation': {
-                'medical_misinformation': ['cure cancer', 'miracle treatment', 'doctors hate'],
-                'conspiracy_theories': ['government conspiracy', 'fake pandemic'],
-                'risk_level': 'medium',
-                'action': 'fact_check_disclaimer'
-            }
-        }
+        self.content_safety = CONTENT_SAFETY
         
         # Ethical Guidelines Framework
-        self.ethical_guidelines = {
-            'professional_boundaries': {
-                'therapeutic_relationship': [
-                    'therapist-client', 'professional boundaries', 'dual relationships'
-                ],
-                'scope_of_practice': [
-                    'ai limitations', 'not a replacement', 'professional help'
-                ],
-                'risk_level': 'medium',
-                'action': 'boundary_reminder'
-            },
-            'cultural_sensitivity': {
-                'discriminatory_language': [
-                    'racial slurs', 'hate speech', 'discriminatory terms'
-                ],
-                'cultural_appropriation': [
-                    'cultural stereotypes', 'inappropriate generalizations'
-                ],
-                'risk_level': 'high',
-                'action': 'cultural_correction'
-            }
-        }
-        
-        # Audit trail storage
-        self.audit_trail = []
+        self.ethical_guidelines = ETHICAL_GUIDELINES
+        
+        # Audit trail storage: bounded ring buffer, persisted when MAC_AUDIT_LOG_DIR is set;
+        # persisted segments are kept for the GDPR retention period (MAC_AUDIT_RETENTION_DAYS)
+        self.audit_log = AuditLog(
+            capacity=1000,
+            log_dir=audit_log_dir or os.getenv('MAC_AUDIT_LOG_DIR') or None,
+            retention_seconds=float(os.getenv('MAC_AUDIT_RETENTION_DAYS', 730)) * 86400
+        )
+        self.audit_trail = self.audit_log.entries
+        self.audit_codebook = self._build_audit_codebook()
         self.compliance_flags = {}
         
         # Medical disclaimers
-        self.medical_disclaimers = {
-            'general': (
-                "\n\n⚠️ MEDICAL DISCLAIMER: This information is for educational purposes only "
-                "and is not intended as medical advice. Always consult with a qualified "
-                "healthcare professional for medical concerns."
-            ),
-            'crisis': (
-                "\n\n🚨 CRISIS DISCLAIMER: If you're experiencing a medical emergency, "
-                "call 911 immediately. For mental health crises, call 988 or text HOME to 741741."
-            ),
-            'medication': (
-                "\n\n💊 MEDICATION DISCLAIMER: Never start, stop, or change medications "
-                "without consulting your healthcare provider. This is not medical advice."
-            )
-        }
+        self.medical_disclaimers = MEDICAL_DISCLAIMERS
         
         logger.info("MAC Agent initialized with compliance and safety frameworks")
     
@@ -201,18 +235,98 @@ class MACAgent(SpecializedAgent):
             self._record_request(response_time, False)
             return self._handle_compliance_error(e, request_data)
     
+    def process_batch(self, batch: Sequence[Union[str, Dict[str, Any]]]) -> Dict[str, List[Any]]:
+        """
+        Compliance and safety assessment for many messages (e.g. compliance backfills)
+        Detected elements are returned as audit codebook bits; decode a row with
+        `self.audit_codebook.decode_violations(bits)`. No audit entries are written.
+        """
+        requests = self._batch_requests(batch)
+        codebook = self.audit_codebook
+        columns = {name: [] for name in (
+            'session_id', 'overall_score', 'requires_action', 'hipaa_risk', 'requires_consent_notice',
+            'ethical_intervention', 'safety_risk', 'requires_blocking', 'requires_moderation',
+            'high_risk_areas', 'violations'
+        )}
+        
+        for request, hits in zip(requests, self._batch_scan(requests)):
+            hipaa_risk = 'low'
+            personal_data = data_protection = ethical_intervention = False
+            safety_risk = 'low'
+            violations = 0
+            
+            for (framework, category, subcategory), elements in hits.items():
+                violations |= codebook.element_bits(framework, category, subcategory, elements)
+                if framework == 'hipaa':
+                    level = self.hipaa_compliance[category]['risk_level']
+                    if level == 'high' or (level == 'medium' and hipaa_risk != 'high'):
+                        hipaa_risk = level
+                elif framework == 'gdpr':
+                    personal_data = True
+                    data_protection = data_protection or self.gdpr_compliance[category]['risk_level'] == 'high'
+                elif framework == 'ethical':
+                    ethical_intervention = (ethical_intervention or
+                                            self.ethical_guidelines[category]['risk_level'] == 'high')
+                else:
+                    level = self.content_safety[category]['risk_level']
+                    if RISK_CODES[level] > RISK_CODES[safety_risk]:
+                        safety_risk = level
+            
+            hipaa_compliant = not any(key[0] == 'hipaa' for key in hits)
+            overall_score = (
+                (1.0 if hipaa_compliant else 0.5) * 0.4 +
+                (1.0 if not personal_data else 0.7) * 0.3 +
+                (1.0 if not ethical_intervention else 0.6) * 0.3
+            )
+            high_risk_areas = []
+            if hipaa_risk == 'high':
+                high_risk_areas.append('HIPAA_PHI_EXPOSURE')
+            if data_protection:
+                high_risk_areas.append('GDPR_PERSONAL_DATA')
+            if ethical_intervention:
+                high_risk_areas.append('ETHICAL_GUIDELINES_VIOLATION')
+            
+            columns['session_id'].append(request.get('session_id', ''))
+            columns['overall_score'].append(overall_score)
+            columns['requires_action'].append(overall_score < 0.8)
+            columns['hipaa_risk'].append(hipaa_risk)
+            columns['requires_consent_notice'].append(personal_data)
+            columns['ethical_intervention'].append(ethical_intervention)
+            columns['safety_risk'].append(safety_risk)
+            columns['requires_blocking'].append(safety_risk == 'critical')
+            columns['requires_moderation'].append(safety_risk in ['critical', 'high'])
+            columns['high_risk_areas'].append(high_risk_areas)
+            columns['violations'].append(violations)
+        
+        return columns
+    
+    def _batch_pattern_groups(self):
+        # Same element enumeration as the audit codebook
+        groups = []
+        for category, config in self.hipaa_compliance.items():
+            groups.append((('hipaa', category, None), config.get('identifiers') or config.get('indicators', [])))
+        for data_type, config in self.gdpr_compliance.items():
+            if 'identifiers' in config:
+                groups.append((('gdpr', data_type, None), config['identifiers']))
+        for framework, table in (('ethical', self.ethical_guidelines), ('safety', self.content_safety)):
+            for category, config in table.items():
+                for subcategory, indicators in config.items():
+                    if isinstance(indicators, list):
+                        groups.append(((framework, category, subcategory), indicators))
+        return groups
+    
     def _assess_compliance(self, message: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Comprehensive compliance assessment across all frameworks"""
-        message_lower = message.lower()
+        hits = self._match_patterns(message)
         
         # HIPAA assessment
-        hipaa_assessment = self._assess_hipaa_compliance(message_lower)
+        hipaa_assessment = self._assess_hipaa_compliance(hits)
         
         # GDPR assessment
-        gdpr_assessment = self._assess_gdpr_compliance(message_lower)
+        gdpr_assessment = self._assess_gdpr_compliance(hits)
         
         # Ethical guidelines assessment
-        ethical_assessment = self._assess_ethical_compliance(message_lower)
+        ethical_assessment = self._assess_ethical_compliance(hits)
         
         # Calculate overall compliance score
         compliance_score = self._calculate_compliance_score(
@@ -230,14 +344,14 @@ class MACAgent(SpecializedAgent):
             )
         }
     
-    def _assess_hipaa_compliance(self, message: str) -> Dict[str, Any]:
-        """Assess HIPAA compliance requirements"""
+    def _assess_hipaa_compliance(self, hits: Dict[Hashable, List[str]]) -> Dict[str, Any]:
+        """Assess HIPAA compliance requirements from the message's table matches"""
         violations = {}
         risk_level = 'low'
         
         for category, config in self.hipaa_compliance.items():
-            identifiers = config['identifiers']
-            detected = [identifier for identifier in identifiers if identifier in message]
+            identifiers = config.get('identifiers') or config.get('indicators', [])
+            detected = hits.get(('hipaa', category, None))
             
             if detected:
                 violations[category] = {
@@ -259,14 +373,13 @@ class MACAgent(SpecializedAgent):
             'required_disclaimers': self._determine_required_disclaimers(violations)
         }
     
-    def _assess_gdpr_compliance(self, message: str) -> Dict[str, Any]:
-        """Assess GDPR compliance requirements"""
+    def _assess_gdpr_compliance(self, hits: Dict[Hashable, List[str]]) -> Dict[str, Any]:
+        """Assess GDPR compliance requirements from the message's table matches"""
         personal_data_detected = {}
         
         for data_type, config in self.gdpr_compliance.items():
             if 'identifiers' in config:
-                identifiers = config['identifiers']
-                detected = [identifier for identifier in identifiers if identifier in message]
+                detected = hits.get(('gdpr', data_type, None))
                 
                 if detected:
                     personal_data_detected[data_type] = {
@@ -284,14 +397,14 @@ class MACAgent(SpecializedAgent):
             'retention_compliance': True  # Simplified for demo
         }
     
-    def _assess_ethical_compliance(self, message: str) -> Dict[str, Any]:
-        """Assess ethical guidelines compliance"""
+    def _assess_ethical_compliance(self, hits: Dict[Hashable, List[str]]) -> Dict[str, Any]:
+        """Assess ethical guidelines compliance from the message's table matches"""
         ethical_concerns = {}
         
         for category, config in self.ethical_guidelines.items():
             for subcategory, indicators in config.items():
                 if isinstance(indicators, list):
-                    detected = [indicator for indicator in indicators if indicator in message]
+                    detected = hits.get(('ethical', category, subcategory))
                     
                     if detected:
                         ethical_concerns[f"{category}_{subcategory}"] = {
@@ -312,7 +425,7 @@ class MACAgent(SpecializedAgent):
     
     def _validate_content_safety(self, message: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Validate content safety across all categories"""
-        message_lower = message.lower()
+        hits = self._match_patterns(message)
         safety_violations = {}
         overall_risk = 'low'
         
@@ -321,7 +434,7 @@ class MACAgent(SpecializedAgent):
             
             for subcategory, indicators in config.items():
                 if isinstance(indicators, list):
-                    detected = [indicator for indicator in indicators if indicator in message_lower]
+                    detected = hits.get(('safety', category, subcategory))
                     
                     if detected:
                         category_violations[subcategory] = {
@@ -381,8 +494,7 @@ class MACAgent(SpecializedAgent):
                 recommendations['disclaimers'].append(self.medical_disclaimers['general'])
         
         # Add crisis disclaimer if needed
-        crisis_indicators = ['crisis', 'emergency', 'suicide', 'harm']
-        if any(indicator in context['message'].lower() for indicator in crisis_indicators):
+        if CRISIS_INDICATORS.any(context['message']):
             recommendations['disclaimers'].append(self.medical_disclaimers['crisis'])
         
         # GDPR-based recommendations
@@ -400,34 +512,86 @@ class MACAgent(SpecializedAgent):
         
         return recommendations
     
-    def _create_audit_entry(self, session_id: str, compliance_assessment: Dict[str, Any],
-                           safety_assessment: Dict[str, Any], recommendations: Dict[str, Any]) -> Dict[str, Any]:
-        """Create comprehensive audit trail entry"""
-        entry_id = hashlib.md5(f"{session_id}{datetime.utcnow().isoformat()}".encode()).hexdigest()[:8]
+    def _patterns_applied(self):
+        # Codes are append-only, so bits in existing audit records still decode after a swap
+        self._build_audit_codebook(self.audit_codebook)
+    
+    def _build_audit_codebook(self, codebook: AuditCodebook = None) -> AuditCodebook:
+        """Intern every detectable element of the rule tables as one bit"""
+        codebook = codebook or AuditCodebook(agent_version=self.agent_version)
         
-        return {
-            'entry_id': entry_id,
-            'session_id': session_id,
-            'timestamp': datetime.utcnow().isoformat(),
-            'compliance_assessment': compliance_assessment,
-            'safety_assessment': safety_assessment,
-            'recommendations': recommendations,
-            'agent_version': self.agent_version,
-            'processing_time_ms': 0  # Will be updated
-        }
+        for category, config in self.hipaa_compliance.items():
+            codebook.register_category('hipaa', category, config['risk_level'], config['action'])
+            for element in config.get('identifiers') or config.get('indicators', []):
+                codebook.register_element('hipaa', category, None, element)
+        
+        for data_type, config in self.gdpr_compliance.items():
+            if 'identifiers' in config:
+                codebook.register_category('gdpr', data_type, config['risk_level'], config['action'])
+                for element in config['identifiers']:
+                    codebook.register_element('gdpr', data_type, None, element)
+        
+        for framework, table in (('ethical', self.ethical_guidelines), ('safety', self.content_safety)):
+            for category, config in table.items():
+                codebook.register_category(framework, category, config['risk_level'], config['action'])
+                for subcategory, indicators in config.items():
+                    if isinstance(indicators, list):
+                        for element in indicators:
+                            codebook.register_element(framework, category, subcategory, element)
+        
+        return codebook
     
-    def _log_audit_entry(self, audit_entry: Dict[str, Any]):
+    def _create_audit_entry(self, session_id: str, compliance_assessment: Dict[str, Any],
+                           safety_assessment: Dict[str, Any], recommendations: Dict[str, Any]) -> AuditRecord:
+        """Create compact audit trail entry (decoded lazily via `to_dict`)"""
+        codebook = self.audit_codebook
+        entry_id = new_id()
+        
+        violations = 0
+        for category, details in compliance_assessment['hipaa']['violations'].items():
+            violations |= codebook.element_bits('hipaa', category, None, details['detected_elements'])
+        for data_type, details in compliance_assessment['gdpr']['personal_data_detected'].items():
+            violations |= codebook.element_bits('gdpr', data_type, None, details['detected_elements'])
+        for concern, details in compliance_assessment['ethical']['concerns'].items():
+            category = details['category']
+            subcategory = concern[len(category) + 1:]
+            violations |= codebook.element_bits('ethical', category, subcategory, details['detected_elements'])
+        for category, details in safety_assessment['violations'].items():
+            for subcategory, detail in details['violations'].items():
+                violations |= codebook.element_bits('safety', category, subcategory, detail['detected_elements'])
+        
+        recommendation_bits = 0
+        for kind in ('required_actions', 'disclaimers', 'content_modifications'):
+            recommendation_bits |= codebook.text_bits(kind, recommendations[kind])
+        
+        flags = 0
+        if recommendations['block_response']:
+            flags |= FLAG_BLOCK_RESPONSE
+        if recommendations['escalation_needed']:
+            flags |= FLAG_ESCALATION_NEEDED
+        if compliance_assessment['requires_action']:
+            flags |= FLAG_REQUIRES_ACTION
+        
+        return AuditRecord(
+            codebook,
+            entry_id=entry_id,
+            session_id=session_id,
+            timestamp=time.time(),
+            violations=violations,
+            recommendations=recommendation_bits,
+            overall_score=compliance_assessment['overall_score'],
+            risk=RISK_CODES[safety_assessment['overall_risk']],
+            flags=flags
+        )
+    
+    def _log_audit_entry(self, audit_entry: AuditRecord):
         """Log audit entry for compliance tracking"""
-        self.audit_trail.append(audit_entry)
+        high_risk = audit_entry.high_risk
+        self.audit_log.append(audit_entry, high_risk=high_risk, timestamp=audit_entry.timestamp)
         
         # Log high-risk entries
-        if (audit_entry['safety_assessment']['overall_risk'] in ['critical', 'high'] or
-            audit_entry['compliance_assessment']['overall_score'] < 0.6):
-            logger.warning(f"HIGH-RISK COMPLIANCE EVENT: {audit_entry['entry_id']}")
-        
-        # Keep audit trail manageable (last 1000 entries)
-        if len(self.audit_trail) > 1000:
-            self.audit_trail = self.audit_trail[-1000:]
+        if high_risk or audit_entry.overall_score < 0.6:
+            logger.warning(f"HIGH-RISK COMPLIANCE EVENT: {audit_entry.entry_id}")
     
     def _format_compliance_response(self, recommendations: Dict[str, Any]) -> str:
         """Format compliance recommendations into response"""
@@ -509,22 +673,16 @@ class MACAgent(SpecializedAgent):
         return required
     
     def get_audit_summary(self) -> Dict[str, Any]:
-        """Get audit trail summary for compliance reporting"""
-        if not self.audit_trail:
-            return {'total_entries': 0, 'compliance_rate': 1.0}
-        
-        total_entries = len(self.audit_trail)
-        high_risk_entries = sum(1 for entry in self.audit_trail 
-                               if entry['safety_assessment']['overall_risk'] in ['critical', 'high'])
-        
-        compliance_rate = (total_entries - high_risk_entries) / total_entries
-        
-        return {
-            'total_entries': total_entries,
-            'high_risk_entries': high_risk_entries,
-            'compliance_rate': compliance_rate,
-            'last_audit': self.audit_trail[-1]['timestamp'] if self.audit_trail else None
-        }
+        """Get audit trail summary for compliance reporting (O(1), from running counters)"""
+        summary = self.audit_log.summary()
+        if summary['last_audit'] is not None:
+            summary['last_audit'] = datetime.utcfromtimestamp(summary['last_audit']).isoformat()
+        return summary
+    
+    def search_audit_trail(self, session_id: str = None, start: float = None,
+                           end: float = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Search persisted audit entries by session and/or epoch time range"""
+        return list(self.audit_log.search(session_id=session_id, start=start, end=end, limit=limit))
     
     def calculate_confidence(self, request_data: Dict[str, Any]) -> float:
         """Calculate confidence for compliance-related requests"""
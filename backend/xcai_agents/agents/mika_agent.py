@@ -9,21 +9,143 @@ Response Time: < 1ms for crisis detection
 """
 import time
 import re
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Sequence, Union
 from datetime import datetime
 import logging
 
 from ..core.base_agent import SpecializedAgent
+from ..core.phrase_matcher import TokenMatcher
+from ..core.fuzzy_lexicon import FUZZY_CONFIDENCE
 
 logger = logging.getLogger(__name__)
 
+# Enhanced crisis detection patterns
+CRISIS_PATTERNS = {
+    'critical': {
+        'suicide': [
+            'kill myself', 'suicide', 'end my life', 'want to die', 'take my own life',
+            'not worth living', 'better off dead', 'end it all', 'ready to die'
+        ],
+        'immediate_harm': [
+            'overdose', 'pills to end', 'going to hurt myself', 'cutting deeper',
+            'jump off', 'hanging myself', 'gun to my head'
+        ],
+        'medical_emergency': [
+            'heart attack', 'stroke', 'can\'t breathe', 'bleeding heavily',
+            'unconscious', 'overdosed', 'poisoned'
+        ],
+        'harm_others': [
+            'kill them', 'hurt everyone', 'revenge on others', 'make them pay',
+            'violent thoughts about'
+        ],
+        'confidence': 0.95,
+        'response_time': 0.001,  # 1ms
+        'escalation': 'immediate_emergency'
+    },
+    'high': {
+        'self_harm': [
+            'hurt myself', 'self harm', 'cut myself', 'want to hurt',
+            'harm my body', 'punish myself', 'cutting again'
+        ],
+        'substance_crisis': [
+            'too many pills', 'drinking to forget', 'using to escape',
+            'overdosing', 'substance to cope'
+        ],
+        'severe_ideation': [
+            'thinking about death', 'planning to hurt', 'ways to end',
+            'researching suicide', 'goodbye messages'
+        ],
+        'confidence': 0.85,
+        'response_time': 0.002,  # 2ms
+        'escalation': 'crisis_intervention'
+    },
+    'moderate': {
+        'psychological_distress': [
+            'hopeless', 'worthless', 'give up', 'no point', 'nobody cares',
+            'can\'t go on', 'trapped', 'desperate', 'breaking down'
+        ],
+        'crisis_indicators': [
+            'in crisis', 'emergency help', 'need immediate help',
+            'can\'t handle this', 'falling apart'
+        ],
+        'isolation': [
+            'all alone', 'no one understands', 'abandoned', 'isolated',
+            'disconnected from everyone'
+        ],
+        'confidence': 0.70,
+        'response_time': 0.005,  # 5ms
+        'escalation': 'crisis_support'
+    },
+    'low': {
+        'emotional_distress': [
+            'sad', 'depressed', 'anxious', 'overwhelmed', 'stressed',
+            'struggling', 'difficult time', 'hard to cope'
+        ],
+        'support_seeking': [
+            'need help', 'feeling lost', 'don\'t know what to do',
+            'scared', 'worried', 'confused'
+        ],
+        'confidence': 0.50,
+        'response_time': 0.010,  # 10ms
+        'escalation': 'supportive_response'
+    }
+}
+
+# Emergency resources
+EMERGENCY_RESOURCES = {
+    'critical': {
+        'primary': '911 (Emergency Services)',
+        'crisis': '988 (Suicide & Crisis Lifeline)',
+        'text': 'Text HOME to 741741 (Crisis Text Line)',
+        'message': 'IMMEDIATE EMERGENCY - Contact emergency services now'
+    },
+    'high': {
+        'primary': '988 (Suicide & Crisis Lifeline)',
+        'crisis': 'Text HOME to 741741 (Crisis Text Line)',
+        'backup': '911 if immediate danger',
+        'message': 'CRISIS INTERVENTION NEEDED - Professional help required immediately'
+    },
+    'moderate': {
+        'primary': 'Text HOME to 741741 (Crisis Text Line)',
+        'crisis': '988 (Suicide & Crisis Lifeline)',
+        'support': '1-800-662-HELP (SAMHSA Helpline)',
+        'message': 'CRISIS SUPPORT RECOMMENDED - Multiple resources available'
+    },
+    'low': {
+        'primary': '1-800-662-HELP (SAMHSA Helpline)',
+        'mental_health': 'Contact local mental health services',
+        'support': 'Reach out to trusted friends/family',
+        'message': 'SUPPORTIVE RESOURCES - Consider professional support'
+    }
+}
+
+# Risk factors for enhanced assessment
+RISK_FACTORS = {
+    'demographic': ['young', 'elderly', 'male', 'isolated'],
+    'psychological': ['depression', 'anxiety', 'ptsd', 'bipolar', 'psychosis'],
+    'situational': ['loss', 'divorce', 'job loss', 'financial stress', 'legal problems'],
+    'behavioral': ['substance use', 'previous attempts', 'impulsive', 'aggressive'],
+    'social': ['isolated', 'rejected', 'bullied', 'discriminated']
+}
+
+# Keyword levels the crisis model (if any) also scores
+BORDERLINE_LEVELS = ('moderate', 'low', 'none')
+
+# Crisis-related content that raises MIKA's routing confidence
+CONFIDENCE_INDICATORS = TokenMatcher.of([
+    'crisis', 'emergency', 'help', 'suicide', 'harm', 'hurt', 'hopeless',
+    'desperate', 'overwhelmed', 'can\'t handle', 'give up', 'end it'
+])
+
 class MIKAAgent(SpecializedAgent):
     """
     MIKA Agent - Crisis Intervention and Risk Assessment
     Fibonacci Level: 5 (Crisis Specialist)
     """
     
-    def __init__(self):
+    PATTERN_TABLES = ('crisis_patterns', 'risk_factors')
+    
+    def __init__(self, crisis_model=None):
         super().__init__(
             agent_name="MIKA",
             specialization="Crisis Intervention & Risk Assessment",
@@ -43,113 +165,16 @@ class MIKAAgent(SpecializedAgent):
         ]
         
         # Enhanced crisis detection patterns
-        self.crisis_patterns = {
-            'critical': {
-                'suicide': [
-                    'kill myself', 'suicide', 'end my life', 'want to die', 'take my own life',
-                    'not worth living', 'better off dead', 'end it all', 'ready to die'
-                ],
-                'immediate_harm': [
-                    'overdose', 'pills to end', 'going to hurt myself', 'cutting deeper',
-                    'jump off', 'hanging myself', 'gun to my head'
-                ],
-                'medical_emergency': [
-                    'heart attack', 'stroke', 'can\'t breathe', 'bleeding heavily',
-                    'unconscious', 'overdosed', 'poisoned'
-                ],
-                'harm_others': [
-                    'kill them', 'hurt everyone', 'revenge on others', 'make them pay',
-                    'violent thoughts about'
-                ],
-                'confidence': 0.95,
-                'response_time': 0.001,  # 1ms
-                'escalation': 'immediate_emergency'
-            },
-            'high': {
-                'self_harm': [
-                    'hurt myself', 'self harm', 'cut myself', 'want to hurt',
-                    'harm my body', 'punish myself', 'cutting again'
-                ],
-                'substance_crisis': [
-                    'too many pills', 'drinking to forget', 'using to escape',
-                    'overdosing', 'substance to cope'
-                ],
-                'severe_ideation': [
-                    'thinking about death', 'planning to hurt', 'ways to end',
-                    'researching suicide', 'goodbye messages'
-                ],
-                'confidence': 0.85,
-                'response_time': 0.002,  # 2ms
-                'escalation': 'crisis_intervention'
-            },
-            'moderate': {
-                'psychological_distress': [
-                    'hopeless', 'worthless', 'give up', 'no point', 'nobody cares',
-                    'can\'t go on', 'trapped', 'desperate', 'breaking down'
-                ],
-                'crisis_indicators': [
-                    'in crisis', 'emergency help', 'need immediate help',
-                    'can\'t handle this', 'falling apart'
-                ],
-                'isolation': [
-                    'all alone', 'no one understands', 'abandoned', 'isolated',
-                    'disconnected from everyone'
-                ],
-                'confidence': 0.70,
-                'response_time': 0.005,  # 5ms
-                'escalation': 'crisis_support'
-            },
-            'low': {
-                'emotional_distress': [
-                    'sad', 'depressed', 'anxious', 'overwhelmed', 'stressed',
-                    'struggling', 'difficult time', 'hard to cope'
-                ],
-                'support_seeking': [
-                    'need help', 'feeling lost', 'don\'t know what to do',
-                    'scared', 'worried', 'confused'
-                ],
-                'confidence': 0.50,
-                'response_time': 0.010,  # 10ms
-                'escalation': 'supportive_response'
-            }
-        }
+        self.crisis_patterns = CRISIS_PATTERNS
         
         # Emergency resources
-        self.emergency_resources = {
-            'critical': {
-                'primary': '911 (Emergency Services)',
-                'crisis': '988 (Suicide & Crisis Lifeline)',
-                'text': 'Text HOME to 741741 (Crisis Text Line)',
-                'message': 'IMMEDIATE EMERGENCY - Contact emergency services now'
-            },
-            'high': {
-                'primary': '988 (Suicide & Crisis Lifeline)',
-                'crisis': 'Text HOME to 741741 (Crisis Text Line)',
-                'backup': '911 if immediate danger',
-                'message': 'CRISIS INTERVENTION NEEDED - Professional help required immediately'
-            },
-            'moderate': {
-                'primary': 'Text HOME to 741741 (Crisis Text Line)',
-                'crisis': '988 (Suicide & Crisis Lifeline)',
-                'support': '1-800-662-HELP (SAMHSA Helpline)',
-                'message': 'CRISIS SUPPORT RECOMMENDED - Multiple resources available'
-            },
-            'low': {
-                'primary': '1-800-662-HELP (SAMHSA Helpline)',
-                'mental_health': 'Contact local mental health services',
-                'support': 'Reach out to trusted friends/family',
-                'message': 'SUPPORTIVE RESOURCES - Consider professional support'
-            }
-        }
+        self.emergency_resources = EMERGENCY_RESOURCES
         
         # Risk factors for enhanced assessment
-        self.risk_factors = {
-            'demographic': ['young', 'elderly', 'male', 'isolated'],
-            'psychological': ['depression', 'anxiety', 'ptsd', 'bipolar', 'psychosis'],
-            'situational': ['loss', 'divorce', 'job loss', 'financial stress', 'legal problems'],
-            'behavioral': ['substance use', 'previous attempts', 'impulsive', 'aggressive'],
-            'social': ['isolated', 'rejected', 'bullied', 'discriminated']
-        }
+        self.risk_factors = RISK_FACTORS
+        
+        # Optional second-stage scorer (CrisisModelStore) for borderline assessments
+        self.crisis_model = crisis_model
         
         logger.info("MIKA Agent initialized with crisis intervention protocols")
     
@@ -189,29 +214,89 @@ class MIKAAgent(SpecializedAgent):
             self._record_request(response_time, False)
             return self._handle_crisis_error(e, request_data)
     
-    def _detect_crisis_immediate(self, message: str) -> Dict[str, Any]:
-        """Immediate crisis detection with sub-millisecond response"""
-        message_lower = message.lower()
+    def process_batch(self, batch: Sequence[Union[str, Dict[str, Any]]]) -> Dict[str, List[Any]]:
+        """Crisis level and risk factors for many messages (e.g. re-scoring archived sessions)"""
+        requests = self._batch_requests(batch)
+        columns = {name: [] for name in (
+            'session_id', 'crisis_level', 'category', 'detected_pattern', 'confidence',
+            'escalation_protocol', 'requires_immediate_action', 'risk_factors', 'total_risk_score',
+            'risk_multiplier', 'match_type', 'model_risk'
+        )}
+        model = self.crisis_model.model if self.crisis_model is not None else None
         
-        # Check critical level first (highest priority)
-        for level in ['critical', 'high', 'moderate', 'low']:
-            level_config = self.crisis_patterns[level]
+        for request, hits in zip(requests, self._batch_scan(requests)):
+            level, category, pattern, match_type = 'none', 'normal', None, None
+            # Groups come back in table order, so the first crisis group is the one
+            # the per-message scan would have returned
+            for key, phrases in hits.items():
+                if key[0] == 'crisis':
+                    _, level, category = key
+                    pattern, match_type = phrases[0], 'exact'
+                    break
+            level_config = self.crisis_patterns.get(level, {})
+            confidence = level_config.get('confidence', 0.0)
+            if match_type is None:
+                # The fuzzy pass is per message, but only for the rows with no exact crisis phrase
+                message = request.get('message') or ''
+                corrected = self._fuzzy_lexicon('crisis').correct(message)
+                fuzzy = corrected and self._first_crisis(self._match_patterns(corrected[0]), message, corrected[1])
+                if fuzzy:
+                    level, category, pattern, match_type = fuzzy['level'], fuzzy['category'], fuzzy['detected_pattern'], 'fuzzy'
+                    level_config, confidence = self.crisis_patterns[level], fuzzy['confidence']
             
-            for category, patterns in level_config.items():
-                if isinstance(patterns, list):  # Skip metadata
-                    for pattern in patterns:
-                        if pattern in message_lower:
-                            return {
-                                'level': level,
-                                'category': category,
-                                'detected_pattern': pattern,
-                                'confidence': level_config['confidence'],
-                                'response_time_target': level_config['response_time'],
-                                'escalation_protocol': level_config['escalation'],
-                                'requires_immediate_action': level in ['critical', 'high'],
-                                'pattern_match_position': message_lower.find(pattern)
-                            }
+            detected_factors = {key[1]: phrases for key, phrases in hits.items() if key[0] == 'risk'}
+            total_risk_score = sum(len(phrases) for phrases in detected_factors.values())
+            if len(request.get('conversation_history', [])) > 5:
+                total_risk_score += 0.5
+            
+            columns['session_id'].append(request.get('session_id', ''))
+            columns['crisis_level'].append(level)
+            columns['category'].append(category)
+            columns['detected_pattern'].append(pattern)
+            columns['confidence'].append(confidence)
+            columns['escalation_protocol'].append(level_config.get('escalation', 'standard_response'))
+            columns['requires_immediate_action'].append(level in ['critical', 'high'])
+            columns['risk_factors'].append(detected_factors)
+            columns['total_risk_score'].append(total_risk_score)
+            columns['risk_multiplier'].append(min(2.0, 1.0 + (total_risk_score * 0.1)))
+            columns['match_type'].append(match_type)
+            columns['model_risk'].append(None)
+        
+        if model is not None:
+            borderline = [i for i, level in enumerate(columns['crisis_level']) if level in BORDERLINE_LEVELS]
+            scores = model.score_batch(requests[i].get('message') or '' for i in borderline)
+            for i, risk in zip(borderline, scores):
+                columns['model_risk'][i] = risk
+                if risk >= model.threshold:
+                    columns['requires_immediate_action'][i] = True
         
+        return columns
+    
+    def _batch_pattern_groups(self):
+        groups = []
+        for level in ['critical', 'high', 'moderate', 'low']:
+            for category, patterns in self.crisis_patterns[level].items():
+                if isinstance(patterns, list):  # Skip metadata
+                    groups.append((('crisis', level, category), patterns))
+        for category, factors in self.risk_factors.items():
+            groups.append((('risk', category), factors))
+        return groups
+    
+    def _detect_crisis_immediate(self, message: str) -> Dict[str, Any]:
+        """Immediate crisis detection with sub-millisecond response"""
+        assessment = self._first_crisis(self._match_patterns(message), message)
+        if assessment is None:
+            # Nothing exact: retry with misspellings and shorthand corrected ("kil myself", "wanna die")
+            corrected = self._fuzzy_lexicon('crisis').correct(message)
+            if corrected is not None:
+                assessment = self._first_crisis(self._match_patterns(corrected[0]), message, corrected[1])
+        if assessment is None:
+            assessment = self._no_crisis()
+        if assessment['level'] in BORDERLINE_LEVELS:
+            self._add_model_risk(assessment, message)
+        return assessment
+    
+    def _no_crisis(self) -> Dict[str, Any]:
         return {
             'level': 'none',
             'category': 'normal',
@@ -220,24 +305,64 @@ class MIKAAgent(SpecializedAgent):
             'response_time_target': 0.050,
             'escalation_protocol': 'standard_response',
             'requires_immediate_action': False,
-            'pattern_match_position': -1
+            'pattern_match_position': -1,
+            'match_type': None
         }
     
+    def _add_model_risk(self, assessment: Dict[str, Any], message: str):
+        # The keyword level stands; a model score over threshold flags the message for immediate action
+        model = self.crisis_model.model if self.crisis_model is not None else None
+        if model is None:
+            return
+        risk = model.score(message)
+        assessment['model_risk'] = risk
+        assessment['model_version'] = model.version
+        if risk >= model.threshold:
+            assessment['requires_immediate_action'] = True
+    
+    def _first_crisis(self, hits: Dict[Any, List[str]], message: str,
+                      corrections: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        # Check critical level first (highest priority)
+        for level in ['critical', 'high', 'moderate', 'low']:
+            level_config = self.crisis_patterns[level]
+            
+            for category, patterns in level_config.items():
+                if isinstance(patterns, list):  # Skip metadata
+                    detected = hits.get(('crisis', level, category))
+                    if detected:
+                        pattern = detected[0]
+                        assessment = {
+                            'level': level,
+                            'category': category,
+                            'detected_pattern': pattern,
+                            'confidence': level_config['confidence'],
+                            'response_time_target': level_config['response_time'],
+                            'escalation_protocol': level_config['escalation'],
+                            'requires_immediate_action': level in ['critical', 'high'],
+                            'pattern_match_position': message.lower().find(pattern),
+                            'match_type': 'exact'
+                        }
+                        if corrections is not None:
+                            # Same level and escalation: a misspelled crisis is still a crisis
+                            assessment.update({
+                                'confidence': level_config['confidence'] * FUZZY_CONFIDENCE,
+                                'match_type': 'fuzzy',
+                                'corrections': corrections
+                            })
+                        return assessment
+        return None
+    
     def _assess_risk_factors(self, message: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Assess additional risk factors for comprehensive evaluation"""
-        message_lower = message.lower()
+        hits = self._match_patterns(message)
         detected_factors = {}
         total_risk_score = 0
         
-        for category, factors in self.risk_factors.items():
-            detected_in_category = []
-            for factor in factors:
-                if factor in message_lower:
-                    detected_in_category.append(factor)
-                    total_risk_score += 1
-            
+        for category in self.risk_factors:
+            detected_in_category = hits.get(('risk', category))
             if detected_in_category:
                 detected_factors[category] = detected_in_category
+                total_risk_score += len(detected_in_category)
         
         # Additional context-based risk assessment
         history_length = len(context.get('conversation_history', []))
@@ -261,6 +386,10 @@ class MIKAAgent(SpecializedAgent):
         """Generate appropriate crisis intervention response"""
         level = crisis_assessment['level']
         
+        # Keyword level below high, but the crisis model's risk is over its threshold
+        if level in BORDERLINE_LEVELS and crisis_assessment['requires_immediate_action']:
+            return self._generate_high_response(crisis_assessment, risk_profile)
+        
         if level == 'critical':
             return self._generate_critical_response(crisis_assessment, risk_profile)
         elif level == 'high':
@@ -409,15 +538,8 @@ class MIKAAgent(SpecializedAgent):
     
     def calculate_confidence(self, request_data: Dict[str, Any]) -> float:
         """Calculate confidence for crisis-related requests"""
-        message = request_data.get('message', '').lower()
-        
         # High confidence for crisis-related content
-        crisis_indicators = [
-            'crisis', 'emergency', 'help', 'suicide', 'harm', 'hurt', 'hopeless',
-            'desperate', 'overwhelmed', 'can\'t handle', 'give up', 'end it'
-        ]
-        
-        matches = sum(1 for indicator in crisis_indicators if indicator in message)
+        matches = CONFIDENCE_INDICATORS.count(request_data.get('message', ''))
         
         # Base confidence for MIKA (crisis specialist)
         base_confidence = 0.6
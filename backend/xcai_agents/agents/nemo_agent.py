@@ -8,7 +8,7 @@ Output: Cultural insights and priority considerations
 """
 import time
 import re
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Sequence, Union
 from datetime import datetime
 import logging
 
@@ -16,12 +16,181 @@ from ..core.base_agent import SpecializedAgent
 
 logger = logging.getLogger(__name__)
 
+# 9 Cultural Dimensions Framework
+CULTURAL_DIMENSIONS = {
+    'language': {
+        'indicators': [
+            'english second language', 'esl', 'non-native speaker', 'language barrier',
+            'translation', 'interpreter', 'accent', 'bilingual', 'multilingual',
+            'spanish', 'chinese', 'arabic', 'hindi', 'french', 'german', 'portuguese'
+        ],
+        'considerations': [
+            'Language accessibility and clarity',
+            'Cultural communication styles',
+            'Potential translation needs',
+            'Non-verbal communication differences'
+        ],
+        'weight': 0.15
+    },
+    'ethnicity': {
+        'indicators': [
+            'african american', 'black', 'latino', 'hispanic', 'asian', 'native american',
+            'indigenous', 'white', 'caucasian', 'multiracial', 'ethnic background',
+            'cultural heritage', 'ancestry', 'tribal', 'immigrant'
+        ],
+        'considerations': [
+            'Historical trauma awareness',
+            'Cultural values and practices',
+            'Systemic discrimination experiences',
+            'Community support systems'
+        ],
+        'weight': 0.15
+    },
+    'religion': {
+        'indicators': [
+            'christian', 'muslim', 'jewish', 'hindu', 'buddhist', 'atheist', 'agnostic',
+            'spiritual', 'faith', 'religious', 'church', 'mosque', 'synagogue', 'temple',
+            'prayer', 'beliefs', 'secular', 'non-religious'
+        ],
+        'considerations': [
+            'Religious coping mechanisms',
+            'Faith-based support systems',
+            'Religious conflicts or questions',
+            'Spiritual practices and beliefs'
+        ],
+        'weight': 0.12
+    },
+    'gender': {
+        'indicators': [
+            'woman', 'man', 'female', 'male', 'transgender', 'trans', 'non-binary',
+            'genderfluid', 'genderqueer', 'cisgender', 'gender identity', 'pronouns',
+            'she/her', 'he/him', 'they/them', 'gender expression'
+        ],
+        'considerations': [
+            'Gender-specific stressors',
+            'Identity affirmation needs',
+            'Discrimination experiences',
+            'Appropriate pronoun usage'
+        ],
+        'weight': 0.13
+    },
+    'sexuality': {
+        'indicators': [
+            'gay', 'lesbian', 'bisexual', 'straight', 'heterosexual', 'queer', 'lgbtq',
+            'pansexual', 'asexual', 'sexual orientation', 'coming out', 'pride',
+            'same-sex', 'partner', 'relationship'
+        ],
+        'considerations': [
+            'Identity acceptance and disclosure',
+            'Family and social acceptance',
+            'Discrimination and safety concerns',
+            'Community support resources'
+        ],
+        'weight': 0.12
+    },
+    'age': {
+        'indicators': [
+            'teenager', 'teen', 'adolescent', 'young adult', 'college', 'elderly',
+            'senior', 'aging', 'retirement', 'middle-aged', 'child', 'minor',
+            'generation gap', 'ageism'
+        ],
+        'considerations': [
+            'Developmental stage needs',
+            'Generational perspectives',
+            'Age-appropriate resources',
+            'Life transition challenges'
+        ],
+        'weight': 0.10
+    },
+    'disability': {
+        'indicators': [
+            'disability', 'disabled', 'autism', 'adhd', 'depression', 'anxiety',
+            'mental illness', 'chronic illness', 'physical disability', 'wheelchair',
+            'blind', 'deaf', 'accessibility', 'accommodation', 'neurodivergent'
+        ],
+        'considerations': [
+            'Accessibility needs',
+            'Stigma and discrimination',
+            'Accommodation requirements',
+            'Strengths-based perspective'
+        ],
+        'weight': 0.13
+    },
+    'socioeconomic': {
+        'indicators': [
+            'poor', 'poverty', 'homeless', 'unemployed', 'financial stress',
+            'working class', 'middle class', 'wealthy', 'education level',
+            'college educated', 'high school', 'job loss', 'economic hardship'
+        ],
+        'considerations': [
+            'Resource accessibility',
+            'Economic stressors',
+            'Class-based experiences',
+            'Educational background'
+        ],
+        'weight': 0.12
+    },
+    'geography': {
+        'indicators': [
+            'rural', 'urban', 'suburban', 'city', 'small town', 'isolated',
+            'remote', 'metropolitan', 'regional', 'international', 'immigrant',
+            'refugee', 'displaced', 'location', 'community'
+        ],
+        'considerations': [
+            'Regional cultural norms',
+            'Resource availability',
+            'Community support systems',
+            'Geographic isolation factors'
+        ],
+        'weight': 0.08
+    }
+}
+
+# Bias detection patterns
+BIAS_PATTERNS = {
+    'assumptions': [
+        'all people like you', 'your people', 'typical for', 'usually',
+        'most people in your culture', 'traditional for'
+    ],
+    'stereotypes': [
+        'strong and independent', 'naturally good at', 'tend to be',
+        'expected to', 'supposed to', 'your kind'
+    ],
+    'microaggressions': [
+        'articulate for', 'exotic', 'where are you really from',
+        'you don\'t look like', 'so intelligent for'
+    ]
+}
+
+# Inclusive language suggestions
+INCLUSIVE_LANGUAGE = {
+    'gender_neutral': {
+        'person': 'person',
+        'individual': 'individual',
+        'they/them': 'they/them when unsure',
+        'partner': 'partner instead of boyfriend/girlfriend',
+        'folks': 'folks instead of guys'
+    },
+    'ability_first': {
+        'person with': 'person with [condition] rather than [condition] person',
+        'experiences': 'experiences [condition] rather than suffers from',
+        'has': 'has [condition] rather than is [condition]'
+    },
+    'cultural_respect': {
+        'background': 'cultural background rather than exotic',
+        'heritage': 'heritage rather than bloodline',
+        'community': 'community rather than tribe (unless appropriate)'
+    }
+}
+
 class NEMOAgent(SpecializedAgent):
     """
     NEMO Agent - Cultural Intelligence and Equity Analysis
     Fibonacci Level: 2 (Cultural Specialist)
     """
     
+    PATTERN_TABLES = ('cultural_dimensions', 'bias_patterns', 'inclusive_language')
+    
     def __init__(self):
         super().__init__(
             agent_name="NEMO",
@@ -42,171 +211,13 @@ class NEMOAgent(SpecializedAgent):
         ]
         
         # 9 Cultural Dimensions Framework
-        self.cultural_dimensions = {
-            'language': {
-                'indicators': [
-                    'english second language', 'esl', 'non-native speaker', 'language barrier',
-                    'translation', 'interpreter', 'accent', 'bilingual', 'multilingual',
-                    'spanish', 'chinese', 'arabic', 'hindi', 'french', 'german', 'portuguese'
-                ],
-                'considerations': [
-                    'Language accessibility and clarity',
-                    'Cultural communication styles',
-                    'Potential translation needs',
-                    'Non-verbal communication differences'
-                ],
-                'weight': 0.15
-            },
-            'ethnicity': {
-                'indicators': [
-                    'african american', 'black', 'latino', 'hispanic', 'asian', 'native american',
-                    'indigenous', 'white', 'caucasian', 'multiracial', 'ethnic background',
-                    'cultural heritage', 'ancestry', 'tribal', 'immigrant'
-                ],
-                'considerations': [
-                    'Historical trauma awareness',
-                    'Cultural values and practices',
-                    'Systemic discrimination experiences',
-                    'Community support systems'
-                ],
-                'weight': 0.15
-            },
-            'religion': {
-                'indicators': [
-                    'christian', 'muslim', 'jewish', 'hindu', 'buddhist', 'atheist', 'agnostic',
-                    'spiritual', 'faith', 'religious', 'church', 'mosque', 'synagogue', 'temple',
-                    'prayer', 'beliefs', 'secular', 'non-religious'
-                ],
-                'considerations': [
-                    'Religious coping mechanisms',
-                    'Faith-based support systems',
-                    'Religious conflicts or questions',
-                    'Spiritual practices and beliefs'
-                ],
-                'weight': 0.12
-            },
-            'gender': {
-                'indicators': [
-                    'woman', 'man', 'female', 'male', 'transgender', 'trans', 'non-binary',
-                    'genderfluid', 'genderqueer', 'cisgender', 'gender identity', 'pronouns',
-                    'she/her', 'he/him', 'they/them', 'gender expression'
-                ],
-                'considerations': [
-                    'Gender-specific stressors',
-                    'Identity affirmation needs',
-                    'Discrimination experiences',
-                    'Appropriate pronoun usage'
-                ],
-                'weight': 0.13
-            },
-            'sexuality': {
-                'indicators': [
-                    'gay', 'lesbian', 'bisexual', 'straight', 'heterosexual', 'queer', 'lgbtq',
-                    'pansexual', 'asexual', 'sexual orientation', 'coming out', 'pride',
-                    'same-sex', 'partner', 'relationship'
-                ],
-                'considerations': [
-                    'Identity acceptance and disclosure',
-                    'Family and social acceptance',
-                    'Discrimination and safety concerns',
-                    'Community support resources'
-                ],
-                'weight': 0.12
-            },
-            'age': {
-                'indicators': [
-                    'teenager', 'teen', 'adolescent', 'young adult', 'college', 'elderly',
-                    'senior', 'aging', 'retirement', 'middle-aged', 'child', 'minor',
-                    'generation gap', 'ageism'
-                ],
-                'considerations': [
-                    'Developmental stage needs',
-                    'Generational perspectives',
-                    'Age-appropriate resources',
-                    'Life transition challenges'
-                ],
-                'weight': 0.10
-            },
-            'disability': {
-                'indicators': [
-                    'disability', 'disabled', 'autism', 'adhd', 'depression', 'anxiety',
-                    'mental illness', 'chronic illness', 'physical disability', 'wheelchair',
-                    'blind', 'deaf', 'accessibility', 'accommodation', 'neurodivergent'
-                ],
-                'considerations': [
-                    'Accessibility needs',
-                    'Stigma and discrimination',
-                    'Accommodation requirements',
-                    'Strengths-based perspective'
-                ],
-                'weight': 0.13
-            },
-            'socioeconomic': {
-                'indicators': [
-                    'poor', 'poverty', 'homeless', 'unemployed', 'financial stress',
-                    'working class', 'middle class', 'wealthy', 'education level',
-                    'college educated', 'high school', 'job loss', 'economic hardship'
-                ],
-                'considerations': [
-                    'Resource accessibility',
-                    'Economic stressors',
-                    'Class-based experiences',
-                    'Educational background'
-                ],
-                'weight': 0.12
-            },
-            'geography': {
-                'indicators': [
-                    'rural', 'urban', 'suburban', 'city', 'small town', 'isolated',
-                    'remote', 'metropolitan', 'regional', 'international', 'immigrant',
-                    'refugee', 'displaced', 'location', 'community'
-                ],
-                'considerations': [
-                    'Regional cultural norms',
-                    'Resource availability',
-                    'Community support systems',
-                    'Geographic isolation factors'
-                ],
-                'weight': 0.08
-            }
-        }
+        self.cultural_dimensions = CULTURAL_DIMENSIONS
         
         # Bias detection patterns
-        self.bias_patterns = {
-            'assumptions': [
-                'all people like you', 'your people', 'typical for', 'usually',
-                'most people in your culture', 'traditional for'
-            ],
-            'stereotypes': [
-                'strong and independent', 'naturally good at', 'tend to be',
-                'expected to', 'supposed to', 'your kind'
-            ],
-            'microaggressions': [
-                'articulate for', 'exotic', 'where are you really from',
-                'you don\'t look like', 'so intelligent for'
-            ]
-        }
+        self.bias_patterns = BIAS_PATTERNS
         
         # Inclusive language suggestions
-        self.inclusive_language = {
-            'gender_neutral': {
-                'person': 'person',
-                'individual': 'individual',
-                'they/them': 'they/them when unsure',
-                'partner': 'partner instead of boyfriend/girlfriend',
-                'folks': 'folks instead of guys'
-            },
-            'ability_first': {
-                'person with': 'person with [condition] rather than [condition] person',
-                'experiences': 'experiences [condition] rather than suffers from',
-                'has': 'has [condition] rather than is [condition]'
-            },
-            'cultural_respect': {
-                'background': 'cultural background rather than exotic',
-                'heritage': 'heritage rather than bloodline',
-                'community': 'community rather than tribe (unless appropriate)'
-            }
-        }
+        self.inclusive_language = INCLUSIVE_LANGUAGE
         
         logger.info("NEMO Agent initialized with 9-dimension cultural intelligence")
     
@@ -248,9 +259,60 @@ class NEMOAgent(SpecializedAgent):
             self._record_request(response_time, False)
             return self._handle_error(e, request_data)
     
+    def process_batch(self, batch: Sequence[Union[str, Dict[str, Any]]]) -> Dict[str, List[Any]]:
+        """Cultural dimensions, equity priority and bias signals for many messages (analytics)"""
+        requests = self._batch_requests(batch)
+        columns = {name: [] for name in (
+            'session_id', 'cultural_score', 'primary_dimensions', 'requires_adaptation',
+            'equity_priority', 'bias_types', 'bias_severity', 'bias_intervention'
+        )}
+        
+        for request, hits in zip(requests, self._batch_scan(requests)):
+            importance = {}
+            bias_severity = 0.0
+            bias_types = []
+            for (kind, name), detected in hits.items():
+                if kind == 'dimension':
+                    config = self.cultural_dimensions[name]
+                    confidence = min(1.0, len(detected) / len(config['indicators']) * 3)
+                    importance[name] = confidence * config['weight']
+                else:
+                    bias_types.append(name)
+                    bias_severity += len(detected) / len(self.bias_patterns[name])
+            
+            total_score = sum(importance.values())
+            equity_score = sum(value for value in importance.values() if value > 0.4)
+            if equity_score > 0.8:
+                equity_priority = 'high'
+            elif equity_score > 0.4:
+                equity_priority = 'medium'
+            elif equity_score > 0.1:
+                equity_priority = 'low'
+            else:
+                equity_priority = 'standard'
+            
+            columns['session_id'].append(request.get('session_id', ''))
+            columns['cultural_score'].append(total_score)
+            columns['primary_dimensions'].append(
+                sorted(importance, key=importance.get, reverse=True)[:3]
+            )
+            columns['requires_adaptation'].append(total_score > 0.3)
+            columns['equity_priority'].append(equity_priority)
+            columns['bias_types'].append(bias_types)
+            columns['bias_severity'].append(bias_severity)
+            columns['bias_intervention'].append(bias_severity > 0.3)
+        
+        return columns
+    
+    def _batch_pattern_groups(self):
+        groups = [(('dimension', dimension), config['indicators'])
+                  for dimension, config in self.cultural_dimensions.items()]
+        groups.extend((('bias', bias_type), patterns) for bias_type, patterns in self.bias_patterns.items())
+        return groups
+    
     def _analyze_cultural_dimensions(self, message: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze message across 9 cultural dimensions"""
-        message_lower = message.lower()
+        hits = self._match_patterns(message)
         cultural_profile = {}
         total_cultural_score = 0
         
@@ -260,7 +322,7 @@ class NEMOAgent(SpecializedAgent):
             weight = config['weight']
             
             # Check for indicators in message
-            detected_indicators = [indicator for indicator in indicators if indicator in message_lower]
+            detected_indicators = hits.get(('dimension', dimension))
             
             if detected_indicators:
                 confidence = min(1.0, len(detected_indicators) / len(indicators) * 3)  # Boost confidence
@@ -344,11 +406,11 @@ class NEMOAgent(SpecializedAgent):
     
     def _detect_bias_patterns(self, message: str) -> Dict[str, Any]:
         """Detect potential bias patterns in the conversation"""
-        message_lower = message.lower()
+        hits = self._match_patterns(message)
         detected_biases = {}
         
         for bias_type, patterns in self.bias_patterns.items():
-            detected_patterns = [pattern for pattern in patterns if pattern in message_lower]
+            detected_patterns = hits.get(('bias', bias_type))
             if detected_patterns:
                 detected_biases[bias_type] = {
                     'patterns': detected_patterns,
@@ -516,14 +578,10 @@ class NEMOAgent(SpecializedAgent):
     
     def calculate_confidence(self, request_data: Dict[str, Any]) -> float:
         """Calculate confidence for cultural analysis requests"""
-        message = request_data.get('message', '').lower()
+        hits = self._match_patterns(request_data.get('message', ''))
         
         # Look for cultural indicators across all dimensions
-        cultural_indicators = []
-        for dimension_config in self.cultural_dimensions.values():
-            cultural_indicators.extend(dimension_config['indicators'])
-        
-        matches = sum(1 for indicator in cultural_indicators if indicator in message)
+        matches = sum(len(detected) for (kind, _), detected in hits.items() if kind == 'dimension')
         
         # Base confidence for NEMO (cultural specialist)
         base_confidence = 0.3  # Lower base since not all requests need cultural analysis
@@ -8,20 +8,68 @@ Response Time: < 50ms standard, < 5ms crisis mode
 """
 import time
 import re
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Sequence, Union
 from datetime import datetime
 import logging
 
 from ..core.base_agent import SpecializedAgent
+from ..core.scheduler import llm_gate
+from ..core.phrase_matcher import TokenMatcher
+from ..core.fuzzy_lexicon import FUZZY_CONFIDENCE
 
 logger = logging.getLogger(__name__)
 
+# Emotional analysis patterns
+EMOTION_PATTERNS = {
+    'anxiety': ['anxious', 'worried', 'nervous', 'stressed', 'panic', 'overwhelmed'],
+    'depression': ['depressed', 'sad', 'hopeless', 'empty', 'worthless', 'numb'],
+    'anger': ['angry', 'furious', 'rage', 'frustrated', 'mad', 'irritated'],
+    'fear': ['scared', 'afraid', 'terrified', 'frightened', 'fearful'],
+    'joy': ['happy', 'joyful', 'excited', 'elated', 'thrilled', 'glad'],
+    'love': ['love', 'caring', 'affection', 'warmth', 'connection'],
+    'shame': ['ashamed', 'guilty', 'embarrassed', 'humiliated'],
+    'grief': ['grieving', 'mourning', 'loss', 'bereaved', 'heartbroken']
+}
+
+# Words that raise emotional intensity
+INTENSITY_INDICATORS = ['very', 'extremely', 'really', 'so', 'quite', 'totally']
+
+# Confidence signals for routing
+EMOTIONAL_INDICATORS = TokenMatcher.of(['feel', 'emotion', 'sad', 'happy', 'angry', 'scared', 'worried'])
+CRISIS_INDICATORS = TokenMatcher.of(['help', 'crisis', 'desperate', 'hopeless', 'suicide', 'harm'])
+
+# Crisis detection patterns (enhanced from MIKA integration)
+CRISIS_PATTERNS = {
+    'critical': {
+        'patterns': ['kill myself', 'suicide', 'end my life', 'want to die', 'overdose'],
+        'confidence': 0.95,
+        'priority': 1
+    },
+    'high': {
+        'patterns': ['hurt myself', 'self harm', 'cut myself', 'want to hurt', 'harm to others'],
+        'confidence': 0.85,
+        'priority': 2
+    },
+    'moderate': {
+        'patterns': ['hopeless', 'worthless', 'give up', 'no point', 'nobody cares'],
+        'confidence': 0.70,
+        'priority': 3
+    },
+    'low': {
+        'patterns': ['sad', 'depressed', 'anxious', 'overwhelmed', 'stressed'],
+        'confidence': 0.50,
+        'priority': 4
+    }
+}
+
 class NEOAgent(SpecializedAgent):
     """
     NEO Agent - Primary emotional intelligence and response generation
     Fibonacci Level: 1 (Primary Agent)
     """
     
+    PATTERN_TABLES = ('emotion_patterns', 'crisis_patterns')
+    
     def __init__(self, openai_client=None):
         super().__init__(
             agent_name="NEO",
@@ -42,42 +90,13 @@ class NEOAgent(SpecializedAgent):
         
         # OpenAI integration
         self.openai_client = openai_client
+        self.llm_slot_timeout = 5.0  # seconds to wait for a free LLM slot before falling back
         
         # Emotional analysis patterns
-        self.emotion_patterns = {
-            'anxiety': ['anxious', 'worried', 'nervous', 'stressed', 'panic', 'overwhelmed'],
-            'depression': ['depressed', 'sad', 'hopeless', 'empty', 'worthless', 'numb'],
-            'anger': ['angry', 'furious', 'rage', 'frustrated', 'mad', 'irritated'],
-            'fear': ['scared', 'afraid', 'terrified', 'frightened', 'fearful'],
-            'joy': ['happy', 'joyful', 'excited', 'elated', 'thrilled', 'glad'],
-            'love': ['love', 'caring', 'affection', 'warmth', 'connection'],
-            'shame': ['ashamed', 'guilty', 'embarrassed', 'humiliated'],
-            'grief': ['grieving', 'mourning', 'loss', 'bereaved', 'heartbroken']
-        }
+        self.emotion_patterns = EMOTION_PATTERNS
         
         # Crisis detection patterns (enhanced from MIKA integration)
-        self.crisis_patterns = {
-            'critical': {
-                'patterns': ['kill myself', 'suicide', 'end my life', 'want to die', 'overdose'],
-                'confidence': 0.95,
-                'priority': 1
-            },
-            'high': {
-                'patterns': ['hurt myself', 'self harm', 'cut myself', 'want to hurt', 'harm to others'],
-                'confidence': 0.85,
-                'priority': 2
-            },
-            'moderate': {
-                'patterns': ['hopeless', 'worthless', 'give up', 'no point', 'nobody cares'],
-                'confidence': 0.70,
-                'priority': 3
-            },
-            'low': {
-                'patterns': ['sad', 'depressed', 'anxious', 'overwhelmed', 'stressed'],
-                'confidence': 0.50,
-                'priority': 4
-            }
-        }
+        self.crisis_patterns = CRISIS_PATTERNS
         
         logger.info("NEO Agent initialized with emotional intelligence and crisis detection")
     
@@ -122,16 +141,85 @@ class NEOAgent(SpecializedAgent):
             self._record_request(response_time, False)
             return self._handle_error(e, request_data)
     
+    def process_fallback(self, request_data: Dict[str, Any]) -> str:
+        """
+        Degraded processing: full emotional and crisis analysis, template responses only
+        Never calls OpenAI, used when the LLM tier is unavailable or shed
+        """
+        if not self._validate_input(request_data):
+            return "I'd like to help you. Could you please share what's on your mind?"
+        
+        context = self._extract_context(request_data)
+        message = context['message']
+        
+        emotional_state = self._analyze_emotions(message)
+        crisis_assessment = self._detect_crisis(message)
+        enhanced_context = self._build_context(context, emotional_state, crisis_assessment)
+        
+        if crisis_assessment['level'] in ['critical', 'high']:
+            return self._generate_crisis_response(enhanced_context)
+        return self._generate_fallback_response(enhanced_context)
+    
+    def process_batch(self, batch: Sequence[Union[str, Dict[str, Any]]]) -> Dict[str, List[Any]]:
+        """Emotional analysis and crisis level for many messages; never calls OpenAI"""
+        requests = self._batch_requests(batch)
+        columns = {name: [] for name in (
+            'session_id', 'primary_emotion', 'intensity', 'emotions', 'crisis_level',
+            'crisis_confidence', 'detected_pattern', 'requires_immediate_response', 'crisis_match_type'
+        )}
+        
+        for request, hits in zip(requests, self._batch_scan(requests)):
+            primary_emotion, intensity = 'neutral', 0.0
+            emotions = []
+            intensity_boost = 0.0
+            crisis_level, crisis_pattern = 'none', None
+            for (kind, name), detected in hits.items():
+                if kind == 'emotion':
+                    emotions.append(name)
+                    confidence = len(detected) / len(self.emotion_patterns[name])
+                    if confidence > intensity:
+                        intensity, primary_emotion = confidence, name
+                elif kind == 'intensity':
+                    intensity_boost = len(detected) * 0.1
+                elif crisis_pattern is None:
+                    crisis_level, crisis_pattern = name, detected[0]
+            crisis = {'level': crisis_level, 'detected_pattern': crisis_pattern,
+                      'match_type': 'exact' if crisis_pattern else None,
+                      'confidence': self.crisis_patterns.get(crisis_level, {}).get('confidence', 0.0)}
+            if crisis_pattern is None:
+                # The fuzzy pass is per message, but only for the rows with no exact crisis phrase
+                corrected = self._fuzzy_lexicon('crisis').correct(request.get('message') or '')
+                if corrected is not None:
+                    crisis = self._first_crisis(self._match_patterns(corrected[0]), corrected[1]) or crisis
+            
+            columns['session_id'].append(request.get('session_id', ''))
+            columns['primary_emotion'].append(primary_emotion)
+            columns['intensity'].append(min(1.0, intensity + intensity_boost))
+            columns['emotions'].append(emotions)
+            columns['crisis_level'].append(crisis['level'])
+            columns['crisis_confidence'].append(crisis['confidence'])
+            columns['detected_pattern'].append(crisis['detected_pattern'])
+            columns['requires_immediate_response'].append(crisis['level'] in ['critical', 'high'])
+            columns['crisis_match_type'].append(crisis['match_type'])
+        
+        return columns
+    
+    def _batch_pattern_groups(self):
+        groups = [(('emotion', emotion), patterns) for emotion, patterns in self.emotion_patterns.items()]
+        groups.append((('intensity', None), INTENSITY_INDICATORS))
+        groups.extend((('crisis', level), config['patterns']) for level, config in self.crisis_patterns.items())
+        return groups
+    
     def _analyze_emotions(self, message: str) -> Dict[str, Any]:
         """Analyze emotional content of the message"""
-        message_lower = message.lower()
+        hits = self._match_patterns(message)
         detected_emotions = {}
         primary_emotion = 'neutral'
         intensity = 0.0
         
         # Pattern matching for emotions
         for emotion, patterns in self.emotion_patterns.items():
-            matches = [pattern for pattern in patterns if pattern in message_lower]
+            matches = hits.get(('emotion', emotion))
             if matches:
                 confidence = len(matches) / len(patterns)
                 detected_emotions[emotion] = {
@@ -145,8 +233,7 @@ class NEOAgent(SpecializedAgent):
                     primary_emotion = emotion
         
         # Emotional intensity analysis
-        intensity_indicators = ['very', 'extremely', 'really', 'so', 'quite', 'totally']
-        intensity_boost = sum(1 for indicator in intensity_indicators if indicator in message_lower) * 0.1
+        intensity_boost = len(hits.get(('intensity', None), ())) * 0.1
         intensity = min(1.0, intensity + intensity_boost)
         
         return {
@@ -158,27 +245,46 @@ class NEOAgent(SpecializedAgent):
     
     def _detect_crisis(self, message: str) -> Dict[str, Any]:
         """Enhanced crisis detection with confidence scoring"""
-        message_lower = message.lower()
-        
-        for level, config in self.crisis_patterns.items():
-            for pattern in config['patterns']:
-                if pattern in message_lower:
-                    return {
-                        'level': level,
-                        'confidence': config['confidence'],
-                        'priority': config['priority'],
-                        'detected_pattern': pattern,
-                        'requires_immediate_response': level in ['critical', 'high']
-                    }
+        assessment = self._first_crisis(self._match_patterns(message))
+        if assessment is None:
+            # Nothing exact: retry with misspellings and shorthand corrected
+            corrected = self._fuzzy_lexicon('crisis').correct(message)
+            if corrected is not None:
+                assessment = self._first_crisis(self._match_patterns(corrected[0]), corrected[1])
+        if assessment is not None:
+            return assessment
         
         return {
             'level': 'none',
             'confidence': 0.0,
             'priority': 5,
             'detected_pattern': None,
-            'requires_immediate_response': False
+            'requires_immediate_response': False,
+            'match_type': None
         }
     
+    def _first_crisis(self, hits: Dict[Any, List[str]],
+                      corrections: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        for level, config in self.crisis_patterns.items():
+            detected = hits.get(('crisis', level))
+            if detected:
+                assessment = {
+                    'level': level,
+                    'confidence': config['confidence'],
+                    'priority': config['priority'],
+                    'detected_pattern': detected[0],
+                    'requires_immediate_response': level in ['critical', 'high'],
+                    'match_type': 'exact'
+                }
+                if corrections is not None:
+                    assessment.update({
+                        'confidence': config['confidence'] * FUZZY_CONFIDENCE,
+                        'match_type': 'fuzzy',
+                        'corrections': corrections
+                    })
+                return assessment
+        return None
+    
     def _build_context(self, base_context: Dict[str, Any], emotional_state: Dict[str, Any], 
                       crisis_assessment: Dict[str, Any]) -> Dict[str, Any]:
         """Build enhanced context for response generation"""
@@ -271,13 +377,14 @@ class NEOAgent(SpecializedAgent):
             # Add current message
             conversation.append({'role': 'user', 'content': context['message']})
             
-            # Generate response
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=conversation,
-                max_tokens=400,
-                temperature=0.7
-            )
+            # Generate response; crisis callers can use the reserved LLM slots
+            with llm_gate.slot(context.get('priority', 'standard'), timeout=self.llm_slot_timeout):
+                response = self.openai_client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=conversation,
+                    max_tokens=400,
+                    temperature=0.7
+                )
             
             return response.choices[0].message.content
             
@@ -370,14 +477,11 @@ class NEOAgent(SpecializedAgent):
     
     def calculate_confidence(self, request_data: Dict[str, Any]) -> float:
         """Calculate confidence for handling this request"""
-        message = request_data.get('message', '').lower()
+        message = request_data.get('message', '')
         
         # High confidence for emotional and crisis content
-        emotional_indicators = ['feel', 'emotion', 'sad', 'happy', 'angry', 'scared', 'worried']
-        crisis_indicators = ['help', 'crisis', 'desperate', 'hopeless', 'suicide', 'harm']
-        
-        emotional_score = sum(1 for indicator in emotional_indicators if indicator in message)
-        crisis_score = sum(1 for indicator in crisis_indicators if indicator in message)
+        emotional_score = EMOTIONAL_INDICATORS.count(message)
+        crisis_score = CRISIS_INDICATORS.count(message)
         
         # NEO is the primary agent, so it has high confidence for most requests
         base_confidence = 0.8
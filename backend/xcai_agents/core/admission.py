@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Admission Control
+Adaptive (AIMD) concurrency limit in front of the orchestrator with a bounded,
+deadline-aware wait queue. Crisis requests are always admitted.
+"""
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+import logging
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CRISIS = 'crisis'
+PRIORITY_STANDARD = 'standard'
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit
+    Additive increase (+1 per limit's worth of fast successes), multiplicative
+    decrease when a request fails or exceeds the latency target
+    """
+    
+    def __init__(self, initial_limit: int = 20, min_limit: int = 2, max_limit: int = 200,
+                 latency_target: float = 2.0, backoff_ratio: float = 0.9):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+    
+    def on_sample(self, latency: float, success: bool, in_flight: int):
+        """Adjust the limit from one completed request"""
+        if not success or latency > self.latency_target:
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        elif in_flight + 1 >= int(self.limit):
+            # Only grow while the limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+    
+    @property
+    def current(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+class AdmissionTicket:
+    """Handle for an admitted request, returned to `release`"""
+    __slots__ = ('priority', 'admitted_at', 'granted', 'deadline')
+    
+    def __init__(self, priority: str, deadline: Optional[float] = None):
+        self.priority = priority
+        self.deadline = deadline
+        self.admitted_at = None
+        self.granted = False
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded FIFO queue
+    Waiters whose deadline passes are dropped instead of being admitted late
+    """
+    
+    def __init__(self, limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 max_queue: int = 50, queue_timeout: float = 1.0):
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+    
+    def acquire(self, priority: str = PRIORITY_STANDARD, timeout: Optional[float] = None) -> Optional[AdmissionTicket]:
+        """
+        Admit a request, waiting in the queue up to `timeout` seconds
+        Returns None when the request is shed
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        ticket = AdmissionTicket(priority, deadline=time.time() + timeout)
+        
+        with self._cond:
+            # Crisis traffic is never queued or shed
+            if priority == PRIORITY_CRISIS:
+                self._grant(ticket)
+                metrics.increment('admission.crisis_admitted')
+                return ticket
+            
+            # A waiter past its deadline must not hold back the fast path
+            self._drop_expired(time.time())
+            if not self._queue and self.in_flight < self.limiter.current:
+                self._grant(ticket)
+                metrics.increment('admission.admitted')
+                return ticket
+            
+            if len(self._queue) >= self.max_queue:
+                self._shed('queue_full')
+                return None
+            
+            self._queue.append(ticket)
+            metrics.increment('admission.queued')
+            while not ticket.granted:
+                remaining = ticket.deadline - time.time()
+                if remaining <= 0:
+                    self._remove(ticket)
+                    self._shed('deadline')
+                    return None
+                self._cond.wait(remaining)
+        
+        metrics.increment('admission.admitted')
+        return ticket
+    
+    def release(self, ticket: AdmissionTicket, success: Optional[bool] = True):
+        """
+        Release an admitted request and feed its latency back to the limiter
+        success=None releases without a sample (the request was short-circuited
+        before doing the work the limit protects, e.g. by an open breaker)
+        """
+        latency = time.time() - (ticket.admitted_at or time.time())
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            # Crisis latency depends on the crisis path, not on standard load
+            if ticket.priority != PRIORITY_CRISIS and success is not None:
+                self.limiter.on_sample(latency, success, self.in_flight)
+            self._dispatch()
+    
+    def load(self) -> float:
+        """Current load as in-flight / limit, plus queue pressure"""
+        with self._cond:
+            limit = self.limiter.current
+            return (self.in_flight + len(self._queue)) / max(1, limit)
+    
+    def get_status(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'limit': self.limiter.current,
+                'in_flight': self.in_flight,
+                'queued': len(self._queue),
+                'max_queue': self.max_queue,
+                'queue_timeout': self.queue_timeout
+            }
+    
+    def _grant(self, ticket: AdmissionTicket):
+        ticket.granted = True
+        ticket.admitted_at = time.time()
+        self.in_flight += 1
+    
+    def _dispatch(self):
+        """Admit queued waiters while capacity is available, skipping expired ones"""
+        now = time.time()
+        granted = False
+        while self._queue and self.in_flight < self.limiter.current:
+            ticket = self._queue.popleft()
+            if ticket.deadline <= now:
+                # The waiter will see its deadline and shed itself
+                continue
+            self._grant(ticket)
+            granted = True
+        if granted:
+            self._cond.notify_all()
+    
+    def _drop_expired(self, now: float):
+        while self._queue and self._queue[0].deadline <= now:
+            self._queue.popleft()
+    
+    def _remove(self, ticket: AdmissionTicket):
+        try:
+            self._queue.remove(ticket)
+        except ValueError:
+            pass
+    
+    def _shed(self, reason: str):
+        metrics.increment(f"admission.shed.{reason}")
+        logger.warning(f"Admission control shed request ({reason}), in flight: {self.in_flight}")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Session Affinity
+Consistent-hash ring mapping sessions to their owner node, so per-process
+session state (history, ECHO memory) stays on one process as the deployment
+scales out. Non-owners proxy to the owner; ring changes hand off sessions
+whose owner moved.
+
+Each node is one backend process with its own address (one gunicorn worker
+per node, or several nodes per host on different ports):
+    SESSION_NODES=a=http://127.0.0.1:9001,b=http://127.0.0.1:9002
+    SESSION_NODE_ID=a
+    SESSION_INTERNAL_TOKEN=<shared secret>
+
+The internal endpoints (ring updates, session import) answer 404 on a node
+without SESSION_NODE_ID and SESSION_NODES, and 403 without the shared token;
+with no token configured they refuse every caller. They stay open when a ring
+update shrinks the ring to one node or drops this node, so the departing
+node can still hand its sessions to the ones that remain.
+"""
+import os
+import hmac
+import bisect
+import hashlib
+import threading
+import urllib.request
+import urllib.error
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+import logging
+
+from .metrics import metrics
+from .serialization import dumps
+from .sessions import session_shard
+
+logger = logging.getLogger(__name__)
+
+FORWARDED_HEADER = 'X-Session-Forwarded-By'
+INTERNAL_TOKEN_HEADER = 'X-Internal-Token'
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+PASSTHROUGH_HEADERS = ('Content-Type', 'ETag', 'Retry-After')
+
+def _passthrough_headers(headers) -> Dict[str, str]:
+    return {name: headers[name] for name in PASSTHROUGH_HEADERS if headers.get(name)}
+
+def routing_key(session_id: str) -> str:
+    """Sessions route by shard prefix so handoff moves whole shards; legacy IDs by full ID"""
+    shard = session_shard(session_id)
+    return f"shard-{shard}" if shard is not None else session_id
+
+class HashRing:
+    """Consistent-hash ring with `vnodes` virtual points per node"""
+    
+    def __init__(self, nodes: Iterable[str], vnodes: int = 64):
+        self.nodes = sorted(set(nodes))
+        self.vnodes = vnodes
+        points = []
+        for node in self.nodes:
+            for index in range(vnodes):
+                points.append((_hash(f"{node}#{index}"), node))
+        points.sort()
+        self._hashes = [point[0] for point in points]
+        self._owners = [point[1] for point in points]
+    
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+class SessionAffinity:
+    """Owner lookup, request forwarding and handoff for one node"""
+    
+    def __init__(self, node_id: Optional[str] = None, nodes: Optional[Dict[str, str]] = None,
+                 vnodes: int = 64, proxy_timeout: float = 5.0, internal_token: Optional[str] = None):
+        self.node_id = node_id
+        self.nodes = dict(nodes or {})
+        self.vnodes = vnodes
+        self.proxy_timeout = proxy_timeout
+        self.internal_token = internal_token
+        self.ring = HashRing(self.nodes, vnodes)
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.node_id in self.nodes and len(self.nodes) > 1
+    
+    @property
+    def configured(self) -> bool:
+        """This node has an identity and a ring, even one it is no longer part of"""
+        return bool(self.node_id) and bool(self.nodes)
+    
+    def owner(self, session_id: str) -> Optional[str]:
+        return self.ring.owner(routing_key(session_id))
+    
+    def is_local(self, session_id: str) -> bool:
+        return not self.enabled or self.owner(session_id) == self.node_id
+    
+    def authorized(self, token: Optional[str]) -> bool:
+        """Internal endpoints are closed unless SESSION_INTERNAL_TOKEN is set and matches"""
+        if not self.internal_token or not token:
+            return False
+        return hmac.compare_digest(token.encode(), self.internal_token.encode())
+    
+    def forward(self, session_id: str, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Optional[Tuple[int, bytes, Dict[str, str]]]:
+        """
+        Proxy a request to the session's owner
+        Returns (status, body, passthrough headers), or None if the owner is unreachable
+        """
+        owner = self.owner(session_id)
+        url = self.nodes[owner].rstrip('/') + path
+        request_headers = {FORWARDED_HEADER: self.node_id, 'Content-Type': 'application/json'}
+        request_headers.update({key: value for key, value in (headers or {}).items() if value})
+        req = urllib.request.Request(url, data=body, method=method, headers=request_headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.proxy_timeout) as response:
+                metrics.increment('affinity.forwarded')
+                return response.status, response.read(), _passthrough_headers(response.headers)
+        except urllib.error.HTTPError as e:
+            # The owner answered (including 304 Not Modified); pass it through unchanged
+            metrics.increment('affinity.forwarded')
+            return e.code, e.read(), _passthrough_headers(e.headers)
+        except (urllib.error.URLError, OSError) as e:
+            logger.warning(f"Session owner {owner} unreachable ({e}); serving {session_id} locally")
+            metrics.increment('affinity.forward_failed')
+            return None
+    
+    def update_nodes(self, nodes: Dict[str, str]) -> None:
+        with self._lock:
+            self.nodes = dict(nodes)
+            self.ring = HashRing(self.nodes, self.vnodes)
+        logger.info(f"Session ring updated: {sorted(self.nodes)}")
+    
+    def moved_sessions(self, session_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Group locally held sessions that now belong to another node by new owner
+        Includes every session when the ring no longer has this node (scale-down)
+        """
+        moved: Dict[str, List[str]] = {}
+        for session_id in session_ids:
+            owner = self.owner(session_id)
+            if owner is not None and owner != self.node_id:
+                moved.setdefault(owner, []).append(session_id)
+        return moved
+    
+    def push(self, owner: str, payload: Dict[str, Any]) -> bool:
+        """Send handed-off session state to its new owner's import endpoint"""
+        url = self.nodes[owner].rstrip('/') + '/internal/sessions/import'
+        headers = {'Content-Type': 'application/json', FORWARDED_HEADER: self.node_id}
+        if self.internal_token:
+            headers[INTERNAL_TOKEN_HEADER] = self.internal_token
+        req = urllib.request.Request(url, data=dumps(payload), method='POST', headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.proxy_timeout) as response:
+                return 200 <= response.status < 300
+        except (urllib.error.URLError, OSError) as e:
+            logger.error(f"Session handoff to {owner} failed: {e}")
+            metrics.increment('affinity.handoff_failed')
+            return False
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'node_id': self.node_id,
+            'nodes': sorted(self.nodes),
+            'vnodes': self.vnodes
+        }
+
+def parse_nodes(spec: str) -> Dict[str, str]:
+    """'a=http://host:9001,b=http://host:9002' -> {'a': 'http://host:9001', ...}"""
+    nodes = {}
+    for item in spec.split(','):
+        if '=' in item:
+            node_id, url = item.split('=', 1)
+            nodes[node_id.strip()] = url.strip()
+    return nodes
+
+def build_affinity_from_env() -> SessionAffinity:
+    """SESSION_NODES, SESSION_NODE_ID, SESSION_INTERNAL_TOKEN, SESSION_PROXY_TIMEOUT"""
+    affinity = SessionAffinity(
+        node_id=os.getenv('SESSION_NODE_ID'),
+        nodes=parse_nodes(os.getenv('SESSION_NODES', '')),
+        proxy_timeout=float(os.getenv('SESSION_PROXY_TIMEOUT', 5.0)),
+        internal_token=os.getenv('SESSION_INTERNAL_TOKEN') or None
+    )
+    if affinity.enabled:
+        logger.info(f"Session affinity enabled: node {affinity.node_id} of {sorted(affinity.nodes)}")
+        if not affinity.internal_token:
+            logger.warning("SESSION_INTERNAL_TOKEN is not set: ring updates and session handoff are refused")
+    return affinity
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Agent Registry
+Name -> agent mapping that can hold factories instead of instances, so agents
+are constructed on first use rather than at import. Membership and iteration
+never construct; indexing and get() do, exactly once per process.
+"""
+import threading
+from collections.abc import Mapping
+from typing import Dict, Any, Callable, Iterator, List, Optional
+import logging
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class AgentRegistry(Mapping):
+    """Read-only mapping of registered agents with lazy construction"""
+    
+    def __init__(self):
+        self._instances: Dict[str, Any] = {}
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._order: List[str] = []
+        self._lock = threading.Lock()
+    
+    def register(self, name: str, agent: Any):
+        with self._lock:
+            self._factories.pop(name, None)
+            self._instances[name] = agent
+            if name not in self._order:
+                self._order.append(name)
+    
+    def register_factory(self, name: str, factory: Callable[[], Any]):
+        with self._lock:
+            self._instances.pop(name, None)
+            self._factories[name] = factory
+            if name not in self._order:
+                self._order.append(name)
+    
+    def __getitem__(self, name: str) -> Any:
+        agent = self._instances.get(name)
+        if agent is not None:
+            return agent
+        with self._lock:
+            agent = self._instances.get(name)
+            if agent is None:
+                if name not in self._factories:
+                    raise KeyError(name)
+                # The factory stays registered until construction succeeds, so a
+                # failed attempt (missing key, transient import error) can be retried
+                agent = self._factories[name]()
+                self._instances[name] = agent
+                del self._factories[name]
+                metrics.increment('agents.constructed')
+                logger.debug(f"Constructed agent on first use: {name}")
+            return agent
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self._instances or name in self._factories
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._order))
+    
+    def __len__(self) -> int:
+        return len(self._order)
+    
+    def is_constructed(self, name: str) -> bool:
+        return name in self._instances
+    
+    def prewarm(self, names: Optional[List[str]] = None):
+        """Construct agents now (e.g. in a preloading master before fork)"""
+        for name in names or list(self._order):
+            self[name]
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {name: 'ready' if name in self._instances else 'lazy' for name in self._order}
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Compliance Audit Log
+Fixed-size in-memory ring buffer plus an optional background writer that
+batches entries into append-only, rotated, gzip-compressed JSONL segments.
+A small manifest records each segment's time range and sessions so searches
+only decompress segments that can match.
+
+Several processes (gunicorn workers) can share one log directory. Each
+writes its own segments and merges its entries into the shared manifest
+under a file lock, keeping every other process's entries. Searches read the
+merged manifest, so they see every worker's segments.
+
+The manifest is rewritten when a segment opens and when it rotates or
+closes, not per batch. Until then the open segment's time range and sessions
+live in its writer's memory; other processes see it marked open and scan it
+whatever the query. With a retention period, closed segments that end
+before it are deleted (file and manifest entry) whenever the manifest is
+rewritten.
+"""
+import os
+import json
+import gzip
+import time
+import queue
+import atexit
+import threading
+from collections import deque
+try:
+    import fcntl
+except ImportError:  # no advisory locks (Windows): one process per log directory
+    fcntl = None
+from typing import Dict, Any, Optional, Iterator, List
+import logging
+
+from .metrics import metrics
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_LOCK = 'manifest.lock'
+
+def _as_dict(entry) -> Dict[str, Any]:
+    # Compact records (see audit_record.py) are decoded only when read or persisted
+    return entry.to_dict() if hasattr(entry, 'to_dict') else dict(entry)
+
+class AuditLog:
+    """
+    Compliance audit trail
+    - `entries`: last `capacity` entries in memory (O(1) append, no list copies)
+    - running counters make `summary()` O(1)
+    - with `log_dir`, entries are persisted by a background thread
+    Entries are dicts or objects with `get(key)` and `to_dict()`
+    """
+    
+    def __init__(self, capacity: int = 1000, log_dir: Optional[str] = None,
+                 flush_interval: float = 1.0, batch_size: int = 500,
+                 segment_max_entries: int = 50000, max_pending: int = 10000,
+                 retention_seconds: Optional[float] = None):
+        self.entries = deque(maxlen=capacity)
+        self._timestamps = deque(maxlen=capacity)
+        self.log_dir = log_dir
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.segment_max_entries = segment_max_entries
+        self.retention_seconds = retention_seconds
+        
+        # Running counters
+        self.total_entries = 0
+        self.high_risk_entries = 0
+        self.last_timestamp = None
+        self.dropped_entries = 0
+        self._lock = threading.Lock()
+        
+        # Persistence state
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._writer = None
+        self._stop = threading.Event()
+        self._segments: List[Dict[str, Any]] = []  # closed segments written by this process
+        self._persisted_segments = 0
+        self._segment_file = None
+        self._segment_meta: Optional[Dict[str, Any]] = None
+        self._segment_sessions = set()
+        
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            self._persisted_segments = len(self._load_manifest())
+            self._start_writer()
+            atexit.register(self.close)
+        
+        # The writer thread does not survive fork (gunicorn preloads the app in
+        # the master); each worker starts its own and writes its own segments
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+    
+    def _reset_after_fork(self):
+        # The parent still owns its queue and open segment, and writes them out itself
+        self._lock = threading.Lock()
+        self._pending = queue.Queue(maxsize=self._pending.maxsize)
+        self._stop = threading.Event()
+        self._segments = []
+        inherited = self._segment_file
+        if inherited is not None:
+            # The parent's open segment: closing it here would write its buffers and a gzip
+            # trailer into the parent's file, so the child's copy of the descriptor goes to /dev/null
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, inherited.fileno())
+            os.close(devnull)
+            inherited.close()
+        self._segment_file = None
+        self._segment_meta = None
+        self._segment_sessions = set()
+        writing = self._writer is not None
+        self._writer = None
+        if writing:
+            self._start_writer()
+    
+    def append(self, entry: Dict[str, Any], high_risk: bool = False, timestamp: Optional[float] = None):
+        """Record an entry; never blocks on disk I/O"""
+        timestamp = timestamp or time.time()
+        with self._lock:
+            self.entries.append(entry)
+            self._timestamps.append(timestamp)
+            self.total_entries += 1
+            if high_risk:
+                self.high_risk_entries += 1
+            self.last_timestamp = timestamp
+        
+        if self._writer is not None:
+            try:
+                self._pending.put_nowait((timestamp, entry))
+            except queue.Full:
+                with self._lock:
+                    self.dropped_entries += 1
+                metrics.increment('audit_log.dropped')
+    
+    def summary(self) -> Dict[str, Any]:
+        """O(1) summary from running counters"""
+        with self._lock:
+            total = self.total_entries
+            high_risk = self.high_risk_entries
+            return {
+                'total_entries': total,
+                'high_risk_entries': high_risk,
+                'compliance_rate': (total - high_risk) / total if total else 1.0,
+                'last_audit': self.last_timestamp,
+                'buffered_entries': len(self.entries),
+                'dropped_entries': self.dropped_entries,
+                'persisted_segments': self._persisted_segments
+            }
+    
+    def search(self, session_id: Optional[str] = None, start: Optional[float] = None,
+               end: Optional[float] = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream persisted entries matching a session and/or [start, end] epoch range
+        Segments whose manifest metadata cannot match are skipped without decompression
+        Without a log directory only the in-memory ring buffer is searched
+        """
+        if self.log_dir is None:
+            yield from self._search_memory(session_id, start, end, limit)
+            return
+        
+        self.flush()
+        yielded = 0
+        for segment in self._all_segments():
+            if start is not None and segment['last_ts'] is not None and segment['last_ts'] < start:
+                continue
+            if end is not None and segment['first_ts'] is not None and segment['first_ts'] > end:
+                continue
+            # Another process's open segment has no session list yet; it has to be read
+            if session_id is not None and not segment.get('open') and session_id not in segment['sessions']:
+                continue
+            
+            for record in self._read_segment(segment['file']):
+                ts = record.get('ts', 0)
+                if start is not None and ts < start:
+                    continue
+                if end is not None and ts > end:
+                    continue
+                if session_id is not None and record.get('session_id') != session_id:
+                    continue
+                yield record
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+    
+    def _search_memory(self, session_id, start, end, limit):
+        with self._lock:
+            records = list(zip(self._timestamps, self.entries))
+        yielded = 0
+        for ts, entry in records:
+            if start is not None and ts < start:
+                continue
+            if end is not None and ts > end:
+                continue
+            if session_id is not None and entry.get('session_id') != session_id:
+                continue
+            record = _as_dict(entry)
+            record['ts'] = ts
+            yield record
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+    
+    def flush(self, timeout: float = 5.0):
+        """Wait until queued entries have been written"""
+        if self._writer is None:
+            return
+        deadline = time.time() + timeout
+        while self._pending.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.005)
+    
+    def close(self):
+        """Flush pending entries and stop the writer"""
+        if self._writer is None:
+            return
+        self.flush()
+        self._stop.set()
+        self._writer.join(timeout=5.0)
+        self._writer = None
+        self._close_segment()
+    
+    # Writer thread
+    def _start_writer(self):
+        self._writer = threading.Thread(target=self._run_writer, name='audit-log-writer', daemon=True)
+        self._writer.start()
+    
+    def _run_writer(self):
+        while not self._stop.is_set():
+            batch = []
+            try:
+                batch.append(self._pending.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                pass
+            
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    logger.error(f"Audit log write failed: {e}")
+                    metrics.increment('audit_log.write_errors')
+                finally:
+                    for _ in batch:
+                        self._pending.task_done()
+    
+    def _write_batch(self, batch):
+        lines = []
+        for timestamp, entry in batch:
+            if self._segment_file is None:
+                self._open_segment(timestamp)
+            record = _as_dict(entry)
+            record['ts'] = timestamp
+            lines.append(dumps(record))
+            self._segment_sessions.add(entry.get('session_id'))
+            with self._lock:
+                meta = self._segment_meta
+                meta['count'] += 1
+                meta['last_ts'] = timestamp
+            
+            if meta['count'] >= self.segment_max_entries:
+                self._segment_file.write(b'\n'.join(lines) + b'\n')
+                lines = []
+                self._close_segment()
+        
+        if lines:
+            self._segment_file.write(b'\n'.join(lines) + b'\n')
+            # Sync-flush so a crash loses at most the current batch; the manifest
+            # already lists the open segment, so it stays searchable after a crash
+            self._segment_file.flush()
+        metrics.increment('audit_log.persisted', len(batch))
+    
+    def _open_segment(self, timestamp: float):
+        name = f"audit-{int(timestamp * 1000)}-{os.getpid()}.jsonl.gz"
+        self._segment_file = gzip.open(os.path.join(self.log_dir, name), 'ab')
+        self._segment_sessions = set()
+        with self._lock:
+            self._segment_meta = {'file': name, 'first_ts': timestamp, 'last_ts': None, 'count': 0}
+        self._write_manifest()
+    
+    def _close_segment(self):
+        if self._segment_file is None:
+            return
+        self._segment_file.close()
+        self._segment_file = None
+        with self._lock:
+            meta = dict(self._segment_meta)
+            meta['sessions'] = sorted(s for s in self._segment_sessions if s)
+            self._segments.append(meta)
+            self._segment_meta = None
+        self._segment_sessions = set()
+        self._write_manifest()
+    
+    def _own_segments(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            segments = list(self._segments)
+            if self._segment_meta:
+                current = dict(self._segment_meta)
+                current['sessions'] = sorted(s for s in self._segment_sessions if s)
+                segments.append(current)
+        return segments
+    
+    def _merged(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Other processes' entries from the manifest, this process's from memory (they are newer)
+        own_files = {segment['file'] for segment in segments}
+        merged = [segment for segment in self._load_manifest() if segment['file'] not in own_files]
+        merged.extend(segments)
+        merged.sort(key=lambda segment: segment['first_ts'] or 0)
+        return merged
+    
+    def _all_segments(self) -> List[Dict[str, Any]]:
+        return self._merged(self._own_segments())
+    
+    def _write_manifest(self):
+        """Merge this process's segments into the manifest (on segment open, rotation and close)"""
+        segments = self._own_segments()
+        if self._segment_meta is not None:
+            # The open segment's sessions change with every batch; readers treat it as matching anything
+            segments[-1] = {**segments[-1], 'sessions': [], 'open': True}
+        path = os.path.join(self.log_dir, MANIFEST_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(os.path.join(self.log_dir, MANIFEST_LOCK), 'a') as lock:
+            # Read, merge and replace as one step, or two workers would drop each other's segments
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            merged = self._expire(self._merged(segments))
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': 1, 'segments': merged}, f)
+            os.replace(tmp_path, path)
+        self._persisted_segments = len(merged)
+    
+    def _expire(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Delete closed segments that ended before the retention period (called under the manifest lock)"""
+        if self.retention_seconds is None:
+            return segments
+        cutoff = time.time() - self.retention_seconds
+        expired = {segment['file'] for segment in segments
+                   if not segment.get('open') and (segment['last_ts'] or 0) < cutoff}
+        if not expired:
+            return segments
+        for name in expired:
+            try:
+                os.remove(os.path.join(self.log_dir, name))
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._segments = [segment for segment in self._segments if segment['file'] not in expired]
+        metrics.increment('audit_log.expired_segments', len(expired))
+        return [segment for segment in segments if segment['file'] not in expired]
+    
+    def _load_manifest(self) -> List[Dict[str, Any]]:
+        path = os.path.join(self.log_dir, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path) as f:
+                return json.load(f).get('segments', [])
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read audit manifest: {e}")
+            return []
+    
+    def _read_segment(self, name: str) -> Iterator[Dict[str, Any]]:
+        path = os.path.join(self.log_dir, name)
+        try:
+            with gzip.open(path, 'rt') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except EOFError:
+            # Segment still being written (no gzip trailer yet)
+            return
+        except OSError as e:
+            logger.error(f"Could not read audit segment {name}: {e}")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Compact Audit Records
+Audit entries stored as bit flags over an interned codebook instead of nested
+assessment dicts. Every detectable element (framework, category, subcategory,
+indicator) gets one bit; recommendation texts are interned the same way.
+Readable dict views are decoded only when an entry is read or persisted.
+"""
+import sys
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+RISK_LEVELS = ('low', 'medium', 'high', 'critical')
+RISK_CODES = {level: code for code, level in enumerate(RISK_LEVELS)}
+
+FLAG_BLOCK_RESPONSE = 1
+FLAG_ESCALATION_NEEDED = 2
+FLAG_REQUIRES_ACTION = 4
+
+RECOMMENDATION_KINDS = ('required_actions', 'disclaimers', 'content_modifications')
+
+def _iter_bits(bits: int):
+    """Yield indexes of set bits, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+class AuditCodebook:
+    """
+    Interned violation and recommendation codes
+    Built once from an agent's rule tables; records only hold integers
+    """
+    
+    def __init__(self, agent_version: str = ''):
+        self.agent_version = agent_version
+        self.elements: List[Tuple[str, str, Optional[str], str]] = []
+        self.element_codes: Dict[Tuple[str, str, Optional[str], str], int] = {}
+        self.categories: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self.texts: List[Tuple[str, str]] = []
+        self.text_codes: Dict[Tuple[str, str], int] = {}
+    
+    def register_category(self, framework: str, category: str, risk_level: str, action: str):
+        self.categories[(framework, category)] = (sys.intern(risk_level), sys.intern(action))
+    
+    def register_element(self, framework: str, category: str, subcategory: Optional[str], element: str) -> int:
+        key = (sys.intern(framework), sys.intern(category),
+               sys.intern(subcategory) if subcategory else None, sys.intern(element))
+        code = self.element_codes.get(key)
+        if code is None:
+            code = len(self.elements)
+            self.elements.append(key)
+            self.element_codes[key] = code
+        return code
+    
+    def element_bits(self, framework: str, category: str, subcategory: Optional[str], detected: List[str]) -> int:
+        bits = 0
+        for element in detected:
+            code = self.element_codes.get((framework, category, subcategory, element))
+            if code is not None:
+                bits |= 1 << code
+        return bits
+    
+    def text_bits(self, kind: str, texts: List[str]) -> int:
+        """Intern recommendation texts on first use and return their bit set"""
+        bits = 0
+        for text in texts:
+            key = (kind, text)
+            code = self.text_codes.get(key)
+            if code is None:
+                code = len(self.texts)
+                self.texts.append((kind, sys.intern(text)))
+                self.text_codes[key] = code
+            bits |= 1 << code
+        return bits
+    
+    def decode_violations(self, bits: int) -> Dict[str, Dict[Tuple[str, Optional[str]], List[str]]]:
+        """framework -> (category, subcategory) -> detected elements"""
+        decoded: Dict[str, Dict[Tuple[str, Optional[str]], List[str]]] = {}
+        for code in _iter_bits(bits):
+            framework, category, subcategory, element = self.elements[code]
+            decoded.setdefault(framework, {}).setdefault((category, subcategory), []).append(element)
+        return decoded
+    
+    def decode_texts(self, bits: int) -> Dict[str, List[str]]:
+        decoded = {kind: [] for kind in RECOMMENDATION_KINDS}
+        for code in _iter_bits(bits):
+            kind, text = self.texts[code]
+            decoded[kind].append(text)
+        return decoded
+
+class AuditRecord:
+    """One compliance audit entry (a few hundred bytes instead of several KB of nested dicts)"""
+    __slots__ = ('entry_id', 'session_id', 'timestamp', 'violations', 'recommendations',
+                 'overall_score', 'risk', 'flags', 'processing_time_ms', 'codebook')
+    
+    def __init__(self, codebook: AuditCodebook, entry_id: str, session_id: str, timestamp: float,
+                 violations: int, recommendations: int, overall_score: float, risk: int, flags: int,
+                 processing_time_ms: float = 0):
+        self.codebook = codebook
+        self.entry_id = entry_id
+        self.session_id = session_id
+        self.timestamp = timestamp
+        self.violations = violations
+        self.recommendations = recommendations
+        self.overall_score = overall_score
+        self.risk = risk
+        self.flags = flags
+        self.processing_time_ms = processing_time_ms
+    
+    @property
+    def overall_risk(self) -> str:
+        return RISK_LEVELS[self.risk]
+    
+    @property
+    def high_risk(self) -> bool:
+        return self.risk >= RISK_CODES['high']
+    
+    def get(self, key: str, default=None):
+        """Dict-style access for the scalar fields"""
+        if key in ('entry_id', 'session_id', 'timestamp', 'overall_score', 'processing_time_ms'):
+            return getattr(self, key)
+        return default
+    
+    def to_row(self) -> tuple:
+        """Compact, codebook-relative serialization"""
+        return (self.entry_id, self.session_id, self.timestamp, self.violations,
+                self.recommendations, self.overall_score, self.risk, self.flags, self.processing_time_ms)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Decode into the readable nested audit entry"""
+        codebook = self.codebook
+        decoded = codebook.decode_violations(self.violations)
+        
+        def section(framework: str, with_subcategory: bool) -> Dict[str, Any]:
+            result = {}
+            for (category, subcategory), elements in decoded.get(framework, {}).items():
+                risk_level, action = codebook.categories.get((framework, category), ('low', ''))
+                name = f"{category}_{subcategory}" if with_subcategory and subcategory else category
+                result[name] = {'detected_elements': elements, 'risk_level': risk_level, 'required_action': action}
+            return result
+        
+        hipaa = section('hipaa', False)
+        gdpr = section('gdpr', False)
+        ethical = section('ethical', True)
+        high_risk_areas = []
+        if any(v['risk_level'] == 'high' for v in hipaa.values()):
+            high_risk_areas.append('HIPAA_PHI_EXPOSURE')
+        if any(v['risk_level'] == 'high' for v in gdpr.values()):
+            high_risk_areas.append('GDPR_PERSONAL_DATA')
+        if any(v['risk_level'] == 'high' for v in ethical.values()):
+            high_risk_areas.append('ETHICAL_GUIDELINES_VIOLATION')
+        
+        safety = {}
+        for (category, subcategory), elements in decoded.get('safety', {}).items():
+            risk_level, action = codebook.categories.get(('safety', category), ('low', ''))
+            entry = safety.setdefault(category, {'violations': {}, 'risk_level': risk_level, 'required_action': action})
+            entry['violations'][subcategory] = {'detected_elements': elements}
+        
+        recommendations = codebook.decode_texts(self.recommendations)
+        recommendations['escalation_needed'] = bool(self.flags & FLAG_ESCALATION_NEEDED)
+        recommendations['block_response'] = bool(self.flags & FLAG_BLOCK_RESPONSE)
+        
+        return {
+            'entry_id': self.entry_id,
+            'session_id': self.session_id,
+            'timestamp': datetime.utcfromtimestamp(self.timestamp).isoformat(),
+            'compliance_assessment': {
+                'hipaa': {'violations': hipaa},
+                'gdpr': {'personal_data_detected': gdpr},
+                'ethical': {'concerns': ethical},
+                'overall_score': self.overall_score,
+                'requires_action': bool(self.flags & FLAG_REQUIRES_ACTION),
+                'high_risk_areas': high_risk_areas
+            },
+            'safety_assessment': {'violations': safety, 'overall_risk': self.overall_risk},
+            'recommendations': recommendations,
+            'agent_version': codebook.agent_version,
+            'processing_time_ms': self.processing_time_ms
+        }
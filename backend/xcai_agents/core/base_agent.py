@@ -5,19 +5,65 @@ Foundation for all XCAi-AIIA specialized agents
 """
 import time
 import asyncio
+import contextvars
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Union, Hashable, Tuple
 from datetime import datetime
 import logging
 
+from .scheduler import agent_executor, PRIORITY_STANDARD
+from .phrase_matcher import PhraseMatcher, TokenMatcher, normalize_batch
+from .fuzzy_lexicon import FuzzyLexicon
+from .text_index import TextIndex
+
 logger = logging.getLogger(__name__)
 
+# Pattern snapshot pinned for the current request, {agent name: {table: value}}
+# (set by the orchestrator so a reload mid-request never mixes versions)
+pinned_patterns: contextvars.ContextVar = contextvars.ContextVar('xcai_pinned_patterns', default=None)
+
+class PatternTable:
+    """Keyword table attribute that resolves to the request's pinned snapshot, if any"""
+    
+    def __init__(self, name: str):
+        self.name = name
+    
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        pinned = pinned_patterns.get()
+        if pinned is not None:
+            tables = pinned.get(agent.agent_name)
+            if tables is not None and self.name in tables:
+                return tables[self.name]
+        return agent.__dict__[self.name]
+    
+    def __set__(self, agent, value):
+        agent.__dict__[self.name] = value
+
+class _TableView:
+    # An agent seen through replacement tables, for compiling a matcher without touching the agent
+    def __init__(self, agent, tables: Dict[str, Any]):
+        self._agent = agent
+        self.__dict__.update(tables)
+    
+    def __getattr__(self, name: str):
+        return getattr(self._agent, name)
+
 class BaseAgent(ABC):
     """
     Abstract base class for all XCAi-AIIA agents
     Provides common functionality and interface
     """
     
+    # Attributes holding keyword tables; these are what pattern artifacts and configs carry
+    PATTERN_TABLES: Tuple[str, ...] = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.__dict__.get('PATTERN_TABLES', ()):
+            setattr(cls, name, PatternTable(name))
+    
     def __init__(self, agent_name: str, agent_version: str = "1.0.0"):
         self.agent_name = agent_name
         self.agent_version = agent_version
@@ -44,10 +90,110 @@ class BaseAgent(ABC):
     async def process_async(self, request_data: Dict[str, Any]) -> str:
         """
         Async wrapper for process method
+        Runs on the shared priority executor so crisis work is not queued behind standard work
         Can be overridden for true async implementations
         """
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.process, request_data)
+        priority = request_data.get('priority', PRIORITY_STANDARD)
+        # Run in a copy of this context so the request's pinned patterns follow it to the worker thread
+        context = contextvars.copy_context()
+        return await asyncio.wrap_future(
+            agent_executor.submit(context.run, self.process, request_data, priority=priority)
+        )
+    
+    def process_batch(self, batch: Sequence[Union[str, Dict[str, Any]]]) -> Dict[str, List[Any]]:
+        """
+        Process many messages at once (offline re-scoring, backfills, analytics)
+        Items are request dicts or bare message strings; the result is columnar,
+        one list per field with one row per item. This default calls process()
+        per item; agents with keyword tables override it with a single compiled
+        scan over the whole batch.
+        """
+        requests = self._batch_requests(batch)
+        return {
+            'session_id': [request.get('session_id', '') for request in requests],
+            'response': [self.process(request) for request in requests]
+        }
+    
+    def _batch_requests(self, batch: Sequence[Union[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        return [{'message': item} if isinstance(item, str) else item for item in batch]
+    
+    def _batch_scan(self, requests: List[Dict[str, Any]]) -> List[Dict[Hashable, List[str]]]:
+        """Normalize and match every message in the batch against this agent's tables"""
+        matcher = getattr(self, '_batch_matcher', None)
+        if matcher is None:
+            matcher = self._batch_matcher = PhraseMatcher(self._batch_pattern_groups())
+        texts = [request.get('message') or '' for request in requests]
+        return matcher.scan(normalize_batch(texts))
+    
+    def _match_patterns(self, message: Union[str, TextIndex]) -> Dict[Hashable, List[str]]:
+        """
+        Per-message counterpart of _batch_scan: {group key: [phrases]} on word boundaries
+        Matched against the tables this request sees (its pinned snapshot, if any)
+        """
+        matcher = self._compiled_for_tables('matcher', lambda view: TokenMatcher(type(self)._batch_pattern_groups(view)))
+        return matcher.match(message)
+    
+    def _fuzzy_lexicon(self, kind: str) -> FuzzyLexicon:
+        """
+        Misspelling index over the phrases of this agent's `kind` groups (e.g. 'crisis'),
+        for a second pass through _match_patterns when exact phrases find nothing
+        Words anywhere in the agent's tables are taken as spelled.
+        """
+        def build(view):
+            groups = type(self)._batch_pattern_groups(view)
+            return FuzzyLexicon(
+                [phrase for key, phrases in groups if key[0] == kind for phrase in phrases],
+                known=[phrase for _, phrases in groups for phrase in phrases]
+            )
+        return self._compiled_for_tables(('fuzzy', kind), build)
+    
+    def _compiled_for_tables(self, name: Hashable, build):
+        # Something built from the tables this request sees, cached per table version
+        tables = {table: getattr(self, table) for table in self.PATTERN_TABLES}
+        key = (name,) + tuple(id(value) for value in tables.values())
+        compiled = self.__dict__.setdefault('_compiled_tables', {})
+        entry = compiled.get(key)
+        if entry is None:
+            # The entry holds the tables themselves, so their ids cannot be reused while it is cached
+            entry = (build(_TableView(self, tables)), tables)
+            if len(compiled) >= 8:
+                compiled.clear()  # versions from before the last reloads
+            compiled[key] = entry
+        return entry[0]
+    
+    def pattern_tables(self) -> Dict[str, Any]:
+        """The agent's own current tables (never a request's pinned snapshot)"""
+        return {name: self.__dict__[name] for name in self.PATTERN_TABLES}
+    
+    def builtin_pattern_tables(self) -> Dict[str, Any]:
+        """Tables the agent was built with, before any artifact or config was applied"""
+        return self.__dict__.get('_builtin_patterns') or self.pattern_tables()
+    
+    def compile_batch_matcher(self, tables: Dict[str, Any]) -> Optional[PhraseMatcher]:
+        """Batch matcher for replacement tables, built without modifying the agent"""
+        groups = type(self)._batch_pattern_groups(_TableView(self, tables))
+        return PhraseMatcher(groups) if groups else None
+    
+    def apply_patterns(self, tables: Dict[str, Any], matcher: Optional[PhraseMatcher] = None):
+        """
+        Swap in new keyword tables, and the batch matcher compiled from them, in one step
+        Tables not named in PATTERN_TABLES are ignored; a missing matcher is rebuilt on next use
+        """
+        if '_builtin_patterns' not in self.__dict__:
+            self._builtin_patterns = self.pattern_tables()
+        update = {name: tables[name] for name in self.PATTERN_TABLES if name in tables}
+        update['_batch_matcher'] = matcher
+        # A single dict update runs no Python code, so concurrent requests see old or new, never a mix
+        self.__dict__.update(update)
+        self._patterns_applied()
+    
+    def _patterns_applied(self):
+        """Hook for state derived from the tables"""
+        pass
+    
+    def _batch_pattern_groups(self) -> List[Tuple[Hashable, List[str]]]:
+        """(group key, phrases) pairs in the order the agent's per-message checks use them (see _match_patterns)"""
+        return []
     
     def _record_request(self, response_time: float, success: bool = True):
         """Record performance metrics for this request"""
@@ -83,8 +229,10 @@ class BaseAgent(ABC):
         return {
             'message': request_data.get('message', ''),
             'session_id': request_data.get('session_id', ''),
+            'request_id': request_data.get('request_id'),
             'user_context': request_data.get('user_context', {}),
             'conversation_history': request_data.get('conversation_history', []),
+            'priority': request_data.get('priority', PRIORITY_STANDARD),
             'timestamp': request_data.get('timestamp', datetime.utcnow().isoformat())
         }
     
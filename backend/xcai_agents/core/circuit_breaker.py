@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Circuit Breaker
+Sliding-window breaker that trips on error rate, slow-call rate or consecutive
+failures, limits half-open probes and backs off recovery exponentially
+"""
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+import logging
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Calls past the agent timeout are recorded as failures, so "slow" has to mean
+# clearly below it: half of the orchestrator's 50ms standard timeout
+DEFAULT_SLOW_CALL_THRESHOLD = 0.025
+
+class CircuitBreaker:
+    """
+    Circuit breaker for fault tolerance
+    
+    CLOSED: calls flow; outcomes are tracked in a time window
+    OPEN: calls rejected until the (backed-off) recovery timeout elapses
+    HALF_OPEN: at most `half_open_max_calls` probes in flight; all must succeed to close
+    """
+    
+    def __init__(self, name: str = 'agent', failure_threshold: int = 5, recovery_timeout: float = 30,
+                 window_seconds: float = 60, minimum_calls: int = 10,
+                 failure_rate_threshold: float = 0.5, slow_call_threshold: float = DEFAULT_SLOW_CALL_THRESHOLD,
+                 slow_call_rate_threshold: float = 0.8, half_open_max_calls: int = 3,
+                 max_recovery_timeout: float = 300, backoff_multiplier: float = 2.0,
+                 metrics_registry=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.window_seconds = window_seconds
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.half_open_max_calls = half_open_max_calls
+        self.max_recovery_timeout = max_recovery_timeout
+        self.backoff_multiplier = backoff_multiplier
+        self.metrics = metrics_registry or metrics
+        
+        self.state = 'CLOSED'  # CLOSED, OPEN, HALF_OPEN
+        self.failure_count = 0  # Consecutive failures
+        self.last_failure_time = None
+        self.opened_at = None
+        self.current_recovery_timeout = recovery_timeout
+        self.trip_count = 0
+        
+        # Sliding window of (timestamp, failed, slow) with running totals
+        self._window = deque()
+        self._window_failures = 0
+        self._window_slow = 0
+        
+        # Half-open probe accounting
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        
+        self._lock = threading.Lock()
+    
+    def can_execute(self) -> bool:
+        """Check whether a call may proceed; in HALF_OPEN this reserves a probe slot"""
+        with self._lock:
+            if self.state == 'OPEN':
+                if self.opened_at is None or (time.time() - self.opened_at) < self.current_recovery_timeout:
+                    return False
+                self._transition('HALF_OPEN', 'recovery_timeout_elapsed')
+            
+            if self.state == 'HALF_OPEN':
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    return False
+                self._half_open_in_flight += 1
+                return True
+            
+            return True
+    
+    def release_probe(self):
+        """Give back a probe slot reserved by can_execute() for a call that never ran"""
+        with self._lock:
+            if self.state == 'HALF_OPEN':
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+    
+    def is_open(self) -> bool:
+        """Check whether calls are currently rejected, without reserving a probe slot"""
+        with self._lock:
+            if self.state != 'OPEN':
+                return False
+            return self.opened_at is not None and (time.time() - self.opened_at) < self.current_recovery_timeout
+    
+    def record_success(self, duration: Optional[float] = None):
+        """Record a successful call; calls slower than `slow_call_threshold` count as slow"""
+        now = time.time()
+        slow = duration is not None and duration >= self.slow_call_threshold
+        
+        with self._lock:
+            self.failure_count = 0
+            
+            if self.state == 'HALF_OPEN':
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                if slow:
+                    self._trip('slow_probe', backoff=True)
+                    return
+                self._half_open_successes += 1
+                if self._half_open_successes >= self.half_open_max_calls:
+                    self.current_recovery_timeout = self.recovery_timeout
+                    self._reset_window()
+                    self._transition('CLOSED', 'probes_succeeded')
+            elif self.state == 'CLOSED':
+                self._add_outcome(now, False, slow)
+                self._evaluate_window(now)
+    
+    def record_failure(self, duration: Optional[float] = None):
+        """Record a failed call (error or timeout)"""
+        now = time.time()
+        
+        with self._lock:
+            self.failure_count += 1
+            self.last_failure_time = now
+            
+            if self.state == 'HALF_OPEN':
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._trip('probe_failed', backoff=True)
+            elif self.state == 'CLOSED':
+                slow = duration is not None and duration >= self.slow_call_threshold
+                self._add_outcome(now, True, slow)
+                if self.failure_count >= self.failure_threshold:
+                    self._trip('consecutive_failures', backoff=False)
+                else:
+                    self._evaluate_window(now)
+    
+    def get_state(self) -> Dict[str, Any]:
+        """Get a snapshot of breaker state for health reporting"""
+        with self._lock:
+            self._prune_window(time.time())
+            calls = len(self._window)
+            return {
+                'state': self.state,
+                'failure_count': self.failure_count,
+                'last_failure': self.last_failure_time,
+                'window_calls': calls,
+                'failure_rate': self._window_failures / calls if calls else 0.0,
+                'slow_call_rate': self._window_slow / calls if calls else 0.0,
+                'recovery_timeout': self.current_recovery_timeout,
+                'trip_count': self.trip_count
+            }
+    
+    def _add_outcome(self, now: float, failed: bool, slow: bool):
+        """Append an outcome to the sliding window"""
+        self._window.append((now, failed, slow))
+        if failed:
+            self._window_failures += 1
+        if slow:
+            self._window_slow += 1
+    
+    def _prune_window(self, now: float):
+        """Drop outcomes older than the window"""
+        cutoff = now - self.window_seconds
+        window = self._window
+        while window and window[0][0] < cutoff:
+            _, failed, slow = window.popleft()
+            if failed:
+                self._window_failures -= 1
+            if slow:
+                self._window_slow -= 1
+    
+    def _reset_window(self):
+        """Clear the sliding window"""
+        self._window.clear()
+        self._window_failures = 0
+        self._window_slow = 0
+    
+    def _evaluate_window(self, now: float):
+        """Trip when error or slow-call rate exceeds its threshold"""
+        self._prune_window(now)
+        calls = len(self._window)
+        if calls < self.minimum_calls:
+            return
+        
+        if self._window_failures / calls >= self.failure_rate_threshold:
+            self._trip('failure_rate', backoff=False)
+        elif self._window_slow / calls >= self.slow_call_rate_threshold:
+            self._trip('slow_call_rate', backoff=False)
+    
+    def _trip(self, reason: str, backoff: bool):
+        """Open the breaker, backing off the recovery timeout after failed recovery"""
+        if backoff:
+            self.current_recovery_timeout = min(
+                self.max_recovery_timeout,
+                self.current_recovery_timeout * self.backoff_multiplier
+            )
+        self.opened_at = time.time()
+        self.trip_count += 1
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        self._reset_window()
+        self._transition('OPEN', reason)
+    
+    def _transition(self, new_state: str, reason: str):
+        """Change state and report the transition to metrics"""
+        old_state = self.state
+        if old_state == new_state:
+            return
+        self.state = new_state
+        if new_state == 'HALF_OPEN':
+            self._half_open_in_flight = 0
+            self._half_open_successes = 0
+        
+        self.metrics.increment(f"circuit_breaker.{self.name}.{new_state.lower()}")
+        self.metrics.record_event('circuit_breaker_transition', {
+            'breaker': self.name,
+            'from': old_state,
+            'to': new_state,
+            'reason': reason,
+            'recovery_timeout': self.current_recovery_timeout
+        })
+        
+        if new_state == 'OPEN':
+            logger.warning(f"Circuit breaker {self.name} OPEN ({reason}), retry in {self.current_recovery_timeout:.0f}s")
+        else:
+            logger.info(f"Circuit breaker {self.name} {old_state} -> {new_state} ({reason})")
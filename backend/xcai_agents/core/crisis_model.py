@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Crisis Model
+Second-stage crisis scorer: logistic regression over hashed word n-grams,
+a few microseconds per message on one core, in pure Python.
+
+The keyword pass gives each crisis level a fixed confidence. The model scores
+the message itself and returns a calibrated probability: a Platt-scaled
+sigmoid of the linear score, fitted on held-out data at training time
+(offline/train_crisis_model.py). MIKA adds it to borderline assessments, and
+chat() uses it next to the keyword check when choosing crisis mode.
+
+Features are the message's tokens (text_index) and adjacent token pairs,
+hashed with CRC-32 into `buckets` slots. Only presence counts, so a
+message's score is the bias plus one weight per distinct n-gram.
+
+File layout, like the pattern artifact:
+- A fixed header: magic, format, metadata length, weights length, SHA-256.
+- A JSON metadata block: version, training time, bucket count, bias,
+  calibration, decision threshold and the validation metrics. It is padded so
+  the weights start 8-byte aligned.
+- The weights: `buckets` little-endian float32 values. numpy.frombuffer can
+  read them, but numpy is not needed.
+
+The file is memory-mapped read-only and the weights are read in place.
+
+ModelRegistry keeps versions side by side in one directory, with an ACTIVE
+file naming the one servers should use (see crisis_model_store.py).
+"""
+import os
+import sys
+import json
+import math
+import mmap
+import time
+import zlib
+import shutil
+import struct
+import hashlib
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Union
+import logging
+
+from .text_index import TextIndex, index_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'XCCRISIS'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHIQ32s')  # magic, format, reserved, metadata length, weights length, sha256(metadata + weights)
+DEFAULT_BUCKETS = 1 << 16
+MODEL_SUFFIX = '.xcmodel'
+
+def features(text: Union[str, TextIndex], buckets: int = DEFAULT_BUCKETS) -> List[int]:
+    """Distinct hashed unigram and bigram slots of a message"""
+    return hashed_slots((text if isinstance(text, TextIndex) else index_text(text)).tokens, buckets)
+
+def hashed_slots(tokens: List[str], buckets: int) -> List[int]:
+    grams = [token.encode() for token in tokens]
+    grams.extend(f'{a} {b}'.encode() for a, b in zip(tokens, tokens[1:]))
+    return list({zlib.crc32(gram) % buckets for gram in grams})
+
+def sigmoid(z: float) -> float:
+    if z < -35:
+        return 0.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+def write_model(path: str, weights: Sequence[float], bias: float, calibration: Sequence[float] = (1.0, 0.0),
+                threshold: float = 0.5, version: Optional[str] = None,
+                metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Write a model file at `path` (temporary file, then renamed)
+    Returns the metadata; the version defaults to a digest of the weights
+    """
+    data = array('f', weights)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    weight_bytes = data.tobytes()
+    meta = {
+        'version': version or hashlib.sha256(weight_bytes + struct.pack('<d', bias)).hexdigest()[:12],
+        'trained_at': time.time(),
+        'buckets': len(data),
+        'bias': bias,
+        'calibration': list(calibration),
+        'threshold': threshold,
+        'metrics': metrics or {},
+        'format': FORMAT_VERSION
+    }
+    meta_bytes = json.dumps(meta, separators=(',', ':')).encode()
+    meta_bytes += b' ' * (-(HEADER.size + len(meta_bytes)) % 8)
+    digest = hashlib.sha256(meta_bytes + weight_bytes).digest()
+    
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(meta_bytes), len(weight_bytes), digest))
+        f.write(meta_bytes)
+        f.write(weight_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return meta
+
+class CrisisModel:
+    """A model file, memory-mapped; score() is the calibrated crisis probability of one message"""
+    
+    def __init__(self, path: str, verify: bool = True):
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if stat.st_size < HEADER.size:
+                raise ValueError(f"{path}: too short for a crisis model")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        try:
+            magic, format_version, _, meta_length, weights_length, digest = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: not a crisis model")
+            if format_version != FORMAT_VERSION:
+                raise ValueError(f"{path}: format {format_version}, expected {FORMAT_VERSION}")
+            start = HEADER.size + meta_length
+            if start + weights_length != len(self._map) or weights_length % 4:
+                raise ValueError(f"{path}: truncated")
+            if verify and hashlib.sha256(self._map[HEADER.size:]).digest() != digest:
+                raise ValueError(f"{path}: checksum mismatch")
+            self.meta = json.loads(self._map[HEADER.size:start])
+            if sys.byteorder == 'little':
+                self._view = memoryview(self._map)[start:]
+                self.weights = self._view.cast('f')
+            else:
+                self._view = None
+                self.weights = array('f', self._map[start:])
+                self.weights.byteswap()
+        except BaseException:
+            self._map.close()
+            raise
+        
+        self.version: str = self.meta['version']
+        self.buckets: int = self.meta['buckets']
+        self.bias: float = self.meta['bias']
+        self.scale, self.offset = self.meta['calibration']
+        self.threshold: float = self.meta['threshold']
+        if len(self.weights) != self.buckets:
+            self.close()
+            raise ValueError(f"{path}: {len(self.weights)} weights for {self.buckets} buckets")
+    
+    def margin(self, text: Union[str, TextIndex]) -> float:
+        """Uncalibrated linear score"""
+        weights = self.weights
+        return self.bias + sum(weights[slot] for slot in features(text, self.buckets))
+    
+    def score(self, text: Union[str, TextIndex]) -> float:
+        """Calibrated probability that the message is a crisis; cached on the message's index"""
+        index = text if isinstance(text, TextIndex) else index_text(text)
+        probability = index.matches.get(self)
+        if probability is None:
+            probability = index.matches[self] = sigmoid(self.scale * self.margin(index) + self.offset)
+        return probability
+    
+    def score_batch(self, texts: Iterable[str]) -> List[float]:
+        """Scores for many messages without filling the per-message index cache"""
+        weights, bias, buckets = self.weights, self.bias, self.buckets
+        scale, offset = self.scale, self.offset
+        scores = []
+        for text in texts:
+            margin = bias + sum(weights[slot] for slot in hashed_slots(tokenize(text or ''), buckets))
+            scores.append(sigmoid(scale * margin + offset))
+        return scores
+    
+    def is_crisis(self, text: Union[str, TextIndex]) -> bool:
+        return self.score(text) >= self.threshold
+    
+    def close(self):
+        """Unmap now; only for a model no other thread can still be scoring with"""
+        # Views into the mapping have to go before it can close
+        if self._view is not None:
+            self.weights.release()
+            self._view.release()
+        self._map.close()
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'version': self.version,
+            'trained_at': self.meta['trained_at'],
+            'buckets': self.buckets,
+            'threshold': self.threshold,
+            'metrics': self.meta.get('metrics', {})
+        }
+
+class ModelRegistry:
+    """
+    Model versions in one directory, as <version>.xcmodel, plus an ACTIVE file
+    naming the version to serve. Publishing and activating replace files by
+    rename, so a server polling the registry never sees a partial update.
+    """
+    
+    ACTIVE = 'ACTIVE'
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+    
+    def path_of(self, version: str) -> str:
+        if not version or os.sep in version or version.startswith('.'):
+            raise ValueError(f"Invalid model version: {version!r}")
+        return os.path.join(self.directory, version + MODEL_SUFFIX)
+    
+    def versions(self) -> List[Dict[str, Any]]:
+        """Metadata of every published version, oldest first"""
+        found = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(MODEL_SUFFIX):
+                try:
+                    model = CrisisModel(os.path.join(self.directory, name), verify=False)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping {name} in model registry: {e}")
+                    continue
+                found.append(model.get_status())
+                model.close()
+        return sorted(found, key=lambda status: status['trained_at'])
+    
+    def active_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, self.ACTIVE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def active_path(self) -> Optional[str]:
+        version = self.active_version()
+        return self.path_of(version) if version else None
+    
+    def publish(self, path: str, activate: bool = False) -> str:
+        """Copy a model file into the registry under its version; returns the version"""
+        model = CrisisModel(path)
+        version = model.version
+        model.close()
+        os.makedirs(self.directory, exist_ok=True)
+        target = self.path_of(version)
+        tmp = f"{target}.tmp.{os.getpid()}"
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, target)
+        if activate:
+            self.activate(version)
+        return version
+    
+    def activate(self, version: str):
+        """Point ACTIVE at a published version (also how a rollback is done)"""
+        if not os.path.exists(self.path_of(version)):
+            raise ValueError(f"Model version {version} is not in {self.directory}")
+        pointer = os.path.join(self.directory, self.ACTIVE)
+        tmp = f"{pointer}.tmp.{os.getpid()}"
+        with open(tmp, 'w') as f:
+            f.write(version + '\n')
+        os.replace(tmp, pointer)
+        logger.info(f"Crisis model {version} active in {self.directory}")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Crisis Model Store
+The crisis model (crisis_model.py) a running server scores with, from a model
+file or a model registry directory (its ACTIVE version).
+
+A watcher thread polls the source, like the pattern store does. A new file or
+a new ACTIVE version is opened and verified on that thread, then swapped in
+with one reference assignment. Requests read `model` once and score with that
+object. The replaced model is not unmapped explicitly: a request may still be
+using it, and the mapping is released when the last reference goes. A model
+that fails to load is logged, and the current one stays active.
+"""
+import os
+import time
+import threading
+from typing import Dict, Any, Optional, Union
+import logging
+
+from .crisis_model import CrisisModel, ModelRegistry
+from .text_index import TextIndex
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class CrisisModelStore:
+    """The active crisis model, if any, and where it comes from"""
+    
+    def __init__(self, path: str, check_interval: float = 30.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.registry = ModelRegistry(path) if os.path.isdir(path) else None
+        self.model: Optional[CrisisModel] = None
+        self.loaded_at: Optional[float] = None
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        
+        # The watcher thread does not survive fork; each worker runs its own
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+    
+    def _reset_after_fork(self):
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        watching = self._watcher is not None
+        self._watcher = None
+        if watching:
+            self.start()
+    
+    @property
+    def version(self) -> Optional[str]:
+        model = self.model
+        return model.version if model is not None else None
+    
+    def _model_path(self) -> Optional[str]:
+        return self.registry.active_path() if self.registry is not None else self.path
+    
+    def start(self):
+        """Poll the source every check_interval seconds on a background thread"""
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name='xcai-crisis-model-watcher', daemon=True)
+            self._watcher.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _watch(self):
+        stop = self._stop
+        while not stop.wait(self.check_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Crisis model reload failed: {e}")
+    
+    def load(self) -> bool:
+        """Load the model now (startup); False, with keyword-only crisis detection, on failure"""
+        return self.reload(force=True)
+    
+    def reload(self, force: bool = False) -> bool:
+        """Load the model if the file, or the registry's active version, changed"""
+        with self._reload_lock:
+            current = self.model
+            try:
+                path = self._model_path()
+                if path is None:
+                    raise ValueError(f"{self.path}: no active model version")
+                if not force and current is not None and current.path == path:
+                    stat = os.stat(path)
+                    if (stat.st_ino, stat.st_size, stat.st_mtime_ns) == current.identity:
+                        return False
+                model = CrisisModel(path)
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+                metrics.increment('crisis_model.reload_failed')
+                logger.error(f"Crisis model from {self.path} not loaded, keeping version {self.version}: {e}")
+                return False
+            
+            self.model = model
+            self.loaded_at = time.time()
+            self.last_error = None
+            if current is not None:
+                self.reloads += 1
+            metrics.increment('crisis_model.loaded')
+            logger.info(f"Crisis model version {model.version} active (threshold {model.threshold:.3f})")
+            return True
+    
+    def score(self, text: Union[str, TextIndex]) -> Optional[float]:
+        """Calibrated crisis probability, or None without a model"""
+        model = self.model
+        return model.score(text) if model is not None else None
+    
+    def is_crisis(self, text: Union[str, TextIndex]) -> bool:
+        model = self.model
+        return model is not None and model.is_crisis(text)
+    
+    def get_status(self) -> Dict[str, Any]:
+        status = {
+            'path': self.path,
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'reloads': self.reloads,
+            'last_error': self.last_error
+        }
+        if self.model is not None:
+            status['model'] = self.model.get_status()
+        return status
+
+def build_crisis_model_store_from_env() -> Optional[CrisisModelStore]:
+    """
+    XCAI_CRISIS_MODEL: a crisis model file or a model registry directory;
+    crisis detection stays keyword-only when unset
+    """
+    path = os.getenv('XCAI_CRISIS_MODEL')
+    if not path:
+        return None
+    store = CrisisModelStore(path, check_interval=float(os.getenv('XCAI_CRISIS_MODEL_CHECK_INTERVAL', 30.0)))
+    store.load()
+    store.start()
+    return store
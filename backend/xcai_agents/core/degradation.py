@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Graceful Degradation
+Quality-tier ladder used when agents are shed, breakers are open or the
+orchestrator misses its deadline:
+    llm -> neo_fallback -> template
+"""
+from typing import Dict, Any, Optional, Tuple, Callable, Sequence
+import logging
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Quality tiers, best first. Each step down is cheaper and never calls OpenAI.
+TIER_LLM = 'llm'                    # Full multi-agent orchestration (NEO may call OpenAI)
+TIER_NEO_FALLBACK = 'neo_fallback'  # NEO emotional analysis + fallback templates
+TIER_TEMPLATE = 'template'          # MIKA crisis/support templates
+QUALITY_TIERS = (TIER_LLM, TIER_NEO_FALLBACK, TIER_TEMPLATE)
+
+# Last-resort response when no agent is available at all
+STATIC_TEMPLATE_RESPONSE = (
+    "I'm here with you, and I want to make sure you get support right away. "
+    "If you're in crisis, please call or text 988 (Suicide & Crisis Lifeline) "
+    "or text HOME to 741741 (Crisis Text Line). "
+    "You don't have to go through this alone."
+)
+
+class DegradationPolicy:
+    """Per-route degradation settings"""
+    
+    def __init__(self, route: str, tiers: Sequence[str] = QUALITY_TIERS, shed_llm_above_load: float = 1.0):
+        unknown = [tier for tier in tiers if tier not in QUALITY_TIERS]
+        if unknown or not tiers:
+            raise ValueError(f"Invalid quality tiers for route {route}: {list(tiers)}")
+        self.route = route
+        self.tiers = tuple(tiers)
+        self.shed_llm_above_load = shed_llm_above_load
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'route': self.route,
+            'tiers': list(self.tiers),
+            'shed_llm_above_load': self.shed_llm_above_load
+        }
+
+class DegradationEngine:
+    """
+    Picks the best quality tier the system can currently afford and produces
+    degraded responses from the cheaper tiers
+    """
+    
+    def __init__(self, orchestrator):
+        self.orchestrator = orchestrator
+        self.policies: Dict[str, DegradationPolicy] = {
+            'default': DegradationPolicy('default'),
+            'chat': DegradationPolicy('chat')
+        }
+        self.load_provider: Optional[Callable[[], float]] = None
+    
+    def configure_route(self, route: str, tiers: Sequence[str] = QUALITY_TIERS,
+                        shed_llm_above_load: float = 1.0) -> DegradationPolicy:
+        """Set the degradation policy for a route"""
+        policy = DegradationPolicy(route, tiers, shed_llm_above_load)
+        self.policies[route] = policy
+        logger.info(f"Degradation policy for {route}: {list(policy.tiers)}")
+        return policy
+    
+    def set_load_provider(self, provider: Optional[Callable[[], float]]):
+        """Register a callable returning current load in [0, 1]"""
+        self.load_provider = provider
+    
+    def get_policy(self, route: str) -> DegradationPolicy:
+        return self.policies.get(route) or self.policies['default']
+    
+    def select_tier(self, route: str = 'default') -> str:
+        """Select the best tier available right now for this route"""
+        policy = self.get_policy(route)
+        for tier in policy.tiers:
+            if self._tier_available(tier, policy):
+                return tier
+        return policy.tiers[-1]
+    
+    def respond(self, request_data: Dict[str, Any], route: str = 'default', reason: str = 'degraded',
+                after_tier: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Produce a response from the cheapest-path tiers, skipping `after_tier` and better
+        Returns (response, tier)
+        """
+        policy = self.get_policy(route)
+        tiers = [tier for tier in policy.tiers if tier != TIER_LLM]
+        if after_tier in tiers:
+            tiers = tiers[tiers.index(after_tier) + 1:]
+        
+        for tier in tiers:
+            try:
+                response = self._respond_with_tier(tier, request_data)
+            except Exception as e:
+                logger.error(f"Degradation tier {tier} failed: {e}")
+                continue
+            if response:
+                self.record_tier(route, tier, reason)
+                return response, tier
+        
+        self.record_tier(route, TIER_TEMPLATE, reason)
+        return STATIC_TEMPLATE_RESPONSE, TIER_TEMPLATE
+    
+    def record_tier(self, route: str, tier: str, reason: Optional[str] = None):
+        """Report the tier that served a response"""
+        metrics.increment(f"degradation.{route}.{tier}")
+        if tier != TIER_LLM:
+            metrics.record_event('degraded_response', {'route': route, 'tier': tier, 'reason': reason})
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'policies': {route: policy.to_dict() for route, policy in self.policies.items()},
+            'current_tier': {route: self.select_tier(route) for route in self.policies}
+        }
+    
+    def _tier_available(self, tier: str, policy: DegradationPolicy) -> bool:
+        agents = self.orchestrator.agents
+        if tier == TIER_LLM:
+            if 'NEO' not in agents or self.orchestrator.circuit_breakers['NEO'].is_open():
+                return False
+            if self.load_provider is not None and self.load_provider() > policy.shed_llm_above_load:
+                return False
+            return True
+        if tier == TIER_NEO_FALLBACK:
+            return 'NEO' in agents
+        return True
+    
+    def _respond_with_tier(self, tier: str, request_data: Dict[str, Any]) -> Optional[str]:
+        agents = self.orchestrator.agents
+        if tier == TIER_NEO_FALLBACK:
+            neo = agents.get('NEO')
+            return neo.process_fallback(request_data) if neo else None
+        if tier == TIER_TEMPLATE:
+            mika = agents.get('MIKA')
+            return mika.process(request_data) if mika else STATIC_TEMPLATE_RESPONSE
+        return None
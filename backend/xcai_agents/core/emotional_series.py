@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Emotional Series
+Per-session time series of emotional valence and intensity, one point per
+user turn. Values are stored in compact typed arrays alongside prefix sums,
+so appends are O(1) and every rolling statistic (mean, standard deviation,
+least-squares trend, mean absolute change) over any trailing window is O(1)
+regardless of session length. Shift detection runs incrementally on append.
+
+Only the most recent `max_turns` points are retained (compacted in amortized
+O(1)); whole-session totals are kept as running scalars.
+"""
+import math
+import threading
+from array import array
+from collections import deque
+from typing import Dict, Any, List, Tuple
+
+POSITIVE, NEUTRAL, NEGATIVE = 'positive', 'neutral', 'negative'
+
+class EmotionalSeries:
+    """Valence in [-1, 1] and intensity in [0, 1] per turn, with O(1) rolling statistics"""
+    
+    def __init__(self, max_turns: int = 1000, shift_window: int = 3, shift_threshold: float = 0.6):
+        self.max_turns = max_turns
+        self.shift_window = shift_window
+        self.shift_threshold = shift_threshold
+        self._lock = threading.Lock()
+        
+        self.valence = array('f')
+        self.intensity = array('f')
+        # Prefix sums over the retained points: p[i] = sum of the first i values
+        self._p_valence = array('d', [0.0])
+        self._p_valence_sq = array('d', [0.0])
+        self._p_index_valence = array('d', [0.0])
+        self._p_abs_change = array('d', [0.0])
+        self._p_intensity = array('d', [0.0])
+        
+        self.offset = 0  # session turn number of valence[0]
+        self.turns = 0
+        self.valence_total = 0.0
+        self.emotion_counts = {POSITIVE: 0, NEUTRAL: 0, NEGATIVE: 0}
+        self.shifts = deque(maxlen=32)  # (turn, mean before, mean after)
+    
+    def __len__(self) -> int:
+        return len(self.valence)
+    
+    def append(self, valence: float, intensity: float):
+        with self._lock:
+            self._append(valence, intensity)
+            self.turns += 1
+            self.valence_total += valence
+            self.emotion_counts[POSITIVE if valence > 0 else NEGATIVE if valence < 0 else NEUTRAL] += 1
+            self._detect_shift()
+            if len(self.valence) >= 2 * self.max_turns:
+                self._compact()
+    
+    def _append(self, valence: float, intensity: float):
+        index = len(self.valence)
+        change = abs(valence - self.valence[-1]) if index else 0.0
+        self.valence.append(valence)
+        self.intensity.append(intensity)
+        self._p_valence.append(self._p_valence[-1] + valence)
+        self._p_valence_sq.append(self._p_valence_sq[-1] + valence * valence)
+        self._p_index_valence.append(self._p_index_valence[-1] + index * valence)
+        self._p_abs_change.append(self._p_abs_change[-1] + change)
+        self._p_intensity.append(self._p_intensity[-1] + intensity)
+    
+    def _compact(self):
+        # Keep the newest max_turns points and rebuild their prefix sums
+        valence = self.valence[-self.max_turns:]
+        intensity = self.intensity[-self.max_turns:]
+        self.offset += len(self.valence) - len(valence)
+        self.valence, self.intensity = array('f'), array('f')
+        for prefix in ('_p_valence', '_p_valence_sq', '_p_index_valence', '_p_abs_change', '_p_intensity'):
+            setattr(self, prefix, array('d', [0.0]))
+        for v, i in zip(valence, intensity):
+            self._append(v, i)
+    
+    def _detect_shift(self):
+        w = self.shift_window
+        n = len(self.valence)
+        if n < 2 * w:
+            return
+        if self.shifts and self.shifts[-1][0] > self.offset + n - 2 * w:
+            return  # at most one shift per window
+        before = self._mean(self._p_valence, n - 2 * w, n - w)
+        after = self._mean(self._p_valence, n - w, n)
+        if abs(after - before) >= self.shift_threshold:
+            self.shifts.append((self.offset + n - w, before, after))
+    
+    # Rolling statistics over the trailing `window` retained points
+    def _bounds(self, window: int) -> Tuple[int, int]:
+        n = len(self.valence)
+        return max(0, n - window), n
+    
+    @staticmethod
+    def _mean(prefix: array, a: int, b: int) -> float:
+        return (prefix[b] - prefix[a]) / (b - a) if b > a else 0.0
+    
+    def mean_valence(self, window: int) -> float:
+        return self._mean(self._p_valence, *self._bounds(window))
+    
+    def mean_intensity(self, window: int) -> float:
+        return self._mean(self._p_intensity, *self._bounds(window))
+    
+    def std_valence(self, window: int) -> float:
+        a, b = self._bounds(window)
+        if b - a < 2:
+            return 0.0
+        mean = self._mean(self._p_valence, a, b)
+        variance = self._mean(self._p_valence_sq, a, b) - mean * mean
+        return math.sqrt(max(0.0, variance))
+    
+    def slope_valence(self, window: int) -> float:
+        """Least-squares valence change per turn"""
+        a, b = self._bounds(window)
+        n = b - a
+        if n < 2:
+            return 0.0
+        sum_x = (a + b - 1) * n / 2
+        sum_xx = ((b - 1) * b * (2 * b - 1) - (a - 1) * a * (2 * a - 1)) / 6
+        sum_y = self._p_valence[b] - self._p_valence[a]
+        sum_xy = self._p_index_valence[b] - self._p_index_valence[a]
+        denominator = n * sum_xx - sum_x * sum_x
+        return (n * sum_xy - sum_x * sum_y) / denominator if denominator else 0.0
+    
+    def mean_abs_change(self, window: int) -> float:
+        a, b = self._bounds(window)
+        # Changes are stored on the later point; the first point in the window has no predecessor inside it
+        return self._mean(self._p_abs_change, a + 1, b) if b - a >= 2 else 0.0
+    
+    @property
+    def session_mean_valence(self) -> float:
+        return self.valence_total / self.turns if self.turns else 0.0
+    
+    def recent(self, window: int) -> List[Tuple[int, float, float]]:
+        """(turn, valence, intensity) for the trailing window"""
+        a, b = self._bounds(window)
+        return [(self.offset + i, self.valence[i], self.intensity[i]) for i in range(a, b)]
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            buffer.itemsize * len(buffer) for buffer in (
+                self.valence, self.intensity, self._p_valence, self._p_valence_sq,
+                self._p_index_valence, self._p_abs_change, self._p_intensity
+            )
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe state for session handoff"""
+        return {
+            'valence': self.valence.tolist(),
+            'intensity': self.intensity.tolist(),
+            'offset': self.offset,
+            'turns': self.turns,
+            'valence_total': self.valence_total,
+            'emotion_counts': dict(self.emotion_counts),
+            'shifts': [list(shift) for shift in self.shifts]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], **kwargs) -> 'EmotionalSeries':
+        series = cls(**kwargs)
+        for v, i in zip(data.get('valence', []), data.get('intensity', [])):
+            series._append(v, i)
+        series.offset = data.get('offset', 0)
+        series.turns = data.get('turns', len(series))
+        series.valence_total = data.get('valence_total', series._p_valence[-1])
+        series.emotion_counts.update(data.get('emotion_counts', {}))
+        series.shifts.extend(tuple(shift) for shift in data.get('shifts', []))
+        return series
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Fuzzy Lexicon
+Misspelling- and slang-tolerant phrase matching ("kil myself", "suicde",
+"wanna die"), run as a second pass when exact matching finds nothing.
+
+A message's tokens are corrected towards the lexicon (the words of the
+phrases it was built from), and the corrected token sequence is matched with
+the agent's ordinary TokenMatcher, so a fuzzy hit is still a whole phrase.
+
+- Slang and shorthand that are not misspellings ("wanna", "kms") expand to
+  the words the tables use. Adjacent tokens whose concatenation is a lexicon
+  word are joined ("my self", "over dose"). A phrase typed without its
+  spaces ("killmyself") is split back into its words.
+- Any other token that is neither a lexicon word nor a known word (a common
+  English word or a word from the agent's tables) is looked up, SymSpell
+  style. Every lexicon word is stored under itself and each string left by
+  deleting one of its characters. A token's candidates are found by probing
+  that index with the token and its own single deletes, with no scan over the
+  lexicon. That reaches everything one edit away. Long words may be two edits
+  away; they are found through a bigram index and kept only if the token
+  shares enough bigrams with them (each edit breaks at most two). Every
+  candidate is confirmed with a bounded Damerau-Levenshtein distance.
+- Edit budget: none below MIN_FUZZY_LENGTH letters, because too many real
+  words are one edit from "die" or "cut". It is 1 up to 7 letters and 2 from 8.
+  Known words are never corrected, so "will myself" does not become
+  "kill myself".
+
+Each lookup has a bounded cost. Tokens longer than MAX_TOKEN_LENGTH are
+skipped, and at most MAX_LOOKUPS unknown tokens are looked up per
+message. Corrections are cached per token, so repeated words cost one
+dictionary probe.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+import logging
+
+from .metrics import metrics
+from .text_index import TextIndex, index_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+MIN_FUZZY_LENGTH = 4
+LONG_WORD_LENGTH = 8
+MAX_TOKEN_LENGTH = 24
+MAX_LOOKUPS = 32
+CACHE_SIZE = 8192
+
+# Confidence multiplier for a match found only after correction
+FUZZY_CONFIDENCE = 0.9
+
+# Shorthand that no edit distance would find, in token form
+SLANG = {
+    'wanna': ('want', 'to'),
+    'gonna': ('going', 'to'),
+    'gotta': ('got', 'to'),
+    'kms': ('kill', 'myself'),
+    'unalive': ('kill',),
+    'sewerslide': ('suicide',),
+    'idk': ('dont', 'know'),
+    'ppl': ('people',),
+    'u': ('you',),
+    'ur': ('your',),
+    'cuz': ('because',),
+    'bc': ('because',),
+    'rn': ('right', 'now'),
+}
+
+# Frequent English words, many of them one edit away from a crisis word
+# ("fill"/"kill", "homeless"/"hopeless", "life"/"wife"); never corrected
+COMMON_WORDS = frozenset('''
+a about above after again against ago all almost alone along already also although always am among an and
+another any anyone anything are area arm arms around as ask asked at away back bad be because been before
+being below best better between big bill bills bit bitter blending body book both boy breeding bump but buy
+by call called calling came can candle cape car card care cares cars case cat cause chair change chant charm
+chat child children city code come comes coming cost could couple course cure curt dad dare dares dawn day
+days deal dear deed deep deeply did diet dive do does doing done door down dump during each early east eat
+else end enough even ever every eye eyes face fact failing fall family far farm fast feed feel fell felling
+few fill filled fills find fine first five food for forge forgot form found four free friend friends frog
+from fun game gave get gets getting gill girl give giving go goes gone good got great group grow had half
+hand happen happy hard hare has hat have he head hear heard heart heat held hell hello help hemp her here
+hers herself hill hills him himself his hit hold home homeless hope host hot house how however hump hunt
+hurl hut i id idea if ill important in into is it its itself job joint just keep keeper kelp kid kids
+kiln kilt kind kit knew lake land last late later lead least leave left less let letter lie life lift like
+line list little live lives living long look looking loss lot love loving low lump made make male man many
+married mary may me mean men might mill mills mind mine miss mom money month more morning most mother
+mothers move much music must my name near need needs never new news next nice night no none nor north now
+number of off often oh ok okay old on once one only open or order other others our out over own paint
+pant parent parents part party past pay peeling people perhaps person pill pint place plan play pleading
+point post power problem prom pulls pump put question quite rant rather read reads real really reason reed
+reeling refused right room run said same sat saw say says school see seed seem seen self sell set setter
+she shelf shell should show side since sing sister skill snow so some someone something sometimes son soon
+sorry spills still stoke stop story strike strode study such suing sure take taken takes tale talk tapped
+team tell than thank thanking that the their them theme themselves then there these they thin thing things
+think thinning this those though three through thus tide tie tile till time to today together told too
+took town tripped true try trying turn two under until up upon us use used very wait want war warm wars
+was way we weed week well went were what when where which while who whole why wife will wills with within
+without woman women word words work world worries would wrapped year years yelp yes yet you young your
+yours yourself
+'''.split())
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment (Damerau-Levenshtein) distance, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+def edit_budget(word: str) -> int:
+    if len(word) < MIN_FUZZY_LENGTH:
+        return 0
+    return 2 if len(word) >= LONG_WORD_LENGTH else 1
+
+def _deletes(word: str) -> List[str]:
+    return [word] + [word[:i] + word[i + 1:] for i in range(len(word))]
+
+def _bigrams(word: str) -> Set[str]:
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+class FuzzyLexicon:
+    """
+    Deletion index over the words of `phrases`. correct() maps a message to
+    its corrected token index. Words in `known` (and COMMON_WORDS) are
+    taken as spelled.
+    """
+    
+    def __init__(self, phrases: Iterable[str], known: Iterable[str] = ()):
+        self.words: Set[str] = set()
+        self.compounds: Dict[str, List[str]] = {}
+        for phrase in phrases:
+            words = tokenize(phrase)
+            self.words.update(words)
+            if len(words) > 1:
+                self.compounds[''.join(words)] = words
+        self.known = frozenset(COMMON_WORDS.union(*(tokenize(word) for word in known))) | self.words
+        self._index: Dict[str, List[str]] = {}
+        self._long_bigrams: Dict[str, List[str]] = {}
+        self._bigrams_needed: Dict[str, int] = {}
+        for word in sorted(self.words):
+            budget = edit_budget(word)
+            if budget:
+                for deleted in set(_deletes(word)):
+                    self._index.setdefault(deleted, []).append(word)
+            if budget > 1:
+                grams = _bigrams(word)
+                for gram in grams:
+                    self._long_bigrams.setdefault(gram, []).append(word)
+                self._bigrams_needed[word] = len(grams) - 2 * budget
+        self._cache: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+    
+    def lookup(self, token: str) -> Optional[str]:
+        """Closest lexicon word within its edit budget (ties: the first word in sorted order), or None"""
+        cached = self._cache.get(token, False)
+        if cached is not False:
+            return cached
+        candidates = {word for deleted in _deletes(token) for word in self._index.get(deleted, ())}
+        if len(token) >= LONG_WORD_LENGTH - 2:
+            shared: Dict[str, int] = {}
+            for gram in _bigrams(token):
+                for word in self._long_bigrams.get(gram, ()):
+                    shared[word] = shared.get(word, 0) + 1
+            candidates.update(word for word, count in shared.items() if count >= self._bigrams_needed[word])
+        best, best_distance = None, LONG_WORD_LENGTH
+        for word in sorted(candidates):
+            budget = edit_budget(word)
+            distance = edit_distance(token, word, budget)
+            if distance <= budget and distance < best_distance:
+                best, best_distance = word, distance
+        with self._lock:
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            self._cache[token] = best
+        return best
+    
+    def correct(self, text: Union[str, TextIndex]) -> Optional[Tuple[TextIndex, Dict[str, str]]]:
+        """
+        (corrected index, {original: replacement}) or None when nothing was corrected
+        Cached on the message's index, like a matcher's result
+        """
+        index = text if isinstance(text, TextIndex) else index_text(text)
+        if self in index.matches:
+            return index.matches[self]
+        
+        tokens, corrections = [], {}
+        lookups = 0
+        source = index.tokens
+        i = 0
+        while i < len(source):
+            token = source[i]
+            joined = token + source[i + 1] if i + 1 < len(source) else None
+            if joined in self.words:
+                corrections[f'{token} {source[i + 1]}'] = joined
+                tokens.append(joined)
+                i += 2
+                continue
+            if token in SLANG:
+                corrections[token] = ' '.join(SLANG[token])
+                tokens.extend(SLANG[token])
+            elif token in self.compounds:
+                corrections[token] = ' '.join(self.compounds[token])
+                tokens.extend(self.compounds[token])
+            elif token in self.known or len(token) < 3 or len(token) > MAX_TOKEN_LENGTH or not token.isalpha():
+                tokens.append(token)
+            elif lookups < MAX_LOOKUPS:
+                lookups += 1
+                word = self.lookup(token)
+                if word is not None:
+                    corrections[token] = word
+                tokens.append(word or token)
+            else:
+                metrics.increment('fuzzy_lexicon.lookups_skipped')
+                tokens.append(token)
+            i += 1
+        
+        result = (TextIndex(tokens), corrections) if corrections else None
+        index.matches[self] = result
+        return result
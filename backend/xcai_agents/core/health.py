@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Health Snapshots
+Health reports built at most once per interval (or when a metrics event
+signals a state change) and served as an immutable, pre-serialized snapshot
+with a version number, so frequent probes never rebuild the tree.
+"""
+import time
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, Callable, Optional
+import logging
+
+from .metrics import metrics
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+class HealthSnapshot:
+    """Immutable health report: `data` is read-only, `body` is its encoded JSON"""
+    __slots__ = ('version', 'built_at', 'data', 'body')
+    
+    def __init__(self, version: int, built_at: float, data: Dict[str, Any]):
+        data = dict(data, snapshot_version=version)
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'built_at', built_at)
+        object.__setattr__(self, 'body', dumps(data))
+        object.__setattr__(self, 'data', MappingProxyType(data))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError('HealthSnapshot is immutable')
+    
+    @property
+    def age(self) -> float:
+        return time.time() - self.built_at
+
+class HealthSnapshotCache:
+    """
+    Rebuilds the snapshot when it is older than `interval`, or older than
+    `min_interval` and a metrics event (breaker transition, degraded response, ...)
+    happened since the last build
+    Only one caller rebuilds at a time; concurrent callers get the current snapshot
+    """
+    
+    def __init__(self, builder: Callable[[], Dict[str, Any]], interval: float = 5.0,
+                 min_interval: float = 0.5, change_version: Optional[Callable[[], int]] = None):
+        self.builder = builder
+        self.interval = interval
+        self.min_interval = min_interval
+        self.change_version = change_version or (lambda: metrics.event_version)
+        self._snapshot: Optional[HealthSnapshot] = None
+        self._built_for_change = None
+        self._version = 0
+        self._rebuild_lock = threading.Lock()
+    
+    def get(self) -> HealthSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and not self._stale(snapshot):
+            return snapshot
+        
+        # Single-flight rebuild; the very first caller always waits for a snapshot
+        if not self._rebuild_lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            snapshot = self._snapshot
+            if snapshot is None or self._stale(snapshot):
+                change = self.change_version()
+                self._version += 1
+                snapshot = HealthSnapshot(self._version, time.time(), self.builder())
+                self._snapshot = snapshot
+                self._built_for_change = change
+                metrics.increment('health.snapshots_built')
+            return snapshot
+        finally:
+            self._rebuild_lock.release()
+    
+    def invalidate(self):
+        self._built_for_change = None
+    
+    def _stale(self, snapshot: HealthSnapshot) -> bool:
+        age = snapshot.age
+        if age >= self.interval:
+            return True
+        # Rebuild on change, but never more than once per min_interval under an event storm
+        return age >= self.min_interval and self.change_version() != self._built_for_change
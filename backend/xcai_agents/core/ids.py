@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Identifiers
+Monotonic, sortable, collision-free 128-bit IDs (ULID-style, no hashing)
+Layout: 48-bit millisecond timestamp | 32-bit process component | 48-bit counter
+Encoded as 26 Crockford base32 characters, so string order is creation order.
+"""
+import os
+import time
+import random
+import threading
+
+CROCKFORD_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+# Two characters (10 bits) per table lookup
+CROCKFORD_PAIRS = [a + b for a in CROCKFORD_ALPHABET for b in CROCKFORD_ALPHABET]
+CROCKFORD_DECODE = {char: value for value, char in enumerate(CROCKFORD_ALPHABET)}
+
+_COUNTER_MASK = (1 << 48) - 1
+
+def _encode_pairs(value: int, count: int) -> str:
+    return ''.join(CROCKFORD_PAIRS[(value >> shift) & 0x3FF] for shift in range((count - 1) * 10, -10, -10))
+
+class IdGenerator:
+    """
+    Thread-safe ID source for one process
+    The process component is re-drawn after fork so workers never collide
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reseed()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reseed)
+    
+    def _reseed(self):
+        self._lock = threading.Lock()
+        self._process = random.SystemRandom().getrandbits(32)
+        self._counter = random.SystemRandom().getrandbits(24)
+        self._last_ms = 0
+        self._high_cache = (None, '')
+    
+    def next_int(self) -> int:
+        with self._lock:
+            # Never go backwards, even if the wall clock does
+            now_ms = max(int(time.time() * 1000), self._last_ms)
+            self._last_ms = now_ms
+            self._counter = (self._counter + 1) & _COUNTER_MASK
+            counter = self._counter
+        return (now_ms << 80) | (self._process << 48) | counter
+    
+    def new_id(self, prefix: str = '') -> str:
+        return prefix + self.encode(self.next_int())
+    
+    def encode(self, value: int) -> str:
+        # Timestamp and process bits only change once per millisecond: cache their 16 characters
+        high = value >> 50
+        cached = self._high_cache
+        if cached[0] != high:
+            cached = (high, _encode_pairs(high, 8))
+            self._high_cache = cached
+        pairs = CROCKFORD_PAIRS
+        return (cached[1] + pairs[(value >> 40) & 0x3FF] + pairs[(value >> 30) & 0x3FF] +
+                pairs[(value >> 20) & 0x3FF] + pairs[(value >> 10) & 0x3FF] + pairs[value & 0x3FF])
+
+def decode_timestamp(identifier: str) -> float:
+    """Creation time (epoch seconds) of an ID from this module"""
+    encoded = identifier[-26:]
+    value = 0
+    for char in encoded[:10]:
+        value = (value << 5) | CROCKFORD_DECODE[char]
+    # First 10 characters hold 50 bits: 2 padding bits + 48 timestamp bits
+    return value / 1000.0
+
+# Global generator shared across the backend
+id_generator = IdGenerator()
+
+def new_id(prefix: str = '') -> str:
+    """New sortable unique ID, e.g. new_id('session-')"""
+    return id_generator.new_id(prefix)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA LLM Client
+Deferred OpenAI client: the openai package (the bulk of backend import time)
+is imported and the HTTP client built on first use, in the worker that uses
+it, instead of at import in every process.
+"""
+import os
+import threading
+from typing import Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LazyOpenAIClient:
+    """
+    Stand-in for openai.OpenAI that constructs the real client on first attribute access
+    Truthy while an API key is configured and construction has not failed, so
+    `if not client:` checks keep falling back to templates as before
+    """
+    
+    def __init__(self, api_key: str, **client_kwargs):
+        self._api_key = api_key
+        self._client_kwargs = client_kwargs
+        self._client = None
+        self._failed = False
+        self._lock = threading.Lock()
+    
+    def __bool__(self) -> bool:
+        return bool(self._api_key) and not self._failed
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client(), name)
+    
+    @property
+    def constructed(self) -> bool:
+        return self._client is not None
+    
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    try:
+                        from openai import OpenAI
+                        self._client = OpenAI(api_key=self._api_key, **self._client_kwargs)
+                        logger.info("OpenAI client initialized successfully")
+                    except Exception as e:
+                        self._failed = True
+                        logger.error(f"Failed to initialize OpenAI client: {e}")
+                        raise
+        return self._client
+    
+    @staticmethod
+    def preload_module():
+        """Import openai without building a client (safe to call before fork)"""
+        import openai
+
+def build_openai_client_from_env() -> Optional[LazyOpenAIClient]:
+    """OPENAI_API_KEY; None when unset"""
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        logger.error("OPENAI_API_KEY environment variable not set")
+        return None
+    return LazyOpenAIClient(api_key)
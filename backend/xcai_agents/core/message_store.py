@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Message Store
+Write-behind persistence for conversation history. Appends are buffered in
+memory and flushed to SQLite in batches (timer or size trigger), so /api/chat
+never waits on disk unless durability='sync'. Sessions are rehydrated lazily
+on first access after a restart.
+
+Durability modes:
+- relaxed: write-behind, SQLite synchronous=OFF (may lose the last batch on OS crash)
+- batched: write-behind, synchronous=NORMAL, pending batch flushed at exit
+- sync:    write-through, each append committed before returning (synchronous=FULL)
+"""
+import os
+import json
+import time
+import atexit
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, List
+import logging
+
+from .metrics import metrics
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_RELAXED = 'relaxed'
+DURABILITY_BATCHED = 'batched'
+DURABILITY_SYNC = 'sync'
+
+_SYNCHRONOUS = {DURABILITY_RELAXED: 'OFF', DURABILITY_BATCHED: 'NORMAL', DURABILITY_SYNC: 'FULL'}
+
+class MessageStore:
+    """SQLite-backed session and message history with a write-behind buffer"""
+    
+    def __init__(self, db_path: str, durability: str = DURABILITY_BATCHED,
+                 flush_interval: float = 0.5, batch_size: int = 256):
+        if durability not in _SYNCHRONOUS:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.db_path = db_path
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        
+        self._pending_sessions: List[tuple] = []
+        self._pending_messages: List[tuple] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._local = threading.local()
+        self._writer = None
+        self._closed = False
+        self.flushed_batches = 0
+        
+        conn = self._connection()
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY, device_id TEXT, created_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL,"
+            " role TEXT NOT NULL, content TEXT NOT NULL, timestamp REAL NOT NULL, extra TEXT);"
+            "CREATE INDEX IF NOT EXISTS messages_by_session ON messages (session_id, id);"
+        )
+        if durability != DURABILITY_RELAXED:
+            atexit.register(self.close)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+    
+    def _reset_after_fork(self):
+        # The parent still owns (and will flush) anything buffered before the fork
+        self._pending_sessions = []
+        self._pending_messages = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._writer = None
+    
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and per process (connections must not cross fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={_SYNCHRONOUS[self.durability]}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def create_session(self, session: Dict[str, Any]):
+        row = (session['session_id'], session.get('device_id'), session.get('created_at', time.time()))
+        self._enqueue('sessions', row)
+    
+    def append(self, session_id: str, message: Dict[str, Any]):
+        """Persist one message; returns once buffered (or committed, in sync mode)"""
+        extra = {key: value for key, value in message.items() if key not in ('role', 'content', 'timestamp')}
+        row = (session_id, message.get('role', ''), message.get('content', ''),
+               message.get('timestamp', time.time()), dumps(extra).decode() if extra else None)
+        self._enqueue('messages', row)
+    
+    def load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Rehydrate a session and its history; None if it was never stored
+        A failed flush is logged and the rows still buffered are served alongside the stored ones
+        """
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Message store flush before load failed: {e}")
+            metrics.increment('message_store.flush_errors')
+        conn = self._connection()
+        meta = conn.execute(
+            "SELECT device_id, created_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        rows = conn.execute(
+            "SELECT role, content, timestamp, extra FROM messages WHERE session_id = ? ORDER BY id",
+            (session_id,)
+        ).fetchall()
+        with self._cond:
+            if meta is None:
+                meta = next((row[1:] for row in self._pending_sessions if row[0] == session_id), None)
+            rows += [row[1:] for row in self._pending_messages if row[0] == session_id]
+        if meta is None and not rows:
+            return None
+        
+        messages = []
+        for role, content, timestamp, extra in rows:
+            message = {'role': role, 'content': content, 'timestamp': timestamp}
+            if extra:
+                message.update(json.loads(extra))
+            messages.append(message)
+        metrics.increment('message_store.rehydrated')
+        return {
+            'session_id': session_id,
+            'device_id': meta[0] if meta else 'unknown',
+            'created_at': meta[1] if meta else (messages[0]['timestamp'] if messages else time.time()),
+            'messages': messages
+        }
+    
+    def flush(self):
+        """Write everything buffered so far (called from any thread)"""
+        # Serialized so batches are committed in the order they were buffered
+        with self._flush_lock:
+            with self._cond:
+                sessions, self._pending_sessions = self._pending_sessions, []
+                messages, self._pending_messages = self._pending_messages, []
+            if sessions or messages:
+                try:
+                    self._write(sessions, messages)
+                except Exception:
+                    # Keep the batch buffered, ahead of anything appended since, for the next flush
+                    with self._cond:
+                        self._pending_sessions[:0] = sessions
+                        self._pending_messages[:0] = messages
+                    raise
+    
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending_sessions) + len(self._pending_messages)
+    
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.flush()
+    
+    def ping(self) -> bool:
+        """Readiness probe: the database file is reachable and answering"""
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Message store unreachable: {e}")
+            return False
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'db_path': self.db_path,
+            'durability': self.durability,
+            'pending_writes': self.pending(),
+            'flushed_batches': self.flushed_batches
+        }
+    
+    def _enqueue(self, kind: str, row: tuple):
+        if self.durability == DURABILITY_SYNC:
+            with self._flush_lock:
+                if kind == 'sessions':
+                    self._write([row], [])
+                else:
+                    self._write([], [row])
+            return
+        
+        with self._cond:
+            (self._pending_sessions if kind == 'sessions' else self._pending_messages).append(row)
+            self._ensure_writer()
+            if len(self._pending_sessions) + len(self._pending_messages) >= self.batch_size:
+                self._cond.notify_all()
+    
+    def _ensure_writer(self):
+        # Started lazily so forked workers each run their own writer
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run_writer, name='message-store-writer', daemon=True)
+            self._writer.start()
+    
+    def _run_writer(self):
+        while True:
+            with self._cond:
+                if not self._closed:
+                    self._cond.wait_for(
+                        lambda: self._closed or
+                        len(self._pending_sessions) + len(self._pending_messages) >= self.batch_size,
+                        timeout=self.flush_interval
+                    )
+                closed = self._closed
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Message store flush failed: {e}")
+                metrics.increment('message_store.flush_errors')
+                time.sleep(self.flush_interval)
+            if closed:
+                return
+    
+    def _write(self, sessions: List[tuple], messages: List[tuple]):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if sessions:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO sessions (session_id, device_id, created_at) VALUES (?, ?, ?)",
+                    sessions
+                )
+            if messages:
+                conn.executemany(
+                    "INSERT INTO messages (session_id, role, content, timestamp, extra) VALUES (?, ?, ?, ?, ?)",
+                    messages
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self.flushed_batches += 1
+        metrics.increment('message_store.flushed_messages', len(messages))
+
+def build_message_store_from_env() -> Optional[MessageStore]:
+    """MESSAGE_STORE_PATH (unset: history stays in memory only), MESSAGE_STORE_DURABILITY"""
+    db_path = os.getenv('MESSAGE_STORE_PATH')
+    if not db_path:
+        return None
+    store = MessageStore(
+        db_path,
+        durability=os.getenv('MESSAGE_STORE_DURABILITY', DURABILITY_BATCHED).lower(),
+        flush_interval=float(os.getenv('MESSAGE_STORE_FLUSH_INTERVAL', 0.5)),
+        batch_size=int(os.getenv('MESSAGE_STORE_BATCH_SIZE', 256))
+    )
+    logger.info(f"Conversation history persisted to {db_path} ({store.durability})")
+    return store
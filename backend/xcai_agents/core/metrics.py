@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Metrics Registry
+Process-wide counters and recent events shared by orchestrator components
+"""
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MetricsRegistry:
+    """
+    Thread-safe counters plus a bounded log of recent events
+    Counters are cheap to bump from hot paths; events keep the last N entries only
+    """
+    
+    def __init__(self, max_events: int = 256):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._events = deque(maxlen=max_events)
+        # Bumped on every event; lets caches notice state changes cheaply
+        self.event_version = 0
+    
+    def increment(self, name: str, value: float = 1):
+        """Increment a named counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+    
+    def record_event(self, name: str, data: Optional[Dict[str, Any]] = None):
+        """Record a discrete event (state transition, shed request, ...)"""
+        event = {'event': name, 'time': time.time()}
+        if data:
+            event.update(data)
+        with self._lock:
+            self._events.append(event)
+            self.event_version += 1
+            self._counters[f"events.{name}"] = self._counters.get(f"events.{name}", 0) + 1
+    
+    def get_counter(self, name: str) -> float:
+        """Get the current value of a counter"""
+        with self._lock:
+            return self._counters.get(name, 0)
+    
+    def recent_events(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get the most recent events, newest last"""
+        with self._lock:
+            events = list(self._events)
+        return events[-limit:]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a point-in-time copy of all counters"""
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'event_count': len(self._events)
+            }
+    
+    def reset(self):
+        """Clear all counters and events"""
+        with self._lock:
+            self._counters.clear()
+            self._events.clear()
+
+# Global metrics instance
+metrics = MetricsRegistry()
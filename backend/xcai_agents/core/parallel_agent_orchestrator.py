@@ -6,45 +6,39 @@ for optimal load balancing and sub-5ms crisis response times.
 """
 import time
 import asyncio
-from typing import Dict, List, Any, Optional
+import contextvars
+from typing import Dict, List, Any, Optional, Sequence, Union
 from datetime import datetime
 import logging
 
+from .circuit_breaker import CircuitBreaker
+from .agent_registry import AgentRegistry
+from .metrics import metrics
+from .degradation import DegradationEngine, TIER_LLM
+from .scheduler import agent_executor, llm_gate, PRIORITY_CRISIS, PRIORITY_STANDARD
+from .base_agent import pinned_patterns
+from .phrase_matcher import TokenMatcher
+
 # Golden ratio for load balancing
 PHI = 1.618
 
-logger = logging.getLogger(__name__)
+# Per-agent deadlines; a breaker counts a call as slow at SLOW_CALL_FRACTION of the standard one
+STANDARD_TIMEOUT = 0.050
+CRISIS_TIMEOUT = 0.005
+SLOW_CALL_FRACTION = 0.5
 
-class CircuitBreaker:
-    """Circuit breaker for fault tolerance"""
-    def __init__(self, failure_threshold=5, recovery_timeout=30):
-        self.failure_threshold = failure_threshold
-        self.recovery_timeout = recovery_timeout
-        self.failure_count = 0
-        self.last_failure_time = None
-        self.state = 'CLOSED'  # CLOSED, OPEN, HALF_OPEN
-    
-    def can_execute(self):
-        if self.state == 'CLOSED':
-            return True
-        elif self.state == 'OPEN':
-            if self.last_failure_time and (time.time() - self.last_failure_time) > self.recovery_timeout:
-                self.state = 'HALF_OPEN'
-                return True
-            return False
-        elif self.state == 'HALF_OPEN':
-            return True
-        return False
-    
-    def record_success(self):
-        self.failure_count = 0
-        self.state = 'CLOSED'
-    
-    def record_failure(self):
-        self.failure_count += 1
-        self.last_failure_time = time.time()
-        if self.failure_count >= self.failure_threshold:
-            self.state = 'OPEN'
+# Agents with table-driven batch analysis (ECHO is per-session and stateful)
+BATCH_AGENTS = ['NEO', 'MIKA', 'NEMO', 'MAC']
+
+# Words in a request that bring in a specialist agent
+ROUTING_INDICATORS = TokenMatcher([
+    ('NEMO', ['culture', 'background', 'tradition', 'identity', 'discrimination', 'bias']),  # cultural considerations
+    ('MAC', ['legal', 'safe', 'appropriate', 'guidelines', 'policy']),  # compliance and safety checks
+    ('MIKA', ['crisis', 'emergency', 'help', 'urgent', 'desperate']),  # crisis (also handled in crisis mode)
+    ('ISHA', ['health', 'medical', 'doctor', 'medication', 'symptoms'])  # health-related requests
+])
+
+logger = logging.getLogger(__name__)
 
 class ParallelAgentOrchestrator:
     """
@@ -52,7 +46,7 @@ class ParallelAgentOrchestrator:
     """
     
     def __init__(self):
-        self.agents = {}
+        self.agents = AgentRegistry()
         self.circuit_breakers = {}
         self.performance_metrics = {}
         
@@ -70,43 +64,91 @@ class ParallelAgentOrchestrator:
         # Crisis-capable agents (sub-5ms response requirement)
         self.crisis_agents = ['NEO', 'MIKA', 'MAC', 'ECHO']
         
+        # Quality-tier ladder for shed/timeout/breaker-open requests
+        self.degradation = DegradationEngine(self)
+        
+        # Live keyword tables (PatternStore); each request pins the version current when it starts
+        self.pattern_store = None
+        
+        # Optional similarity stage after the routing keywords (SemanticRouter)
+        self.semantic_router = None
+    
     def register_agent(self, agent_name: str, agent_instance):
         """Register an agent with the orchestrator"""
-        self.agents[agent_name] = agent_instance
-        self.circuit_breakers[agent_name] = CircuitBreaker()
+        self.agents.register(agent_name, agent_instance)
+        self._track_agent(agent_name)
+        logger.info(f"Registered agent: {agent_name}")
+    
+    def register_agent_factory(self, agent_name: str, factory):
+        """Register an agent that is constructed on first use"""
+        self.agents.register_factory(agent_name, factory)
+        self._track_agent(agent_name)
+        logger.info(f"Registered agent (lazy): {agent_name}")
+    
+    def prewarm_agents(self):
+        """Construct every lazily registered agent now"""
+        self.agents.prewarm()
+    
+    def _track_agent(self, agent_name: str):
+        self.circuit_breakers[agent_name] = CircuitBreaker(name=agent_name,
+                                                           slow_call_threshold=STANDARD_TIMEOUT * SLOW_CALL_FRACTION)
         self.performance_metrics[agent_name] = {
             'total_requests': 0,
             'successful_requests': 0,
             'average_response_time': 0,
             'last_request_time': None
         }
-        logger.info(f"Registered agent: {agent_name}")
     
-    async def orchestrate_request(self, request_data: Dict[str, Any], crisis_mode: bool = False) -> Dict[str, Any]:
+    async def orchestrate_request(self, request_data: Dict[str, Any], crisis_mode: bool = False,
+                                  route: str = 'default') -> Dict[str, Any]:
         """
         Orchestrate request across multiple agents
         Crisis mode activates all crisis-capable agents simultaneously
+        Falls down the degradation ladder when the LLM tier is unavailable or misses its deadline
         """
         start_time = time.time()
         
+        if self.pattern_store is not None:
+            # Scoped to this request's task context, including the agent calls it fans out
+            pinned_patterns.set(self.pattern_store.snapshot)
+        
+        # Skip straight to a cheaper tier when NEO's breaker is open or load is too high
+        tier = self.degradation.select_tier(route)
+        if tier != TIER_LLM:
+            return self.degraded_response(request_data, crisis_mode=crisis_mode, route=route,
+                                          reason='tier_unavailable', start_time=start_time)
+        
         if crisis_mode:
             # Crisis mode: activate all crisis-capable agents with 5ms timeout
             selected_agents = self.crisis_agents
-            timeout = 0.005  # 5ms timeout for crisis
+            timeout = CRISIS_TIMEOUT
             logger.warning(f"CRISIS MODE ACTIVATED - agents: {selected_agents}")
         else:
             # Standard mode: intelligent agent selection
             selected_agents = self._select_agents(request_data)
-            timeout = 0.050  # 50ms timeout for standard
+            timeout = STANDARD_TIMEOUT
         
-        # Execute agents in parallel
-        tasks = []
-        for agent_name in selected_agents:
-            if agent_name in self.agents and self.circuit_breakers[agent_name].can_execute():
-                tasks.append(self._execute_agent(agent_name, request_data, timeout))
+        # Tag the request so executors and the LLM gate can prioritise crisis work
+        request_data = {**request_data, 'priority': PRIORITY_CRISIS if crisis_mode else PRIORITY_STANDARD}
         
-        # Wait for all agents to complete
+        # Execute agents in parallel; can_execute() may reserve a half-open probe slot,
+        # which _execute_agent settles by recording an outcome
+        tasks = []
+        reserved, settled = [], set()
+        gathered = False
         try:
+            for agent_name in selected_agents:
+                if agent_name in self.agents and self.circuit_breakers[agent_name].can_execute():
+                    reserved.append(agent_name)
+                    tasks.append(self._execute_agent(agent_name, request_data, timeout, settled))
+            if not tasks:
+                # Every selected agent's breaker is open: nothing was attempted
+                return self.degraded_response(request_data, crisis_mode=crisis_mode, route=route,
+                                              reason='breaker_open', start_time=start_time,
+                                              agents_used=selected_agents)
+            
+            # Wait for all agents to complete
+            gathered = True
             results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=timeout * 2)
             
             # Coordinate responses
@@ -114,13 +156,20 @@ class ParallelAgentOrchestrator:
             
             # Update performance metrics
             total_time = time.time() - start_time
-            self._update_metrics(selected_agents, total_time, True)
+            self._update_metrics(selected_agents, total_time, coordinated_response is not None)
             
+            if coordinated_response is None:
+                return self.degraded_response(request_data, crisis_mode=crisis_mode, route=route,
+                                              reason='no_agent_response', start_time=start_time,
+                                              agents_used=selected_agents)
+            
+            self.degradation.record_tier(route, TIER_LLM)
             return {
                 'response': coordinated_response,
                 'agents_used': selected_agents,
                 'response_time_ms': total_time * 1000,
                 'crisis_mode': crisis_mode,
+                'quality_tier': TIER_LLM,
                 'timestamp': datetime.utcnow().isoformat()
             }
             
@@ -128,15 +177,61 @@ class ParallelAgentOrchestrator:
             logger.error(f"Orchestration timeout in {'crisis' if crisis_mode else 'standard'} mode")
             self._update_metrics(selected_agents, timeout * 2, False)
             
-            # Fallback response
-            return {
-                'response': 'I apologize, but I\'m experiencing a brief delay. Please try again.',
-                'agents_used': selected_agents,
-                'response_time_ms': timeout * 2000,
-                'crisis_mode': crisis_mode,
-                'error': 'timeout',
-                'timestamp': datetime.utcnow().isoformat()
-            }
+            result = self.degraded_response(request_data, crisis_mode=crisis_mode, route=route,
+                                            reason='timeout', start_time=start_time,
+                                            agents_used=selected_agents)
+            result['error'] = 'timeout'
+            return result
+        finally:
+            # Calls that never started (cancelled or failed while reserving) recorded no outcome; free their slots
+            for agent_name in reserved:
+                if agent_name not in settled:
+                    self.circuit_breakers[agent_name].release_probe()
+            if not gathered:
+                for task in tasks:
+                    task.close()
+    
+    def degraded_response(self, request_data: Dict[str, Any], crisis_mode: bool = False,
+                          route: str = 'default', reason: str = 'degraded',
+                          start_time: Optional[float] = None,
+                          agents_used: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Build an orchestration result from the cheapest available quality tier"""
+        start_time = start_time or time.time()
+        response, tier = self.degradation.respond(request_data, route=route, reason=reason)
+        
+        return {
+            'response': response,
+            'agents_used': agents_used or [],
+            'response_time_ms': (time.time() - start_time) * 1000,
+            'crisis_mode': crisis_mode,
+            'quality_tier': tier,
+            'degraded_reason': reason,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    
+    def orchestrate_batch(self, batch: Sequence[Union[str, Dict[str, Any]]],
+                          agents: Optional[List[str]] = None, chunk_size: int = 4096) -> Dict[str, Any]:
+        """
+        Run agents' process_batch over many messages (offline jobs, not the chat path)
+        Returns columnar results per agent; chunks bound the size of each joined scan
+        """
+        start_time = time.time()
+        agent_names = [name for name in (agents or BATCH_AGENTS) if name in self.agents]
+        results: Dict[str, Dict[str, List[Any]]] = {name: {} for name in agent_names}
+        
+        for offset in range(0, len(batch), chunk_size):
+            chunk = batch[offset:offset + chunk_size]
+            for agent_name in agent_names:
+                columns = self.agents[agent_name].process_batch(chunk)
+                for column, values in columns.items():
+                    results[agent_name].setdefault(column, []).extend(values)
+        
+        metrics.increment('batch.messages', len(batch))
+        return {
+            'count': len(batch),
+            'agents': results,
+            'elapsed_ms': (time.time() - start_time) * 1000
+        }
     
     def _select_agents(self, request_data: Dict[str, Any]) -> List[str]:
         """Intelligent agent selection based on request analysis"""
@@ -148,28 +243,16 @@ class ParallelAgentOrchestrator:
         # Include ECHO for context
         selected.append('ECHO')
         
-        # Analyze request for specialized needs
-        message = request_data.get('message', '').lower()
-        
-        # Cultural considerations
-        cultural_indicators = ['culture', 'background', 'tradition', 'identity', 'discrimination', 'bias']
-        if any(indicator in message for indicator in cultural_indicators):
-            selected.append('NEMO')
+        # Analyze request for specialized needs, on word boundaries ('safe' is not "unsafe")
+        message = request_data.get('message', '')
+        selected.extend(ROUTING_INDICATORS.match(message))
         
-        # Compliance and safety checks
-        safety_indicators = ['legal', 'safe', 'appropriate', 'guidelines', 'policy']
-        if any(indicator in message for indicator in safety_indicators):
-            selected.append('MAC')
-        
-        # Crisis detection (MIKA already handled in crisis mode)
-        crisis_indicators = ['crisis', 'emergency', 'help', 'urgent', 'desperate']
-        if any(indicator in message for indicator in crisis_indicators):
-            selected.append('MIKA')
-        
-        # Health-related requests
-        health_indicators = ['health', 'medical', 'doctor', 'medication', 'symptoms']
-        if any(indicator in message for indicator in health_indicators):
-            selected.append('ISHA')
+        # Paraphrases none of the keywords cover ("my new pills make me dizzy")
+        if self.semantic_router is not None:
+            added = [agent for agent in self.semantic_router.route(message) if agent not in selected]
+            if added:
+                metrics.increment('routing.semantic_added', len(added))
+                selected.extend(added)
         
         # Complex requests need strategic oversight
         if len(selected) > 3:
@@ -177,8 +260,10 @@ class ParallelAgentOrchestrator:
         
         return list(set(selected))  # Remove duplicates
     
-    async def _execute_agent(self, agent_name: str, request_data: Dict[str, Any], timeout: float):
-        """Execute individual agent with circuit breaker protection"""
+    async def _execute_agent(self, agent_name: str, request_data: Dict[str, Any], timeout: float,
+                             settled: Optional[set] = None):
+        """Execute individual agent with circuit breaker protection; adds its name to `settled` once recorded"""
+        start_time = time.time()
         try:
             agent = self.agents[agent_name]
             
@@ -187,29 +272,40 @@ class ParallelAgentOrchestrator:
                 result = await asyncio.wait_for(agent.process_async(request_data), timeout=timeout)
             else:
                 # Fallback to sync execution
-                result = await asyncio.wait_for(
-                    asyncio.get_event_loop().run_in_executor(None, agent.process, request_data),
-                    timeout=timeout
+                future = agent_executor.submit(
+                    contextvars.copy_context().run, agent.process, request_data,
+                    priority=request_data.get('priority', PRIORITY_STANDARD)
                 )
+                result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
             
-            self.circuit_breakers[agent_name].record_success()
+            self.circuit_breakers[agent_name].record_success(time.time() - start_time)
             return {'agent': agent_name, 'result': result, 'status': 'success'}
             
         except asyncio.TimeoutError:
             logger.warning(f"Agent {agent_name} timed out")
-            self.circuit_breakers[agent_name].record_failure()
+            self.circuit_breakers[agent_name].record_failure(time.time() - start_time)
             return {'agent': agent_name, 'result': None, 'status': 'timeout'}
+        except asyncio.CancelledError:
+            # Cancelled by the orchestration deadline; release any half-open probe slot
+            self.circuit_breakers[agent_name].record_failure(time.time() - start_time)
+            raise
         except Exception as e:
             logger.error(f"Agent {agent_name} failed: {e}")
-            self.circuit_breakers[agent_name].record_failure()
+            self.circuit_breakers[agent_name].record_failure(time.time() - start_time)
             return {'agent': agent_name, 'result': None, 'status': 'error', 'error': str(e)}
+        finally:
+            if settled is not None:
+                settled.add(agent_name)
     
-    def _coordinate_responses(self, results: List[Dict], selected_agents: List[str]) -> str:
-        """Coordinate responses from multiple agents using golden ratio weighting"""
+    def _coordinate_responses(self, results: List[Dict], selected_agents: List[str]) -> Optional[str]:
+        """
+        Coordinate responses from multiple agents using golden ratio weighting
+        Returns None when no agent produced a usable response
+        """
         successful_results = [r for r in results if isinstance(r, dict) and r.get('status') == 'success']
         
         if not successful_results:
-            return "I apologize, but I'm having difficulty processing your request right now. Please try again."
+            return None
         
         # Weight responses by Fibonacci hierarchy
         weighted_responses = []
@@ -226,7 +322,7 @@ class ParallelAgentOrchestrator:
                 })
         
         if not weighted_responses:
-            return "I understand you're reaching out. Let me help you with that."
+            return None
         
         # For now, return the highest-weighted response
         # In full implementation, this would intelligently blend responses
@@ -267,20 +363,24 @@ class ParallelAgentOrchestrator:
             health_data['agents'][agent_name] = {
                 'registered': True,
                 'fibonacci_weight': self.fibonacci_weights.get(agent_name, 1),
-                'crisis_capable': agent_name in self.crisis_agents
+                'crisis_capable': agent_name in self.crisis_agents,
+                'constructed': self.agents.is_constructed(agent_name)
             }
             
             # Circuit breaker status
-            cb = self.circuit_breakers[agent_name]
-            health_data['circuit_breakers'][agent_name] = {
-                'state': cb.state,
-                'failure_count': cb.failure_count,
-                'last_failure': cb.last_failure_time
-            }
+            health_data['circuit_breakers'][agent_name] = self.circuit_breakers[agent_name].get_state()
             
             # Performance metrics
             health_data['performance'][agent_name] = self.performance_metrics[agent_name].copy()
         
+        health_data['degradation'] = self.degradation.get_status()
+        health_data['scheduler'] = {
+            'agent_queue_depths': agent_executor.queue_depths(),
+            'llm_gate': llm_gate.get_status()
+        }
+        health_data['metrics'] = metrics.snapshot()
+        health_data['recent_events'] = metrics.recent_events(limit=20)
+        
         return health_data
 
 # Global orchestrator instance
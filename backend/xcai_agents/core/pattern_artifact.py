@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Pattern Artifact
+All agents' keyword tables compiled into one versioned, checksummed file.
+
+Layout:
+- A fixed header: magic, format, index length, body length, SHA-256.
+- A JSON index: version, build time, and per agent the byte ranges of its
+  sections.
+- The body: one section per table, plus each agent's compiled batch matcher.
+  The matcher section holds the phrase groups with their category and level
+  keys, the trie pattern and the prefix closure.
+
+The file is memory-mapped read-only so a section can be read without loading
+the rest. Only the raw bytes are shared between processes that map the same
+artifact: each process decodes the JSON sections it uses into its own tables
+and compiles its own matchers (on first use, or all at once with compile()).
+What the artifact saves is the build work, not per-process memory.
+
+Loaded and hot-swapped into running agents by PatternStore (pattern_store.py).
+"""
+import os
+import json
+import mmap
+import time
+import struct
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from .phrase_matcher import PhraseMatcher
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'XCPATTRN'
+FORMAT_VERSION = 2  # 2: word-boundary matchers over normalized phrase keys
+HEADER = struct.Struct('<8sHHIQ32s')  # magic, format, reserved, index length, body length, sha256(index + body)
+
+def _keys_to_tuples(groups: List[List[Any]]) -> List[Tuple[Any, List[str]]]:
+    # JSON has no tuples; group keys are flat tuples such as ('crisis', 'critical', 'suicide')
+    return [(tuple(key) if isinstance(key, list) else key, phrases) for key, phrases in groups]
+
+def build_artifact(agents: Dict[str, Any], path: str, version: Optional[str] = None,
+                   source: str = 'builtin') -> Dict[str, Any]:
+    """
+    Compile the pattern tables of `agents` (name -> agent) into an artifact at `path`
+    Written to a temporary file and renamed, so readers never see a partial file
+    Returns the index; the version defaults to a digest of the table contents
+    """
+    body = bytearray()
+    index: Dict[str, Any] = {'agents': {}}
+    
+    def section(obj: Any) -> List[int]:
+        data = json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+        offset = len(body)
+        body.extend(data)
+        return [offset, len(data)]
+    
+    content = hashlib.sha256()
+    for name, agent in sorted(agents.items()):
+        tables = agent.pattern_tables()
+        content.update(json.dumps([name, tables], sort_keys=True).encode())
+        entry = {'tables': {table: section(value) for table, value in tables.items()}, 'matcher': None}
+        groups = agent._batch_pattern_groups()
+        if groups:
+            matcher = PhraseMatcher(groups)
+            entry['matcher'] = section({'groups': matcher.groups, **matcher.compiled()})
+        index['agents'][name] = entry
+    
+    index.update(
+        version=version or content.hexdigest()[:12],
+        built_at=time.time(),
+        source=source,
+        format=FORMAT_VERSION
+    )
+    index_bytes = json.dumps(index, separators=(',', ':')).encode()
+    digest = hashlib.sha256(index_bytes + body).digest()
+    
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(index_bytes), len(body), digest))
+        f.write(index_bytes)
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return index
+
+class PatternArtifact:
+    """Read-only view of an artifact file; sections are decoded into per-process objects on first use"""
+    
+    def __init__(self, path: str, verify: bool = True):
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if stat.st_size < HEADER.size:
+                raise ValueError(f"{path}: too short for a pattern artifact")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        try:
+            magic, format_version, _, index_length, body_length, digest = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: not a pattern artifact")
+            if format_version != FORMAT_VERSION:
+                raise ValueError(f"{path}: format {format_version}, expected {FORMAT_VERSION}")
+            self._body_offset = HEADER.size + index_length
+            if self._body_offset + body_length != len(self._map):
+                raise ValueError(f"{path}: truncated")
+            if verify and hashlib.sha256(self._map[HEADER.size:]).digest() != digest:
+                raise ValueError(f"{path}: checksum mismatch")
+            self.index = json.loads(self._map[HEADER.size:self._body_offset])
+        except BaseException:
+            self._map.close()
+            raise
+        
+        self.version: str = self.index['version']
+        self.built_at: float = self.index['built_at']
+        self.source: str = self.index.get('source', '')
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Dict[str, Any]] = {}
+        self._matchers: Dict[str, Optional[PhraseMatcher]] = {}
+    
+    @property
+    def agents(self) -> List[str]:
+        return list(self.index['agents'])
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self._map)
+    
+    def _section(self, span: List[int]) -> Any:
+        offset, length = span
+        start = self._body_offset + offset
+        return json.loads(self._map[start:start + length])
+    
+    def tables(self, agent_name: str) -> Dict[str, Any]:
+        with self._lock:
+            tables = self._tables.get(agent_name)
+            if tables is None:
+                spans = self.index['agents'][agent_name]['tables']
+                tables = self._tables[agent_name] = {name: self._section(span) for name, span in spans.items()}
+            return tables
+    
+    def matcher(self, agent_name: str) -> Optional[PhraseMatcher]:
+        with self._lock:
+            if agent_name not in self._matchers:
+                span = self.index['agents'][agent_name]['matcher']
+                matcher = None
+                if span is not None:
+                    compiled = self._section(span)
+                    matcher = PhraseMatcher(_keys_to_tuples(compiled.pop('groups')), compiled=compiled)
+                self._matchers[agent_name] = matcher
+            return self._matchers[agent_name]
+    
+    def compile(self, agents: Optional[Dict[str, Any]] = None):
+        """Decode every section and build every matcher now rather than on first use"""
+        for agent_name in self.agents:
+            self.tables(agent_name)
+            self.matcher(agent_name)
+    
+    def apply(self, agent_name: str, agent: Any) -> bool:
+        """Give `agent` this artifact's tables and matcher; False if the artifact has none for it"""
+        if agent_name not in self.index['agents']:
+            return False
+        agent.apply_patterns(self.tables(agent_name), self.matcher(agent_name))
+        return True
+    
+    def close(self):
+        self._map.close()
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'version': self.version,
+            'built_at': self.built_at,
+            'source': self.source,
+            'bytes': self.nbytes,
+            'agents': self.agents
+        }
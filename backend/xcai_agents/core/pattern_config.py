@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Pattern Configuration
+Agent keyword tables from external, versioned JSON files, one file per agent:
+    
+    {"agent": "MIKA", "version": "2024-06-01.2",
+     "tables": {"crisis_patterns": {"critical": {"suicide": ["kill myself", ...], ...}, ...}}}
+
+Tables left out of a file keep the agent's built-in value. A table must keep
+the shape of the built-in one: every key it has, with the same kinds of values,
+so agent code that indexes known levels and categories keeps working. Extra
+categories and phrases are free to add.
+"""
+import os
+import json
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+def check_table_shape(builtin: Any, table: Any, path: str):
+    """Raise ValueError where `table` drops a key or changes a value's kind relative to `builtin`"""
+    if isinstance(builtin, dict):
+        if not isinstance(table, dict):
+            raise ValueError(f"{path}: expected an object")
+        for key, value in builtin.items():
+            if key not in table:
+                raise ValueError(f"{path}.{key}: missing")
+            check_table_shape(value, table[key], f"{path}.{key}")
+    elif isinstance(builtin, list):
+        if not isinstance(table, list):
+            raise ValueError(f"{path}: expected a list")
+        kinds = {type(item) for item in builtin}
+        for index, item in enumerate(table):
+            if kinds and type(item) not in kinds:
+                raise ValueError(f"{path}[{index}]: expected {' or '.join(kind.__name__ for kind in kinds)}")
+    elif isinstance(builtin, bool) or builtin is None:
+        if type(table) is not type(builtin):
+            raise ValueError(f"{path}: expected {type(builtin).__name__}")
+    elif isinstance(builtin, (int, float)):
+        if isinstance(table, bool) or not isinstance(table, (int, float)):
+            raise ValueError(f"{path}: expected a number")
+    elif type(table) is not type(builtin):
+        raise ValueError(f"{path}: expected {type(builtin).__name__}")
+
+class PatternConfigSet:
+    """
+    Parsed config directory; the same apply/tables/matcher surface as PatternArtifact
+    Matchers are compiled by compile() against the live agents, off the request path
+    """
+    
+    def __init__(self, directory: str):
+        self.path = directory
+        self.identity = self.identity_of(directory)
+        self.configs: Dict[str, Dict[str, Any]] = {}
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.json'):
+                continue
+            file_path = os.path.join(directory, name)
+            with open(file_path, encoding='utf-8') as f:
+                try:
+                    config = json.load(f)
+                except ValueError as e:
+                    raise ValueError(f"{file_path}: {e}")
+            agent_name = config.get('agent') if isinstance(config, dict) else None
+            if not agent_name or not config.get('version') or not isinstance(config.get('tables'), dict):
+                raise ValueError(f"{file_path}: needs 'agent', 'version' and a 'tables' object")
+            if agent_name in self.configs:
+                raise ValueError(f"{file_path}: second config for {agent_name}")
+            config['file'] = name
+            self.configs[agent_name] = config
+        
+        self.versions = {agent_name: str(config['version']) for agent_name, config in self.configs.items()}
+        self.version = ','.join(f"{agent_name}@{version}" for agent_name, version in self.versions.items()) or 'builtin'
+        self._tables: Dict[str, Dict[str, Any]] = {}
+        self._matchers: Dict[str, Any] = {}
+    
+    @staticmethod
+    def identity_of(directory: str) -> Optional[Tuple]:
+        """Changes whenever a config file is added, removed or rewritten"""
+        try:
+            entries = []
+            for name in sorted(os.listdir(directory)):
+                if name.endswith('.json'):
+                    stat = os.stat(os.path.join(directory, name))
+                    entries.append((name, stat.st_ino, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            return None
+        return tuple(entries)
+    
+    @property
+    def agents(self) -> List[str]:
+        return list(self.configs)
+    
+    def compile(self, agents: Dict[str, Any]):
+        """
+        Validate every config against its agent's built-in tables and compile the
+        batch matchers; raises ValueError, leaving nothing applied, if any table is unusable
+        """
+        for agent_name, config in self.configs.items():
+            agent = agents.get(agent_name)
+            if agent is None:
+                continue  # applied, and checked, when that agent is first built
+            self._tables[agent_name] = self._checked_tables(agent_name, agent, config)
+            try:
+                self._matchers[agent_name] = agent.compile_batch_matcher(self._tables[agent_name])
+            except (KeyError, TypeError, AttributeError) as e:
+                raise ValueError(f"{config['file']}: tables do not compile: {e!r}")
+    
+    def _checked_tables(self, agent_name: str, agent: Any, config: Dict[str, Any]) -> Dict[str, Any]:
+        builtin = agent.builtin_pattern_tables()
+        tables = dict(builtin)
+        for table_name, table in config['tables'].items():
+            if table_name not in builtin:
+                raise ValueError(f"{config['file']}: {agent_name} has no table '{table_name}'")
+            check_table_shape(builtin[table_name], table, f"{config['file']}:{table_name}")
+            tables[table_name] = table
+        return tables
+    
+    def tables(self, agent_name: str) -> Dict[str, Any]:
+        return self._tables[agent_name]
+    
+    def matcher(self, agent_name: str):
+        return self._matchers.get(agent_name)
+    
+    def apply(self, agent_name: str, agent: Any) -> bool:
+        config = self.configs.get(agent_name)
+        if config is None:
+            return False
+        if agent_name not in self._tables:
+            # Agent built after the load: check now; a bad table leaves its built-ins in place
+            self._tables[agent_name] = self._checked_tables(agent_name, agent, config)
+        agent.apply_patterns(self._tables[agent_name], self._matchers.get(agent_name))
+        return True
+    
+    def close(self):
+        pass
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'version': self.version,
+            'agents': {
+                agent_name: {'version': self.versions[agent_name], 'file': config['file'],
+                             'tables': sorted(config['tables'])}
+                for agent_name, config in self.configs.items()
+            }
+        }
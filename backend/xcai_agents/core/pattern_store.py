@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Pattern Store
+Live keyword tables for running agents, from either a compiled artifact file
+(pattern_artifact.py) or a directory of versioned JSON configs
+(pattern_config.py).
+
+A watcher thread polls the source. A changed source is parsed, validated and
+compiled on that thread, then swapped in: each agent's tables and matcher are
+replaced with one dict update, and the store's snapshot reference is replaced
+once. The orchestrator pins that snapshot when a request starts, so every agent
+the request touches reads the same version even if a swap lands mid-request.
+Requests never wait on a reload. A source that fails validation is logged and
+the current version stays active.
+"""
+import os
+import time
+import threading
+from typing import Dict, Any, Callable, Optional
+import logging
+
+from .pattern_artifact import PatternArtifact
+from .pattern_config import PatternConfigSet
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def open_pattern_source(path: str):
+    """A config directory or an artifact file, by what is at `path`"""
+    return PatternConfigSet(path) if os.path.isdir(path) else PatternArtifact(path)
+
+def _source_identity(path: str):
+    if os.path.isdir(path):
+        return PatternConfigSet.identity_of(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+class PatternStore:
+    """The active pattern source and every agent it applies to"""
+    
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.source = None
+        # {agent name: {table: value}} for the active version; replaced, never mutated
+        self.snapshot: Dict[str, Dict[str, Any]] = {}
+        self.loaded_at: Optional[float] = None
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._agents: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        
+        # The watcher thread does not survive fork; each worker runs its own
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+    
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        watching = self._watcher is not None
+        self._watcher = None
+        if watching:
+            self.start()
+    
+    @property
+    def version(self) -> Optional[str]:
+        return self.source.version if self.source is not None else None
+    
+    def start(self):
+        """Poll the source every check_interval seconds on a background thread"""
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name='xcai-pattern-watcher', daemon=True)
+            self._watcher.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _watch(self):
+        stop = self._stop
+        while not stop.wait(self.check_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Pattern reload failed: {e}")
+    
+    def load(self) -> bool:
+        """Load the source now (startup); False, with the built-in tables left in place, on failure"""
+        return self.reload(force=True)
+    
+    def attach(self, agent_name: str, agent: Any) -> Any:
+        """Track an agent and apply the active version to it; returns the agent (factory-friendly)"""
+        with self._lock:
+            self._agents[agent_name] = agent
+            if self.source is not None:
+                try:
+                    self.source.apply(agent_name, agent)
+                except ValueError as e:
+                    self.last_error = str(e)
+                    logger.error(f"Keeping built-in patterns for {agent_name}: {e}")
+            self.snapshot = {**self.snapshot, agent_name: agent.pattern_tables()}
+        return agent
+    
+    def wrap_factory(self, agent_name: str, factory: Callable[[], Any]) -> Callable[[], Any]:
+        return lambda: self.attach(agent_name, factory())
+    
+    def reload(self, force: bool = False) -> bool:
+        """Load the source if it changed and swap every attached agent over to it"""
+        with self._reload_lock:
+            current = self.source
+            if not force and current is not None and _source_identity(self.path) == current.identity:
+                return False
+            try:
+                # Parse, validate and compile everything before any agent sees the new version
+                source = open_pattern_source(self.path)
+                with self._lock:
+                    agents = dict(self._agents)
+                source.compile(agents)
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+                metrics.increment('patterns.reload_failed')
+                logger.error(f"Patterns from {self.path} not loaded, keeping version {self.version}: {e}")
+                return False
+            
+            with self._lock:
+                for agent_name, agent in self._agents.items():
+                    try:
+                        applied = source.apply(agent_name, agent)
+                    except ValueError as e:
+                        # Only agents attached since compile() get here
+                        logger.error(f"Keeping built-in patterns for {agent_name}: {e}")
+                        applied = False
+                    if not applied:
+                        agent.apply_patterns(agent.builtin_pattern_tables())
+                self.snapshot = {agent_name: agent.pattern_tables() for agent_name, agent in self._agents.items()}
+                self.source = source
+                self.loaded_at = time.time()
+                self.last_error = None
+                if current is not None:
+                    self.reloads += 1
+            
+            metrics.increment('patterns.loaded')
+            logger.info(f"Patterns version {source.version} active ({len(agents)} agents updated)")
+            # Decoded tables do not reference the old source's mapping, so it can go
+            if current is not None:
+                current.close()
+            return True
+    
+    def get_status(self) -> Dict[str, Any]:
+        status = {
+            'path': self.path,
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'reloads': self.reloads,
+            'last_error': self.last_error
+        }
+        if self.source is not None:
+            status['source'] = self.source.get_status()
+        return status
+
+def build_pattern_store_from_env() -> Optional[PatternStore]:
+    """
+    XCAI_PATTERNS: a pattern artifact file or a directory of JSON pattern configs
+    (XCAI_PATTERN_ARTIFACT is accepted as before); agents keep their built-in tables when unset
+    """
+    path = os.getenv('XCAI_PATTERNS') or os.getenv('XCAI_PATTERN_ARTIFACT')
+    if not path:
+        return None
+    store = PatternStore(path, check_interval=float(os.getenv('XCAI_PATTERN_CHECK_INTERVAL', 5.0)))
+    store.load()
+    store.start()
+    return store
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Phrase Matcher
+Keyword-table matching on word boundaries, over text normalized by
+text_index (case folded, contractions unified, punctuation collapsed to
+single spaces).
+
+- PhraseMatcher (batch): compiles an agent's tables into one trie-shaped
+  regular expression. A batch of normalized messages is joined once and
+  matched with one `finditer`, and hits are mapped back to messages by offset.
+- TokenMatcher (one message): intersects the message's n-gram set
+  (text_index.TextIndex) with the table's phrase keys.
+
+Both report, per message, {group key: [matched phrases]} in table order.
+Both match a phrase only as whole tokens, and they agree with each other.
+"""
+import re
+import bisect
+from typing import Dict, Any, FrozenSet, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+import logging
+
+from .text_index import TextIndex, index_text, phrase_key, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Never appears in normalized text, so no match can span two messages
+SEPARATOR = '\x00'
+
+def normalize_batch(texts: Sequence[str]) -> List[str]:
+    """Each text as its tokens joined by single spaces, the form phrase keys match against"""
+    return [' '.join(tokenize(text)) for text in texts]
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    # Shared prefixes are factored out so the engine does not retry them per alternative
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = None
+    
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return f'(?:{body})?' if len(branches) == 1 else body + '?'
+        return body
+    
+    return build(trie)
+
+class _PhraseGroups:
+    # Phrases by normalized key, each with its table rank and group; shared by both matchers
+    
+    def __init__(self, groups: Iterable[Tuple[Hashable, Iterable[str]]]):
+        self.groups: List[Tuple[Hashable, List[str]]] = []
+        self._entries: Dict[str, List[Tuple[int, Hashable, str]]] = {}
+        rank = 0
+        for key, phrases in groups:
+            phrases = [phrase for phrase in phrases if phrase]
+            self.groups.append((key, phrases))
+            for phrase in phrases:
+                normalized = phrase_key(phrase)
+                if normalized:
+                    self._entries.setdefault(normalized, []).append((rank, key, phrase))
+                rank += 1
+        self.size = rank
+    
+    def _group(self, matched: Iterable[str]) -> Dict[Hashable, List[str]]:
+        ranked = sorted(entry for normalized in matched for entry in self._entries[normalized])
+        grouped: Dict[Hashable, List[str]] = {}
+        for _, key, phrase in ranked:
+            grouped.setdefault(key, []).append(phrase)
+        return grouped
+
+class PhraseMatcher(_PhraseGroups):
+    """
+    Groups of phrases, e.g. [(('critical', 'suicide'), ['kill myself', ...]), ...]
+    scan() returns, per message, {group key: [matched phrases]} in table order
+    `compiled` (from compiled(), e.g. out of a pattern artifact) skips building
+    the trie when its phrase set matches the groups
+    """
+    
+    def __init__(self, groups: Iterable[Tuple[Hashable, Iterable[str]]], compiled: Optional[Dict[str, Any]] = None):
+        super().__init__(groups)
+        
+        # A lookahead finds the longest phrase starting at every token; shorter
+        # phrases that are whole-token prefixes of it are implied rather than matched separately
+        phrases = sorted(self._entries)
+        if compiled is not None and compiled.get('phrases') == phrases:
+            self.pattern = compiled['pattern']
+            self._implied = {
+                phrase: [phrases[index] for index in indices]
+                for phrase, indices in zip(phrases, compiled['implied'])
+            }
+        else:
+            self.pattern = _trie_pattern(phrases)
+            self._implied = {
+                phrase: [other for other in phrases if phrase == other or phrase.startswith(other + ' ')]
+                for phrase in phrases
+            }
+        # Tried only after a space or separator (the scanned text gets a leading space),
+        # and must end at one or at the end of the text
+        self._regex = re.compile(f'[ {SEPARATOR}](?=({self.pattern})(?![^ {SEPARATOR}]))') if phrases else None
+    
+    def compiled(self) -> Dict[str, Any]:
+        """Precomputed trie pattern and prefix closure, reusable through `compiled=`"""
+        phrases = sorted(self._entries)
+        index = {phrase: i for i, phrase in enumerate(phrases)}
+        return {
+            'phrases': phrases,
+            'pattern': self.pattern,
+            'implied': [[index[other] for other in self._implied[phrase]] for phrase in phrases]
+        }
+    
+    def scan(self, texts: Sequence[str]) -> List[Dict[Hashable, List[str]]]:
+        """Match a batch of texts already passed through normalize_batch()"""
+        hits: List[set] = [set() for _ in texts]
+        if self._regex is None or not texts:
+            return [{} for _ in texts]
+        
+        starts = []
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text) + 1
+        
+        implied = self._implied
+        # With the leading space, a match's start is its phrase's offset in the joined texts
+        for match in self._regex.finditer(' ' + SEPARATOR.join(texts)):
+            phrase = match.group(1)
+            if phrase:
+                hits[bisect.bisect_right(starts, match.start()) - 1].update(implied[phrase])
+        return [self._group(matched) if matched else {} for matched in hits]
+    
+    def scan_one(self, text: str) -> Dict[Hashable, List[str]]:
+        return self.scan(normalize_batch([text]))[0]
+
+class TokenMatcher(_PhraseGroups):
+    """
+    Per-message matching through the message's token index (text_index)
+    Single-word phrases are one set intersection; longer ones are checked only
+    where their first token occurs. Accepts a message (indexed once, cached) or a TextIndex.
+    """
+    
+    def __init__(self, groups: Iterable[Tuple[Hashable, Iterable[str]]]):
+        super().__init__(groups)
+        self._single = frozenset(normalized for normalized in self._entries if ' ' not in normalized)
+        # first token -> second token -> phrase lengths, so most candidates are rejected without building an n-gram
+        self._continuations: Dict[str, Dict[str, List[int]]] = {}
+        for normalized in self._entries:
+            words = normalized.split(' ')
+            if len(words) > 1:
+                sizes = self._continuations.setdefault(words[0], {}).setdefault(words[1], [])
+                if len(words) not in sizes:
+                    sizes.append(len(words))
+        self._first = frozenset(self._continuations)
+    
+    @classmethod
+    def of(cls, phrases: Iterable[str]) -> 'TokenMatcher':
+        """Matcher for one flat list of phrases"""
+        return cls([(None, phrases)])
+    
+    def _hits(self, text: Union[str, TextIndex]) -> FrozenSet[str]:
+        index = text if isinstance(text, TextIndex) else index_text(text)
+        hits = self._single.intersection(index.token_set)
+        candidates = self._first.intersection(index.token_set)
+        if not candidates:
+            return hits
+        tokens = index.tokens
+        last = len(tokens) - 1
+        entries = self._entries
+        longer = []
+        for first in candidates:
+            continuations = self._continuations[first]
+            for i in index.positions(first):
+                sizes = continuations.get(tokens[i + 1]) if i < last else None
+                if sizes:
+                    longer.extend(gram for gram in (' '.join(tokens[i:i + size]) for size in sizes) if gram in entries)
+        return hits.union(longer) if longer else hits
+    
+    def match(self, text: Union[str, TextIndex]) -> Dict[Hashable, List[str]]:
+        index = text if isinstance(text, TextIndex) else index_text(text)
+        grouped = index.matches.get(self)
+        if grouped is None:
+            hits = self._hits(index)
+            grouped = index.matches[self] = self._group(hits) if hits else {}
+        return grouped
+    
+    def find(self, text: Union[str, TextIndex]) -> List[str]:
+        """Matched phrases in table order"""
+        hits = self._hits(text)
+        return [phrase for _, _, phrase in sorted(entry for key in hits for entry in self._entries[key])]
+    
+    def count(self, text: Union[str, TextIndex]) -> int:
+        """Number of table phrases present"""
+        return sum(len(self._entries[key]) for key in self._hits(text))
+    
+    def any(self, text: Union[str, TextIndex]) -> bool:
+        index = text if isinstance(text, TextIndex) else index_text(text)
+        return not self._single.isdisjoint(index.token_set) or bool(self._hits(index))
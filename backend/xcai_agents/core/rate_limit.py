@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Rate Limiting
+Token buckets per device, per session and globally
+In-memory store for single-process deployments, SQLite store shared across
+gunicorn workers on the same host. Crisis requests are never throttled.
+A request takes a token from every scope or from none: all of its buckets are
+checked first and charged only if each one allows it, so a rejection by the
+global bucket does not drain the session and device buckets.
+"""
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SCOPE_GLOBAL = 'global'
+SCOPE_DEVICE = 'device'
+SCOPE_SESSION = 'session'
+
+class RateLimitRule:
+    """Refill `rate` tokens per second up to `burst`"""
+    __slots__ = ('scope', 'rate', 'burst')
+    
+    def __init__(self, scope: str, rate: float, burst: float):
+        self.scope = scope
+        self.rate = rate
+        self.burst = burst
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'scope': self.scope, 'rate_per_second': self.rate, 'burst': self.burst}
+
+def _refill(tokens: float, updated: float, rule: RateLimitRule, now: float) -> float:
+    return min(rule.burst, tokens + (now - updated) * rule.rate)
+
+def _verdict(rules: List[Tuple[RateLimitRule, str]], levels: List[float],
+             cost: float) -> Tuple[Optional[str], float]:
+    """First scope without `cost` tokens (None if all have them) and the wait until every scope has"""
+    limited, retry_after = None, 0.0
+    for (rule, _), tokens in zip(rules, levels):
+        if tokens < cost:
+            limited = limited or rule.scope
+            retry_after = max(retry_after, (cost - tokens) / max(rule.rate, 1e-9))
+    return limited, retry_after
+
+class InMemoryBucketStore:
+    """
+    Buckets kept in LRU order per scope
+    Each access moves the bucket to the end, so idle buckets collect at the front
+    and are evicted a few at a time: O(1) amortized cleanup per request
+    """
+    
+    def __init__(self, idle_ttl: float = 600, evict_per_call: int = 4):
+        self.idle_ttl = idle_ttl
+        self.evict_per_call = evict_per_call
+        self._buckets: Dict[str, OrderedDict] = {}
+        self._lock = threading.Lock()
+    
+    def consume(self, rules: List[Tuple[RateLimitRule, str]], cost: float = 1,
+                now: Optional[float] = None) -> Tuple[Optional[str], float]:
+        """
+        Take `cost` tokens from every (rule, key) bucket if all of them have it
+        Returns (limited_scope, retry_after_seconds); limited_scope is None when charged
+        """
+        now = now or time.time()
+        with self._lock:
+            levels = []
+            for rule, key in rules:
+                bucket = self._buckets.setdefault(rule.scope, OrderedDict()).get(key)
+                levels.append(rule.burst if bucket is None else _refill(bucket[0], bucket[1], rule, now))
+            
+            limited, retry_after = _verdict(rules, levels, cost)
+            if limited is None:
+                for (rule, key), tokens in zip(rules, levels):
+                    buckets = self._buckets[rule.scope]
+                    buckets[key] = [tokens - cost, now]
+                    buckets.move_to_end(key)
+                    self._evict_idle(buckets, now)
+        
+        return limited, retry_after
+    
+    def _evict_idle(self, buckets: OrderedDict, now: float):
+        cutoff = now - self.idle_ttl
+        for _ in range(self.evict_per_call):
+            if not buckets:
+                return
+            oldest_key = next(iter(buckets))
+            if buckets[oldest_key][1] >= cutoff:
+                return
+            del buckets[oldest_key]
+    
+    def size(self) -> int:
+        with self._lock:
+            return sum(len(buckets) for buckets in self._buckets.values())
+
+class SQLiteBucketStore:
+    """
+    Buckets in a SQLite file shared by every worker process on the host
+    Each consume reads and charges all of a request's buckets in one short
+    IMMEDIATE transaction
+    """
+    
+    def __init__(self, db_path: str, idle_ttl: float = 600, cleanup_every: int = 1000):
+        self.db_path = db_path
+        self.idle_ttl = idle_ttl
+        self.cleanup_every = cleanup_every
+        self._local = threading.local()
+        self._calls = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            " scope TEXT NOT NULL, key TEXT NOT NULL, tokens REAL NOT NULL, updated REAL NOT NULL,"
+            " PRIMARY KEY (scope, key))"
+        )
+    
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and per process (connections must not cross fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def consume(self, rules: List[Tuple[RateLimitRule, str]], cost: float = 1,
+                now: Optional[float] = None) -> Tuple[Optional[str], float]:
+        now = now or time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = []
+            for rule, key in rules:
+                row = conn.execute(
+                    "SELECT tokens, updated FROM rate_limit_buckets WHERE scope = ? AND key = ?",
+                    (rule.scope, key)
+                ).fetchone()
+                levels.append(rule.burst if row is None else _refill(row[0], row[1], rule, now))
+            
+            limited, retry_after = _verdict(rules, levels, cost)
+            if limited is None:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (scope, key, tokens, updated) VALUES (?, ?, ?, ?)",
+                    [(rule.scope, key, tokens - cost, now) for (rule, key), tokens in zip(rules, levels)]
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        
+        self._calls += 1
+        if self._calls % self.cleanup_every == 0:
+            conn.execute("DELETE FROM rate_limit_buckets WHERE updated < ?", (now - self.idle_ttl,))
+        
+        return limited, retry_after
+    
+    def size(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limit_buckets").fetchone()[0]
+
+class RateLimiter:
+    """Checks global, device and session buckets for a request"""
+    
+    def __init__(self, store, rules: Dict[str, RateLimitRule]):
+        self.store = store
+        self.rules = rules
+    
+    def check(self, device_id: Optional[str] = None, session_id: Optional[str] = None,
+              crisis: bool = False, cost: float = 1) -> Tuple[bool, Optional[str], float]:
+        """
+        Returns (allowed, limited_scope, retry_after_seconds)
+        Fails open if the backing store is unreachable
+        """
+        if crisis:
+            metrics.increment('rate_limit.crisis_bypass')
+            return True, None, 0.0
+        
+        checks = [(SCOPE_SESSION, session_id), (SCOPE_DEVICE, device_id), (SCOPE_GLOBAL, SCOPE_GLOBAL)]
+        rules = [(self.rules[scope], key) for scope, key in checks if key and scope in self.rules]
+        if not rules:
+            return True, None, 0.0
+        try:
+            limited, retry_after = self.store.consume(rules, cost)
+        except Exception as e:
+            logger.error(f"Rate limit store error: {e}")
+            metrics.increment('rate_limit.store_errors')
+            return True, None, 0.0
+        if limited is not None:
+            metrics.increment(f"rate_limit.throttled.{limited}")
+            return False, limited, retry_after
+        
+        return True, None, 0.0
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'backend': type(self.store).__name__,
+            'rules': {scope: rule.to_dict() for scope, rule in self.rules.items()},
+            'tracked_buckets': self.store.size()
+        }
+
+def build_rate_limiter_from_env() -> RateLimiter:
+    """
+    RATE_LIMIT_BACKEND=memory|sqlite (RATE_LIMIT_DB_PATH for sqlite)
+    Per-minute limits: RATE_LIMIT_DEVICE_PER_MIN, RATE_LIMIT_SESSION_PER_MIN, RATE_LIMIT_GLOBAL_PER_MIN
+    """
+    device_per_min = float(os.getenv('RATE_LIMIT_DEVICE_PER_MIN', 30))
+    session_per_min = float(os.getenv('RATE_LIMIT_SESSION_PER_MIN', 20))
+    global_per_min = float(os.getenv('RATE_LIMIT_GLOBAL_PER_MIN', 3000))
+    rules = {
+        SCOPE_DEVICE: RateLimitRule(SCOPE_DEVICE, device_per_min / 60.0, max(1.0, device_per_min / 3)),
+        SCOPE_SESSION: RateLimitRule(SCOPE_SESSION, session_per_min / 60.0, max(1.0, session_per_min / 4)),
+        SCOPE_GLOBAL: RateLimitRule(SCOPE_GLOBAL, global_per_min / 60.0, max(1.0, global_per_min / 6))
+    }
+    
+    backend = os.getenv('RATE_LIMIT_BACKEND', 'memory').lower()
+    if backend == 'sqlite':
+        db_path = os.getenv('RATE_LIMIT_DB_PATH', '/tmp/codeword_rate_limits.db')
+        store = SQLiteBucketStore(db_path)
+        logger.info(f"Rate limiting with shared SQLite store: {db_path}")
+    else:
+        store = InMemoryBucketStore()
+    
+    return RateLimiter(store, rules)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Priority Scheduler
+Shared worker pool for agent execution and LLM calls with reserved crisis
+capacity and weighted, starvation-free queueing between priority classes
+"""
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Any, Callable
+import logging
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CRISIS = 'crisis'
+PRIORITY_STANDARD = 'standard'
+
+class PriorityExecutor:
+    """
+    Thread pool with two queues
+    - `reserved_workers` threads only ever run crisis work
+    - shared threads pick crisis work `crisis_weight` times for every standard
+      task while both queues are non-empty, so standard work is never starved
+    """
+    
+    def __init__(self, shared_workers: int = 8, reserved_workers: int = 2,
+                 crisis_weight: int = 4, name: str = 'xcai'):
+        self.shared_workers = shared_workers
+        self.reserved_workers = reserved_workers
+        self.crisis_weight = max(1, crisis_weight)
+        self.name = name
+        
+        self._queues = {PRIORITY_CRISIS: deque(), PRIORITY_STANDARD: deque()}
+        self._cond = threading.Condition()
+        self._crisis_streak = 0
+        self._threads = []
+        self._shutdown = False
+        self._started = False
+        
+        # Worker threads do not survive fork; let each child start its own
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+    
+    def submit(self, fn: Callable, *args, priority: str = PRIORITY_STANDARD, **kwargs) -> Future:
+        """Queue a callable and return a concurrent.futures.Future for its result"""
+        if priority not in self._queues:
+            priority = PRIORITY_STANDARD
+        future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError(f"{self.name} executor is shut down")
+            if not self._started:
+                self._start_workers()
+            self._queues[priority].append((future, fn, args, kwargs))
+            self._cond.notify_all()
+        metrics.increment(f"scheduler.{self.name}.submitted.{priority}")
+        return future
+    
+    def queue_depths(self) -> Dict[str, int]:
+        with self._cond:
+            return {priority: len(queue) for priority, queue in self._queues.items()}
+    
+    def shutdown(self, wait: bool = True):
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+    
+    def _reset_after_fork(self):
+        self._cond = threading.Condition()
+        self._queues = {PRIORITY_CRISIS: deque(), PRIORITY_STANDARD: deque()}
+        self._threads = []
+        self._started = False
+        self._crisis_streak = 0
+    
+    def _start_workers(self):
+        # Threads start lazily so forked gunicorn workers get their own pool
+        for index in range(self.reserved_workers):
+            self._spawn(f"{self.name}-crisis-{index}", crisis_only=True)
+        for index in range(self.shared_workers):
+            self._spawn(f"{self.name}-shared-{index}", crisis_only=False)
+        self._started = True
+    
+    def _spawn(self, thread_name: str, crisis_only: bool):
+        thread = threading.Thread(target=self._worker, args=(crisis_only,), name=thread_name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+    
+    def _next_task(self, crisis_only: bool):
+        """Pick the next task under the lock, or None if nothing is runnable"""
+        crisis_queue = self._queues[PRIORITY_CRISIS]
+        standard_queue = self._queues[PRIORITY_STANDARD]
+        
+        if crisis_only:
+            return crisis_queue.popleft() if crisis_queue else None
+        
+        if crisis_queue and (not standard_queue or self._crisis_streak < self.crisis_weight):
+            self._crisis_streak += 1
+            return crisis_queue.popleft()
+        if standard_queue:
+            self._crisis_streak = 0
+            return standard_queue.popleft()
+        return None
+    
+    def _worker(self, crisis_only: bool):
+        while True:
+            with self._cond:
+                task = self._next_task(crisis_only)
+                while task is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    task = self._next_task(crisis_only)
+            
+            future, fn, args, kwargs = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+class PrioritySemaphore:
+    """
+    Concurrency gate for a shared downstream (e.g. the OpenAI connection pool)
+    `reserved` slots can only be taken by crisis callers
+    """
+    
+    def __init__(self, total: int = 10, reserved: int = 2, name: str = 'llm'):
+        self.total = total
+        self.reserved = min(reserved, total - 1) if total > 1 else 0
+        self.name = name
+        self.in_use = 0
+        self._cond = threading.Condition()
+    
+    def acquire(self, priority: str = PRIORITY_STANDARD, timeout: float = None) -> bool:
+        capacity = self.total if priority == PRIORITY_CRISIS else self.total - self.reserved
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_use < capacity, timeout=timeout):
+                metrics.increment(f"scheduler.{self.name}.gate_timeout.{priority}")
+                return False
+            self.in_use += 1
+            return True
+    
+    def release(self):
+        with self._cond:
+            self.in_use = max(0, self.in_use - 1)
+            self._cond.notify_all()
+    
+    @contextmanager
+    def slot(self, priority: str = PRIORITY_STANDARD, timeout: float = None):
+        """Hold a slot for the duration of the block; raises TimeoutError if none frees up"""
+        if not self.acquire(priority, timeout=timeout):
+            raise TimeoutError(f"No {self.name} capacity available for {priority} request")
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def get_status(self) -> Dict[str, Any]:
+        with self._cond:
+            return {'total': self.total, 'reserved_for_crisis': self.reserved, 'in_use': self.in_use}
+
+# Global scheduler instances shared by agents and the orchestrator
+agent_executor = PriorityExecutor(
+    shared_workers=int(os.getenv('XCAI_AGENT_WORKERS', 8)),
+    reserved_workers=int(os.getenv('XCAI_CRISIS_WORKERS', 2)),
+    name='agents'
+)
+llm_gate = PrioritySemaphore(
+    total=int(os.getenv('XCAI_LLM_CONCURRENCY', 10)),
+    reserved=int(os.getenv('XCAI_LLM_CRISIS_RESERVED', 2)),
+    name='llm'
+)
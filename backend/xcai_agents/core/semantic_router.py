@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Semantic Router
+Optional routing stage after the keyword indicators: brings in a specialist
+when a message is close in wording to that specialist's example requests,
+so "my new pills make me dizzy" reaches ISHA without the word 'medication'.
+
+A message is embedded as a sparse vector of hashed features: its tokens
+(text_index) and the character trigrams of every token of four or more
+letters. The trigrams make "cultural" close to "culture" and "prescribed" to
+"prescription". Each feature is weighted by its inverse document frequency
+over the example sentences. Features no example contains carry no routing
+information, so they are dropped and a long message is not diluted by its
+small talk. The vector is L2-normalized.
+
+Each agent's centroid is the normalized mean of its examples' vectors. A
+'general' set of everyday messages has a centroid too. An agent is selected
+when its cosine similarity reaches `threshold` and beats 'general'.
+
+The centroids are one matrix in compressed sparse column form, in three
+contiguous arrays: for each feature slot, the agents with a weight there and
+those weights. Scoring a message is one sparse matrix-vector product, one
+multiply-add per (message feature, agent with that feature). Embeddings are
+cached per normalized message, and route() results on the message's index
+like a matcher's, so repeated messages cost a dictionary probe. Each token's
+slots are cached too, so a new message made of familiar words is hashed
+without any CRC-32.
+"""
+import os
+import json
+import math
+import zlib
+import threading
+from array import array
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+import logging
+
+from .text_index import TextIndex, index_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIMENSIONS = 1 << 14
+DEFAULT_THRESHOLD = 0.2
+CACHE_SIZE = 8192
+MIN_TRIGRAM_LENGTH = 4
+
+# Examples of requests each specialist should see; phrased without relying on
+# the keyword indicators, which already catch the obvious cases
+ROUTING_EXAMPLES = {
+    'NEMO': [
+        'my parents are immigrants and expect me to follow their customs',
+        'people at school treat me differently because of my race',
+        'i feel stuck between two cultures',
+        'my family does not accept that i am gay',
+        'coming out to my religious family',
+        'my faith and my community mean a lot to me',
+        'racism at work is wearing me down',
+        'i get stereotyped because of where i come from',
+        'nobody here speaks my language',
+        'my heritage and ethnicity feel invisible',
+        'being a minority in my town is lonely',
+        'my grandparents want an arranged marriage for me',
+        'i am transgender and my relatives refuse to use my name',
+        'microaggressions from coworkers every day',
+        'our holidays and rituals are not respected',
+        'prejudice against refugees like my family',
+        'i moved to a new country and feel like an outsider',
+        'my church says who i am is wrong',
+    ],
+    'MAC': [
+        'is it allowed to share my conversations with you',
+        'what happens to my data and privacy',
+        'who can read these messages',
+        'i want to report someone who is abusing me online',
+        'can i talk to a lawyer about this',
+        'is this against the rules',
+        'what are my rights if my landlord evicts me',
+        'can my employer fire me for this',
+        'do you keep my information confidential',
+        'i was harassed and want to file a complaint',
+        'is it ok to record someone without permission',
+        'my ex is threatening to post private photos',
+        'the terms of service and consent for this app',
+        'i think someone is stalking me',
+        'can you delete my account and personal information',
+        'is it okay to tell my boss about my diagnosis',
+        'regulations about reporting child abuse',
+    ],
+    'MIKA': [
+        'i cant cope with anything anymore',
+        'everything is falling apart and i need someone right now',
+        'i am scared of what i might do tonight',
+        'i dont see a way forward',
+        'i feel completely out of control',
+        'please i need someone to talk to immediately',
+        'i am panicking and cannot calm down',
+        'i dont feel safe at home right now',
+        'i am at my breaking point',
+        'my thoughts are getting really dark',
+        'i feel like disappearing forever',
+        'someone is threatening to hurt me',
+        'i am not okay and i am alone',
+    ],
+    'ISHA': [
+        'my new pills make me dizzy',
+        'side effects from my prescription',
+        'i have had chest pains for days',
+        'my blood pressure has been high',
+        'i was just diagnosed with diabetes',
+        'should i see a therapist or a psychiatrist',
+        'my antidepressants stopped working',
+        'i cant sleep and have insomnia every night',
+        'i keep getting migraines and headaches',
+        'my appointment at the clinic is next week',
+        'the hospital discharged me yesterday',
+        'i have a fever and feel sick',
+        'my dose was increased by the nurse',
+        'chronic pain in my back',
+        'pregnant and worried about my baby',
+        'i have been losing weight and not eating',
+        'my heart races and my hands shake',
+        'i forgot to take my meds',
+        'treatment for my illness is exhausting',
+    ],
+}
+
+# Everyday messages no specialist needs; an agent must score above these
+GENERAL_EXAMPLES = [
+    'i had a good day today',
+    'thanks for listening to me',
+    'i went for a walk with my friends',
+    'work was busy this week',
+    'what should i cook for dinner',
+    'i watched a movie last night',
+    'my dog is so funny',
+    'i am thinking about my plans for the weekend',
+    'how are you doing',
+    'i want to talk about my day',
+    'my sister visited us',
+    'i am reading a new book',
+    'school starts next week',
+    'i feel a bit tired but fine',
+    'we played games all evening',
+    'tell me something interesting',
+    'i cleaned my room and did laundry',
+    'the weather is nice outside',
+]
+
+GENERAL = 'general'
+
+def token_slots(token: str, dimensions: int) -> List[int]:
+    """Hashed slots of a token's word feature and character trigrams"""
+    slots = [zlib.crc32(token.encode()) % dimensions]
+    if len(token) >= MIN_TRIGRAM_LENGTH:
+        padded = f'<{token}>'
+        # A leading '#' keeps trigrams apart from three-letter words
+        slots.extend(zlib.crc32(f'#{padded[i:i + 3]}'.encode()) % dimensions for i in range(len(padded) - 2))
+    return slots
+
+def hashed_features(tokens: Sequence[str], dimensions: int) -> Dict[int, int]:
+    """Slot -> count of the tokens' word and character trigram features"""
+    counts: Dict[int, int] = {}
+    for token in tokens:
+        for slot in token_slots(token, dimensions):
+            counts[slot] = counts.get(slot, 0) + 1
+    return counts
+
+def _normalized(vector: Dict[int, float]) -> Dict[int, float]:
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {slot: value / norm for slot, value in vector.items()} if norm else {}
+
+class SemanticRouter:
+    """Agents whose example requests a message resembles"""
+    
+    def __init__(self, examples: Optional[Dict[str, List[str]]] = None, general: Optional[List[str]] = None,
+                 threshold: float = DEFAULT_THRESHOLD, dimensions: int = DEFAULT_DIMENSIONS):
+        examples = ROUTING_EXAMPLES if examples is None else examples
+        general = GENERAL_EXAMPLES if general is None else general
+        if not examples:
+            raise ValueError("Semantic routing needs example requests for at least one agent")
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self.agents = list(examples)
+        self.labels = self.agents + [GENERAL]
+        
+        groups = [[index_text(text).tokens for text in texts] for texts in list(examples.values()) + [general]]
+        documents = [hashed_features(tokens, dimensions) for group in groups for tokens in group]
+        frequency: Dict[int, int] = {}
+        for document in documents:
+            for slot in document:
+                frequency[slot] = frequency.get(slot, 0) + 1
+        # Slots no example has keep weight 0 and drop out of every message
+        self.idf = array('f', bytes(4 * dimensions))
+        for slot, count in frequency.items():
+            self.idf[slot] = math.log((len(documents) + 1) / count)
+        
+        self._cache: Dict[str, Tuple[Tuple[int, float], ...]] = {}
+        self._token_cache: Dict[str, Tuple[int, ...]] = {}
+        self._lock = threading.Lock()
+        
+        centroids = []
+        for group in groups:
+            total: Dict[int, float] = {}
+            for tokens in group:
+                for slot, value in self._weighted(tokens).items():
+                    total[slot] = total.get(slot, 0.0) + value
+            centroids.append(_normalized(total))
+        
+        # Compressed sparse columns: the agents with a weight in slot s are
+        # rows[offsets[s]:offsets[s + 1]], their weights values[...] likewise
+        self.offsets = array('I', [0] * (dimensions + 1))
+        self.rows = array('H')
+        self.values = array('f')
+        columns: Dict[int, List[Tuple[int, float]]] = {}
+        for row, centroid in enumerate(centroids):
+            for slot, value in centroid.items():
+                columns.setdefault(slot, []).append((row, value))
+        for slot in range(dimensions):
+            for row, value in columns.get(slot, ()):
+                self.rows.append(row)
+                self.values.append(value)
+            self.offsets[slot + 1] = len(self.rows)
+    
+    def _known_slots(self, token: str) -> Tuple[int, ...]:
+        # A token's slots that some example has; most messages reuse a small vocabulary
+        slots = self._token_cache.get(token)
+        if slots is None:
+            idf = self.idf
+            slots = tuple(slot for slot in token_slots(token, self.dimensions) if idf[slot])
+            with self._lock:
+                if len(self._token_cache) >= CACHE_SIZE:
+                    self._token_cache.clear()
+                self._token_cache[token] = slots
+        return slots
+    
+    def _weighted(self, tokens: Sequence[str]) -> Dict[int, float]:
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            for slot in self._known_slots(token):
+                counts[slot] = counts.get(slot, 0) + 1
+        idf = self.idf
+        return _normalized({slot: count * idf[slot] for slot, count in counts.items()})
+    
+    def embed(self, text: Union[str, TextIndex]) -> Tuple[Tuple[int, float], ...]:
+        """(slot, weight) pairs of the message's unit vector; cached per normalized message"""
+        tokens = (text if isinstance(text, TextIndex) else index_text(text)).tokens
+        key = ' '.join(tokens)
+        vector = self._cache.get(key)
+        if vector is None:
+            vector = tuple(self._weighted(tokens).items())
+            with self._lock:
+                if len(self._cache) >= CACHE_SIZE:
+                    self._cache.clear()
+                self._cache[key] = vector
+        return vector
+    
+    def similarities(self, text: Union[str, TextIndex]) -> Dict[str, float]:
+        """Cosine similarity to each agent's centroid and to 'general'"""
+        offsets, rows, values = self.offsets, self.rows, self.values
+        scores = [0.0] * len(self.labels)
+        for slot, weight in self.embed(text):
+            for k in range(offsets[slot], offsets[slot + 1]):
+                scores[rows[k]] += values[k] * weight
+        return dict(zip(self.labels, scores))
+    
+    def route(self, text: Union[str, TextIndex]) -> List[str]:
+        """Agents at or over the threshold and closer than everyday messages; cached on the message's index"""
+        index = text if isinstance(text, TextIndex) else index_text(text)
+        selected = index.matches.get(self)
+        if selected is None:
+            scores = self.similarities(index)
+            general = scores[GENERAL]
+            selected = index.matches[self] = [agent for agent in self.agents
+                                              if scores[agent] >= self.threshold and scores[agent] > general]
+        return selected
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'agents': self.agents,
+            'threshold': self.threshold,
+            'dimensions': self.dimensions,
+            'centroid_weights': len(self.values),
+            'cached_embeddings': len(self._cache)
+        }
+
+def load_examples(path: str) -> Tuple[Dict[str, List[str]], Optional[List[str]]]:
+    """Agent examples (and optionally 'general' ones) from a JSON object of lists of sentences"""
+    with open(path) as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not all(isinstance(texts, list) for texts in data.values()):
+        raise ValueError(f"{path}: expected an object mapping agent names to lists of example requests")
+    general = data.pop(GENERAL, None)
+    return data, general
+
+def build_semantic_router_from_env() -> Optional[SemanticRouter]:
+    """
+    XCAI_SEMANTIC_ROUTING=true enables the stage with the built-in examples;
+    XCAI_ROUTING_EXAMPLES is a JSON file of examples to use instead and
+    XCAI_SEMANTIC_ROUTING_THRESHOLD the similarity an agent needs
+    """
+    if os.getenv('XCAI_SEMANTIC_ROUTING', 'false').lower() != 'true':
+        return None
+    examples, general = None, None
+    path = os.getenv('XCAI_ROUTING_EXAMPLES')
+    if path:
+        examples, general = load_examples(path)
+    router = SemanticRouter(examples, general,
+                            threshold=float(os.getenv('XCAI_SEMANTIC_ROUTING_THRESHOLD', DEFAULT_THRESHOLD)))
+    logger.info(f"Semantic routing for {', '.join(router.agents)} (threshold {router.threshold})")
+    return router
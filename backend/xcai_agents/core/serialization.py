@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Serialization
+Pluggable JSON encoder for API responses and SSE frames
+Uses orjson, then ujson, when installed and falls back to the stdlib json
+module. Static fragments (the crisis_support block, the SSE done frame) are
+encoded once at import and spliced into responses as bytes.
+"""
+import json
+from typing import Any, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(',', ':'), default=str).encode()
+
+try:
+    import orjson
+    
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+    
+    def _fast_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+    
+    BACKEND = 'orjson'
+except ImportError:
+    try:
+        import ujson
+        
+        def _fast_dumps(obj: Any) -> bytes:
+            return ujson.dumps(obj, ensure_ascii=False, default=str).encode()
+        
+        BACKEND = 'ujson'
+    except ImportError:
+        _fast_dumps = _stdlib_dumps
+        BACKEND = 'json'
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON; anything the fast encoder rejects goes through stdlib"""
+    try:
+        return _fast_dumps(obj)
+    except (TypeError, ValueError, OverflowError):
+        return _stdlib_dumps(obj)
+
+def dumps_with_fragments(obj: Dict[str, Any], fragments: Dict[str, bytes]) -> bytes:
+    """Encode a dict and append pre-encoded `key: fragment` members without re-encoding them"""
+    body = dumps(obj)
+    parts = [body[:-1]]
+    for key, fragment in fragments.items():
+        if len(parts) > 1 or len(body) > 2:
+            parts.append(b',')
+        parts.append(dumps(key) + b':' + fragment)
+    parts.append(b'}')
+    return b''.join(parts)
+
+# Static fragments
+CRISIS_SUPPORT = {
+    '988_lifeline': 'Call or text 988 for immediate crisis support',
+    'crisis_text': 'Text HOME to 741741 for Crisis Text Line',
+    'emergency': 'Call 911 for immediate physical danger'
+}
+CRISIS_SUPPORT_JSON = dumps(CRISIS_SUPPORT)
+NULL_JSON = b'null'
+
+def crisis_support_fragment(crisis_mode: bool) -> bytes:
+    return CRISIS_SUPPORT_JSON if crisis_mode else NULL_JSON
+
+# Server-sent events
+SSE_DONE_FRAME = b'data: ' + dumps({'content': '', 'done': True}) + b'\n\n'
+_SSE_CONTENT_PREFIX = b'data: {"content":'
+_SSE_CONTENT_SUFFIX = b',"done":false}\n\n'
+
+def sse_content_frame(content: str) -> bytes:
+    """SSE frame for one streamed token; only the token itself is encoded"""
+    return _SSE_CONTENT_PREFIX + dumps(content) + _SSE_CONTENT_SUFFIX
+
+logger.debug(f"JSON serialization backend: {BACKEND}")
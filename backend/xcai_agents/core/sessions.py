@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Sessions
+Session ID service: unique, cheap, burst-safe IDs with a shard prefix
+Format: session-<2-char shard>-<26-char sortable id>, e.g. session-K7-01M5AP...
+The shard prefix is a hash of the ID's counter bits, so it is uniform across
+1024 shards even when thousands of sessions are created in the same millisecond.
+"""
+import time
+from typing import Dict, Any, Optional, List, Callable
+
+from .ids import id_generator, CROCKFORD_PAIRS, CROCKFORD_DECODE
+
+SESSION_PREFIX = 'session-'
+SHARD_COUNT = 1024
+
+def _shard_for(value: int) -> int:
+    # Fibonacci hashing of the low 48 bits (counter) into 10 bits
+    return (((value & 0xFFFFFFFFFFFF) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 54
+
+def new_session_id() -> str:
+    value = id_generator.next_int()
+    return f"{SESSION_PREFIX}{CROCKFORD_PAIRS[_shard_for(value)]}-{id_generator.encode(value)}"
+
+def session_shard(session_id: str, shards: int = SHARD_COUNT) -> Optional[int]:
+    """Shard (0..shards-1) encoded in a session ID's prefix; None for legacy IDs"""
+    start = len(SESSION_PREFIX)
+    if not session_id.startswith(SESSION_PREFIX) or session_id[start + 2:start + 3] != '-':
+        return None
+    prefix = session_id[start:start + 2]
+    try:
+        shard = (CROCKFORD_DECODE[prefix[0]] << 5) | CROCKFORD_DECODE[prefix[1]]
+    except KeyError:
+        return None
+    return shard % shards
+
+MAX_ID_ATTEMPTS = 64
+
+def create_session(sessions: Dict[str, Dict[str, Any]], device_id: str,
+                   accept: Optional[Callable[[str], bool]] = None) -> Dict[str, Any]:
+    """
+    Create and register a session; never overwrites an existing one
+    `accept` lets a node mint only IDs it owns (see affinity.py)
+    """
+    attempts = 0
+    while True:
+        session_id = new_session_id()
+        attempts += 1
+        if accept is not None and attempts < MAX_ID_ATTEMPTS and not accept(session_id):
+            continue
+        session = {
+            'session_id': session_id,
+            'device_id': device_id,
+            'created_at': time.time(),
+            'messages': []
+        }
+        # setdefault is atomic on a dict, so concurrent creators cannot clobber each other
+        if sessions.setdefault(session_id, session) is session:
+            return session
+
+def create_sessions(sessions: Dict[str, Dict[str, Any]], device_id: str, count: int,
+                    accept: Optional[Callable[[str], bool]] = None) -> List[Dict[str, Any]]:
+    return [create_session(sessions, device_id, accept) for _ in range(count)]
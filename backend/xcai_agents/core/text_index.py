@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Text Index
+Normalization and tokenization for keyword matching, done once per message
+and shared by routing and every agent that looks at the message.
+
+- normalize_text(): Unicode compatibility forms, case folding, diacritics
+  dropped, one apostrophe character.
+- tokenize(): word tokens. Apostrophes inside a word are dropped, so "can't"
+  and "cant" are one token. The exceptions are contractions that would turn
+  into a different word ("i'll"/"ill", "we're"/"were"). Hyphens, slashes and
+  all other punctuation separate tokens, so "self-harm" and "self harm" are
+  the same phrase.
+- index_text(): a TextIndex, the token array plus a hash set of its tokens.
+  A phrase matches when its own token sequence occurs in the message, that
+  is, exactly on word boundaries: 'sad' no longer matches "sadly" and 'my' no
+  longer matches "myth". Single-word phrases are set lookups. Longer phrases
+  are joined into n-grams only where their first token occurs. Indexes are
+  cached by message text.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+_APOSTROPHES = re.compile("[’‘ʼ]")  # fullwidth ＇ becomes ' under compatibility decomposition
+
+# Combining diacritical marks (Latin, Greek, Cyrillic and their supplements)
+_DIACRITICS = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]')
+
+# ASCII fast path: every byte other than a letter, digit or apostrophe separates tokens
+_ASCII_SEPARATORS = bytes.maketrans(
+    bytes(range(128)),
+    bytes(c if chr(c).isalnum() or c == ord("'") else ord(' ') for c in range(128))
+)
+
+# Contractions that would become a different word without the apostrophe
+_KEEP_APOSTROPHE = frozenset(('ill', 'well', 'were', 'wed', 'shell', 'hell', 'shed', 'id'))
+
+def normalize_text(text: str) -> str:
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize('NFKD', _APOSTROPHES.sub("'", text).casefold())
+    return unicodedata.normalize('NFC', _DIACRITICS.sub('', text))
+
+def tokenize(text: str) -> List[str]:
+    if text.isascii():
+        text = text.lower()
+        tokens = text.encode('ascii').translate(_ASCII_SEPARATORS).decode('ascii').split()
+    else:
+        text = normalize_text(text)
+        tokens = _TOKEN.findall(text)
+    return _without_apostrophes(tokens) if "'" in text else tokens
+
+def _without_apostrophes(tokens: List[str]) -> List[str]:
+    canonical = []
+    for token in tokens:
+        if "'" in token:
+            token = token.strip("'")  # quotes around a word
+            bare = token.replace("'", '')
+            if not bare:
+                continue
+            token = token if bare in _KEEP_APOSTROPHE else bare
+        canonical.append(token)
+    return canonical
+
+@lru_cache(maxsize=8192)
+def phrase_key(phrase: str) -> str:
+    """The n-gram a phrase matches as: its tokens joined by single spaces ('' if it has none)"""
+    return ' '.join(tokenize(phrase))
+
+class TextIndex:
+    """
+    Tokens of one message and a hash set of them
+    `matches` holds each matcher's result for this message, so checks that
+    share a matcher match once
+    """
+    
+    __slots__ = ('tokens', 'token_set', 'matches')
+    
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.token_set = frozenset(tokens)
+        self.matches: Dict[Any, Any] = {}
+    
+    def positions(self, token: str) -> Iterator[int]:
+        tokens = self.tokens
+        i = -1
+        while True:
+            try:
+                i = tokens.index(token, i + 1)
+            except ValueError:
+                return
+            yield i
+    
+    def __contains__(self, phrase: str) -> bool:
+        key = phrase_key(phrase)
+        first = key.split(' ', 1)[0]
+        if not key or first not in self.token_set:
+            return False
+        size = key.count(' ') + 1
+        return first == key or any(' '.join(self.tokens[i:i + size]) == key for i in self.positions(first))
+    
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+@lru_cache(maxsize=1024)
+def index_text(text: str) -> TextIndex:
+    """Cached per message text, so routing and each agent share one index"""
+    return TextIndex(tokenize(text))
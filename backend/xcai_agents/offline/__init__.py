@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Offline Analysis
+Batch jobs over stored messages that run outside the request path
+(entry points are runnable modules, e.g. `python -m xcai_agents.offline.runner`)
+"""
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Pattern Artifact Build
+Compiles every agent's keyword tables and batch matcher into one artifact.
+Servers load it through XCAI_PATTERN_ARTIFACT and pick up a replaced file
+without restarting. The output is written to a temporary file and renamed
+into place, so a running server never reads a partial artifact.
+
+With --config, the versioned JSON pattern configs (see core/pattern_config.py)
+are validated and overlaid on the built-in tables first.
+
+Usage: python -m xcai_agents.offline.build_patterns -o patterns.xcpat [--config patterns/] [--version 2024-06-01]
+       python -m xcai_agents.offline.build_patterns --inspect patterns.xcpat
+"""
+import sys
+import json
+import argparse
+from typing import Dict, Any, List, Optional
+import logging
+
+from ..agents.neo_agent import NEOAgent
+from ..agents.mika_agent import MIKAAgent
+from ..agents.nemo_agent import NEMOAgent
+from ..agents.echo_agent import ECHOAgent
+from ..agents.mac_agent import MACAgent
+from ..core.pattern_artifact import PatternArtifact, build_artifact
+from ..core.pattern_config import PatternConfigSet
+
+logger = logging.getLogger(__name__)
+
+PATTERN_AGENTS = {
+    'NEO': NEOAgent,
+    'MIKA': MIKAAgent,
+    'NEMO': NEMOAgent,
+    'ECHO': ECHOAgent,
+    'MAC': MACAgent
+}
+
+def build(output: str, version: Optional[str] = None, config_dir: Optional[str] = None) -> Dict[str, Any]:
+    agents = {name: cls() for name, cls in PATTERN_AGENTS.items()}
+    source = 'builtin'
+    if config_dir:
+        configs = PatternConfigSet(config_dir)
+        configs.compile(agents)
+        for name, agent in agents.items():
+            configs.apply(name, agent)
+        source = f"config:{configs.version}"
+    return build_artifact(agents, output, version=version, source=source)
+
+def inspect(path: str) -> Dict[str, Any]:
+    artifact = PatternArtifact(path)
+    try:
+        status = artifact.get_status()
+        status['tables'] = {
+            name: {table: len(value) for table, value in artifact.tables(name).items()}
+            for name in artifact.agents
+        }
+        status['phrases'] = {
+            name: artifact.matcher(name).size if artifact.matcher(name) else 0
+            for name in artifact.agents
+        }
+        return status
+    finally:
+        artifact.close()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-o', '--output', help='artifact path to write')
+    parser.add_argument('--config', metavar='DIR', help='JSON pattern configs to overlay on the built-in tables')
+    parser.add_argument('--version', default=None, help='version label (default: digest of the tables)')
+    parser.add_argument('--inspect', metavar='PATH', help='verify an artifact and print its contents')
+    args = parser.parse_args(argv)
+    if not args.output and not args.inspect:
+        parser.error('one of -o/--output or --inspect is required')
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    logging.getLogger('xcai_agents').setLevel(logging.WARNING)
+    try:
+        if args.output:
+            index = build(args.output, args.version, args.config)
+            print(f"Wrote {args.output}: version {index['version']}, agents {', '.join(index['agents'])}")
+        if args.inspect:
+            print(json.dumps(inspect(args.inspect), indent=2))
+    except (ValueError, OSError) as e:
+        logger.error(str(e))
+        return 2
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
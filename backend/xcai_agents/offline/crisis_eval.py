@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Crisis Evaluation Set
+Misspelled crisis messages with the level MIKA should assign them, and
+everyday near-misses that must stay at 'none'. Shared by the fuzzy detection
+benchmark (benchmarks/bench_fuzzy_crisis.py) and the tests.
+"""
+
+# (message, MIKA level)
+RECALL = [
+    ("i want to kil myself", 'critical'),
+    ("I want to kill myslef", 'critical'),
+    ("gonna kms tonight", 'critical'),
+    ("i just wanna die", 'critical'),
+    ("i wanna die so bad", 'critical'),
+    ("thinking about suicde", 'critical'),
+    ("sucide is all i think about", 'critical'),
+    ("killmyself", 'critical'),
+    ("i want to kill my self", 'critical'),
+    ("gonna end my lfie", 'critical'),
+    ("going to tkae my own life", 'critical'),
+    ("i'm beter off dead", 'critical'),
+    ("took an ovrdose", 'critical'),
+    ("i think i overdosd", 'critical'),
+    ("i cant breath", 'critical'),
+    ("ready to dye", 'none'),  # "die" is too short for an edit budget
+    ("going to hurt myslef", 'critical'),
+    ("i want to unalive myself", 'critical'),
+    ("cuting again", 'high'),
+    ("I want to hurt myslef", 'high'),
+    ("reserching suicide methods", 'critical'),
+    ("i feel so hopless", 'moderate'),
+    ("i am worthles", 'moderate'),
+    ("im completly isloated", 'moderate'),
+    ("im so depresed", 'low'),
+    ("really overwelmed lately", 'low'),
+    ("i feel anxius", 'low'),
+    ("i am strugling", 'low'),
+]
+
+NEGATIVES = [
+    "I will myself to get up every morning",
+    "Fill myself up with coffee before work",
+    "We volunteer at the homeless shelter",
+    "My wife and I went to the lake",
+    "The bill came and we split it",
+    "I took a pill for my headache",
+    "They went to the mill by the hill",
+    "Hunt for a new job this week",
+    "I need to read more books",
+    "Going to the farm to see the horses",
+    "It is warm and sunny today",
+    "The candle smelled like pine",
+    "My keeper at the zoo job is great",
+    "I was married last spring",
+    "The violet flowers are blooming",
+    "I love my life and my family",
+    "Pay the rent and then take a nap",
+    "The kids skill at chess is impressive",
+    "We moved to a new town",
+    "I feel fine, thanks for asking",
+]
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Streaming Pipeline
+Memory-bounded analysis of conversation exports.
+
+Each stage is a generator: read, then normalize, then batch, then analyze,
+then write. Records are pulled through one batch at a time, so memory depends
+on batch size and queue depth, not on input size. Exports are read from a
+memory-mapped file or from stdin. Two formats are accepted:
+- NDJSON: /events/<id>?format=ndjson, or one {"message": ...} per line.
+- JSON documents: the /events/<id> response, or a bare array. The "events"
+  array is decoded one element at a time.
+
+Set read_ahead or write_behind to run the stage before that point in a
+background thread. A bounded queue links the two sides. A full queue blocks
+the producer, which gives backpressure. With 0 the stages run in the
+caller's thread. Analysis uses the same agent classes and process_batch path
+as the online orchestrator.
+
+Usage: python -m xcai_agents.offline.pipeline export.ndjson -o results.ndjson
+       curl -s "$HOST/events/$ID?format=ndjson" | python -m xcai_agents.offline.pipeline - --session-id "$ID"
+"""
+import os
+import re
+import sys
+import json
+import mmap
+import queue
+import codecs
+import argparse
+import threading
+from typing import Dict, Any, BinaryIO, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+from .runner import build_batch_orchestrator, open_crisis_model, resolve_agents
+from ..core.serialization import dumps
+from ..core.pattern_store import open_pattern_source
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 1 << 16
+DEFAULT_ROLES = ('user',)  # assistant replies are ours, not the user's state
+
+_DONE = object()
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+def _open_source(path: str) -> Tuple[BinaryIO, Any]:
+    """(readable binary stream, resource to close); files are memory-mapped"""
+    if path == '-':
+        return sys.stdin.buffer, None
+    f = open(path, 'rb')
+    if os.fstat(f.fileno()).st_size == 0:
+        return f, f
+    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    f.close()
+    if hasattr(mapped, 'madvise'):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    return mapped, mapped
+
+def iter_ndjson(stream: BinaryIO, stats: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+    for line in iter(stream.readline, b''):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            stats['invalid'] += 1
+
+def iter_json_array(stream: BinaryIO, key: str = 'events', read_size: int = READ_SIZE) -> Iterator[Any]:
+    """
+    Elements of a top-level array, or of the array under `key` in a top-level
+    object, decoded one at a time from a stream
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer, pos, eof = '', 0, False
+    
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = stream.read(read_size)
+        eof = not chunk
+        # Drop what has been consumed so the buffer stays around one read plus one element
+        buffer = buffer[pos:] + utf8.decode(chunk, final=eof)
+        pos = 0
+        return True
+    
+    # Find the opening bracket
+    opening = re.compile(r'\s*\[|\s*\{.*?"' + re.escape(key) + r'"\s*:\s*\[', re.DOTALL)
+    while True:
+        match = opening.match(buffer)
+        if match and (match.end() < len(buffer) or eof):
+            pos = match.end()
+            break
+        if not fill():
+            raise ValueError(f"No JSON array (or '{key}' array) found")
+    
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buffer):
+            if not fill():
+                raise ValueError("Unterminated JSON array")
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            element, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not fill():
+                raise
+            continue
+        if end == len(buffer) and not eof:
+            fill()  # a number at the end of the buffer may continue in the next read
+            continue
+        pos = end
+        yield element
+
+def read_records(path: str, input_format: Optional[str] = None,
+                 stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """Raw export records from a file ('-' for stdin)"""
+    stats = stats if stats is not None else {'invalid': 0}
+    input_format = input_format or ('json' if path.endswith('.json') else 'ndjson')
+    stream, resource = _open_source(path)
+    try:
+        if input_format == 'json':
+            yield from iter_json_array(stream)
+        else:
+            yield from iter_ndjson(stream, stats)
+    finally:
+        if resource is not None:
+            resource.close()
+
+def normalize_records(records: Iterable[Any], session_id: Optional[str] = None,
+                      roles: Optional[Sequence[str]] = DEFAULT_ROLES,
+                      stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Export records to batch requests: {'id', 'message', 'session_id', 'timestamp'}
+    Accepts stored events ({'role', 'content', 'timestamp'}), request-shaped
+    records ({'message', 'session_id'}) and bare strings; ids number the input records
+    """
+    stats = stats if stats is not None else {'skipped': 0}
+    for index, record in enumerate(records):
+        if isinstance(record, str):
+            record = {'message': record}
+        elif not isinstance(record, dict):
+            stats['skipped'] += 1
+            continue
+        if roles and record.get('role', roles[0]) not in roles:
+            stats['skipped'] += 1
+            continue
+        text = record.get('content', record.get('message'))
+        if not isinstance(text, str) or not text.strip():
+            stats['skipped'] += 1
+            continue
+        yield {
+            'id': record.get('id', index),
+            'message': text,
+            'session_id': record.get('session_id', session_id or ''),
+            'timestamp': record.get('timestamp')
+        }
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def buffered(items: Iterable[Any], maxsize: int) -> Iterator[Any]:
+    """
+    Run the upstream stage in a background thread at most `maxsize` items ahead
+    A full queue blocks the producer (backpressure); maxsize 0 runs it inline
+    """
+    if maxsize <= 0:
+        yield from items
+        return
+    
+    handoff: queue.Queue = queue.Queue(maxsize)
+    stop = threading.Event()
+    
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failure(e))
+    
+    thread = threading.Thread(target=produce, name='xcai-pipeline-stage', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = handoff.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        # Consumer finished or failed: release a producer blocked on a full queue
+        stop.set()
+
+def analyze(batches: Iterable[List[Dict[str, Any]]], orchestrator, agents: List[str]
+            ) -> Iterator[Tuple[List[Dict[str, Any]], Dict[str, Dict[str, List[Any]]]]]:
+    for batch in batches:
+        result = orchestrator.orchestrate_batch(batch, agents=agents, chunk_size=len(batch))
+        yield batch, result['agents']
+
+def result_rows(results: Iterable[Tuple[List[Dict[str, Any]], Dict[str, Dict[str, List[Any]]]]]
+                ) -> Iterator[Dict[str, Any]]:
+    """Columnar batch results back to one row per message"""
+    for batch, columns in results:
+        for i, request in enumerate(batch):
+            row = {'id': request['id'], 'session_id': request['session_id'], 'timestamp': request['timestamp']}
+            for agent_name, agent_columns in columns.items():
+                row[agent_name] = {
+                    column: values[i] for column, values in agent_columns.items() if column != 'session_id'
+                }
+            yield row
+
+def write_ndjson(rows: Iterable[Dict[str, Any]], out: BinaryIO, flush_every: int = 1000) -> int:
+    count = 0
+    for row in rows:
+        out.write(dumps(row) + b'\n')
+        count += 1
+        if count % flush_every == 0:
+            out.flush()
+    out.flush()
+    return count
+
+class StreamingPipeline:
+    """read -> normalize -> batch -> [read_ahead] -> analyze -> [write_behind] -> write"""
+    
+    def __init__(self, agents: Optional[List[str]] = None, batch_size: int = 1024,
+                 read_ahead: int = 2, write_behind: int = 2,
+                 roles: Optional[Sequence[str]] = DEFAULT_ROLES, patterns: Optional[str] = None,
+                 crisis_model: Optional[str] = None):
+        self.agents = resolve_agents(agents)
+        self.batch_size = batch_size
+        self.read_ahead = read_ahead
+        self.write_behind = write_behind
+        self.roles = roles
+        self.orchestrator = build_batch_orchestrator(
+            self.agents, open_pattern_source(patterns) if patterns else None, open_crisis_model(crisis_model)
+        )
+    
+    def rows(self, records: Iterable[Any], session_id: Optional[str] = None,
+             stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+        """Analyzed rows for any iterable of export records, produced lazily"""
+        stats = stats if stats is not None else {'skipped': 0}
+        requests = normalize_records(records, session_id, self.roles, stats)
+        batches = buffered(batched(requests, self.batch_size), self.read_ahead)
+        results = buffered(analyze(batches, self.orchestrator, self.agents), self.write_behind)
+        return result_rows(results)
+    
+    def run(self, source: str, output: str = '-', input_format: Optional[str] = None,
+            session_id: Optional[str] = None) -> Dict[str, int]:
+        stats = {'invalid': 0, 'skipped': 0}
+        if session_id is None and source != '-':
+            # /events/<session_id> saved as <session_id>.json or .ndjson
+            session_id = os.path.splitext(os.path.basename(source))[0]
+        
+        records = read_records(source, input_format, stats)
+        out = sys.stdout.buffer if output == '-' else open(output, 'wb')
+        try:
+            stats['written'] = write_ndjson(self.rows(records, session_id, stats), out)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        return stats
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="NDJSON or JSON export file, or '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help='NDJSON results (default stdout)')
+    parser.add_argument('--format', choices=('ndjson', 'json'), default=None, help='default: by extension')
+    parser.add_argument('--session-id', default=None, help='for records without one (default: file name)')
+    parser.add_argument('--agents', default=None, help='comma-separated (default NEO,MIKA,NEMO,MAC)')
+    parser.add_argument('--batch-size', type=int, default=1024)
+    parser.add_argument('--read-ahead', type=int, default=2, help='batches queued before analysis (0: inline)')
+    parser.add_argument('--write-behind', type=int, default=2, help='batches queued before writing (0: inline)')
+    parser.add_argument('--patterns', default=None,
+                        help='pattern artifact or config directory (default: built-in tables)')
+    parser.add_argument('--crisis-model', default=None,
+                        help="crisis model file or registry directory, for MIKA's model_risk column")
+    parser.add_argument('--all-roles', action='store_true', help='also analyze assistant messages')
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s', stream=sys.stderr)
+    logging.getLogger('xcai_agents').setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+    try:
+        pipeline = StreamingPipeline(
+            agents=[name.strip().upper() for name in args.agents.split(',')] if args.agents else None,
+            batch_size=args.batch_size, read_ahead=args.read_ahead, write_behind=args.write_behind,
+            roles=None if args.all_roles else DEFAULT_ROLES, patterns=args.patterns,
+            crisis_model=args.crisis_model
+        )
+        stats = pipeline.run(args.input, args.output, args.format, args.session_id)
+    except (ValueError, OSError) as e:
+        logger.error(str(e))
+        return 2
+    logger.info(f"{stats['written']:,d} messages analyzed, {stats['skipped']:,d} skipped, "
+                f"{stats['invalid']:,d} invalid lines")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
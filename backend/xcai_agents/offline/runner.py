@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Offline Runner
+Multi-core keyword analysis (NEO, MIKA, NEMO, MAC) over large message files.
+
+The input is split into units: newline-aligned byte ranges of a JSONL file, or
+row groups of a Parquet file. Units are spread over a process pool. Agents are
+built and their batch matchers compiled once in the parent, and the heap is
+frozen before forking, so workers share the tables copy-on-write. Each worker
+reads only its own units and sends back one columnar result per unit. The
+parent writes that result as a part file.
+
+Part files are written atomically and double as the checkpoint. A rerun with
+the same input and options skips every unit that already has a part file.
+
+Usage: python -m xcai_agents.offline.runner messages.jsonl -o results/ [--workers 8]
+"""
+import os
+import gc
+import sys
+import json
+import time
+import signal
+import argparse
+import multiprocessing
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import logging
+
+from ..agents.neo_agent import NEOAgent
+from ..agents.mika_agent import MIKAAgent
+from ..agents.nemo_agent import NEMOAgent
+from ..agents.mac_agent import MACAgent
+from ..core.parallel_agent_orchestrator import ParallelAgentOrchestrator, BATCH_AGENTS
+from ..core.serialization import dumps
+from ..core.pattern_store import open_pattern_source
+from ..core.crisis_model_store import CrisisModelStore
+
+logger = logging.getLogger(__name__)
+
+AGENT_CLASSES = {
+    'NEO': NEOAgent,
+    'MIKA': MIKAAgent,
+    'NEMO': NEMOAgent,
+    'MAC': MACAgent
+}
+
+CHECKPOINT_FILE = 'checkpoint.json'
+PART_TEMPLATE = 'part-{:06d}.json'
+DEFAULT_UNIT_BYTES = 1 << 20  # about 5-10k typical chat messages
+
+# Worker state: set in the parent before forking, or by _init_worker under spawn
+_worker: Dict[str, Any] = {}
+
+def _input_format(path: str) -> str:
+    return 'parquet' if path.endswith(('.parquet', '.pq')) else 'jsonl'
+
+def _parquet_file(path: str):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet input requires pyarrow (pip install pyarrow)")
+    return pq.ParquetFile(path)
+
+def plan_units(path: str, unit_bytes: int = DEFAULT_UNIT_BYTES) -> List[Tuple[int, int]]:
+    """JSONL: [start, end) byte ranges ending on line boundaries; Parquet: (row group, rows)"""
+    if _input_format(path) == 'parquet':
+        metadata = _parquet_file(path).metadata
+        return [(group, metadata.row_group(group).num_rows) for group in range(metadata.num_row_groups)]
+    
+    size = os.path.getsize(path)
+    units = []
+    with open(path, 'rb') as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + unit_bytes, size))
+            f.readline()  # run on to the end of the line the boundary fell in
+            end = min(f.tell(), size)
+            units.append((start, end))
+            start = end
+    return units
+
+def _parse_record(line: bytes, message_field: str) -> Dict[str, Any]:
+    record = json.loads(line)
+    if isinstance(record, str):
+        return {'message': record}
+    request = {'message': record.get(message_field) or ''}
+    if 'session_id' in record:
+        request['session_id'] = record['session_id']
+    return request
+
+def read_unit(path: str, unit: Tuple[int, int], message_field: str = 'message'
+              ) -> Tuple[List[Dict[str, Any]], List[int], List[int]]:
+    """(requests, record ids, ids that failed to parse); ids are byte offsets or row numbers"""
+    requests, ids, errors = [], [], []
+    
+    if _input_format(path) == 'parquet':
+        parquet = _parquet_file(path)
+        group, _ = unit
+        first_row = sum(parquet.metadata.row_group(g).num_rows for g in range(group))
+        columns = [name for name in (message_field, 'session_id') if name in parquet.schema_arrow.names]
+        for row, record in enumerate(parquet.read_row_group(group, columns=columns).to_pylist(), first_row):
+            request = {'message': record.get(message_field) or ''}
+            if record.get('session_id') is not None:
+                request['session_id'] = record['session_id']
+            requests.append(request)
+            ids.append(row)
+        return requests, ids, errors
+    
+    start, end = unit
+    with open(path, 'rb') as f:
+        f.seek(start)
+        offset = start
+        while offset < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                try:
+                    requests.append(_parse_record(line, message_field))
+                    ids.append(offset)
+                except (ValueError, AttributeError):
+                    errors.append(offset)
+            offset += len(line)
+    return requests, ids, errors
+
+def resolve_agents(agents: Optional[List[str]] = None) -> List[str]:
+    agent_names = list(agents or BATCH_AGENTS)
+    unknown = [name for name in agent_names if name not in AGENT_CLASSES]
+    if unknown:
+        raise ValueError(f"No batch analysis for agents: {', '.join(unknown)}")
+    return agent_names
+
+def build_batch_orchestrator(agent_names: List[str], patterns=None, crisis_model=None) -> ParallelAgentOrchestrator:
+    """
+    Orchestrator holding only the given batch agents, matchers compiled
+    `patterns` is an opened pattern source (see pattern_store.open_pattern_source); built-in tables without one
+    `crisis_model` is a loaded CrisisModelStore, for MIKA's model_risk column
+    """
+    orchestrator = ParallelAgentOrchestrator()
+    for name in agent_names:
+        agent = AGENT_CLASSES[name]()
+        if patterns is not None:
+            patterns.apply(name, agent)
+        if crisis_model is not None and hasattr(agent, 'crisis_model'):
+            agent.crisis_model = crisis_model
+        agent.process_batch([''])  # compile the batch matcher now (in the parent, for the runner)
+        orchestrator.register_agent(name, agent)
+    return orchestrator
+
+def open_crisis_model(path: Optional[str]) -> Optional[CrisisModelStore]:
+    """A loaded CrisisModelStore for a model file or registry, or None without a path"""
+    if not path:
+        return None
+    store = CrisisModelStore(path)
+    if not store.load():
+        raise ValueError(f"Crisis model not loaded: {store.last_error}")
+    return store
+
+def _prepare_worker(agent_names: List[str], chunk_size: int, message_field: str, patterns: Optional[str],
+                    crisis_model: Optional[str] = None):
+    configured = (_worker.get('agents'), _worker.get('patterns'), _worker.get('crisis_model'))
+    if configured != (agent_names, patterns, crisis_model):
+        source = open_pattern_source(patterns) if patterns else None
+        model = open_crisis_model(crisis_model)
+        _worker.update(
+            orchestrator=build_batch_orchestrator(agent_names, source, model), agents=agent_names,
+            patterns=patterns, patterns_version=source.version if source is not None else 'builtin',
+            crisis_model=crisis_model, crisis_model_version=model.version if model is not None else None,
+            chunk_size=chunk_size, message_field=message_field
+        )
+
+def _init_worker(agent_names: List[str], chunk_size: int, message_field: str, patterns: Optional[str],
+                 crisis_model: Optional[str] = None):
+    # Ctrl-C is handled by the parent, which terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _prepare_worker(agent_names, chunk_size, message_field, patterns, crisis_model)
+
+def _process_unit(task: Tuple[str, int, Tuple[int, int]]) -> Dict[str, Any]:
+    path, index, unit = task
+    requests, ids, errors = read_unit(path, unit, _worker['message_field'])
+    result = _worker['orchestrator'].orchestrate_batch(
+        requests, agents=_worker['agents'], chunk_size=_worker['chunk_size']
+    )
+    return {
+        'unit': index,
+        'range': list(unit),
+        'count': len(requests),
+        'ids': ids,
+        'errors': errors,
+        'agents': result['agents'],
+        'elapsed_ms': result['elapsed_ms'],
+        'pid': os.getpid()
+    }
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _job_signature(path: str, agent_names: List[str], unit_bytes: int, message_field: str,
+                   patterns_version: str, crisis_model_version: Optional[str] = None) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {
+        'input': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'format': _input_format(path),
+        'unit_bytes': unit_bytes,
+        'message_field': message_field,
+        'agents': agent_names,
+        'patterns': patterns_version,
+        'crisis_model': crisis_model_version
+    }
+
+def _completed_units(output_dir: str) -> set:
+    completed = set()
+    for name in os.listdir(output_dir):
+        if name.startswith('part-') and name.endswith('.json'):
+            completed.add(int(name[5:-5]))
+    return completed
+
+class Progress:
+    """Periodic progress lines: units, messages, throughput and ETA"""
+    
+    def __init__(self, total_units: int, done_units: int, interval: float):
+        self.total_units = total_units
+        self.done_units = done_units
+        self.skipped = done_units
+        self.messages = 0
+        self.interval = interval
+        self.start = time.time()
+        self.last_report = self.start
+    
+    def update(self, messages: int, force: bool = False):
+        self.done_units += 1
+        self.messages += messages
+        now = time.time()
+        if force or now - self.last_report >= self.interval:
+            self.last_report = now
+            logger.info(self.line(now))
+    
+    def line(self, now: Optional[float] = None) -> str:
+        elapsed = max((now or time.time()) - self.start, 1e-9)
+        rate = self.messages / elapsed
+        processed = self.done_units - self.skipped
+        remaining = self.total_units - self.done_units
+        eta = elapsed / processed * remaining if processed else 0.0
+        percent = 100.0 * self.done_units / self.total_units if self.total_units else 100.0
+        return (f"units {self.done_units}/{self.total_units} ({percent:.0f}%), "
+                f"{self.messages:,d} messages, {rate:,.0f} msg/s, eta {eta:.0f}s")
+
+def run(input_path: str, output_dir: str, agents: Optional[List[str]] = None,
+        workers: Optional[int] = None, unit_bytes: int = DEFAULT_UNIT_BYTES,
+        chunk_size: int = 4096, message_field: str = 'message', resume: bool = True,
+        progress_interval: float = 5.0, patterns: Optional[str] = None,
+        crisis_model: Optional[str] = None) -> Dict[str, Any]:
+    """Analyze every message in input_path, writing one part file per unit to output_dir"""
+    agent_names = resolve_agents(agents)
+    workers = workers or os.cpu_count() or 1
+    
+    # Build everything the workers need before forking (see below)
+    _prepare_worker(agent_names, chunk_size, message_field, patterns, crisis_model)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILE)
+    signature = _job_signature(
+        input_path, agent_names, unit_bytes, message_field, _worker['patterns_version'],
+        _worker['crisis_model_version']
+    )
+    
+    completed = set()
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            previous = json.load(f)
+        if not resume:
+            for index in _completed_units(output_dir):
+                os.remove(os.path.join(output_dir, PART_TEMPLATE.format(index)))
+        elif previous.get('job') != signature:
+            raise ValueError(f"{output_dir} holds results for a different job; use a new directory or --restart")
+        else:
+            completed = _completed_units(output_dir)
+    
+    units = plan_units(input_path, unit_bytes)
+    _write_atomic(checkpoint_path, dumps({'job': signature, 'units': len(units), 'finished': False}))
+    pending = [(input_path, index, unit) for index, unit in enumerate(units) if index not in completed]
+    if completed:
+        logger.info(f"Resuming: {len(units) - len(pending)} of {len(units)} units already done")
+    
+    # Frozen objects are never touched by the collector, so their pages stay shared with the parent
+    gc.collect()
+    gc.freeze()
+    
+    progress = Progress(len(units), len(units) - len(pending), progress_interval)
+    totals = {'messages': 0, 'errors': 0, 'worker_ms': 0.0}
+    pool = multiprocessing.Pool(
+        min(workers, len(pending)) or 1, initializer=_init_worker,
+        initargs=(agent_names, chunk_size, message_field, patterns, crisis_model)
+    )
+    try:
+        for result in pool.imap_unordered(_process_unit, pending):
+            _write_atomic(os.path.join(output_dir, PART_TEMPLATE.format(result['unit'])), dumps(result))
+            totals['messages'] += result['count']
+            totals['errors'] += len(result['errors'])
+            totals['worker_ms'] += result['elapsed_ms']
+            progress.update(result['count'])
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        gc.unfreeze()
+    
+    elapsed = time.time() - progress.start
+    summary = {
+        'units': len(units),
+        'processed_units': len(pending),
+        'skipped_units': len(units) - len(pending),
+        'messages': totals['messages'],
+        'errors': totals['errors'],
+        'workers': workers,
+        'elapsed_s': elapsed,
+        'messages_per_second': totals['messages'] / elapsed if elapsed else 0.0,
+        'worker_ms': totals['worker_ms']
+    }
+    _write_atomic(checkpoint_path, dumps({'job': signature, 'units': len(units), 'finished': True, 'summary': summary}))
+    if pending:
+        logger.info(progress.line())
+    return summary
+
+def iter_results(output_dir: str) -> Iterator[Dict[str, Any]]:
+    """Part files in input order"""
+    for index in sorted(_completed_units(output_dir)):
+        with open(os.path.join(output_dir, PART_TEMPLATE.format(index)), 'rb') as f:
+            yield json.load(f)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='JSONL (one string or {"message": ...} object per line) or .parquet')
+    parser.add_argument('-o', '--output', required=True, help='directory for part files and the checkpoint')
+    parser.add_argument('--agents', default=','.join(BATCH_AGENTS))
+    parser.add_argument('--workers', type=int, default=None, help='default: all cores')
+    parser.add_argument('--unit-bytes', type=int, default=DEFAULT_UNIT_BYTES)
+    parser.add_argument('--chunk', type=int, default=4096, help='messages per compiled scan')
+    parser.add_argument('--message-field', default='message')
+    parser.add_argument('--progress-interval', type=float, default=5.0)
+    parser.add_argument('--patterns', default=None,
+                        help='pattern artifact or config directory (default: built-in tables)')
+    parser.add_argument('--crisis-model', default=None,
+                        help="crisis model file or registry directory, for MIKA's model_risk column")
+    parser.add_argument('--restart', action='store_true', help='discard existing results instead of resuming')
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    logging.getLogger('xcai_agents').setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+    try:
+        summary = run(
+            args.input, args.output, agents=[name.strip().upper() for name in args.agents.split(',') if name.strip()],
+            workers=args.workers, unit_bytes=args.unit_bytes, chunk_size=args.chunk,
+            message_field=args.message_field, resume=not args.restart,
+            progress_interval=args.progress_interval, patterns=args.patterns,
+            crisis_model=args.crisis_model
+        )
+    except (ValueError, OSError) as e:
+        logger.error(str(e))
+        return 2
+    except KeyboardInterrupt:
+        logger.error("Interrupted; rerun the same command to resume")
+        return 130
+    print(json.dumps(summary, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+XCAi-AIIA Crisis Model Training
+Trains the second-stage crisis scorer (core/crisis_model.py) from labelled
+messages and exports it as a model file, optionally publishing it to a
+model registry.
+
+Input is an export the streaming pipeline reads (NDJSON or a JSON array).
+Each record has a "message" (or "content") and a "label": 1 or true for a
+crisis, 0 or false for anything else. With --weak-labels, records without a
+label are labelled by MIKA's keyword pass (critical or high is a crisis).
+That bootstraps a model from unlabelled history, which then generalizes past
+the exact phrases.
+
+Training is logistic regression with per-weight AdaGrad steps over the
+hashed features. Part of the data is held out. On the held-out part, a
+Platt scaling, sigmoid(a * margin + b), is fitted by Newton steps with a
+line search, so scores are calibrated probabilities. The decision threshold is the highest score that
+still reaches --target-recall. The model records AUC, precision and recall
+at that threshold, and log loss.
+
+Usage: python -m xcai_agents.offline.train_crisis_model labelled.ndjson -o crisis.xcmodel [--registry models/ --activate]
+       python -m xcai_agents.offline.train_crisis_model --registry models/ --list
+       python -m xcai_agents.offline.train_crisis_model --registry models/ --set-active VERSION
+       python -m xcai_agents.offline.train_crisis_model --inspect crisis.xcmodel
+"""
+import sys
+import json
+import math
+import random
+import argparse
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from .pipeline import read_records
+from ..agents.mika_agent import MIKAAgent
+from ..core.crisis_model import DEFAULT_BUCKETS, CrisisModel, ModelRegistry, hashed_slots, sigmoid, write_model
+from ..core.text_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+def labelled_examples(records: Iterable[Any], weak_labels: bool = False) -> Iterable[Tuple[str, int]]:
+    """(message, 0 or 1) from export records; unlabelled records need weak_labels"""
+    mika = MIKAAgent() if weak_labels else None
+    for record in records:
+        if isinstance(record, str):
+            record = {'message': record}
+        if not isinstance(record, dict):
+            continue
+        text = record.get('message', record.get('content'))
+        if not isinstance(text, str) or not text.strip():
+            continue
+        label = record.get('label')
+        if label is None:
+            if mika is None:
+                raise ValueError(f"Record without a label (use --weak-labels): {text[:50]!r}")
+            label = mika._detect_crisis_immediate(text)['level'] in ('critical', 'high')
+        yield text, int(bool(label))
+
+def _auc(scores: Sequence[float], labels: Sequence[int]) -> Optional[float]:
+    positives = sum(labels)
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return None
+    ranked = sorted(zip(scores, labels))
+    rank_sum, i = 0.0, 0
+    while i < len(ranked):
+        j = i
+        while j < len(ranked) and ranked[j][0] == ranked[i][0]:
+            j += 1
+        # Tied scores share their average rank
+        rank_sum += sum(label for _, label in ranked[i:j]) * (i + j + 1) / 2
+        i = j
+    return (rank_sum - positives * (positives + 1) / 2) / (positives * negatives)
+
+def _platt_loss(a: float, b: float, margins: Sequence[float], targets: Sequence[float]) -> float:
+    loss = 0.0
+    for margin, target in zip(margins, targets):
+        z = a * margin + b
+        # log(1 + e^z) - target * z, without overflow for either sign of z
+        loss += (z if z > 0 else 0.0) + math.log1p(math.exp(-abs(z))) - target * z
+    return loss
+
+def _fit_platt(margins: Sequence[float], labels: Sequence[int], iterations: int = 100) -> Tuple[float, float]:
+    # Newton steps with backtracking on log loss (Lin, Lin and Weng's variant of Platt scaling);
+    # Platt's smoothed targets keep the parameters finite when held-out data is separable
+    positives = sum(labels)
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return 1.0, 0.0
+    high, low = (positives + 1) / (positives + 2), 1 / (negatives + 2)
+    targets = [high if label else low for label in labels]
+    a, b = 0.0, math.log((positives + 1) / (negatives + 1))
+    loss = _platt_loss(a, b, margins, targets)
+    for _ in range(iterations):
+        g_a = g_b = 0.0
+        h_aa = h_bb = 1e-12
+        h_ab = 0.0
+        for margin, target in zip(margins, targets):
+            p = sigmoid(a * margin + b)
+            d, w = p - target, p * (1 - p)
+            g_a += d * margin
+            g_b += d
+            h_aa += w * margin * margin
+            h_ab += w * margin
+            h_bb += w
+        if abs(g_a) < 1e-5 and abs(g_b) < 1e-5:
+            break
+        det = h_aa * h_bb - h_ab * h_ab
+        step_a = -(h_bb * g_a - h_ab * g_b) / det
+        step_b = -(h_aa * g_b - h_ab * g_a) / det
+        slope = g_a * step_a + g_b * step_b
+        size = 1.0
+        while size >= 1e-10:
+            new_a, new_b = a + size * step_a, b + size * step_b
+            new_loss = _platt_loss(new_a, new_b, margins, targets)
+            if new_loss < loss + 1e-4 * size * slope:
+                a, b, loss = new_a, new_b, new_loss
+                break
+            size /= 2
+        else:
+            break  # no step lowers the loss any more
+    return a, b
+
+def train(examples: Sequence[Tuple[str, int]], buckets: int = DEFAULT_BUCKETS, epochs: int = 5,
+          learning_rate: float = 0.5, l2: float = 1e-6, holdout: float = 0.2,
+          target_recall: float = 0.95, seed: int = 0) -> Dict[str, Any]:
+    """Weights, bias, calibration, threshold and held-out metrics (keyword arguments of write_model)"""
+    if not examples:
+        raise ValueError("No training examples")
+    rng = random.Random(seed)
+    data = [(hashed_slots(tokenize(text), buckets), label) for text, label in examples]
+    rng.shuffle(data)
+    split = int(len(data) * (1 - holdout)) if len(data) >= 10 else len(data)
+    training, held_out = data[:split], data[split:]
+    
+    weights = [0.0] * buckets
+    squared = [0.0] * buckets
+    bias, bias_squared = 0.0, 0.0
+    for _ in range(epochs):
+        rng.shuffle(training)
+        for slots, label in training:
+            gradient = sigmoid(bias + sum(weights[slot] for slot in slots)) - label
+            if not gradient:
+                continue
+            for slot in slots:
+                # The L2 term is part of the accumulated gradient, or a tiny loss gradient would scale it up
+                step = gradient + l2 * weights[slot]
+                squared[slot] += step * step
+                weights[slot] -= learning_rate * step / math.sqrt(squared[slot])
+            bias_squared += gradient * gradient
+            bias -= learning_rate * gradient / math.sqrt(bias_squared)
+    
+    evaluation = held_out or training
+    labels = [label for _, label in evaluation]
+    margins = [bias + sum(weights[slot] for slot in slots) for slots, _ in evaluation]
+    calibration = _fit_platt(margins, labels) if held_out else (1.0, 0.0)
+    scores = [sigmoid(calibration[0] * margin + calibration[1]) for margin in margins]
+    
+    # Highest threshold whose recall on held-out crises still reaches the target
+    positive_scores = sorted((score for score, label in zip(scores, labels) if label), reverse=True)
+    threshold = 0.5
+    if positive_scores:
+        threshold = positive_scores[max(0, math.ceil(target_recall * len(positive_scores)) - 1)]
+    flagged = [score >= threshold for score in scores]
+    true_positives = sum(1 for hit, label in zip(flagged, labels) if hit and label)
+    log_loss = -sum(math.log(max(score if label else 1 - score, 1e-12)) for score, label in zip(scores, labels))
+    
+    return {
+        'weights': weights,
+        'bias': bias,
+        'calibration': calibration,
+        'threshold': threshold,
+        'metrics': {
+            'examples': len(data),
+            'training': len(training),
+            'held_out': len(held_out),
+            'positives': sum(label for _, label in data),
+            'auc': _auc(scores, labels),
+            'precision': true_positives / max(1, sum(flagged)),
+            'recall': true_positives / max(1, sum(labels)),
+            'log_loss': log_loss / len(labels)
+        }
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', nargs='?', help="labelled export (NDJSON or JSON array), '-' for stdin")
+    parser.add_argument('-o', '--output', help='model file to write')
+    parser.add_argument('--version', default=None, help='version label (default: digest of the weights)')
+    parser.add_argument('--weak-labels', action='store_true', help="label unlabelled records with MIKA's keyword pass")
+    parser.add_argument('--buckets', type=int, default=DEFAULT_BUCKETS)
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--learning-rate', type=float, default=0.5)
+    parser.add_argument('--holdout', type=float, default=0.2, help='fraction held out for calibration and metrics')
+    parser.add_argument('--target-recall', type=float, default=0.95)
+    parser.add_argument('--registry', metavar='DIR', help='model registry to publish to or manage')
+    parser.add_argument('--activate', action='store_true', help='make the published model the active version')
+    parser.add_argument('--set-active', metavar='VERSION', help='activate (or roll back to) a published version')
+    parser.add_argument('--list', action='store_true', help="list the registry's versions")
+    parser.add_argument('--inspect', metavar='PATH', help='verify a model file and print its metadata')
+    args = parser.parse_args(argv)
+    if args.input and not args.output:
+        parser.error('-o/--output is required when training')
+    if (args.activate or args.set_active or args.list) and not args.registry:
+        parser.error('--activate, --set-active and --list need --registry')
+    if not (args.input or args.inspect or args.set_active or args.list):
+        parser.error('nothing to do')
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    logging.getLogger('xcai_agents').setLevel(logging.WARNING)
+    registry = ModelRegistry(args.registry) if args.registry else None
+    try:
+        if args.input:
+            examples = list(labelled_examples(read_records(args.input), weak_labels=args.weak_labels))
+            model = train(examples, buckets=args.buckets, epochs=args.epochs, learning_rate=args.learning_rate,
+                          holdout=args.holdout, target_recall=args.target_recall)
+            meta = write_model(args.output, version=args.version, **model)
+            print(f"Wrote {args.output}: version {meta['version']}, threshold {meta['threshold']:.4f}, "
+                  f"metrics {json.dumps(meta['metrics'])}")
+            if registry is not None:
+                version = registry.publish(args.output, activate=args.activate)
+                print(f"Published {version} to {args.registry}{' (active)' if args.activate else ''}")
+        if args.set_active:
+            registry.activate(args.set_active)
+            print(f"Active version in {args.registry}: {args.set_active}")
+        if args.list:
+            active = registry.active_version()
+            for status in registry.versions():
+                marker = '*' if status['version'] == active else ' '
+                print(f"{marker} {status['version']}  trained {status['trained_at']:.0f}  "
+                      f"threshold {status['threshold']:.4f}  {json.dumps(status['metrics'])}")
+        if args.inspect:
+            model = CrisisModel(args.inspect)
+            print(json.dumps(model.get_status(), indent=2))
+            model.close()
+    except (ValueError, OSError) as e:
+        logger.error(str(e))
+        return 2
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
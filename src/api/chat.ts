@@ -246,20 +246,70 @@ async function sendMessage(
 }
 
 // Get session events (for analytics/debugging)
-async function getSessionEvents(sessionId: string): Promise<any[]> {
-  const res = await fetch(`${API_BASE}/events/${sessionId}`, {
-    headers: {
-      'X-Client': 'codeword-sprint',
-      'X-Version': '1.0.0',
-    },
-  });
+// Pages through history with the since/limit cursor; unchanged pages are served from the ETag cache
+type EventsPage = { etag: string; events: any[]; nextCursor: number; hasMore: boolean };
+// LRU by insertion order: a hit is re-inserted, the oldest page is dropped past the cap
+const MAX_CACHED_EVENT_PAGES = 100;
+const eventsCache = new Map<string, EventsPage>();
+
+function cacheEventsPage(url: string, page: EventsPage) {
+  eventsCache.delete(url);
+  eventsCache.set(url, page);
+  while (eventsCache.size > MAX_CACHED_EVENT_PAGES) {
+    eventsCache.delete(eventsCache.keys().next().value as string);
+  }
+}
 
-  if (!res.ok) {
-    throw new Error(`Failed to get events: ${res.status}`);
+// Drop a finished session's cached pages
+function clearSessionEvents(sessionId: string) {
+  const prefix = `${API_BASE}/events/${sessionId}?`;
+  for (const url of Array.from(eventsCache.keys())) {
+    if (url.startsWith(prefix)) eventsCache.delete(url);
   }
+}
 
-  const data = await res.json();
-  return data.events || [];
+async function getSessionEvents(
+  sessionId: string,
+  options: { since?: number; limit?: number } = {}
+): Promise<any[]> {
+  const limit = options.limit ?? 200;
+  const events: any[] = [];
+  let since = options.since ?? 0;
+
+  while (true) {
+    const url = `${API_BASE}/events/${sessionId}?since=${since}&limit=${limit}`;
+    const cached = eventsCache.get(url);
+    const res = await fetch(url, {
+      headers: {
+        'X-Client': 'codeword-sprint',
+        'X-Version': '1.0.0',
+        ...(cached ? { 'If-None-Match': cached.etag } : {}),
+      },
+    });
+
+    let page: EventsPage;
+    if (res.status === 304 && cached) {
+      page = cached;
+      cacheEventsPage(url, page);
+    } else if (res.ok) {
+      const data = await res.json();
+      page = {
+        etag: res.headers.get('ETag') ?? '',
+        events: data.events || [],
+        nextCursor: data.next_cursor ?? since + (data.events || []).length,
+        hasMore: Boolean(data.has_more),
+      };
+      if (page.etag) cacheEventsPage(url, page);
+    } else {
+      throw new Error(`Failed to get events: ${res.status}`);
+    }
+
+    events.push(...page.events);
+    if (!page.hasMore || page.nextCursor <= since) break;
+    since = page.nextCursor;
+  }
+
+  return events;
 }
 
 // Health check for the chat service with orchestration
@@ -319,5 +369,6 @@ export const chatApi = {
   sendMessage,
   sendWithFailover,
   getSessionEvents,
+  clearSessionEvents,
   healthCheck,
 };